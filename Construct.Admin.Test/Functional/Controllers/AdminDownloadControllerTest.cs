@@ -49,6 +49,12 @@ namespace Construct.Admin.Test.Functional.Controllers
                 ControllerContext = new ControllerContext()
                 {
                     HttpContext = new DefaultHttpContext()
+                    {
+                        Response =
+                        {
+                            Body = new MemoryStream(),
+                        },
+                    },
                 }
             };
             
@@ -68,6 +74,24 @@ namespace Construct.Admin.Test.Functional.Controllers
             });
         }
 
+        /// <summary>
+        /// Reads the lines of a CSV in the CSV ZIP.
+        /// </summary>
+        /// <param name="archive">Archive to read from.</param>
+        /// <param name="name">Name of the CSV.</param>
+        /// <returns>Lines of the CSV.</returns>
+        private static List<string> ReadLines(ZipArchive archive, string name)
+        {
+            var lines = new List<string>();
+            using var reader = new StreamReader(archive.GetEntry(name).Open());
+            string line;
+            while ((line = reader.ReadLine()) != null)
+            {
+                lines.Add(line);
+            }
+            return lines;
+        }
+        
         /// <summary>
         /// Asserts the contents of the CSVs.
         /// </summary>
@@ -77,28 +101,30 @@ namespace Construct.Admin.Test.Functional.Controllers
         /// <param name="totals">Lines of the totals CSV.</param>
         private void AssertCsvs(List<string> users, List<string> visits, List<string> prints, List<string> totals)
         {
-            // Get and extract the CSV files.
-            var csvActionResult = (PhysicalFileResult) this._adminDownloadController.GetCsvs(this._session).Result.Result;
-            var tmpDirectory = Path.Combine(Path.GetTempPath(), Guid.NewGuid().ToString());
-            ZipFile.ExtractToDirectory(csvActionResult.FileName, tmpDirectory);
+            // Get the CSV files.
+            Assert.IsInstanceOf<EmptyResult>(this._adminDownloadController.GetCsvs(this._session).Result.Result);
+            Assert.AreEqual("application/zip", this._adminDownloadController.Response.ContentType);
+            var responseBody = this._adminDownloadController.Response.Body;
+            responseBody.Position = 0;
+            using var archive = new ZipArchive(responseBody, ZipArchiveMode.Read);
             
             // Assert the users file is correct.
-            var usersFileContent = File.ReadAllLines(Path.Combine(tmpDirectory, "LabUsers.csv"));
+            var usersFileContent = ReadLines(archive, "LabUsers.csv");
             Assert.AreEqual("Hashed Id,Name,Email,College,Sign-Up Year", usersFileContent[0]);
             Assert.AreEqual(users, usersFileContent.Skip(1).ToList());
             
             // Assert the users file is correct.
-            var visitsFileContent = File.ReadAllLines(Path.Combine(tmpDirectory, "SwipeLog.csv"));
+            var visitsFileContent = ReadLines(archive, "SwipeLog.csv");
             Assert.AreEqual("Timestamp,Name,Email", visitsFileContent[0]);
             Assert.AreEqual(visits, visitsFileContent.Skip(1).ToList());
             
             // Assert the users file is correct.
-            var printLogFileContent = File.ReadAllLines(Path.Combine(tmpDirectory, "PrintLog.csv"));
+            var printLogFileContent = ReadLines(archive, "PrintLog.csv");
             Assert.AreEqual("Timestamp,Email,File Name,Material Type,Print Weight (g),Print Purpose,Bill To,Print Cost ($),Amount Owed ($)", printLogFileContent[0]);
             Assert.AreEqual(prints, printLogFileContent.Skip(1).ToList());
             
             // Assert the users file is correct.
-            var printTotalsFileContent = File.ReadAllLines(Path.Combine(tmpDirectory, "PrintTotals.csv"));
+            var printTotalsFileContent = ReadLines(archive, "PrintTotals.csv");
             Assert.AreEqual("Email,Total Filament Used (g),Current Amount Owed (g),Current Amount Owed ($),Total Number Of Prints", printTotalsFileContent[0]);
             Assert.AreEqual(totals, printTotalsFileContent.Skip(1).ToList());
         }
@@ -153,6 +179,43 @@ namespace Construct.Admin.Test.Functional.Controllers
                 new List<string>() { "test@email,0,0,$0.00,0", });
         }
 
+        /// <summary>
+        /// Tests GetCsvs with a user with multiple student information entries.
+        /// </summary>
+        [Test]
+        public void TestGetCsvsMultipleStudents()
+        {
+            // Add a student with 2 entries.
+            this.AddData((context) =>
+            {
+                var user = new Core.Database.Model.User()
+                {
+                    HashedId = "test_hash",
+                    Name = "Test User",
+                    Email = "test@email",
+                };
+                context.Users.Add(user);
+                context.Students.Add(new Student()
+                {
+                    User = user,
+                    College = "Test College 1",
+                    Year = "Test Year 1",
+                });
+                context.Students.Add(new Student()
+                {
+                    User = user,
+                    College = "Test College 2",
+                    Year = "Test Year 2",
+                });
+            });
+            
+            // Assert the user is only included once.
+            AssertCsvs(new List<string>() { "test_hash,Test User,test@email,Test College 1,Test Year 1", }, 
+                new List<string>(), 
+                new List<string>(), 
+                new List<string>() { "test@email,0,0,$0.00,0", });
+        }
+
         /// <summary>
         /// Tests GetCsvs with a user with no prints.
         /// </summary>
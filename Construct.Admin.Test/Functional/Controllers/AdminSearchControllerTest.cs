@@ -31,6 +31,9 @@ namespace Construct.Admin.Test.Functional.Controllers
         [SetUp]
         public void SetUpController()
         {
+            // Clear the cached search totals.
+            SearchTotalCache.GetSingleton().Clear();
+            
             // Create the controller.
             this._adminSearchController = new AdminSearchController()
             {
@@ -156,6 +159,26 @@ namespace Construct.Admin.Test.Functional.Controllers
             Assert.AreEqual((search == "" ? 9 : userNames.Count), response.TotalUsers);
         }
 
+        /// <summary>
+        /// Returns the pages of a print search paged with cursors.
+        /// </summary>
+        /// <param name="order">Column to sort by.</param>
+        /// <param name="ascending">Whether to search by ascending.</param>
+        /// <returns>The print names of each page.</returns>
+        private List<List<string>> GetPrintPages(string order, bool ascending)
+        {
+            var pages = new List<List<string>>();
+            string cursor = null;
+            do
+            {
+                var response = (PrintsResponse) this._adminSearchController.GetPrints(this._session, 3, 0, order, ascending, useCursor: true, cursor: cursor).Result.Value;
+                Assert.AreEqual(10, response.TotalPrints);
+                pages.Add(response.Prints.Select(print => print.Print.Name).ToList());
+                cursor = response.NextCursor;
+            } while (cursor != null);
+            return pages;
+        }
+
         /// <summary>
         /// Asserts that a list of visits are returned for a search.
         /// </summary>
@@ -401,6 +424,94 @@ namespace Construct.Admin.Test.Functional.Controllers
             this.AssertPrintsOrder("FileName", true, new List<string>() { }, hashedId: "unknown");
         }
 
+        /// <summary>
+        /// Tests GetPrints with cursors.
+        /// </summary>
+        [Test]
+        public void TestGetPrintsCursor()
+        {
+            Assert.AreEqual(new List<List<string>>()
+            {
+                new List<string>() { "TestPrint0", "TestPrint1", "TestPrint2" },
+                new List<string>() { "TestPrint3", "TestPrint4", "TestPrint5" },
+                new List<string>() { "TestPrint6", "TestPrint7", "TestPrint8" },
+                new List<string>() { "TestPrint9" },
+            }, this.GetPrintPages("FileName", true));
+            Assert.AreEqual(new List<List<string>>()
+            {
+                new List<string>() { "TestPrint9", "TestPrint0", "TestPrint8" },
+                new List<string>() { "TestPrint7", "TestPrint6", "TestPrint5" },
+                new List<string>() { "TestPrint4", "TestPrint3", "TestPrint2" },
+                new List<string>() { "TestPrint1" },
+            }, this.GetPrintPages("Time", false));
+        }
+
+        /// <summary>
+        /// Tests GetPrints with cursors and entries with the same value.
+        /// </summary>
+        [Test]
+        public void TestGetPrintsCursorSameValues()
+        {
+            var printNames = this.GetPrintPages("Owed", true).SelectMany(page => page).ToList();
+            Assert.AreEqual(10, printNames.Count);
+            Assert.AreEqual(10, printNames.Distinct().Count());
+        }
+
+        /// <summary>
+        /// Tests GetPrints with cursors and a search term.
+        /// </summary>
+        [Test]
+        public void TestGetPrintsCursorSearch()
+        {
+            var response = (PrintsResponse) this._adminSearchController.GetPrints(this._session, 1, 0, "FileName", true, "1", useCursor: true).Result.Value;
+            Assert.AreEqual(new List<string>() { "TestPrint1" }, response.Prints.Select(print => print.Print.Name).ToList());
+            Assert.AreEqual(2, response.TotalPrints);
+            response = (PrintsResponse) this._adminSearchController.GetPrints(this._session, 1, 0, "FileName", true, "1", cursor: response.NextCursor).Result.Value;
+            Assert.AreEqual(new List<string>() { "TestPrint7" }, response.Prints.Select(print => print.Print.Name).ToList());
+            Assert.AreEqual(2, response.TotalPrints);
+            Assert.IsNull(response.NextCursor);
+        }
+
+        /// <summary>
+        /// Tests GetPrints with invalid cursors.
+        /// </summary>
+        [Test]
+        public void TestGetPrintsInvalidCursor()
+        {
+            Assert.AreEqual("invalid-cursor", this._adminSearchController.GetPrints(this._session, 3, 0, "FileName", true, cursor: "invalid").Result.Value.Status);
+            Assert.AreEqual(400, this._adminSearchController.Response.StatusCode);
+            var timeCursor = ((PrintsResponse) this._adminSearchController.GetPrints(this._session, 3, 0, "Time", true, useCursor: true).Result.Value).NextCursor;
+            Assert.AreEqual("invalid-cursor", this._adminSearchController.GetPrints(this._session, 3, 0, "FileName", true, cursor: timeCursor).Result.Value.Status);
+        }
+
+        /// <summary>
+        /// Tests that GetPrints caches the total with cursors.
+        /// </summary>
+        [Test]
+        public void TestGetPrintsCursorCachedTotal()
+        {
+            // Load the total and add a print.
+            Assert.AreEqual(10, ((PrintsResponse) this._adminSearchController.GetPrints(this._session, 3, 0, "FileName", true, useCursor: true).Result.Value).TotalPrints);
+            this.AddData((context) =>
+            {
+                context.PrintLog.Add(new PrintLog()
+                {
+                    Time = new DateTime(10000),
+                    FileName = "TestPrint10",
+                    Material = context.PrintMaterials.First(),
+                    WeightGrams = 10,
+                    Purpose = "TestPurpose10",
+                    Cost = 10,
+                });
+            });
+            
+            // Assert the cached total is used with cursors but not with an offset.
+            Assert.AreEqual(10, ((PrintsResponse) this._adminSearchController.GetPrints(this._session, 3, 0, "FileName", true, useCursor: true).Result.Value).TotalPrints);
+            Assert.AreEqual(11, ((PrintsResponse) this._adminSearchController.GetPrints(this._session, 3, 0, "FileName", true).Result.Value).TotalPrints);
+            SearchTotalCache.GetSingleton().Clear();
+            Assert.AreEqual(11, ((PrintsResponse) this._adminSearchController.GetPrints(this._session, 3, 0, "FileName", true, useCursor: true).Result.Value).TotalPrints);
+        }
+
         /// <summary>
         /// Tests GetUsers with an unauthorized search.
         /// </summary>
@@ -552,6 +663,24 @@ namespace Construct.Admin.Test.Functional.Controllers
             this.AssertUsersOrder("Name", true, new List<string>() { }, search: "unknown");
         }
 
+        /// <summary>
+        /// Tests GetUsers with cursors and users with the same value.
+        /// </summary>
+        [Test]
+        public void TestGetUsersCursor()
+        {
+            var userNames = new List<string>();
+            string cursor = null;
+            do
+            {
+                var response = (UsersResponse) this._adminSearchController.GetUsers(this._session, 2, 0, "TotalPrints", true, useCursor: true, cursor: cursor).Result.Value;
+                Assert.AreEqual(9, response.TotalUsers);
+                userNames.AddRange(response.Users.Select(user => user.Name));
+                cursor = response.NextCursor;
+            } while (cursor != null);
+            Assert.AreEqual(Enumerable.Range(0, 9).Select(i => "Test Name " + i).ToList(), userNames.OrderBy(name => name).ToList());
+        }
+
         /// <summary>
         /// Tests GetUsers for permissions.
         /// </summary>
@@ -710,5 +839,21 @@ namespace Construct.Admin.Test.Functional.Controllers
             this.AssertVisitsOrder("Name", true, new List<string>() { "Test Name 1"}, search: "1");
             this.AssertVisitsOrder("Name", true, new List<string>() { }, search: "unknown");
         }
+
+        /// <summary>
+        /// Tests GetVisits with cursors.
+        /// </summary>
+        [Test]
+        public void TestGetVisitsCursor()
+        {
+            var response = (VisitsResponse) this._adminSearchController.GetVisits(this._session, 4, 0, "Time", false, useCursor: true).Result.Value;
+            Assert.AreEqual(new List<string>() { "Test Name 0", "Test Name 8", "Test Name 7", "Test Name 6" }, response.Visits.Select(visit => visit.Name).ToList());
+            Assert.AreEqual(9, response.TotalVisits);
+            response = (VisitsResponse) this._adminSearchController.GetVisits(this._session, 4, 0, "Time", false, cursor: response.NextCursor).Result.Value;
+            Assert.AreEqual(new List<string>() { "Test Name 5", "Test Name 4", "Test Name 3", "Test Name 2" }, response.Visits.Select(visit => visit.Name).ToList());
+            response = (VisitsResponse) this._adminSearchController.GetVisits(this._session, 4, 0, "Time", false, cursor: response.NextCursor).Result.Value;
+            Assert.AreEqual(new List<string>() { "Test Name 1" }, response.Visits.Select(visit => visit.Name).ToList());
+            Assert.IsNull(response.NextCursor);
+        }
     }
 }
\ No newline at end of file
@@ -1,4 +1,5 @@
 using System.Threading;
+using System.Threading.Tasks;
 using Construct.Admin.State;
 using NUnit.Framework;
 
@@ -128,5 +129,55 @@ namespace Construct.Admin.Test.State
             Assert.IsTrue(this._session.SessionValid(session1));
             Assert.IsFalse(this._session.SessionValid(session2));
         }
+
+        /// <summary>
+        /// Tests the metrics of removed sessions.
+        /// </summary>
+        [Test]
+        public void TestMetrics()
+        {
+            for (var i = 0; i < 5; i++)
+            {
+                this._session.CreateSession("test");
+            }
+            Assert.AreEqual(3, this._session.Count);
+            Assert.AreEqual(2, this._session.Evictions);
+            Assert.AreEqual(0, this._session.Expirations);
+        }
+
+        /// <summary>
+        /// Tests removing the expired sessions.
+        /// </summary>
+        [Test]
+        public void TestRemoveExpiredSessions()
+        {
+            var initialSession = this._session.CreateSession("test");
+            this._session.CreateSession("test2");
+            Thread.Sleep(1100);
+            var newSession = this._session.CreateSession("test");
+            this._session.RemoveExpiredSessions();
+            Assert.AreEqual(1, this._session.Count);
+            Assert.AreEqual(2, this._session.Expirations);
+            Assert.IsFalse(this._session.SessionValid(initialSession));
+            Assert.IsTrue(this._session.SessionValid(newSession));
+        }
+
+        /// <summary>
+        /// Tests creating and refreshing sessions from multiple threads.
+        /// </summary>
+        [Test]
+        public void TestConcurrentSessions()
+        {
+            this._session.MaxSessionDuration = 60;
+            Parallel.For(0, 1000, (i) =>
+            {
+                var identifier = "test" + (i % 10);
+                var newSession = this._session.CreateSession(identifier);
+                this._session.RefreshSession(newSession);
+                this._session.GetIdentifier(newSession);
+            });
+            Assert.AreEqual(30, this._session.Count);
+            Assert.AreEqual(970, this._session.Evictions);
+        }
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,164 @@
+using System;
+using System.Collections.Generic;
+using Construct.Admin.State;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Database.Model;
+using NUnit.Framework;
+
+namespace Construct.Admin.Test.State
+{
+    public class VisitFeedTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Feed under test.
+        /// </summary>
+        private VisitFeed _visitFeed;
+
+        /// <summary>
+        /// Sets up the feed and the test user.
+        /// </summary>
+        [SetUp]
+        public void SetUpFeed()
+        {
+            this._visitFeed = new VisitFeed()
+            {
+                PollInterval = 60000,
+                MaxVisits = 2,
+            };
+            this.AddData((context) =>
+            {
+                var user = new User()
+                {
+                    HashedId = "test_hash",
+                    Name = "Test User",
+                    Email = "test@email",
+                };
+                user.Permissions = new List<Permission>()
+                {
+                    new Permission()
+                    {
+                        User = user,
+                        Name = "LabManager",
+                    },
+                };
+                context.Users.Add(user);
+                context.VisitLogs.Add(new VisitLog()
+                {
+                    User = user,
+                    Source = "OldSource",
+                    Time = DateTime.Now,
+                });
+            });
+        }
+
+        /// <summary>
+        /// Adds visits for the test user.
+        /// </summary>
+        /// <param name="totalVisits">Total visits to add.</param>
+        private void AddVisits(int totalVisits)
+        {
+            this.AddData((context) =>
+            {
+                var user = context.Users.Find("test_hash");
+                for (var i = 0; i < totalVisits; i++)
+                {
+                    context.VisitLogs.Add(new VisitLog()
+                    {
+                        User = user,
+                        Source = "NewSource" + i,
+                        Time = DateTime.Now,
+                    });
+                }
+            });
+        }
+
+        /// <summary>
+        /// Tests sending new visits to subscribers.
+        /// </summary>
+        [Test]
+        public void TestPoll()
+        {
+            // Subscribe and assert only visits after subscribing are sent.
+            var (id, visits) = this._visitFeed.SubscribeAsync().Result;
+            this._visitFeed.PollAsync().Wait();
+            Assert.IsFalse(visits.TryRead(out _));
+
+            // Add visits and assert they are sent in order, including past the max visits of a check.
+            this.AddVisits(3);
+            this._visitFeed.PollAsync().Wait();
+            for (var i = 0; i < 3; i++)
+            {
+                Assert.IsTrue(visits.TryRead(out var visit));
+                Assert.AreEqual("NewSource" + i, visit.Source);
+                Assert.AreEqual("test_hash", visit.HashedId);
+                Assert.AreEqual("Test User", visit.Name);
+                Assert.AreEqual("test@email", visit.Email);
+                Assert.AreEqual(new Dictionary<string, bool>() { { "LabManager", true } }, visit.Permissions);
+            }
+            Assert.IsFalse(visits.TryRead(out _));
+
+            // Unsubscribe and assert the visits are completed.
+            this._visitFeed.UnsubscribeAsync(id).Wait();
+            Assert.AreEqual(0, this._visitFeed.Subscribers);
+            Assert.IsTrue(visits.Completion.IsCompleted);
+        }
+
+        /// <summary>
+        /// Tests sending visits that are committed after visits with larger ids.
+        /// </summary>
+        [Test]
+        public void TestPollOutOfOrder()
+        {
+            // Subscribe and add a visit with a larger id.
+            var (id, visits) = this._visitFeed.SubscribeAsync().Result;
+            this.AddData((context) =>
+            {
+                context.VisitLogs.Add(new VisitLog()
+                {
+                    Key = 10,
+                    User = context.Users.Find("test_hash"),
+                    Source = "LaterSource",
+                    Time = DateTime.Now,
+                });
+            });
+            this._visitFeed.PollAsync().Wait();
+            Assert.IsTrue(visits.TryRead(out var visit));
+            Assert.AreEqual("LaterSource", visit.Source);
+            
+            // Add a visit with a smaller id and assert it is sent once.
+            this.AddData((context) =>
+            {
+                context.VisitLogs.Add(new VisitLog()
+                {
+                    Key = 5,
+                    User = context.Users.Find("test_hash"),
+                    Source = "EarlierSource",
+                    Time = DateTime.Now,
+                });
+            });
+            this._visitFeed.PollAsync().Wait();
+            Assert.IsTrue(visits.TryRead(out visit));
+            Assert.AreEqual("EarlierSource", visit.Source);
+            this._visitFeed.PollAsync().Wait();
+            Assert.IsFalse(visits.TryRead(out _));
+            this._visitFeed.UnsubscribeAsync(id).Wait();
+        }
+
+        /// <summary>
+        /// Tests that subscribers that don't read lose the oldest visits.
+        /// </summary>
+        [Test]
+        public void TestSlowSubscriber()
+        {
+            var (id, visits) = this._visitFeed.SubscribeAsync().Result;
+            this.AddVisits(3);
+            this._visitFeed.PollAsync().Wait();
+            Assert.IsTrue(visits.TryRead(out var visit));
+            Assert.AreEqual("NewSource1", visit.Source);
+            Assert.IsTrue(visits.TryRead(out visit));
+            Assert.AreEqual("NewSource2", visit.Source);
+            Assert.IsFalse(visits.TryRead(out _));
+            this._visitFeed.UnsubscribeAsync(id).Wait();
+        }
+    }
+}
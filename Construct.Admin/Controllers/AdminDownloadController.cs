@@ -4,12 +4,13 @@ using System.Globalization;
 using System.IO;
 using System.IO.Compression;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Construct.Admin.State;
 using Construct.Core.Attribute;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Archive;
 using Construct.Core.Database.Context;
-using Construct.Core.Logging;
 using Microsoft.AspNetCore.Mvc;
 using Microsoft.EntityFrameworkCore;
 
@@ -17,6 +18,154 @@ namespace Construct.Admin.Controllers
 {
     public class AdminDownloadController : Controller
     {
+        /// <summary>
+        /// Internal helper class for buffering the ZIP before it is written to the response.
+        /// ZipArchive writes synchronously, so the bytes are stored in memory and
+        /// written to the response asynchronously instead of blocking on the response.
+        /// </summary>
+        private class ResponseBufferStream : Stream
+        {
+            /// <summary>
+            /// Size, in bytes, of the buffer before it is written to the response.
+            /// </summary>
+            private const int FlushSize = 64 * 1024;
+            
+            /// <summary>
+            /// Stream of the response.
+            /// </summary>
+            private readonly Stream _responseStream;
+            
+            /// <summary>
+            /// Bytes that haven't been written to the response.
+            /// </summary>
+            private readonly MemoryStream _buffer = new MemoryStream();
+            
+            /// <summary>
+            /// Total bytes written to the stream.
+            /// </summary>
+            private long _position;
+
+            /// <summary>
+            /// Whether the stream can be read.
+            /// </summary>
+            public override bool CanRead => false;
+            
+            /// <summary>
+            /// Whether the stream can be seeked.
+            /// </summary>
+            public override bool CanSeek => false;
+            
+            /// <summary>
+            /// Whether the stream can be written.
+            /// </summary>
+            public override bool CanWrite => true;
+            
+            /// <summary>
+            /// Length of the stream. Not supported.
+            /// </summary>
+            public override long Length => throw new NotSupportedException();
+            
+            /// <summary>
+            /// Total bytes written to the stream. Can't be set.
+            /// </summary>
+            public override long Position
+            {
+                get => this._position;
+                set => throw new NotSupportedException();
+            }
+            
+            /// <summary>
+            /// Creates the buffer stream.
+            /// </summary>
+            /// <param name="responseStream">Stream of the response to write to.</param>
+            public ResponseBufferStream(Stream responseStream)
+            {
+                this._responseStream = responseStream;
+            }
+
+            /// <summary>
+            /// Stores bytes to write to the response.
+            /// </summary>
+            /// <param name="buffer">Buffer containing the bytes.</param>
+            /// <param name="offset">Offset of the bytes in the buffer.</param>
+            /// <param name="count">Number of bytes to write.</param>
+            public override void Write(byte[] buffer, int offset, int count)
+            {
+                this._buffer.Write(buffer, offset, count);
+                this._position += count;
+            }
+            
+            /// <summary>
+            /// Stores bytes to write to the response.
+            /// </summary>
+            /// <param name="buffer">Bytes to write.</param>
+            public override void Write(ReadOnlySpan<byte> buffer)
+            {
+                this._buffer.Write(buffer);
+                this._position += buffer.Length;
+            }
+            
+            /// <summary>
+            /// Stores bytes to write to the response.
+            /// </summary>
+            /// <param name="buffer">Buffer containing the bytes.</param>
+            /// <param name="offset">Offset of the bytes in the buffer.</param>
+            /// <param name="count">Number of bytes to write.</param>
+            /// <param name="cancellationToken">Token for cancelling the write.</param>
+            public override Task WriteAsync(byte[] buffer, int offset, int count, CancellationToken cancellationToken)
+            {
+                this.Write(buffer, offset, count);
+                return Task.CompletedTask;
+            }
+            
+            /// <summary>
+            /// Stores bytes to write to the response.
+            /// </summary>
+            /// <param name="buffer">Bytes to write.</param>
+            /// <param name="cancellationToken">Token for cancelling the write.</param>
+            public override ValueTask WriteAsync(ReadOnlyMemory<byte> buffer, CancellationToken cancellationToken = default)
+            {
+                this.Write(buffer.Span);
+                return ValueTask.CompletedTask;
+            }
+
+            /// <summary>
+            /// Does nothing since the stored bytes are only written by WriteToResponseAsync.
+            /// </summary>
+            public override void Flush()
+            {
+                
+            }
+
+            /// <summary>
+            /// Writes the stored bytes to the response.
+            /// </summary>
+            /// <param name="force">Whether to write the bytes even if the buffer isn't full.</param>
+            /// <param name="cancellationToken">Token for cancelling the write.</param>
+            public async Task WriteToResponseAsync(bool force, CancellationToken cancellationToken)
+            {
+                if (this._buffer.Length == 0 || (!force && this._buffer.Length < FlushSize)) return;
+                await this._responseStream.WriteAsync(this._buffer.GetBuffer().AsMemory(0, (int) this._buffer.Length), cancellationToken);
+                await this._responseStream.FlushAsync(cancellationToken);
+                this._buffer.SetLength(0);
+            }
+            
+            /// <summary>
+            /// Reads bytes from the stream. Not supported.
+            /// </summary>
+            public override int Read(byte[] buffer, int offset, int count) => throw new NotSupportedException();
+            
+            /// <summary>
+            /// Seeks the stream. Not supported.
+            /// </summary>
+            public override long Seek(long offset, SeekOrigin origin) => throw new NotSupportedException();
+            
+            /// <summary>
+            /// Sets the length of the stream. Not supported.
+            /// </summary>
+            public override void SetLength(long value) => throw new NotSupportedException();
+        }
+        
         /// <summary>
         /// Internal helper class for CSVs.
         /// </summary>
@@ -28,12 +177,27 @@ namespace Construct.Admin.Controllers
             private readonly StreamWriter _writer;
             
             /// <summary>
-            /// Creates a CSV file writer.
+            /// Buffer of the response that the archive is written to.
+            /// </summary>
+            private readonly ResponseBufferStream _responseBuffer;
+            
+            /// <summary>
+            /// Token for cancelling writing to the response.
             /// </summary>
-            /// <param name="path">Path of the CSV.</param>
-            public CsvFile(string path)
+            private readonly CancellationToken _cancellationToken;
+            
+            /// <summary>
+            /// Creates a CSV file writer for an entry in a ZIP archive.
+            /// </summary>
+            /// <param name="archive">Archive to add the CSV to.</param>
+            /// <param name="responseBuffer">Buffer of the response that the archive is written to.</param>
+            /// <param name="name">Name of the CSV in the archive.</param>
+            /// <param name="cancellationToken">Token for cancelling writing to the response.</param>
+            public CsvFile(ZipArchive archive, ResponseBufferStream responseBuffer, string name, CancellationToken cancellationToken)
             {
-                this._writer = new StreamWriter(path);
+                this._writer = new StreamWriter(archive.CreateEntry(name).Open());
+                this._responseBuffer = responseBuffer;
+                this._cancellationToken = cancellationToken;
             }
 
             /// <summary>
@@ -60,28 +224,40 @@ namespace Construct.Admin.Controllers
                     }
                 }
                 
-                // Write the line.
+                // Write the line and write the buffered archive to the response if it is full.
                 await this._writer.WriteLineAsync(string.Join(",", escapedEntries));
+                await this._responseBuffer.WriteToResponseAsync(false, this._cancellationToken);
             }
 
             /// <summary>
-            /// Closes the CSV file.
+            /// Closes the CSV file. The entry must be closed before
+            /// the next entry in the archive is created.
             /// </summary>
-            public void Close()
+            public async Task CloseAsync()
             {
+                await this._writer.FlushAsync();
                 this._writer.Close();
+                await this._responseBuffer.WriteToResponseAsync(false, this._cancellationToken);
             }
         }
 
+        /// <summary>
+        /// Culture used for the times and costs in the CSVs.
+        /// </summary>
+        private static readonly CultureInfo CsvCulture = CultureInfo.CreateSpecificCulture("en-US");
+
         /// <summary>
         /// Downloads the data of the system as CSVs.
         /// The format is based on a legacy format.
+        /// The ZIP is written to the response in chunks as the rows are
+        /// read so that the memory used does not depend on the size of the tables.
         /// </summary>
         /// <param name="session">Session of the user.</param>
-        /// <returns>The CSV ZIP reference.</returns>
+        /// <param name="archived">Whether to include the archived visit and print logs.</param>
+        /// <returns>An empty result after the CSV ZIP is written.</returns>
         [HttpGet]
         [Path("/admin/csvs")]
-        public async Task<ActionResult<object>> GetCsvs(string session)
+        public async Task<ActionResult<object>> GetCsvs(string session, bool archived = false)
         {
             // Return if the session isn't valid.
             if (!Session.GetSingleton().RefreshSession(session))
@@ -89,69 +265,127 @@ namespace Construct.Admin.Controllers
                 Response.StatusCode = 401;
                 return new UnauthorizedResponse();
             }
-
-            // Determine the temporary file locations.
-            var temporaryDirectory = Path.Combine(Path.GetTempPath(), Guid.NewGuid().ToString());
-            Directory.CreateDirectory(temporaryDirectory);
-            Log.Warn(temporaryDirectory);
-
+            
+            // Prepare the response.
+            // ZipArchive writes the entry headers and central directory synchronously,
+            // so it writes to a buffer that is written to the response asynchronously.
+            Response.ContentType = "application/zip";
+            Response.Headers["Content-Disposition"] = "attachment; filename=\"csvs.zip\"";
+            var cancellationToken = HttpContext.RequestAborted;
+            await using var context = new ConstructContext(readOnly: true);
+            var responseBuffer = new ResponseBufferStream(Response.Body);
+            var archive = new ZipArchive(responseBuffer, ZipArchiveMode.Create, true);
+            
             // Write the users CSV.
-            await using var context = new ConstructContext();
-            var usersCsvFile = new CsvFile(Path.Combine(temporaryDirectory, "LabUsers.csv"));
+            // Only the first student information of each user is used.
+            var usersCsvFile = new CsvFile(archive, responseBuffer, "LabUsers.csv", cancellationToken);
             await usersCsvFile.WriteLineAsync(new List<string>() { "Hashed Id", "Name", "Email", "College", "Sign-Up Year" });
-            foreach (var user in await context.Users.ToListAsync())
+            var users = context.Users.AsNoTracking().Select(user => new
+            {
+                user.HashedId,
+                user.Name,
+                user.Email,
+                College = context.Students.Where(student => student.User.HashedId == user.HashedId).OrderBy(student => student.Key).Select(student => student.College).FirstOrDefault(),
+                Year = context.Students.Where(student => student.User.HashedId == user.HashedId).OrderBy(student => student.Key).Select(student => student.Year).FirstOrDefault(),
+            });
+            await foreach (var user in users.AsAsyncEnumerable())
+            {
+                await usersCsvFile.WriteLineAsync(new List<string>() {
+                    user.HashedId,
+                    user.Name,
+                    user.Email,
+                    user.College,
+                    user.Year });
+            }
+            await usersCsvFile.CloseAsync();
+            
+            // Get the names and emails of the users for the archived logs, which only store the hashed ids.
+            var archivedUsers = new Dictionary<string, (string Name, string Email)>();
+            if (archived)
             {
-                var studentInformation = await context.Students.Include(student => student.User)
-                    .FirstOrDefaultAsync(student => student.User.HashedId == user.HashedId);
-                if (studentInformation != null)
+                await foreach (var user in context.Users.AsNoTracking().Select(user => new { user.HashedId, user.Name, user.Email }).AsAsyncEnumerable())
                 {
-                    await usersCsvFile.WriteLineAsync(new List<string>() {
-                        user.HashedId,
-                        user.Name,
-                        user.Email,
-                        studentInformation.College,
-                        studentInformation.Year });
+                    archivedUsers[user.HashedId] = (user.Name, user.Email);
                 }
-                else
+            }
+            
+            // Write the swipe log CSV.
+            var swipeLogCsvFile = new CsvFile(archive, responseBuffer, "SwipeLog.csv", cancellationToken);
+            await swipeLogCsvFile.WriteLineAsync(new List<string>() { "Timestamp","Name","Email" });
+            if (archived)
+            {
+                await foreach (var swipeLog in LogArchive.GetSingleton().ReadVisitLogsAsync(cancellationToken))
                 {
-                    await usersCsvFile.WriteLineAsync(new List<string>()
+                    archivedUsers.TryGetValue(swipeLog.UserHashedId ?? "", out var user);
+                    await swipeLogCsvFile.WriteLineAsync(new List<string>()
                     {
-                        user.HashedId,
+                        swipeLog.Time.ToString("G", CsvCulture),
                         user.Name,
                         user.Email,
-                        "",
-                        "",
                     });
                 }
             }
-            usersCsvFile.Close();
-            
-            // Write the swipe log CSV.
-            var swipeLogCsvFile = new CsvFile(Path.Combine(temporaryDirectory, "SwipeLog.csv"));
-            await swipeLogCsvFile.WriteLineAsync(new List<string>() { "Timestamp","Name","Email" });
-            foreach (var swipeLog in await context.VisitLogs.Include(visiLog => visiLog.User).ToListAsync())
+            var swipeLogs = context.VisitLogs.AsNoTracking().Select(visitLog => new
+            {
+                visitLog.Time,
+                visitLog.User.Name,
+                visitLog.User.Email,
+            });
+            await foreach (var swipeLog in swipeLogs.AsAsyncEnumerable())
             {
                 await swipeLogCsvFile.WriteLineAsync(new List<string>()
                 {
-                    swipeLog.Time.ToString("G", CultureInfo.CreateSpecificCulture("en-US")),
-                    swipeLog.User.Name,
-                    swipeLog.User.Email,
+                    swipeLog.Time.ToString("G", CsvCulture),
+                    swipeLog.Name,
+                    swipeLog.Email,
                 });
             }
-            swipeLogCsvFile.Close();
+            await swipeLogCsvFile.CloseAsync();
             
             // Write the print log CSV.
-            var printLogCsvFile = new CsvFile(Path.Combine(temporaryDirectory, "PrintLog.csv"));
+            var printLogCsvFile = new CsvFile(archive, responseBuffer, "PrintLog.csv", cancellationToken);
             await printLogCsvFile.WriteLineAsync(new List<string>() { "Timestamp", "Email", "File Name", "Material Type", "Print Weight (g)", "Print Purpose", "Bill To", "Print Cost ($)", "Amount Owed ($)" });
-            foreach (var printLog in await context.PrintLog.Include(printLog => printLog.User).Include(printLog => printLog.Material).ToListAsync())
+            if (archived)
+            {
+                await foreach (var printLog in LogArchive.GetSingleton().ReadPrintLogsAsync(cancellationToken))
+                {
+                    archivedUsers.TryGetValue(printLog.UserHashedId ?? "", out var user);
+                    var costString = printLog.Cost.ToString("C", CsvCulture);
+                    await printLogCsvFile.WriteLineAsync(new List<string>()
+                    {
+                        printLog.Time.ToString("G", CsvCulture),
+                        user.Email ?? "",
+                        printLog.FileName,
+                        printLog.MaterialName,
+                        printLog.WeightGrams.ToString(CultureInfo.InvariantCulture),
+                        printLog.Purpose,
+                        printLog.BillTo,
+                        costString,
+                        printLog.Owed ? costString : "$0.00",
+                    });
+                }
+            }
+            var printLogs = context.PrintLog.AsNoTracking().Select(printLog => new
+            {
+                printLog.Time,
+                printLog.User.Email,
+                printLog.FileName,
+                MaterialName = printLog.Material.Name,
+                printLog.WeightGrams,
+                printLog.Purpose,
+                printLog.BillTo,
+                printLog.Cost,
+                printLog.Owed,
+            });
+            await foreach (var printLog in printLogs.AsAsyncEnumerable())
             {
-                var costString = printLog.Cost.ToString("C", CultureInfo.CreateSpecificCulture("en-US"));
+                var costString = printLog.Cost.ToString("C", CsvCulture);
                 await printLogCsvFile.WriteLineAsync(new List<string>()
                 {
-                    printLog.Time.ToString("G", CultureInfo.CreateSpecificCulture("en-US")),
-                    printLog.User == null ? "" : printLog.User.Email,
+                    printLog.Time.ToString("G", CsvCulture),
+                    printLog.Email ?? "",
                     printLog.FileName,
-                    printLog.Material.Name,
+                    printLog.MaterialName,
                     printLog.WeightGrams.ToString(CultureInfo.InvariantCulture),
                     printLog.Purpose,
                     printLog.BillTo,
@@ -159,28 +393,39 @@ namespace Construct.Admin.Controllers
                     printLog.Owed ? costString : "$0.00",
                 });
             }
-            printLogCsvFile.Close();
+            await printLogCsvFile.CloseAsync();
             
             // Write the print totals CSV.
-            var printTotalsCsvFile = new CsvFile(Path.Combine(temporaryDirectory, "PrintTotals.csv"));
+            // The totals are converted to floats to match the format of the summed print logs.
+            var printTotalsCsvFile = new CsvFile(archive, responseBuffer, "PrintTotals.csv", cancellationToken);
             await printTotalsCsvFile.WriteLineAsync(new List<string>() { "Email", "Total Filament Used (g)", "Current Amount Owed (g)", "Current Amount Owed ($)", "Total Number Of Prints" });
-            foreach (var user in await context.Users.Include(user => user.PrintLogs).ToListAsync())
+            var printTotals = context.Users.AsNoTracking().Select(user => new
+            {
+                user.Email,
+                TotalWeight = (double?) user.PrintTotals.TotalWeight ?? 0,
+                OwedWeight = (double?) user.PrintTotals.OwedWeight ?? 0,
+                OwedCost = (double?) user.PrintTotals.OwedCost ?? 0,
+                TotalPrints = (int?) user.PrintTotals.TotalPrints ?? 0,
+            });
+            await foreach (var printTotal in printTotals.AsAsyncEnumerable())
             {
                 await printTotalsCsvFile.WriteLineAsync(new List<string>()
                 {
-                    user.Email,
-                    user.PrintLogs.Sum(printLog => printLog.WeightGrams).ToString(CultureInfo.InvariantCulture),
-                    user.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.WeightGrams).ToString(CultureInfo.InvariantCulture),
-                    user.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost).ToString("C", CultureInfo.CreateSpecificCulture("en-US")),
-                    user.PrintLogs.Count.ToString(CultureInfo.InvariantCulture),
+                    printTotal.Email,
+                    ((float) printTotal.TotalWeight).ToString(CultureInfo.InvariantCulture),
+                    ((float) printTotal.OwedWeight).ToString(CultureInfo.InvariantCulture),
+                    ((float) printTotal.OwedCost).ToString("C", CsvCulture),
+                    printTotal.TotalPrints.ToString(CultureInfo.InvariantCulture),
                 });
             }
-            printTotalsCsvFile.Close();
+            await printTotalsCsvFile.CloseAsync();
+            
+            // Close the archive to write the central directory and write the rest of the archive.
+            archive.Dispose();
+            await responseBuffer.WriteToResponseAsync(true, cancellationToken);
             
-            // Compress and return the file.
-            var zipFileLocation = temporaryDirectory + ".zip";
-            ZipFile.CreateFromDirectory(temporaryDirectory, zipFileLocation);
-            return PhysicalFile(zipFileLocation, "application/zip", "csvs.zip");
+            // Return an empty result since the response was written.
+            return new EmptyResult();
         }
     }
-}
\ No newline at end of file
+}
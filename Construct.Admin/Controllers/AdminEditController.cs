@@ -5,6 +5,7 @@ using Construct.Admin.State;
 using Construct.Core.Attribute;
 using Construct.Core.Configuration;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Microsoft.AspNetCore.Mvc;
@@ -123,8 +124,9 @@ namespace Construct.Admin.Controllers
                 }
             }
             
-            // Save the user and return success.
+            // Save the user, remove the stored user, and return success.
             await context.SaveChangesAsync();
+            UserCache.GetSingleton().Invalidate(user.HashedId);
             return new BaseSuccessResponse();
         }
         
@@ -1,13 +1,17 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Linq.Expressions;
 using System.Threading.Tasks;
+using Construct.Admin.Data;
 using Construct.Admin.Data.Response;
 using Construct.Admin.State;
 using Construct.Core.Attribute;
 using Construct.Core.Configuration;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
 using Construct.Core.Logging;
 using Microsoft.AspNetCore.Mvc;
 using Microsoft.EntityFrameworkCore;
@@ -16,6 +20,151 @@ namespace Construct.Admin.Controllers
 {
     public class AdminSearchController : Controller
     {
+        /// <summary>
+        /// Orders of the prints search.
+        /// </summary>
+        private static readonly Dictionary<string, SearchOrder<PrintLog, long>> PrintOrders = CreatePrintOrders();
+        
+        /// <summary>
+        /// Orders of the users search.
+        /// </summary>
+        private static readonly Dictionary<string, SearchOrder<User, string>> UserOrders = CreateUserOrders();
+        
+        /// <summary>
+        /// Orders of the visits search.
+        /// </summary>
+        private static readonly Dictionary<string, SearchOrder<VisitLog, long>> VisitOrders = CreateVisitOrders();
+        
+        /// <summary>
+        /// Adds the ascending and descending orders for a column.
+        /// </summary>
+        /// <param name="orders">Orders to add to.</param>
+        /// <param name="name">Name of the column.</param>
+        /// <param name="value">Value of the entries to sort by.</param>
+        /// <param name="primaryKey">Primary key of the entries.</param>
+        private static void AddOrder<TEntity, TPrimaryKey, TValue>(Dictionary<string, SearchOrder<TEntity, TPrimaryKey>> orders, string name, Expression<Func<TEntity, TValue>> value, Expression<Func<TEntity, TPrimaryKey>> primaryKey)
+        {
+            orders[name] = new SearchOrder<TEntity, TPrimaryKey, TValue>(name, value, primaryKey, true);
+            orders[name + "Descending"] = new SearchOrder<TEntity, TPrimaryKey, TValue>(name + "Descending", value, primaryKey, false);
+        }
+        
+        /// <summary>
+        /// Creates the orders of the prints search.
+        /// </summary>
+        /// <returns>The orders of the prints search.</returns>
+        private static Dictionary<string, SearchOrder<PrintLog, long>> CreatePrintOrders()
+        {
+            var orders = new Dictionary<string, SearchOrder<PrintLog, long>>();
+            AddOrder(orders, "time", printLog => printLog.Time, printLog => printLog.Key);
+            AddOrder(orders, "filename", printLog => printLog.NormalizedFileName ?? "", printLog => printLog.Key);
+            AddOrder(orders, "purpose", printLog => printLog.Purpose.ToLower(), printLog => printLog.Key);
+            AddOrder(orders, "material", printLog => printLog.Material.Name.ToLower(), printLog => printLog.Key);
+            AddOrder(orders, "weight", printLog => printLog.WeightGrams, printLog => printLog.Key);
+            AddOrder(orders, "cost", printLog => printLog.Cost, printLog => printLog.Key);
+            AddOrder(orders, "owed", printLog => printLog.Owed ? 1 : 0, printLog => printLog.Key);
+            AddOrder(orders, "billto", printLog => printLog.NormalizedBillTo ?? "", printLog => printLog.Key);
+            AddOrder(orders, "user", printLog => printLog.User.NormalizedEmail ?? "", printLog => printLog.Key);
+            return orders;
+        }
+        
+        /// <summary>
+        /// Creates the orders of the users search.
+        /// </summary>
+        /// <returns>The orders of the users search.</returns>
+        private static Dictionary<string, SearchOrder<User, string>> CreateUserOrders()
+        {
+            var orders = new Dictionary<string, SearchOrder<User, string>>();
+            AddOrder(orders, "name", user => user.NormalizedName ?? "", user => user.HashedId);
+            AddOrder(orders, "email", user => user.NormalizedEmail ?? "", user => user.HashedId);
+            AddOrder(orders, "totalprints", user => (int?) user.PrintTotals.TotalPrints ?? 0, user => user.HashedId);
+            AddOrder(orders, "totalweight", user => (double?) user.PrintTotals.TotalWeight ?? 0, user => user.HashedId);
+            AddOrder(orders, "totalowedprints", user => (int?) user.PrintTotals.OwedPrints ?? 0, user => user.HashedId);
+            AddOrder(orders, "totalowedcost", user => (double?) user.PrintTotals.OwedCost ?? 0, user => user.HashedId);
+            return orders;
+        }
+        
+        /// <summary>
+        /// Creates the orders of the visits search.
+        /// </summary>
+        /// <returns>The orders of the visits search.</returns>
+        private static Dictionary<string, SearchOrder<VisitLog, long>> CreateVisitOrders()
+        {
+            var orders = new Dictionary<string, SearchOrder<VisitLog, long>>();
+            AddOrder(orders, "time", visitLog => visitLog.Time, visitLog => visitLog.Key);
+            AddOrder(orders, "name", visitLog => visitLog.User.NormalizedName ?? "", visitLog => visitLog.Key);
+            AddOrder(orders, "email", visitLog => visitLog.User.NormalizedEmail ?? "", visitLog => visitLog.Key);
+            AddOrder(orders, "totalowedprints", visitLog => (int?) visitLog.User.PrintTotals.OwedPrints ?? 0, visitLog => visitLog.Key);
+            AddOrder(orders, "totalowedcost", visitLog => (double?) visitLog.User.PrintTotals.OwedCost ?? 0, visitLog => visitLog.Key);
+            return orders;
+        }
+        
+        /// <summary>
+        /// Sorts the entries of a cursor page in the order of the keys of the page.
+        /// The entries are loaded by their keys, which doesn't keep the order.
+        /// </summary>
+        /// <param name="rows">Entries of the page.</param>
+        /// <param name="keys">Keys of the page in order.</param>
+        /// <param name="getKey">Returns the key of an entry.</param>
+        /// <returns>The sorted entries.</returns>
+        private static List<TRow> OrderByKeys<TRow, TPrimaryKey>(IEnumerable<TRow> rows, List<TPrimaryKey> keys, Func<TRow, TPrimaryKey> getKey)
+        {
+            var keyIndexes = new Dictionary<TPrimaryKey, int>();
+            for (var i = 0; i < keys.Count; i++)
+            {
+                keyIndexes[keys[i]] = i;
+            }
+            return rows.OrderBy(row => keyIndexes[getKey(row)]).ToList();
+        }
+        
+        /// <summary>
+        /// Returns the total entries for a search. The total is returned with the
+        /// page so that a second query is only needed if the page is empty.
+        /// </summary>
+        /// <param name="query">Query of the search without the ordering or paging.</param>
+        /// <param name="offset">Offset of the page.</param>
+        /// <param name="max">Maximum entries of the page.</param>
+        /// <param name="pageTotals">Totals returned with the entries of the page.</param>
+        /// <returns>The total entries for the search.</returns>
+        private static async Task<int> GetTotalAsync<T>(IQueryable<T> query, int offset, int max, List<int> pageTotals)
+        {
+            // Return the total from the page if there are entries.
+            if (pageTotals.Count > 0)
+            {
+                return pageTotals[0];
+            }
+            
+            // Return 0 if the first page is empty, or count the entries if the page was past the end.
+            if (offset <= 0 && max > 0)
+            {
+                return 0;
+            }
+            return await query.CountAsync();
+        }
+        
+        /// <summary>
+        /// Returns the configurable permissions of a user and if they are active.
+        /// </summary>
+        /// <param name="permissions">Configurable permissions loaded for the user.</param>
+        /// <returns>The configurable permissions and if they are active.</returns>
+        internal static Dictionary<string, bool> GetConfigurablePermissions(List<CachedPermission> permissions)
+        {
+            // Get the active permissions of the user.
+            var userActivePermissions = new HashSet<string>();
+            foreach (var permission in permissions)
+            {
+                if (!permission.IsActive()) continue;
+                userActivePermissions.Add(permission.Name.ToLower());
+            }
+            
+            // Return the configurable permissions.
+            var activePermissions = new Dictionary<string, bool>();
+            foreach (var permissionName in ConstructConfiguration.Configuration.Admin.ConfigurablePermissions)
+            {
+                activePermissions[permissionName] = userActivePermissions.Contains(permissionName.ToLower());
+            }
+            return activePermissions;
+        }
+        
         /// <summary>
         /// Searches for prints in the database.
         /// </summary>
@@ -26,10 +175,12 @@ namespace Construct.Admin.Controllers
         /// <param name="ascending">Whether to search by ascending.</param>
         /// <param name="search">String to search for.</param>
         /// <param name="hashedId">Hashed id to filter for.</param>
+        /// <param name="useCursor">Whether to page with cursors instead of the offset.</param>
+        /// <param name="cursor">Cursor returned with the previous page. Implies useCursor.</param>
         /// <returns>The results of the search.</returns>
         [HttpGet]
         [Path("/admin/prints")]
-        public async Task<ActionResult<IResponse>> GetPrints(string session, int maxPrints, int offsetPrints, string order, bool ascending = false, string search = "", string hashedId = null)
+        public async Task<ActionResult<IResponse>> GetPrints(string session, int maxPrints, int offsetPrints, string order, bool ascending = false, string search = "", string hashedId = null, bool useCursor = false, string cursor = null)
         {
             // Return if the session isn't valid.
             if (!Session.GetSingleton().RefreshSession(session))
@@ -39,52 +190,92 @@ namespace Construct.Admin.Controllers
             }
             
             // Build the base query.
-            search = (search ?? "").ToLower();
+            var searchPattern = ConstructContext.GetContainsPattern(ConstructContext.Normalize(search));
             order = (order ?? "").ToLower() + (ascending ? "" : "Descending");
-            await using var context = new ConstructContext();
-            var basePrintsQuery = context.PrintLog.Include(printLog => printLog.User)
-                .Include(printLog => printLog.Material)
-                .Where(printLog => printLog.FileName.ToLower().Contains(search) || (printLog.BillTo != null && printLog.BillTo.ToLower().Contains(search)));
+            await using var context = new ConstructContext(readOnly: true);
+            var basePrintsQuery = context.PrintLog.AsNoTracking();
+            if (!string.IsNullOrEmpty(search))
+            {
+                basePrintsQuery = basePrintsQuery.Where(printLog => EF.Functions.Like(printLog.NormalizedFileName, searchPattern, ConstructContext.LikeEscapeCharacter)
+                                                                    || (printLog.NormalizedBillTo != null && EF.Functions.Like(printLog.NormalizedBillTo, searchPattern, ConstructContext.LikeEscapeCharacter)));
+            }
             if (hashedId != null)
             {
                 basePrintsQuery = basePrintsQuery.Where(printLog => printLog.User != null && printLog.User.HashedId == hashedId);
             }
 
-            // Add the ordering to the query.
-            basePrintsQuery = order switch
+            // Get the page of prints. With a cursor, the keys of the page are found first and then loaded.
+            var sortOrder = PrintOrders.GetValueOrDefault(order) ?? PrintOrders["filename"];
+            IQueryable<PrintLog> pagePrintsQuery;
+            SearchPage<long> cursorPage = null;
+            if (useCursor || cursor != null)
             {
-                "timeDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.Time),
-                "time" => basePrintsQuery.OrderBy(printLog => printLog.Time),
-                "filenameDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.FileName.ToLower()),
-                "filename" => basePrintsQuery.OrderBy(printLog => printLog.FileName.ToLower()),
-                "purposeDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.Purpose.ToLower()),
-                "purpose" => basePrintsQuery.OrderBy(printLog => printLog.Purpose.ToLower()),
-                "materialDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.Material.Name.ToLower()),
-                "material" => basePrintsQuery.OrderBy(printLog => printLog.Material.Name.ToLower()),
-                "weightDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.WeightGrams),
-                "weight" => basePrintsQuery.OrderBy(printLog => printLog.WeightGrams),
-                "costDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.Cost),
-                "cost" => basePrintsQuery.OrderBy(printLog => printLog.Cost),
-                "owedDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.Owed),
-                "owed" => basePrintsQuery.OrderBy(printLog => printLog.Owed),
-                "billtoDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.BillTo.ToLower()),
-                "billto" => basePrintsQuery.OrderBy(printLog => printLog.BillTo.ToLower()),
-                "userDescending" => basePrintsQuery.OrderByDescending(printLog => printLog.User.Email.ToLower()),
-                "user" => basePrintsQuery.OrderBy(printLog => printLog.User.Email.ToLower()),
-                _ => basePrintsQuery.OrderBy(printLog => printLog.FileName.ToLower()),
-            };
+                try
+                {
+                    cursorPage = await sortOrder.GetPageAsync(basePrintsQuery, cursor, maxPrints);
+                }
+                catch (FormatException)
+                {
+                    Response.StatusCode = 400;
+                    return new GenericStatusResponse("invalid-cursor");
+                }
+                var pageKeys = cursorPage.Keys;
+                pagePrintsQuery = basePrintsQuery.Where(printLog => pageKeys.Contains(printLog.Key));
+            }
+            else
+            {
+                pagePrintsQuery = sortOrder.Order(basePrintsQuery).Skip(offsetPrints).Take(maxPrints);
+            }
+            
+            // Get the prints and the total prints.
+            // The total is counted with the page, except for cursor pages where the total is cached.
+            var printRows = (cursorPage == null
+                ? await pagePrintsQuery.Select(printLog => new
+                {
+                    printLog.Key,
+                    UserEmail = printLog.User.Email,
+                    UserName = printLog.User.Name,
+                    printLog.FileName,
+                    printLog.Time,
+                    MaterialName = printLog.Material.Name,
+                    printLog.WeightGrams,
+                    printLog.Purpose,
+                    printLog.BillTo,
+                    printLog.Cost,
+                    printLog.Owed,
+                    TotalPrints = basePrintsQuery.Count(),
+                }).ToListAsync()
+                : await pagePrintsQuery.Select(printLog => new
+                {
+                    printLog.Key,
+                    UserEmail = printLog.User.Email,
+                    UserName = printLog.User.Name,
+                    printLog.FileName,
+                    printLog.Time,
+                    MaterialName = printLog.Material.Name,
+                    printLog.WeightGrams,
+                    printLog.Purpose,
+                    printLog.BillTo,
+                    printLog.Cost,
+                    printLog.Owed,
+                    TotalPrints = 0,
+                }).ToListAsync());
+            if (cursorPage != null)
+            {
+                printRows = OrderByKeys(printRows, cursorPage.Keys, printLog => printLog.Key);
+            }
             
             // Return the prints.
             var prints = new List<PrintResponseEntry>();
-            foreach (var printLog in basePrintsQuery.Skip(offsetPrints).Take(maxPrints).ToList())
+            foreach (var printLog in printRows)
             {
                 PrintResponseEntryUser user = null;
-                if (printLog.User != null)
+                if (printLog.UserEmail != null)
                 {
                     user = new PrintResponseEntryUser()
                     {
-                        Email = printLog.User.Email,
-                        Name = printLog.User.Name,
+                        Email = printLog.UserEmail,
+                        Name = printLog.UserName,
                     };
                 }
                 prints.Add(new PrintResponseEntry()
@@ -95,7 +286,7 @@ namespace Construct.Admin.Controllers
                         Id = printLog.Key,
                         Name = printLog.FileName,
                         Timestamp = ((DateTimeOffset) printLog.Time).ToUnixTimeSeconds(),
-                        Material = printLog.Material.Name,
+                        Material = printLog.MaterialName,
                         Weight = printLog.WeightGrams,
                         Purpose = printLog.Purpose,
                         BillTo = printLog.BillTo,
@@ -106,8 +297,10 @@ namespace Construct.Admin.Controllers
             }
             return new PrintsResponse()
             {
-                TotalPrints = basePrintsQuery.Count(),
+                TotalPrints = (cursorPage == null ? await GetTotalAsync(basePrintsQuery, offsetPrints, maxPrints, printRows.Select(printLog => printLog.TotalPrints).ToList())
+                    : await SearchTotalCache.GetSingleton().GetOrCountAsync($"prints\n{searchPattern}\n{hashedId}", basePrintsQuery)),
                 Prints = prints,
+                NextCursor = cursorPage?.NextCursor,
             };
         }
         
@@ -120,10 +313,12 @@ namespace Construct.Admin.Controllers
         /// <param name="order">Column to sort by.</param>
         /// <param name="ascending">Whether to search by ascending.</param>
         /// <param name="search">String to search for.</param>
+        /// <param name="useCursor">Whether to page with cursors instead of the offset.</param>
+        /// <param name="cursor">Cursor returned with the previous page. Implies useCursor.</param>
         /// <returns>The results of the search.</returns>
         [HttpGet]
         [Path("/admin/users")]
-        public async Task<ActionResult<IResponse>> GetUsers(string session, int maxUsers, int offsetUsers, string order, bool ascending = false, string search = "")
+        public async Task<ActionResult<IResponse>> GetUsers(string session, int maxUsers, int offsetUsers, string order, bool ascending = false, string search = "", bool useCursor = false, string cursor = null)
         {
             // Return if the session isn't valid.
             if (!Session.GetSingleton().RefreshSession(session))
@@ -133,59 +328,105 @@ namespace Construct.Admin.Controllers
             }
             
             // Build the base query.
-            search = (search ?? "").ToLower();
+            var searchPattern = ConstructContext.GetContainsPattern(ConstructContext.Normalize(search));
             order = (order ?? "").ToLower() + (ascending ? "" : "Descending");
-            await using var context = new ConstructContext();
-            var basePrintsQuery = context.Users.Include(user => user.PrintLogs).Include(user => user.Permissions)
-                .Where(user => user.Name.ToLower().Contains(search) || user.Email.ToLower().Contains(search));
+            await using var context = new ConstructContext(readOnly: true);
+            var baseUsersQuery = context.Users.AsNoTracking();
+            if (!string.IsNullOrEmpty(search))
+            {
+                baseUsersQuery = baseUsersQuery.Where(user => EF.Functions.Like(user.NormalizedName, searchPattern, ConstructContext.LikeEscapeCharacter)
+                                                                || EF.Functions.Like(user.NormalizedEmail, searchPattern, ConstructContext.LikeEscapeCharacter));
+            }
 
-            // Add the ordering to the query.
-            basePrintsQuery = order switch
+            // Get the page of users. With a cursor, the keys of the page are found first and then loaded.
+            var sortOrder = UserOrders.GetValueOrDefault(order) ?? UserOrders["name"];
+            IQueryable<User> pageUsersQuery;
+            SearchPage<string> cursorPage = null;
+            if (useCursor || cursor != null)
             {
-                "nameDescending" => basePrintsQuery.OrderByDescending(user => user.Name.ToLower()),
-                "name" => basePrintsQuery.OrderBy(user => user.Name.ToLower()),
-                "emailDescending" => basePrintsQuery.OrderByDescending(user => user.Email.ToLower()),
-                "email" => basePrintsQuery.OrderBy(user => user.Email.ToLower()),
-                "totalprintsDescending" => basePrintsQuery.OrderByDescending(user => user.PrintLogs.Count),
-                "totalprints" => basePrintsQuery.OrderBy(user => user.PrintLogs.Count),
-                "totalweightDescending" => basePrintsQuery.OrderByDescending(user => user.PrintLogs.Sum(printLog => printLog.WeightGrams)),
-                "totalweight" => basePrintsQuery.OrderBy(user => user.PrintLogs.Sum(printLog => printLog.WeightGrams)),
-                "totalowedprintsDescending" => basePrintsQuery.OrderByDescending(user => user.PrintLogs.Count(printLog => printLog.Owed)),
-                "totalowedprints" => basePrintsQuery.OrderBy(user => user.PrintLogs.Count(printLog => printLog.Owed)),
-                "totalowedcostDescending" => basePrintsQuery.OrderByDescending(user => user.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost)),
-                "totalowedcost" => basePrintsQuery.OrderBy(user => user.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost)),
-                _ => basePrintsQuery.OrderBy(user => user.Name.ToLower()),
-            };
+                try
+                {
+                    cursorPage = await sortOrder.GetPageAsync(baseUsersQuery, cursor, maxUsers);
+                }
+                catch (FormatException)
+                {
+                    Response.StatusCode = 400;
+                    return new GenericStatusResponse("invalid-cursor");
+                }
+                var pageKeys = cursorPage.Keys;
+                pageUsersQuery = baseUsersQuery.Where(user => pageKeys.Contains(user.HashedId));
+            }
+            else
+            {
+                pageUsersQuery = sortOrder.Order(baseUsersQuery).Skip(offsetUsers).Take(maxUsers);
+            }
+            
+            // Get the users with their print totals and the total users.
+            var permissionNames = ConstructConfiguration.Configuration.Admin.ConfigurablePermissionLookup;
+            // The total is counted with the page, except for cursor pages where the total is cached.
+            var userRows = (cursorPage == null
+                ? await pageUsersQuery.Select(user => new
+                {
+                    user.HashedId,
+                    user.Name,
+                    user.Email,
+                    TotalPrints = (int?) user.PrintTotals.TotalPrints ?? 0,
+                    TotalWeight = (double?) user.PrintTotals.TotalWeight ?? 0,
+                    TotalOwedPrints = (int?) user.PrintTotals.OwedPrints ?? 0,
+                    TotalOwedCost = (double?) user.PrintTotals.OwedCost ?? 0,
+                    Permissions = user.Permissions.Where(permission => permissionNames.Contains(permission.Name.ToLower())).Select(permission => new CachedPermission()
+                    {
+                        Name = permission.Name,
+                        StartTime = permission.StartTime,
+                        EndTime = permission.EndTime,
+                    }).ToList(),
+                    TotalUsers = baseUsersQuery.Count(),
+                }).ToListAsync()
+                : await pageUsersQuery.Select(user => new
+                {
+                    user.HashedId,
+                    user.Name,
+                    user.Email,
+                    TotalPrints = (int?) user.PrintTotals.TotalPrints ?? 0,
+                    TotalWeight = (double?) user.PrintTotals.TotalWeight ?? 0,
+                    TotalOwedPrints = (int?) user.PrintTotals.OwedPrints ?? 0,
+                    TotalOwedCost = (double?) user.PrintTotals.OwedCost ?? 0,
+                    Permissions = user.Permissions.Where(permission => permissionNames.Contains(permission.Name.ToLower())).Select(permission => new CachedPermission()
+                    {
+                        Name = permission.Name,
+                        StartTime = permission.StartTime,
+                        EndTime = permission.EndTime,
+                    }).ToList(),
+                    TotalUsers = 0,
+                }).ToListAsync());
+            if (cursorPage != null)
+            {
+                userRows = OrderByKeys(userRows, cursorPage.Keys, user => user.HashedId);
+            }
             
             // Return the users.
             var users = new List<UserEntry>();
-            foreach (var user in basePrintsQuery.Skip(offsetUsers).Take(maxUsers).ToList())
+            foreach (var user in userRows)
             {
-                // Get the permissions for the user.
-                var permissions = new Dictionary<string, bool>();
-                foreach (var permissionName in ConstructConfiguration.Configuration.Admin.ConfigurablePermissions)
-                {
-                    var permission = user.Permissions.FirstOrDefault(permission => permission.Name.ToLower() == permissionName.ToLower());
-                    permissions[permissionName] = (permission != null && permission.IsActive());
-                }
-                
                 // Add the user.
                 users.Add(new UserEntry()
                 {
                     HashedId = user.HashedId,
                     Name = user.Name,
                     Email = user.Email,
-                    TotalPrints = user.PrintLogs.Count,
-                    TotalWeight = user.PrintLogs.Sum(printLog => printLog.WeightGrams),
-                    TotalOwedPrints = user.PrintLogs.Count(printLog => printLog.Owed),
-                    TotalOwedCost = user.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost),
-                    Permissions = permissions,
+                    TotalPrints = user.TotalPrints,
+                    TotalWeight = (float) user.TotalWeight,
+                    TotalOwedPrints = user.TotalOwedPrints,
+                    TotalOwedCost = (float) user.TotalOwedCost,
+                    Permissions = GetConfigurablePermissions(user.Permissions),
                 });
             }
             return new UsersResponse()
             {
-                TotalUsers = basePrintsQuery.Count(),
+                TotalUsers = (cursorPage == null ? await GetTotalAsync(baseUsersQuery, offsetUsers, maxUsers, userRows.Select(user => user.TotalUsers).ToList())
+                    : await SearchTotalCache.GetSingleton().GetOrCountAsync($"users\n{searchPattern}", baseUsersQuery)),
                 Users = users,
+                NextCursor = cursorPage?.NextCursor,
             };
         }
         
@@ -198,10 +439,12 @@ namespace Construct.Admin.Controllers
         /// <param name="order">Column to sort by.</param>
         /// <param name="ascending">Whether to search by ascending.</param>
         /// <param name="search">String to search for.</param>
+        /// <param name="useCursor">Whether to page with cursors instead of the offset.</param>
+        /// <param name="cursor">Cursor returned with the previous page. Implies useCursor.</param>
         /// <returns>The results of the search.</returns>
         [HttpGet]
         [Path("/admin/visits")]
-        public async Task<ActionResult<IResponse>> GetVisits(string session, int maxVisits, int offsetVisits, string order, bool ascending = false, string search = "")
+        public async Task<ActionResult<IResponse>> GetVisits(string session, int maxVisits, int offsetVisits, string order, bool ascending = false, string search = "", bool useCursor = false, string cursor = null)
         {
             // Return if the session isn't valid.
             if (!Session.GetSingleton().RefreshSession(session))
@@ -211,58 +454,109 @@ namespace Construct.Admin.Controllers
             }
             
             // Build the base query.
-            search = (search ?? "").ToLower();
+            var searchPattern = ConstructContext.GetContainsPattern(ConstructContext.Normalize(search));
             order = (order ?? "").ToLower() + (ascending ? "" : "Descending");
-            await using var context = new ConstructContext();
-            var basePrintsQuery = context.VisitLogs.Include(visitLog => visitLog.User).ThenInclude(user => user.PrintLogs)
-                .Include(visitLog => visitLog.User).ThenInclude(user => user.Permissions)
-                .Where(visitLog => visitLog.User.Name.ToLower().Contains(search) || visitLog.User.Email.ToLower().Contains(search));
+            await using var context = new ConstructContext(readOnly: true);
+            var baseVisitsQuery = context.VisitLogs.AsNoTracking();
+            if (!string.IsNullOrEmpty(search))
+            {
+                baseVisitsQuery = baseVisitsQuery.Where(visitLog => EF.Functions.Like(visitLog.User.NormalizedName, searchPattern, ConstructContext.LikeEscapeCharacter)
+                                                                    || EF.Functions.Like(visitLog.User.NormalizedEmail, searchPattern, ConstructContext.LikeEscapeCharacter));
+            }
 
-            // Add the ordering to the query.
-            basePrintsQuery = order switch
+            // Get the page of visits. With a cursor, the keys of the page are found first and then loaded.
+            var sortOrder = VisitOrders.GetValueOrDefault(order) ?? VisitOrders["name"];
+            IQueryable<VisitLog> pageVisitsQuery;
+            SearchPage<long> cursorPage = null;
+            if (useCursor || cursor != null)
             {
-                "timeDescending" => basePrintsQuery.OrderByDescending(visitLog => visitLog.Time),
-                "time" => basePrintsQuery.OrderBy(visitLog => visitLog.Time),
-                "nameDescending" => basePrintsQuery.OrderByDescending(visitLog => visitLog.User.Name.ToLower()),
-                "name" => basePrintsQuery.OrderBy(visitLog => visitLog.User.Name.ToLower()),
-                "emailDescending" => basePrintsQuery.OrderByDescending(visitLog => visitLog.User.Email.ToLower()),
-                "email" => basePrintsQuery.OrderBy(visitLog => visitLog.User.Email.ToLower()),
-                "totalowedprintsDescending" => basePrintsQuery.OrderByDescending(visitLog => visitLog.User.PrintLogs.Count(printLog => printLog.Owed)),
-                "totalowedprints" => basePrintsQuery.OrderBy(visitLog => visitLog.User.PrintLogs.Count(printLog => printLog.Owed)),
-                "totalowedcostDescending" => basePrintsQuery.OrderByDescending(visitLog => visitLog.User.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost)),
-                "totalowedcost" => basePrintsQuery.OrderBy(visitLog => visitLog.User.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost)),
-                _ => basePrintsQuery.OrderBy(visitLog => visitLog.User.Name.ToLower()),
-            };
+                try
+                {
+                    cursorPage = await sortOrder.GetPageAsync(baseVisitsQuery, cursor, maxVisits);
+                }
+                catch (FormatException)
+                {
+                    Response.StatusCode = 400;
+                    return new GenericStatusResponse("invalid-cursor");
+                }
+                var pageKeys = cursorPage.Keys;
+                pageVisitsQuery = baseVisitsQuery.Where(visitLog => pageKeys.Contains(visitLog.Key));
+            }
+            else
+            {
+                pageVisitsQuery = sortOrder.Order(baseVisitsQuery).Skip(offsetVisits).Take(maxVisits);
+            }
+            
+            // Get the visits with the print totals of the users and the total visits.
+            var permissionNames = ConstructConfiguration.Configuration.Admin.ConfigurablePermissionLookup;
+            // The total is counted with the page, except for cursor pages where the total is cached.
+            var visitRows = (cursorPage == null
+                ? await pageVisitsQuery.Select(visitLog => new
+                {
+                    visitLog.Key,
+                    visitLog.Time,
+                    visitLog.Source,
+                    visitLog.User.HashedId,
+                    visitLog.User.Name,
+                    visitLog.User.Email,
+                    TotalOwedPrints = (int?) visitLog.User.PrintTotals.OwedPrints ?? 0,
+                    TotalOwedCost = (double?) visitLog.User.PrintTotals.OwedCost ?? 0,
+                    Permissions = visitLog.User.Permissions.Where(permission => permissionNames.Contains(permission.Name.ToLower())).Select(permission => new CachedPermission()
+                    {
+                        Name = permission.Name,
+                        StartTime = permission.StartTime,
+                        EndTime = permission.EndTime,
+                    }).ToList(),
+                    TotalVisits = baseVisitsQuery.Count(),
+                }).ToListAsync()
+                : await pageVisitsQuery.Select(visitLog => new
+                {
+                    visitLog.Key,
+                    visitLog.Time,
+                    visitLog.Source,
+                    visitLog.User.HashedId,
+                    visitLog.User.Name,
+                    visitLog.User.Email,
+                    TotalOwedPrints = (int?) visitLog.User.PrintTotals.OwedPrints ?? 0,
+                    TotalOwedCost = (double?) visitLog.User.PrintTotals.OwedCost ?? 0,
+                    Permissions = visitLog.User.Permissions.Where(permission => permissionNames.Contains(permission.Name.ToLower())).Select(permission => new CachedPermission()
+                    {
+                        Name = permission.Name,
+                        StartTime = permission.StartTime,
+                        EndTime = permission.EndTime,
+                    }).ToList(),
+                    TotalVisits = 0,
+                }).ToListAsync());
+            if (cursorPage != null)
+            {
+                visitRows = OrderByKeys(visitRows, cursorPage.Keys, visitLog => visitLog.Key);
+            }
             
             // Return the visits.
             var visits = new List<VisitEntry>();
-            foreach (var visitLog in basePrintsQuery.Skip(offsetVisits).Take(maxVisits).ToList())
-            {// Get the permissions for the user.
-                var permissions = new Dictionary<string, bool>();
-                foreach (var permissionName in ConstructConfiguration.Configuration.Admin.ConfigurablePermissions)
-                {
-                    var permission = visitLog.User.Permissions.FirstOrDefault(permission => permission.Name.ToLower() == permissionName.ToLower());
-                    permissions[permissionName] = (permission != null && permission.IsActive());
-                }
-                
+            foreach (var visitLog in visitRows)
+            {
                 // Add the visit.
                 visits.Add(new VisitEntry()
                 {
+                    Id = visitLog.Key,
                     Timestamp = ((DateTimeOffset) visitLog.Time).ToUnixTimeSeconds(),
                     Source = visitLog.Source,
-                    HashedId = visitLog.User.HashedId,
-                    Name = visitLog.User.Name,
-                    Email = visitLog.User.Email,
-                    TotalOwedPrints = visitLog.User.PrintLogs.Count(printLog => printLog.Owed),
-                    TotalOwedCost = visitLog.User.PrintLogs.Where(printLog => printLog.Owed).Sum(printLog => printLog.Cost),
-                    Permissions = permissions,
+                    HashedId = visitLog.HashedId,
+                    Name = visitLog.Name,
+                    Email = visitLog.Email,
+                    TotalOwedPrints = visitLog.TotalOwedPrints,
+                    TotalOwedCost = (float) visitLog.TotalOwedCost,
+                    Permissions = GetConfigurablePermissions(visitLog.Permissions),
                 });
             }
             return new VisitsResponse()
             {
-                TotalVisits = basePrintsQuery.Count(),
+                TotalVisits = (cursorPage == null ? await GetTotalAsync(baseVisitsQuery, offsetVisits, maxVisits, visitRows.Select(visitLog => visitLog.TotalVisits).ToList())
+                    : await SearchTotalCache.GetSingleton().GetOrCountAsync($"visits\n{searchPattern}", baseVisitsQuery)),
                 Visits = visits,
+                NextCursor = cursorPage?.NextCursor,
             };
         }
     }
-}
\ No newline at end of file
+}
@@ -29,8 +29,9 @@ namespace Construct.Admin.Controllers
             
             // Get the user.
             await using var context = new ConstructContext();
+            var normalizedHashedId = ConstructContext.Normalize(hashedId);
             var user = await context.Users.Include(user => user.Permissions)
-                .FirstOrDefaultAsync(user => user.HashedId.ToLower() == hashedId.ToLower());
+                .FirstOrDefaultAsync(user => user.NormalizedHashedId == normalizedHashedId);
             
             // Check if the user is authorized.
             var labmanager = user?.Permissions.FirstOrDefault(p => p.Name.ToLower() == "labmanager");
@@ -0,0 +1,91 @@
+using System;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Admin.State;
+using Construct.Core.Attribute;
+using Construct.Core.Data.Response;
+using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.Mvc;
+
+namespace Construct.Admin.Controllers
+{
+    public class AdminVisitFeedController : Controller
+    {
+        /// <summary>
+        /// Interval to send a heartbeat and check the session when there are no new visits.
+        /// </summary>
+        public static TimeSpan HeartbeatInterval { get; set; } = TimeSpan.FromSeconds(15);
+
+        /// <summary>
+        /// Options for serializing the visits. Matches the responses of the other endpoints.
+        /// </summary>
+        private static readonly JsonSerializerOptions JsonOptions = new JsonSerializerOptions(JsonSerializerDefaults.Web);
+
+        /// <summary>
+        /// Streams new visits as server-sent events until the connection
+        /// is closed or the session is no longer valid.
+        /// </summary>
+        /// <param name="session">Session of the user.</param>
+        /// <returns>The response to send.</returns>
+        [HttpGet]
+        [Path("/admin/visits/feed")]
+        public async Task<ActionResult<IResponse>> GetVisitFeed(string session)
+        {
+            // Return if the session isn't valid.
+            if (!Session.GetSingleton().RefreshSession(session))
+            {
+                Response.StatusCode = 401;
+                return new UnauthorizedResponse();
+            }
+
+            // Start the stream.
+            Response.ContentType = "text/event-stream";
+            Response.Headers["Cache-Control"] = "no-cache";
+            Response.Headers["X-Accel-Buffering"] = "no";
+            await Response.WriteAsync(": connected\n\n");
+            await Response.Body.FlushAsync();
+
+            // Send the visits until the connection is closed.
+            var visitFeed = VisitFeed.GetSingleton();
+            var (subscriberId, visits) = await visitFeed.SubscribeAsync();
+            var requestAborted = HttpContext.RequestAborted;
+            try
+            {
+                while (!requestAborted.IsCancellationRequested)
+                {
+                    // Wait for a visit, or send a heartbeat and check the session if there are none.
+                    using var heartbeatToken = CancellationTokenSource.CreateLinkedTokenSource(requestAborted);
+                    heartbeatToken.CancelAfter(HeartbeatInterval);
+                    try
+                    {
+                        if (!await visits.WaitToReadAsync(heartbeatToken.Token)) break;
+                    }
+                    catch (OperationCanceledException) when (!requestAborted.IsCancellationRequested)
+                    {
+                        if (!Session.GetSingleton().RefreshSession(session)) break;
+                        await Response.WriteAsync(": heartbeat\n\n", requestAborted);
+                        await Response.Body.FlushAsync(requestAborted);
+                        continue;
+                    }
+
+                    // Send the visits.
+                    while (visits.TryRead(out var visit))
+                    {
+                        await Response.WriteAsync($"id: {visit.Id}\nevent: visit\ndata: {JsonSerializer.Serialize(visit, JsonOptions)}\n\n", requestAborted);
+                    }
+                    await Response.Body.FlushAsync(requestAborted);
+                }
+            }
+            catch (OperationCanceledException)
+            {
+                // Connection was closed.
+            }
+            finally
+            {
+                await visitFeed.UnsubscribeAsync(subscriberId);
+            }
+            return new EmptyResult();
+        }
+    }
+}
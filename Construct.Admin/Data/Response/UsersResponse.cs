@@ -57,5 +57,11 @@ namespace Construct.Admin.Data.Response
         /// Prints in the search.
         /// </summary>
         public List<UserEntry> Users { get; set; }
+        
+        /// <summary>
+        /// Cursor for the next page if the search was paged with cursors.
+        /// Null if there are no more entries.
+        /// </summary>
+        public string NextCursor { get; set; }
     }
 }
\ No newline at end of file
@@ -5,6 +5,11 @@ namespace Construct.Admin.Data.Response
 {
     public class VisitEntry
     {
+        /// <summary>
+        /// Id of the visit. Newer visits have larger ids.
+        /// </summary>
+        public long Id { get; set; }
+        
         /// <summary>
         /// Time of the visit.
         /// </summary>
@@ -57,5 +62,11 @@ namespace Construct.Admin.Data.Response
         /// Visits in the search.
         /// </summary>
         public List<VisitEntry> Visits { get; set; }
+        
+        /// <summary>
+        /// Cursor for the next page if the search was paged with cursors.
+        /// Null if there are no more entries.
+        /// </summary>
+        public string NextCursor { get; set; }
     }
 }
\ No newline at end of file
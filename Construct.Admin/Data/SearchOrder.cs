@@ -0,0 +1,304 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Linq.Expressions;
+using System.Text;
+using System.Threading.Tasks;
+using Microsoft.EntityFrameworkCore;
+using Newtonsoft.Json;
+using Newtonsoft.Json.Linq;
+
+namespace Construct.Admin.Data
+{
+    public class SearchPage<TPrimaryKey>
+    {
+        /// <summary>
+        /// Primary keys of the entries in the page, in order.
+        /// </summary>
+        public List<TPrimaryKey> Keys { get; set; }
+
+        /// <summary>
+        /// Cursor for the next page. Null if there are no more entries.
+        /// </summary>
+        public string NextCursor { get; set; }
+    }
+
+    public class SearchKey<TPrimaryKey, TValue>
+    {
+        /// <summary>
+        /// Primary key of the entry.
+        /// </summary>
+        public TPrimaryKey PrimaryKey { get; set; }
+
+        /// <summary>
+        /// Value of the entry that is sorted by.
+        /// </summary>
+        public TValue Value { get; set; }
+    }
+
+    public abstract class SearchOrder<TEntity, TPrimaryKey>
+    {
+        /// <summary>
+        /// Name of the order stored in the cursors.
+        /// </summary>
+        public string Name { get; }
+
+        /// <summary>
+        /// Whether the entries are sorted ascending.
+        /// </summary>
+        public bool Ascending { get; }
+
+        /// <summary>
+        /// Creates the order.
+        /// </summary>
+        /// <param name="name">Name of the order stored in the cursors.</param>
+        /// <param name="ascending">Whether the entries are sorted ascending.</param>
+        protected SearchOrder(string name, bool ascending)
+        {
+            this.Name = name;
+            this.Ascending = ascending;
+        }
+
+        /// <summary>
+        /// Sorts a query by the value for paging with an offset. Entries with the
+        /// same value are left in the order the database returns them.
+        /// </summary>
+        /// <param name="query">Query to sort.</param>
+        /// <returns>The sorted query.</returns>
+        public abstract IOrderedQueryable<TEntity> Order(IQueryable<TEntity> query);
+
+        /// <summary>
+        /// Returns the primary keys of a page of entries after a cursor. Only the entries
+        /// after the cursor are read, so the time to get a page doesn't depend on how many
+        /// pages came before it if the value is indexed.
+        /// </summary>
+        /// <param name="query">Query of the search without the ordering or paging.</param>
+        /// <param name="cursor">Cursor returned with the previous page, or null for the first page.</param>
+        /// <param name="max">Maximum entries of the page.</param>
+        /// <returns>The page of entries.</returns>
+        /// <exception cref="FormatException">The cursor is invalid or for a different order.</exception>
+        public abstract Task<SearchPage<TPrimaryKey>> GetPageAsync(IQueryable<TEntity> query, string cursor, int max);
+    }
+
+    public class SearchOrder<TEntity, TPrimaryKey, TValue> : SearchOrder<TEntity, TPrimaryKey>
+    {
+        /// <summary>
+        /// Method for comparing strings, which can't use the comparison operators.
+        /// Translated to the comparison operators in SQL.
+        /// </summary>
+        private static readonly System.Reflection.MethodInfo StringCompareMethod = typeof(string).GetMethod(nameof(string.Compare), new[] { typeof(string), typeof(string) });
+
+        /// <summary>
+        /// Value of the entries that is sorted by.
+        /// </summary>
+        private readonly Expression<Func<TEntity, TValue>> _value;
+
+        /// <summary>
+        /// Primary key of the entries, used for sorting entries with the same value.
+        /// </summary>
+        private readonly Expression<Func<TEntity, TPrimaryKey>> _primaryKey;
+
+        /// <summary>
+        /// Selector for the primary key and value of the entries.
+        /// </summary>
+        private readonly Expression<Func<TEntity, SearchKey<TPrimaryKey, TValue>>> _searchKey;
+
+        /// <summary>
+        /// Creates the order.
+        /// </summary>
+        /// <param name="name">Name of the order stored in the cursors.</param>
+        /// <param name="value">Value of the entries to sort by. Must not be null in the database.</param>
+        /// <param name="primaryKey">Primary key of the entries.</param>
+        /// <param name="ascending">Whether the entries are sorted ascending.</param>
+        public SearchOrder(string name, Expression<Func<TEntity, TValue>> value, Expression<Func<TEntity, TPrimaryKey>> primaryKey, bool ascending) : base(name, ascending)
+        {
+            this._value = value;
+            this._primaryKey = primaryKey;
+            var entity = Expression.Parameter(typeof(TEntity), "entity");
+            this._searchKey = Expression.Lambda<Func<TEntity, SearchKey<TPrimaryKey, TValue>>>(Expression.MemberInit(Expression.New(typeof(SearchKey<TPrimaryKey, TValue>)),
+                Expression.Bind(typeof(SearchKey<TPrimaryKey, TValue>).GetProperty(nameof(SearchKey<TPrimaryKey, TValue>.PrimaryKey)), ReplaceParameter(primaryKey, entity)),
+                Expression.Bind(typeof(SearchKey<TPrimaryKey, TValue>).GetProperty(nameof(SearchKey<TPrimaryKey, TValue>.Value)), ReplaceParameter(value, entity))), entity);
+        }
+
+        /// <summary>
+        /// Returns the body of a lambda with the parameter replaced.
+        /// </summary>
+        /// <param name="lambda">Lambda to get the body of.</param>
+        /// <param name="parameter">Parameter to use instead.</param>
+        /// <returns>The body with the new parameter.</returns>
+        private static Expression ReplaceParameter(LambdaExpression lambda, ParameterExpression parameter)
+        {
+            return new ParameterReplacer(lambda.Parameters[0], parameter).Visit(lambda.Body);
+        }
+
+        /// <summary>
+        /// Returns an expression comparing two values. The result is compared to 0,
+        /// like IComparable.CompareTo, so that strings can be compared.
+        /// </summary>
+        /// <param name="left">Left value to compare.</param>
+        /// <param name="right">Right value to compare.</param>
+        /// <param name="after">Whether the left value must be after the right value in the order.</param>
+        /// <returns>The comparison.</returns>
+        private Expression IsAfter(Expression left, Expression right, bool after)
+        {
+            // Compare the strings.
+            var greater = (this.Ascending == after);
+            if (left.Type == typeof(string))
+            {
+                var comparison = Expression.Call(StringCompareMethod, left, right);
+                return greater ? Expression.GreaterThan(comparison, Expression.Constant(0)) : Expression.LessThan(comparison, Expression.Constant(0));
+            }
+
+            // Compare the other values.
+            return greater ? Expression.GreaterThan(left, right) : Expression.LessThan(left, right);
+        }
+
+        /// <summary>
+        /// Creates a cursor for the entries after an entry.
+        /// </summary>
+        /// <param name="searchKey">Primary key and value of the last entry of the page.</param>
+        /// <returns>The cursor for the next page.</returns>
+        private string CreateCursor(SearchKey<TPrimaryKey, TValue> searchKey)
+        {
+            var cursor = JsonConvert.SerializeObject(new object[] { this.Name, searchKey.Value, searchKey.PrimaryKey });
+            return Convert.ToBase64String(Encoding.UTF8.GetBytes(cursor)).TrimEnd('=').Replace('+', '-').Replace('/', '_');
+        }
+
+        /// <summary>
+        /// Reads a cursor.
+        /// </summary>
+        /// <param name="cursor">Cursor to read.</param>
+        /// <returns>The primary key and value of the last entry of the previous page.</returns>
+        /// <exception cref="FormatException">The cursor is invalid or for a different order.</exception>
+        private SearchKey<TPrimaryKey, TValue> ReadCursor(string cursor)
+        {
+            try
+            {
+                // Decode the cursor.
+                var base64Cursor = cursor.Replace('-', '+').Replace('_', '/');
+                base64Cursor += new string('=', (4 - base64Cursor.Length % 4) % 4);
+                var values = JArray.Parse(Encoding.UTF8.GetString(Convert.FromBase64String(base64Cursor)));
+
+                // Return the values if the cursor is for the order.
+                if (values.Count != 3 || values[0].ToObject<string>() != this.Name)
+                {
+                    throw new FormatException("Cursor is for a different order.");
+                }
+                return new SearchKey<TPrimaryKey, TValue>()
+                {
+                    Value = values[1].ToObject<TValue>(),
+                    PrimaryKey = values[2].ToObject<TPrimaryKey>(),
+                };
+            }
+            catch (Exception e) when (e is JsonException || e is ArgumentException || e is InvalidCastException)
+            {
+                throw new FormatException("Cursor is invalid.", e);
+            }
+        }
+
+        /// <summary>
+        /// Filters a query to the entries after a cursor.
+        /// </summary>
+        /// <param name="query">Query to filter.</param>
+        /// <param name="cursorKey">Primary key and value of the last entry of the previous page.</param>
+        /// <returns>The filtered query.</returns>
+        private IQueryable<TEntity> After(IQueryable<TEntity> query, SearchKey<TPrimaryKey, TValue> cursorKey)
+        {
+            // Get the values to compare. The cursor values are read from an object so that they are sent as parameters.
+            var entity = Expression.Parameter(typeof(TEntity), "entity");
+            var value = ReplaceParameter(this._value, entity);
+            var primaryKey = ReplaceParameter(this._primaryKey, entity);
+            var cursorObject = Expression.Constant(cursorKey);
+            var cursorValue = Expression.Property(cursorObject, nameof(SearchKey<TPrimaryKey, TValue>.Value));
+            var cursorPrimaryKey = Expression.Property(cursorObject, nameof(SearchKey<TPrimaryKey, TValue>.PrimaryKey));
+
+            // Filter the entries after the value, or with the same value and after the primary key.
+            var filter = Expression.OrElse(this.IsAfter(value, cursorValue, true),
+                Expression.AndAlso(Expression.Equal(value, cursorValue), this.IsAfter(primaryKey, cursorPrimaryKey, true)));
+            return query.Where(Expression.Lambda<Func<TEntity, bool>>(filter, entity));
+        }
+
+        /// <summary>
+        /// Sorts a query by the value for paging with an offset. Entries with the
+        /// same value are left in the order the database returns them.
+        /// </summary>
+        /// <param name="query">Query to sort.</param>
+        /// <returns>The sorted query.</returns>
+        public override IOrderedQueryable<TEntity> Order(IQueryable<TEntity> query)
+        {
+            return this.Ascending ? query.OrderBy(this._value) : query.OrderByDescending(this._value);
+        }
+
+        /// <summary>
+        /// Sorts a query by the value and then the primary key for paging with cursors.
+        /// </summary>
+        /// <param name="query">Query to sort.</param>
+        /// <returns>The sorted query.</returns>
+        private IOrderedQueryable<TEntity> OrderWithPrimaryKey(IQueryable<TEntity> query)
+        {
+            return this.Ascending ? query.OrderBy(this._value).ThenBy(this._primaryKey) : query.OrderByDescending(this._value).ThenByDescending(this._primaryKey);
+        }
+
+        /// <summary>
+        /// Returns the primary keys of a page of entries after a cursor. Only the entries
+        /// after the cursor are read, so the time to get a page doesn't depend on how many
+        /// pages came before it if the value is indexed.
+        /// </summary>
+        /// <param name="query">Query of the search without the ordering or paging.</param>
+        /// <param name="cursor">Cursor returned with the previous page, or null for the first page.</param>
+        /// <param name="max">Maximum entries of the page.</param>
+        /// <returns>The page of entries.</returns>
+        /// <exception cref="FormatException">The cursor is invalid or for a different order.</exception>
+        public override async Task<SearchPage<TPrimaryKey>> GetPageAsync(IQueryable<TEntity> query, string cursor, int max)
+        {
+            // Get the entries after the cursor, plus 1 to check if there is another page.
+            if (!string.IsNullOrEmpty(cursor))
+            {
+                query = this.After(query, this.ReadCursor(cursor));
+            }
+            max = Math.Max(0, max);
+            var searchKeys = await this.OrderWithPrimaryKey(query).Select(this._searchKey).Take(max + 1).ToListAsync();
+
+            // Return the page.
+            return new SearchPage<TPrimaryKey>()
+            {
+                Keys = searchKeys.Take(max).Select(searchKey => searchKey.PrimaryKey).ToList(),
+                NextCursor = (searchKeys.Count > max && max > 0 ? this.CreateCursor(searchKeys[max - 1]) : null),
+            };
+        }
+    }
+
+    public class ParameterReplacer : ExpressionVisitor
+    {
+        /// <summary>
+        /// Parameter to replace.
+        /// </summary>
+        private readonly ParameterExpression _oldParameter;
+
+        /// <summary>
+        /// Parameter to replace with.
+        /// </summary>
+        private readonly ParameterExpression _newParameter;
+
+        /// <summary>
+        /// Creates the replacer.
+        /// </summary>
+        /// <param name="oldParameter">Parameter to replace.</param>
+        /// <param name="newParameter">Parameter to replace with.</param>
+        public ParameterReplacer(ParameterExpression oldParameter, ParameterExpression newParameter)
+        {
+            this._oldParameter = oldParameter;
+            this._newParameter = newParameter;
+        }
+
+        /// <summary>
+        /// Replaces the parameter.
+        /// </summary>
+        /// <param name="node">Parameter being visited.</param>
+        /// <returns>The parameter to use.</returns>
+        protected override Expression VisitParameter(ParameterExpression node)
+        {
+            return node == this._oldParameter ? this._newParameter : base.VisitParameter(node);
+        }
+    }
+}
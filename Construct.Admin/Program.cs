@@ -1,4 +1,5 @@
-﻿using Construct.Core.Server;
+﻿using Construct.Core.Database.Archive;
+using Construct.Core.Server;
 
 namespace Construct.Admin
 {
@@ -8,6 +9,6 @@ namespace Construct.Admin
         /// Runs the program.
         /// </summary>
         /// <param name="args">Arguments from the command line.</param>
-        public static void Main(string[] args) => ServerProgram.Run(args, "Admin");
+        public static void Main(string[] args) => ServerProgram.Run(args, "Admin", typeof(LogArchiveWorker));
     }
 }
\ No newline at end of file
@@ -0,0 +1,129 @@
+using System;
+using System.Collections.Concurrent;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Microsoft.EntityFrameworkCore;
+
+namespace Construct.Admin.State
+{
+    public class CachedSearchTotal
+    {
+        /// <summary>
+        /// Total entries of the search.
+        /// </summary>
+        public int Total { get; set; }
+
+        /// <summary>
+        /// Time the total was counted.
+        /// </summary>
+        public DateTime CountTime { get; set; }
+    }
+
+    public class SearchTotalCache
+    {
+        /// <summary>
+        /// Maximum duration, in seconds, that a total is stored before it is counted again.
+        /// </summary>
+        public int MaxTotalDuration { get; set; } = 30;
+
+        /// <summary>
+        /// Maximum totals to store. Expired totals are removed when this is passed.
+        /// </summary>
+        public int MaxTotals { get; set; } = 1000;
+
+        /// <summary>
+        /// Static cache instance to use.
+        /// </summary>
+        private static SearchTotalCache _staticCache;
+
+        /// <summary>
+        /// Totals of the searches.
+        /// </summary>
+        private readonly ConcurrentDictionary<string, CachedSearchTotal> _totals = new ConcurrentDictionary<string, CachedSearchTotal>();
+
+        /// <summary>
+        /// Returns a static instance of the cache. The settings of the
+        /// cache are updated when the configuration is reloaded.
+        /// </summary>
+        /// <returns>The static instance of the cache.</returns>
+        public static SearchTotalCache GetSingleton()
+        {
+            if (_staticCache != null) return _staticCache;
+            var cache = new SearchTotalCache();
+            cache.ApplyConfiguration(ConstructConfiguration.Configuration);
+            if (Interlocked.CompareExchange(ref _staticCache, cache, null) == null)
+            {
+                ConstructConfiguration.Reloaded += cache.ApplyConfiguration;
+            }
+            return _staticCache;
+        }
+
+        /// <summary>
+        /// Updates the settings of the cache from a configuration.
+        /// </summary>
+        /// <param name="configuration">Configuration to use.</param>
+        public void ApplyConfiguration(ConstructConfiguration configuration)
+        {
+            this.MaxTotalDuration = Math.Max(0, configuration.Admin.SearchTotalCacheDuration);
+        }
+
+        /// <summary>
+        /// Returns the total entries of a search. The total is counted if it
+        /// isn't stored or is older than the max duration.
+        /// </summary>
+        /// <param name="key">Key of the search, including the type of entries and filters.</param>
+        /// <param name="query">Query of the search without the ordering or paging.</param>
+        /// <returns>The total entries of the search.</returns>
+        public async Task<int> GetOrCountAsync<T>(string key, IQueryable<T> query)
+        {
+            // Return the stored total if it hasn't expired.
+            if (this._totals.TryGetValue(key, out var cachedTotal) && !this.IsExpired(cachedTotal))
+            {
+                return cachedTotal.Total;
+            }
+
+            // Count the entries.
+            var total = await query.CountAsync();
+            if (this.MaxTotalDuration <= 0) return total;
+            this._totals[key] = new CachedSearchTotal()
+            {
+                Total = total,
+                CountTime = DateTime.Now,
+            };
+
+            // Remove the expired totals if there are too many, or all of them if none have expired.
+            if (this._totals.Count > this.MaxTotals)
+            {
+                foreach (var (expiredKey, _) in this._totals.Where(pair => this.IsExpired(pair.Value)).ToList())
+                {
+                    this._totals.TryRemove(expiredKey, out _);
+                }
+                if (this._totals.Count > this.MaxTotals)
+                {
+                    this._totals.Clear();
+                }
+            }
+            return total;
+        }
+
+        /// <summary>
+        /// Removes all the stored totals.
+        /// </summary>
+        public void Clear()
+        {
+            this._totals.Clear();
+        }
+
+        /// <summary>
+        /// Returns if a total has expired.
+        /// </summary>
+        /// <param name="cachedTotal">Total to check.</param>
+        /// <returns>Whether the total has expired.</returns>
+        private bool IsExpired(CachedSearchTotal cachedTotal)
+        {
+            return (DateTime.Now - cachedTotal.CountTime).TotalSeconds > this.MaxTotalDuration;
+        }
+    }
+}
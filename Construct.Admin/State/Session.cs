@@ -1,10 +1,24 @@
 using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
-using System.Linq;
+using System.Threading;
 using Construct.Core.Configuration;
 
 namespace Construct.Admin.State
 {
+    public class SessionEntry
+    {
+        /// <summary>
+        /// Identifier the session belongs to.
+        /// </summary>
+        public string Identifier { get; set; }
+
+        /// <summary>
+        /// Time the session expires if it isn't refreshed.
+        /// </summary>
+        public DateTime ExpireTime { get; set; }
+    }
+
     public class Session
     {
         /// <summary>
@@ -17,15 +31,56 @@ namespace Construct.Admin.State
         /// </summary>
         public long MaxSessionDuration { get; set; } = 60 * 60;
 
+        /// <summary>
+        /// Interval in seconds to remove expired sessions for the static instance.
+        /// </summary>
+        public const int SweepInterval = 60;
+
+        /// <summary>
+        /// Total active or expired sessions that haven't been removed.
+        /// </summary>
+        public int Count => this._sessions.Count;
+
+        /// <summary>
+        /// Total sessions removed because they expired.
+        /// </summary>
+        public long Expirations => Interlocked.Read(ref this._expirations);
+
+        /// <summary>
+        /// Total sessions removed to stay within the maximum sessions of an identifier.
+        /// </summary>
+        public long Evictions => Interlocked.Read(ref this._evictions);
+
         /// <summary>
         /// Static session instance to use.
         /// </summary>
         private static Session _staticSession;
-        
+
+        /// <summary>
+        /// Timer for removing the expired sessions of the static instance.
+        /// </summary>
+        private static Timer _sweepTimer;
+
         /// <summary>
-        /// Active sessions for the identifiers, including their expire time.
+        /// Sessions by their session string.
         /// </summary>
-        private readonly Dictionary<string, List<KeyValuePair<string, DateTime>>> _sessions = new Dictionary<string, List<KeyValuePair<string, DateTime>>>();
+        private readonly ConcurrentDictionary<string, SessionEntry> _sessions = new ConcurrentDictionary<string, SessionEntry>();
+
+        /// <summary>
+        /// Session strings of the identifiers in order of increasing expire time.
+        /// The lists are locked when reading or changing them.
+        /// </summary>
+        private readonly ConcurrentDictionary<string, List<string>> _identifierSessions = new ConcurrentDictionary<string, List<string>>();
+
+        /// <summary>
+        /// Total sessions removed because they expired.
+        /// </summary>
+        private long _expirations;
+
+        /// <summary>
+        /// Total sessions removed to stay within the maximum sessions of an identifier.
+        /// </summary>
+        private long _evictions;
 
         /// <summary>
         /// Returns a static instance of the session.
@@ -33,11 +88,26 @@ namespace Construct.Admin.State
         /// <returns></returns>
         public static Session GetSingleton()
         {
-            return _staticSession ??= new Session()
+            if (_staticSession != null) return _staticSession;
+            var session = new Session();
+            session.ApplyConfiguration(ConstructConfiguration.Configuration);
+            if (Interlocked.CompareExchange(ref _staticSession, session, null) == null)
             {
-                MaxSessions = Math.Max(0, ConstructConfiguration.Configuration.Admin.MaximumUserSessions),
-                MaxSessionDuration = Math.Max(0, ConstructConfiguration.Configuration.Admin.MaximumUserSessionDuration),
-            };
+                _sweepTimer = new Timer(_ => session.RemoveExpiredSessions(), null, SweepInterval * 1000, SweepInterval * 1000);
+                ConstructConfiguration.Reloaded += session.ApplyConfiguration;
+            }
+            return _staticSession;
+        }
+
+        /// <summary>
+        /// Updates the settings of the session from a configuration.
+        /// The settings are used for the sessions created after.
+        /// </summary>
+        /// <param name="configuration">Configuration to use.</param>
+        public void ApplyConfiguration(ConstructConfiguration configuration)
+        {
+            this.MaxSessions = Math.Max(0, configuration.Admin.MaximumUserSessions);
+            this.MaxSessionDuration = Math.Max(0, configuration.Admin.MaximumUserSessionDuration);
         }
 
         /// <summary>
@@ -47,27 +117,39 @@ namespace Construct.Admin.State
         /// <returns>The session string to use.</returns>
         public string CreateSession(string identifier)
         {
-            // Create the identifier storage if it doesn't exist.
-            if (!this._sessions.ContainsKey(identifier))
-            {
-                this._sessions[identifier] = new List<KeyValuePair<string, DateTime>>();
-            }
-            
-            // Create and add the session to the end of the list.
             var newSession = Guid.NewGuid().ToString();
-            var sessions = this._sessions[identifier];
-            sessions.Add(new KeyValuePair<string, DateTime>(newSession, DateTime.Now.AddSeconds(this.MaxSessionDuration)));
-            
-            // Remove sessions until the maximum sessions is maintained.
-            while (sessions.Count > this.MaxSessions)
+            while (true)
             {
-                sessions.RemoveAt(0);
+                // Get the sessions of the identifier.
+                // The sessions are fetched again if they were removed before they were locked.
+                var sessions = this._identifierSessions.GetOrAdd(identifier, _ => new List<string>());
+                lock (sessions)
+                {
+                    if (!this._identifierSessions.TryGetValue(identifier, out var currentSessions) || currentSessions != sessions) continue;
+
+                    // Add the session to the end of the list.
+                    this._sessions[newSession] = new SessionEntry()
+                    {
+                        Identifier = identifier,
+                        ExpireTime = DateTime.Now.AddSeconds(this.MaxSessionDuration),
+                    };
+                    sessions.Add(newSession);
+
+                    // Remove sessions until the maximum sessions is maintained.
+                    this.RemoveExpiredSessions(sessions);
+                    while (sessions.Count > this.MaxSessions)
+                    {
+                        this._sessions.TryRemove(sessions[0], out _);
+                        sessions.RemoveAt(0);
+                        Interlocked.Increment(ref this._evictions);
+                    }
+                }
+
+                // Return the created session.
+                return newSession;
             }
-            
-            // Return the created session.
-            return newSession;
         }
-        
+
         /// <summary>
         /// Returns the identifier for a session. Returns null if the
         /// session does not exist or is expired.
@@ -76,27 +158,17 @@ namespace Construct.Admin.State
         /// <returns>The identifier for a session.</returns>
         public string GetIdentifier(string sessionString)
         {
-            // Iterate over the identifiers.
-            foreach (var (identifier, sessions) in this._sessions)
+            // Return null if the session doesn't exist or is expired.
+            // Expired sessions are removed when the identifier changes or the sessions are swept.
+            if (sessionString == null || !this._sessions.TryGetValue(sessionString, out var session) || session.ExpireTime < DateTime.Now)
             {
-                // Ignore if the session is not linked to the identifier.
-                if (sessions.All(session => session.Key != sessionString)) continue;
-                
-                // Remove expired sessions.
-                while (sessions.Count > 0 && sessions[0].Value < DateTime.Now)
-                {
-                    sessions.RemoveAt(0);
-                }
-                
-                // Return if the session string still exists.
-                // If the session expired, null will be returned because it was removed.
-                return sessions.Any(session => session.Key == sessionString) ? identifier : null;
+                return null;
             }
-            
-            // Return null (not found).
-            return null;
+
+            // Return the identifier.
+            return session.Identifier;
         }
-        
+
         /// <summary>
         /// Returns if a session is valid (exists and isn't expired).
         /// </summary>
@@ -115,36 +187,63 @@ namespace Construct.Admin.State
         public bool RefreshSession(string sessionString)
         {
             // Return false if the session isn't valid already.
-            if (!this.SessionValid(sessionString))
+            var identifier = this.GetIdentifier(sessionString);
+            if (identifier == null || !this._identifierSessions.TryGetValue(identifier, out var sessions))
             {
                 return false;
             }
-            
-            // Iterate over the identifiers.
-            foreach (var (identifier, sessions) in this._sessions)
+
+            lock (sessions)
             {
-                // Ignore if the session is not linked to the identifier.
-                if (sessions.All(session => session.Key != sessionString)) continue;
-                
-                // Remove the session.
-                // This keeps the concept of making the list of sessions increase in expire time.
-                for (var i = 0; i < sessions.Count; i++)
-                {
-                    if (sessions[i].Key != sessionString) continue;
-                    sessions.RemoveAt(i);
-                    break;
-                }
-                while (sessions.Count > 0 && sessions[0].Value < DateTime.Now)
+                // Return false if the session expired or was removed before the sessions were locked.
+                if (!this._sessions.TryGetValue(sessionString, out var session) || session.ExpireTime < DateTime.Now)
                 {
-                    sessions.RemoveAt(0);
+                    return false;
                 }
-                
-                // Re-add the session with the new expire time.
-                sessions.Add(new KeyValuePair<string, DateTime>(sessionString, DateTime.Now.AddSeconds(this.MaxSessionDuration)));
+
+                // Move the session to the end with the new expire time.
+                // This keeps the concept of making the list of sessions increase in expire time.
+                sessions.Remove(sessionString);
+                sessions.Add(sessionString);
+                session.ExpireTime = DateTime.Now.AddSeconds(this.MaxSessionDuration);
+                this.RemoveExpiredSessions(sessions);
             }
-            
+
             // Return true (was valid).
             return true;
         }
+
+        /// <summary>
+        /// Removes the expired sessions of all the identifiers.
+        /// </summary>
+        public void RemoveExpiredSessions()
+        {
+            foreach (var (identifier, sessions) in this._identifierSessions)
+            {
+                lock (sessions)
+                {
+                    // Remove the expired sessions and the identifier if it has no sessions.
+                    this.RemoveExpiredSessions(sessions);
+                    if (sessions.Count > 0) continue;
+                    this._identifierSessions.TryRemove(new KeyValuePair<string, List<string>>(identifier, sessions));
+                }
+            }
+        }
+
+        /// <summary>
+        /// Removes the expired sessions of an identifier. The sessions must be locked.
+        /// </summary>
+        /// <param name="sessions">Sessions of the identifier.</param>
+        private void RemoveExpiredSessions(List<string> sessions)
+        {
+            var currentTime = DateTime.Now;
+            while (sessions.Count > 0)
+            {
+                if (this._sessions.TryGetValue(sessions[0], out var session) && session.ExpireTime >= currentTime) break;
+                this._sessions.TryRemove(sessions[0], out _);
+                sessions.RemoveAt(0);
+                Interlocked.Increment(ref this._expirations);
+            }
+        }
     }
-}
\ No newline at end of file
+}
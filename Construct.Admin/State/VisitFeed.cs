@@ -0,0 +1,288 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading;
+using System.Threading.Channels;
+using System.Threading.Tasks;
+using Construct.Admin.Controllers;
+using Construct.Admin.Data.Response;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Cache;
+using Construct.Core.Database.Context;
+using Construct.Core.Logging;
+using Microsoft.EntityFrameworkCore;
+
+namespace Construct.Admin.State
+{
+    public class VisitFeed
+    {
+        /// <summary>
+        /// Interval, in milliseconds, to check the database for new visits while there are subscribers.
+        /// </summary>
+        public int PollInterval { get; set; } = 2000;
+
+        /// <summary>
+        /// Maximum visits to load in one check and to queue for a subscriber.
+        /// Subscribers that don't read their visits lose the oldest visits.
+        /// </summary>
+        public int MaxVisits { get; set; } = 100;
+
+        /// <summary>
+        /// Visit ids before the last sent visit that are checked again. Visits that are
+        /// saved at the same time may be committed after visits with larger ids, so
+        /// they would be skipped if only ids after the last sent visit were checked.
+        /// </summary>
+        public int OverlapVisits { get; set; } = 100;
+
+        /// <summary>
+        /// Total subscribers of the feed.
+        /// </summary>
+        public int Subscribers => this._subscribers.Count;
+
+        /// <summary>
+        /// Static feed instance to use.
+        /// </summary>
+        private static VisitFeed _staticFeed;
+
+        /// <summary>
+        /// Visits queued for the subscribers.
+        /// </summary>
+        private readonly ConcurrentDictionary<Guid, Channel<VisitEntry>> _subscribers = new ConcurrentDictionary<Guid, Channel<VisitEntry>>();
+
+        /// <summary>
+        /// Lock for checking the database so that only one check runs at once.
+        /// Also used for adding and removing subscribers, the poll timer, and the sent visits.
+        /// </summary>
+        private readonly SemaphoreSlim _pollLock = new SemaphoreSlim(1, 1);
+
+        /// <summary>
+        /// Timer for checking the database. Only exists while there are subscribers.
+        /// </summary>
+        private Timer _pollTimer;
+
+        /// <summary>
+        /// Id of the last visit that existed when the first subscriber subscribed.
+        /// Visits up to this id are never sent.
+        /// </summary>
+        private long? _firstId;
+
+        /// <summary>
+        /// Id of the last visit sent to the subscribers.
+        /// </summary>
+        private long _lastId;
+
+        /// <summary>
+        /// Ids of the visits sent to the subscribers that are checked again.
+        /// </summary>
+        private readonly SortedSet<long> _sentIds = new SortedSet<long>();
+
+        /// <summary>
+        /// Whether a check of the database was requested while another check was running.
+        /// </summary>
+        private int _pollRequested;
+
+        /// <summary>
+        /// Returns a static instance of the feed.
+        /// </summary>
+        /// <returns>The static instance of the feed.</returns>
+        public static VisitFeed GetSingleton()
+        {
+            if (_staticFeed != null) return _staticFeed;
+            var feed = new VisitFeed()
+            {
+                PollInterval = Math.Max(100, ConstructConfiguration.Configuration.Admin.VisitFeedPollInterval),
+            };
+            if (Interlocked.CompareExchange(ref _staticFeed, feed, null) == null)
+            {
+                BaseContext.VisitLogsAdded += feed.RequestPoll;
+                ConstructConfiguration.Reloaded += feed.ApplyConfiguration;
+            }
+            return _staticFeed;
+        }
+
+        /// <summary>
+        /// Updates the poll interval of the feed from a configuration.
+        /// </summary>
+        /// <param name="configuration">Configuration to use.</param>
+        public void ApplyConfiguration(ConstructConfiguration configuration)
+        {
+            this._pollLock.Wait();
+            try
+            {
+                this.PollInterval = Math.Max(100, configuration.Admin.VisitFeedPollInterval);
+                this._pollTimer?.Change(this.PollInterval, this.PollInterval);
+            }
+            finally
+            {
+                this._pollLock.Release();
+            }
+        }
+
+        /// <summary>
+        /// Adds a subscriber to the feed. Only visits after subscribing are sent.
+        /// </summary>
+        /// <returns>The id of the subscriber and the reader for the visits.</returns>
+        public async Task<(Guid, ChannelReader<VisitEntry>)> SubscribeAsync()
+        {
+            // Add the subscriber.
+            var id = Guid.NewGuid();
+            var channel = Channel.CreateBounded<VisitEntry>(new BoundedChannelOptions(this.MaxVisits)
+            {
+                FullMode = BoundedChannelFullMode.DropOldest,
+                SingleReader = true,
+            });
+            await this._pollLock.WaitAsync();
+            try
+            {
+                // Get the last visit if this is the first subscriber.
+                if (this._firstId == null)
+                {
+                    await using var context = new ConstructContext(readOnly: true);
+                    this._firstId = await context.VisitLogs.MaxAsync(visitLog => (long?) visitLog.Key) ?? 0;
+                    this._lastId = this._firstId.Value;
+                    this._sentIds.Clear();
+                }
+                
+                // Add the subscriber and start checking the database.
+                this._subscribers[id] = channel;
+                this._pollTimer ??= new Timer(_ => this.RequestPoll(), null, this.PollInterval, this.PollInterval);
+            }
+            finally
+            {
+                this._pollLock.Release();
+            }
+            return (id, channel.Reader);
+        }
+
+        /// <summary>
+        /// Removes a subscriber from the feed.
+        /// </summary>
+        /// <param name="id">Id of the subscriber.</param>
+        public async Task UnsubscribeAsync(Guid id)
+        {
+            await this._pollLock.WaitAsync();
+            try
+            {
+                // Remove the subscriber.
+                if (this._subscribers.TryRemove(id, out var channel))
+                {
+                    channel.Writer.TryComplete();
+                }
+
+                // Stop checking the database if there are no subscribers.
+                if (!this._subscribers.IsEmpty || this._pollTimer == null) return;
+                this._pollTimer.Dispose();
+                this._pollTimer = null;
+                this._firstId = null;
+                this._sentIds.Clear();
+            }
+            finally
+            {
+                this._pollLock.Release();
+            }
+        }
+
+        /// <summary>
+        /// Starts checking the database for new visits without waiting.
+        /// </summary>
+        public void RequestPoll()
+        {
+            if (this._subscribers.IsEmpty) return;
+            _ = this.PollAsync();
+        }
+
+        /// <summary>
+        /// Checks the database for new visits and sends them to the subscribers.
+        /// If a check is already running, it checks again after it completes.
+        /// </summary>
+        public async Task PollAsync()
+        {
+            // Return if a check is running. The running check will check again.
+            Interlocked.Exchange(ref this._pollRequested, 1);
+            if (!await this._pollLock.WaitAsync(0)) return;
+
+            // Check for new visits until no more checks are requested.
+            try
+            {
+                while (Interlocked.Exchange(ref this._pollRequested, 0) == 1)
+                {
+                    await this.SendNewVisitsAsync();
+                }
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"Failed to check for new visits: {e.Message}");
+            }
+            finally
+            {
+                this._pollLock.Release();
+            }
+        }
+
+        /// <summary>
+        /// Loads the visits after the last sent visit, and the visits in the overlap
+        /// before it that weren't sent, and sends them to the subscribers.
+        /// Must be called with the poll lock.
+        /// </summary>
+        private async Task SendNewVisitsAsync()
+        {
+            // Return if there are no subscribers.
+            if (this._subscribers.IsEmpty || this._firstId == null) return;
+
+            // Get the new visits.
+            var minimumId = Math.Max(this._firstId.Value, this._lastId - this.OverlapVisits);
+            this._sentIds.RemoveWhere(sentId => sentId <= minimumId);
+            var sentIds = this._sentIds.ToList();
+            var permissionNames = ConstructConfiguration.Configuration.Admin.ConfigurablePermissionLookup;
+            await using var context = new ConstructContext(readOnly: true);
+            var visitRows = await context.VisitLogs.AsNoTracking().Where(visitLog => visitLog.Key > minimumId && !sentIds.Contains(visitLog.Key))
+                .OrderBy(visitLog => visitLog.Key).Take(this.MaxVisits).Select(visitLog => new
+                {
+                    visitLog.Key,
+                    visitLog.Time,
+                    visitLog.Source,
+                    visitLog.User.HashedId,
+                    visitLog.User.Name,
+                    visitLog.User.Email,
+                    TotalOwedPrints = (int?) visitLog.User.PrintTotals.OwedPrints ?? 0,
+                    TotalOwedCost = (double?) visitLog.User.PrintTotals.OwedCost ?? 0,
+                    Permissions = visitLog.User.Permissions.Where(permission => permissionNames.Contains(permission.Name.ToLower())).Select(permission => new CachedPermission()
+                    {
+                        Name = permission.Name,
+                        StartTime = permission.StartTime,
+                        EndTime = permission.EndTime,
+                    }).ToList(),
+                }).ToListAsync();
+
+            // Send the visits.
+            foreach (var visitLog in visitRows)
+            {
+                var visit = new VisitEntry()
+                {
+                    Id = visitLog.Key,
+                    Timestamp = ((DateTimeOffset) visitLog.Time).ToUnixTimeSeconds(),
+                    Source = visitLog.Source,
+                    HashedId = visitLog.HashedId,
+                    Name = visitLog.Name,
+                    Email = visitLog.Email,
+                    TotalOwedPrints = visitLog.TotalOwedPrints,
+                    TotalOwedCost = (float) visitLog.TotalOwedCost,
+                    Permissions = AdminSearchController.GetConfigurablePermissions(visitLog.Permissions),
+                };
+                foreach (var channel in this._subscribers.Values)
+                {
+                    channel.Writer.TryWrite(visit);
+                }
+                this._sentIds.Add(visitLog.Key);
+                this._lastId = Math.Max(this._lastId, visitLog.Key);
+            }
+
+            // Check again if the maximum visits were loaded.
+            if (visitRows.Count >= this.MaxVisits)
+            {
+                Interlocked.Exchange(ref this._pollRequested, 1);
+            }
+        }
+    }
+}
@@ -3,6 +3,7 @@ using System.IO;
 using System.Net;
 using System.Net.Http;
 using Construct.Core.Configuration;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
 using Construct.Core.Receipt.Print;
 using NUnit.Framework;
@@ -29,6 +30,7 @@ namespace Construct.Base.Test.Functional.Base
             // Set up the configuration.
             ConstructConfiguration.Configuration.Database.Provider = "sqlite";
             ConstructConfiguration.Configuration.Database.Source = this._testDatabaseLocation;
+            ConstructContext.ResetContextPools();
             
             // Remove the existing database file if one exists.
             if (File.Exists(this._testDatabaseLocation))
@@ -36,6 +38,9 @@ namespace Construct.Base.Test.Functional.Base
                 File.Delete(this._testDatabaseLocation);
             }
             
+            // Clear the users stored from other tests.
+            UserCache.GetSingleton().Clear();
+            
             // Set up the database.
             using var context = new ConstructContext();
             context.EnsureUpToDateAsync().Wait();
@@ -72,10 +77,13 @@ namespace Construct.Base.Test.Functional.Base
         [TearDown]
         public void TearDown()
         {
-            // Remove the existing database file if one exists.
-            if (File.Exists(this._testDatabaseLocation))
+            // Remove the existing database files if they exist.
+            foreach (var file in new[] { this._testDatabaseLocation, this._testDatabaseLocation + "-wal", this._testDatabaseLocation + "-shm" })
             {
-                File.Delete(this._testDatabaseLocation);
+                if (File.Exists(file))
+                {
+                    File.Delete(file);
+                }
             }
         }
     }
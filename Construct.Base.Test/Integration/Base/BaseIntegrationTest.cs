@@ -6,6 +6,7 @@ using System.Net.Sockets;
 using System.Threading.Tasks;
 using Construct.Base.Test.Functional.Base;
 using Construct.Core.Configuration;
+using Construct.Core.Data.Response;
 using Construct.Core.Server;
 using Newtonsoft.Json;
 
@@ -44,14 +45,14 @@ namespace Construct.Base.Test.Integration.Base
         /// <param name="name">Name of the application to test.</param>
         public void WaitForApp(string name)
         {
-            // Send requests until a non-socket exception is returned.
+            // Send requests until the app reports that it is ready.
             // A loop isn't required on Windows most of the time, but is on other operating systems.
             while (true)
             {
                 try
                 {
-                    this.Get<string>(name, "/");
-                    break;
+                    var (_, statusCode) = this.Get<GenericStatusResponse>(name, ServerStatus.ReadyPath);
+                    if (statusCode == HttpStatusCode.OK) break;
                 }
                 catch (AggregateException)
                 {
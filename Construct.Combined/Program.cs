@@ -2,9 +2,12 @@
 using System.Collections.Generic;
 using Construct.Admin.Controllers;
 using Construct.Compatibility.Controllers;
+using Construct.Core.Database.Archive;
+using Construct.Core.Receipt.Print;
 using Construct.Core.Server;
 using Construct.Print.Controllers;
 using Construct.Swipe.Controllers;
+using Construct.Swipe.Queue;
 using Construct.User.Controllers;
 
 namespace Construct.Combined
@@ -35,7 +38,7 @@ namespace Construct.Combined
             };
             
             // Start the app.
-            ServerProgram.Run(args, "Combined");
+            ServerProgram.Run(args, "Combined", typeof(PrintReceiptWorker), typeof(SwipeQueueWorker), typeof(LogArchiveWorker));
         } 
     }
 }
\ No newline at end of file
@@ -7,6 +7,7 @@ using Construct.Compatibility.Data.Response;
 using Construct.Core.Attribute;
 using Construct.Core.Configuration;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Construct.Core.Receipt.Print;
@@ -37,6 +38,32 @@ namespace Construct.Compatibility.Controllers
                 return hashedId;
             }
         }
+
+        /// <summary>
+        /// Returns the user for a hashed id using the user cache.
+        /// Only users with the exact hashed id are returned.
+        /// </summary>
+        /// <param name="context">Context to load the user with.</param>
+        /// <param name="hashedId">Hashed id of the user.</param>
+        private static async Task<CachedUser> GetCachedUserAsync(ConstructContext context, string hashedId)
+        {
+            if (hashedId == null) return null;
+            var user = await UserCache.GetSingleton().GetOrLoadAsync(context, hashedId);
+            return user?.HashedId == hashedId ? user : null;
+        }
+        
+        /// <summary>
+        /// Returns the user for an email.
+        /// Only users with the exact email are returned.
+        /// </summary>
+        /// <param name="context">Context to load the user with.</param>
+        /// <param name="email">Email of the user.</param>
+        private static async Task<Core.Database.Model.User> GetUserByEmailAsync(ConstructContext context, string email)
+        {
+            if (email == null) return null;
+            var user = await context.GetUserByEmailAsync(email);
+            return user?.Email == email ? user : null;
+        }
         
         /// <summary>
         /// Legacy endpoint for getting the name of a user.
@@ -50,7 +77,7 @@ namespace Construct.Compatibility.Controllers
             
             // Get and return the name.
             await using var context = new ConstructContext();
-            var user = await context.Users.FirstOrDefaultAsync((u => u.HashedId == hashedId));
+            var user = await GetCachedUserAsync(context, hashedId);
             return new NameResponse()
             {
                 Name = user?.Name,
@@ -69,22 +96,17 @@ namespace Construct.Compatibility.Controllers
 
             // Get the user and return if the user doesn't exist.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(u => u.PrintLogs).FirstOrDefaultAsync(u => u.HashedId == hashedId);
+            var user = await GetCachedUserAsync(context, hashedId);
             if (user == null)
             {
                 return new UserBalanceResponse();
             }
             
-            // Determine and return the balance for the print logs.
-            var owedPrints = user.PrintLogs.Where(print => print.Owed);
-            var owedPrintBalance = 0.0;
-            foreach (var print in owedPrints)
-            {
-                owedPrintBalance += print.Cost;
-            }
+            // Return the balance from the print totals.
+            var printTotals = await context.GetPrintTotalsAsync(user.HashedId);
             return new UserBalanceResponse()
             {
-                Balance = owedPrintBalance,
+                Balance = printTotals?.OwedCost ?? 0,
             };
         }
         
@@ -99,8 +121,9 @@ namespace Construct.Compatibility.Controllers
             hashedId = GetHash(hashedId, universityId);
 
             // Get the user and return if the user is authorized.
+            // The user cache isn't used so that permission changes from other services are seen right away.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(u => u.Permissions).FirstOrDefaultAsync(u => u.HashedId == hashedId);
+            var user = (hashedId == null ? null : await context.Users.Include(u => u.Permissions).FirstOrDefaultAsync(u => u.HashedId == hashedId));
             var isLabManager = (user?.Permissions.FirstOrDefault(p => p.Name.ToLower() == "labmanager") != null);
             return new IsAuthorizedResponse()
             {
@@ -116,11 +139,7 @@ namespace Construct.Compatibility.Controllers
         public async Task<HashedIdResponse> GetHashedId(string email)
         {
             // Correct the email.
-            var emailCorrection = new EmailCorrection()
-            {
-                ValidEmails = ConstructConfiguration.Configuration.Email.ValidEmails,
-                Corrections = ConstructConfiguration.Configuration.Email.EmailCorrections,
-            };
+            var emailCorrection = new EmailCorrection(ConstructConfiguration.Configuration.Email);
             try
             {
                 email = emailCorrection.CorrectEmail(email);
@@ -132,7 +151,7 @@ namespace Construct.Compatibility.Controllers
 
             // Get the user and return the hashed id.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(u => u.Permissions).FirstOrDefaultAsync(u => u.Email == email);
+            var user = await GetUserByEmailAsync(context, email);
             return new HashedIdResponse()
             {
                 HashedId = user?.HashedId,
@@ -151,8 +170,8 @@ namespace Construct.Compatibility.Controllers
 
             // Get the user and return the response.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(u => u.PrintLogs).FirstOrDefaultAsync(u => u.HashedId == hashedId);
-            var lastPrint = user?.PrintLogs.OrderByDescending(p => p.Time).FirstOrDefault();
+            var user = await GetCachedUserAsync(context, hashedId);
+            var lastPrint = (user == null ? null : await context.GetLastPrintAsync(user.HashedId));
             return new UserInfoResponse()
             {
                 Email = user?.Email,
@@ -170,8 +189,8 @@ namespace Construct.Compatibility.Controllers
         {
             // Get the user and return the response.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(u => u.PrintLogs).FirstOrDefaultAsync(u => u.Email == email);
-            var lastPrint = user?.PrintLogs.OrderByDescending(p => p.Time).FirstOrDefault();
+            var user = await GetUserByEmailAsync(context, email);
+            var lastPrint = (user == null ? null : await context.GetLastPrintAsync(user.HashedId));
             return new LastPrintTimeResponse()
             {
                 LastPrintTime = lastPrint != null ? ((DateTimeOffset) lastPrint.Time).ToUnixTimeSeconds() : null,
@@ -190,11 +209,7 @@ namespace Construct.Compatibility.Controllers
             hashedId = GetHash(hashedId, universityId);
             
             // Correct the email.
-            var emailCorrection = new EmailCorrection()
-            {
-                ValidEmails = ConstructConfiguration.Configuration.Email.ValidEmails,
-                Corrections = ConstructConfiguration.Configuration.Email.EmailCorrections,
-            };
+            var emailCorrection = new EmailCorrection(ConstructConfiguration.Configuration.Email);
             try
             {
                 email = emailCorrection.CorrectEmail(email);
@@ -222,6 +237,7 @@ namespace Construct.Compatibility.Controllers
             context.Users.Add(user);
             context.Students.Add(student);
             await context.SaveChangesAsync();
+            UserCache.GetSingleton().Invalidate(user.HashedId);
             return new BaseSuccessResponse();
         }
         
@@ -237,14 +253,14 @@ namespace Construct.Compatibility.Controllers
             
             // Add the swipe log and return success.
             await using var context = new ConstructContext();
-            var user = await context.Users.FirstOrDefaultAsync(user => user.HashedId == hashedId);
+            var user = await GetCachedUserAsync(context, hashedId);
             if (user == null)
             {
                 return new BaseSuccessResponse();
             }
             context.VisitLogs.Add(new VisitLog()
             {
-                User = user,
+                User = user.GetAttachedUser(context),
                 Time = DateTime.Now,
                 Source = "MainLab",
             });
@@ -262,7 +278,7 @@ namespace Construct.Compatibility.Controllers
         {
             // Add the print log.
             await using var context = new ConstructContext();
-            var user = await context.Users.FirstOrDefaultAsync(user => user.Email.ToLower() == email.ToLower());
+            var user = await context.GetUserByEmailAsync(email);
             if (user == null)
             {
                 return new BaseSuccessResponse();
@@ -285,12 +301,16 @@ namespace Construct.Compatibility.Controllers
                 Owed = paymentOwed ?? true,
             };
             context.PrintLog.Add(printLog);
-            await context.SaveChangesAsync();
             
-            // Send the receipt.
+            // Queue the receipt to send in the background.
+            if (printLog.Owed)
+            {
+                PrintReceiptQueue.Add(context, printLog);
+            }
+            await context.SaveChangesAsync();
             if (printLog.Owed)
             {
-                PrintReceiptProvider.SendReceipt(printLog);
+                PrintReceiptQueue.GetSingleton().Notify();
             }
 
             // Return a success response.
@@ -1,4 +1,5 @@
 ﻿using System;
+using Construct.Core.Receipt.Print;
 using Construct.Core.Server;
 
 namespace Construct.Compatibility
@@ -9,6 +10,6 @@ namespace Construct.Compatibility
         /// Runs the program.
         /// </summary>
         /// <param name="args">Arguments from the command line.</param>
-        public static void Main(string[] args) => ServerProgram.Run(args, "Compatibility");
+        public static void Main(string[] args) => ServerProgram.Run(args, "Compatibility", typeof(PrintReceiptWorker));
     }
 }
\ No newline at end of file
@@ -1,4 +1,7 @@
-﻿using Construct.Core.Configuration;
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
+using Construct.Core.Configuration;
 using NUnit.Framework;
 
 namespace Construct.Core.Test.Functional.Configuration
@@ -15,5 +18,63 @@ namespace Construct.Core.Test.Functional.Configuration
         {
             new ConstructConfiguration().SaveAsync();
         }
+
+        /// <summary>
+        /// Tests loading the static configuration again.
+        /// </summary>
+        [Test]
+        public void TestReloadDefaultAsync()
+        {
+            var fileLocation = Path.Combine(Path.GetTempPath(), "test-configuration-" + Guid.NewGuid() + ".json");
+            try
+            {
+                // Test reloading a changed configuration.
+                var originalConfiguration = ConstructConfiguration.Configuration;
+                var configuration = new ConstructConfiguration();
+                configuration.Admin.MaximumUserSessions = 2;
+                configuration.Database.Source = "reloaded.sqlite";
+                configuration.Ports["Combined"] = 1234;
+                configuration.SaveAsync(fileLocation).Wait();
+                Assert.IsTrue(ConstructConfiguration.ReloadDefaultAsync(fileLocation).Result);
+                Assert.AreNotSame(originalConfiguration, ConstructConfiguration.Configuration);
+                Assert.AreEqual(2, ConstructConfiguration.Configuration.Admin.MaximumUserSessions);
+                
+                // Test the Database and Ports configuration being kept.
+                Assert.AreSame(originalConfiguration.Database, ConstructConfiguration.Configuration.Database);
+                Assert.AreSame(originalConfiguration.Ports, ConstructConfiguration.Configuration.Ports);
+                Assert.AreNotEqual("reloaded.sqlite", ConstructConfiguration.Configuration.Database.Source);
+                
+                // Test an invalid configuration being ignored.
+                var reloadedConfiguration = ConstructConfiguration.Configuration;
+                File.WriteAllText(fileLocation, "{\"Admin\": {");
+                Assert.IsFalse(ConstructConfiguration.ReloadDefaultAsync(fileLocation).Result);
+                Assert.AreSame(reloadedConfiguration, ConstructConfiguration.Configuration);
+            }
+            finally
+            {
+                File.Delete(fileLocation);
+                ConstructConfiguration.Configuration = new ConstructConfiguration();
+            }
+        }
+
+        /// <summary>
+        /// Tests the lookups of the configuration being created again after the values are replaced.
+        /// </summary>
+        [Test]
+        public void TestLookups()
+        {
+            var configuration = new ConstructConfiguration();
+            configuration.Email.ValidEmails = new List<string>() { "EMAIL1.test" };
+            configuration.Email.EmailCorrections = new Dictionary<string, string>() { { "EMAIL2.test", "EMAIL1.test" } };
+            configuration.Admin.ConfigurablePermissions = new List<string>() { "LabManager", "labmanager", "Other" };
+            Assert.IsTrue(configuration.Email.ValidEmailLookup.Contains("email1.test"));
+            Assert.AreEqual("email1.test", configuration.Email.EmailCorrectionLookup["email2.test"]);
+            Assert.AreEqual(new List<string>() { "labmanager", "other" }, configuration.Admin.ConfigurablePermissionLookup);
+            
+            configuration.Email.ValidEmails = new List<string>() { "email2.test" };
+            configuration.Admin.ConfigurablePermissions = new List<string>();
+            Assert.IsFalse(configuration.Email.ValidEmailLookup.Contains("email1.test"));
+            Assert.AreEqual(0, configuration.Admin.ConfigurablePermissionLookup.Count);
+        }
     }
 }
\ No newline at end of file
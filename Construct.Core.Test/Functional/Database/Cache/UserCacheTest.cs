@@ -0,0 +1,159 @@
+using System;
+using System.Collections.Generic;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Cache;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Functional.Database.Cache
+{
+    public class UserCacheTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Cache used for the tests.
+        /// </summary>
+        private UserCache _cache;
+
+        /// <summary>
+        /// Sets up the cache and the test users.
+        /// </summary>
+        [SetUp]
+        public void SetUpCache()
+        {
+            this._cache = new UserCache()
+            {
+                MaxUsers = 10,
+                MaxUserDuration = 60,
+            };
+            this.AddData((context) =>
+            {
+                for (var i = 0; i < 12; i++)
+                {
+                    var user = new User()
+                    {
+                        HashedId = "test_hash_" + i,
+                        Name = "Test User " + i,
+                        Email = "test" + i + "@email",
+                    };
+                    user.Permissions = new List<Permission>()
+                    {
+                        new Permission()
+                        {
+                            User = user,
+                            Name = "LabManager",
+                        },
+                        new Permission()
+                        {
+                            User = user,
+                            Name = "Expired",
+                            EndTime = DateTime.Now.AddDays(-1),
+                        },
+                    };
+                    context.Users.Add(user);
+                }
+            });
+        }
+
+        /// <summary>
+        /// Tests loading and storing a user.
+        /// </summary>
+        [Test]
+        public void TestGetOrLoad()
+        {
+            using var context = new ConstructContext();
+            var user = this._cache.GetOrLoadAsync(context, "TEST_HASH_1").Result;
+            Assert.AreEqual("test_hash_1", user.HashedId);
+            Assert.AreEqual("Test User 1", user.Name);
+            Assert.AreEqual("test1@email", user.Email);
+            Assert.AreEqual(new List<string>() { "LabManager" }, user.GetActivePermissions());
+            Assert.AreEqual(0, this._cache.Hits);
+            Assert.AreEqual(1, this._cache.Misses);
+
+            // Get the stored user.
+            Assert.AreSame(user, this._cache.GetOrLoadAsync(context, "test_hash_1").Result);
+            Assert.AreEqual(1, this._cache.Hits);
+            Assert.AreEqual(1, this._cache.Misses);
+        }
+
+        /// <summary>
+        /// Tests that users that don't exist are not stored.
+        /// </summary>
+        [Test]
+        public void TestGetOrLoadNotFound()
+        {
+            using var context = new ConstructContext();
+            Assert.IsNull(this._cache.GetOrLoadAsync(context, "unknown_hash").Result);
+            Assert.AreEqual(0, this._cache.Count);
+
+            // Add the user and check that it is found.
+            this.AddData((addContext) =>
+            {
+                addContext.Users.Add(new User()
+                {
+                    HashedId = "unknown_hash",
+                    Name = "New User",
+                    Email = "new@email",
+                });
+            });
+            Assert.AreEqual("New User", this._cache.GetOrLoadAsync(context, "unknown_hash").Result.Name);
+        }
+
+        /// <summary>
+        /// Tests removing stored users.
+        /// </summary>
+        [Test]
+        public void TestInvalidate()
+        {
+            using var context = new ConstructContext();
+            var user = this._cache.GetOrLoadAsync(context, "test_hash_1").Result;
+            this._cache.Invalidate("TEST_HASH_1");
+            Assert.IsNull(this._cache.Get("test_hash_1"));
+            Assert.AreNotSame(user, this._cache.GetOrLoadAsync(context, "test_hash_1").Result);
+        }
+
+        /// <summary>
+        /// Tests that expired users are loaded again.
+        /// </summary>
+        [Test]
+        public void TestExpired()
+        {
+            using var context = new ConstructContext();
+            var user = this._cache.GetOrLoadAsync(context, "test_hash_1").Result;
+            user.CacheTime = DateTime.Now.AddSeconds(-120);
+            Assert.IsNull(this._cache.Get("test_hash_1"));
+            Assert.AreEqual(0, this._cache.Count);
+        }
+
+        /// <summary>
+        /// Tests that the cache stays within the maximum users.
+        /// </summary>
+        [Test]
+        public void TestMaxUsers()
+        {
+            using var context = new ConstructContext();
+            for (var i = 0; i < 12; i++)
+            {
+                this._cache.GetOrLoadAsync(context, "test_hash_" + i).Wait();
+            }
+            Assert.AreEqual(10, this._cache.Count);
+            Assert.AreEqual(2, this._cache.Evictions);
+            Assert.IsNotNull(this._cache.Get("test_hash_11"));
+        }
+
+        /// <summary>
+        /// Tests updating the settings of the cache from a configuration.
+        /// </summary>
+        [Test]
+        public void TestApplyConfiguration()
+        {
+            var configuration = new ConstructConfiguration();
+            configuration.Cache.MaximumUsers = 20;
+            configuration.Cache.MaximumUserDuration = -1;
+            this._cache.ApplyConfiguration(configuration);
+            Assert.AreEqual(20, this._cache.MaxUsers);
+            Assert.AreEqual(0, this._cache.MaxUserDuration);
+        }
+    }
+}
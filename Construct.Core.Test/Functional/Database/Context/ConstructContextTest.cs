@@ -65,10 +65,42 @@ namespace Construct.Core.Test.Functional.Database.Context
             Assert.AreEqual("test", visitLog.User.HashedId);
             Assert.AreEqual("Test User", visitLog.User.Name);
             Assert.AreEqual("test@test.com", visitLog.User.Email);
+            Assert.AreEqual("test", visitLog.User.NormalizedHashedId);
+            Assert.AreEqual("test user", visitLog.User.NormalizedName);
+            Assert.AreEqual("test@test.com", visitLog.User.NormalizedEmail);
             Assert.AreEqual(2, visitLog.User.Permissions.Count);
             Assert.AreEqual("Permission 1", visitLog.User.Permissions[0].Name);
             Assert.AreEqual("Permission 2", visitLog.User.Permissions[1].Name);
             Assert.AreEqual(startTime, visitLog.User.SignUpTime);
+            
+            // Add a print and check the compiled lookups.
+            readContext.PrintLog.Add(new PrintLog()
+            {
+                User = visitLog.User,
+                Time = startTime,
+                FileName = "test.gcode",
+                Material = new PrintMaterial()
+                {
+                    Name = "PLA",
+                    CostPerGram = 0.03f,
+                },
+                WeightGrams = 10,
+                Purpose = "Test Purpose",
+                Cost = 0.3f,
+                Owed = true,
+            });
+            await readContext.SaveChangesAsync();
+            await using var lookupContext = new ConstructContext();
+            var lookupUser = await lookupContext.GetUserAsync("TEST");
+            Assert.AreEqual("test", lookupUser.HashedId);
+            Assert.AreEqual(2, lookupUser.Permissions.Count);
+            Assert.IsNull(await lookupContext.GetUserAsync("unknown"));
+            Assert.AreEqual("test", (await lookupContext.GetUserByEmailAsync("TEST@test.com")).HashedId);
+            Assert.IsNull(await lookupContext.GetUserByEmailAsync("unknown@test.com"));
+            Assert.AreEqual("test.gcode", (await lookupContext.GetLastPrintAsync("test")).FileName);
+            Assert.IsNull(await lookupContext.GetLastPrintAsync("unknown"));
+            Assert.AreEqual(0.3f, (await lookupContext.GetPrintTotalsAsync("test")).OwedCost, 0.0001f);
+            Assert.IsNull(await lookupContext.GetPrintTotalsAsync("unknown"));
         }
     }
     
@@ -88,6 +120,7 @@ namespace Construct.Core.Test.Functional.Database.Context
             // Set up the configuration.
             ConstructConfiguration.Configuration.Database.Provider = "sqlite";
             ConstructConfiguration.Configuration.Database.Source = TestDatabaseLocation;
+            ConstructContext.ResetContextPools();
             
             // Remove the existing database file if one exists.
             if (File.Exists(TestDatabaseLocation))
@@ -122,6 +155,55 @@ namespace Construct.Core.Test.Functional.Database.Context
             await TestContextAsync();
         }
         
+        /// <summary>
+        /// Tests that contexts from the pool don't keep the changes of previous contexts.
+        /// </summary>
+        [Test]
+        public async Task TestContextReused()
+        {
+            // Add a user without saving it.
+            await using (var context = new ConstructContext())
+            {
+                await context.EnsureUpToDateAsync();
+                context.Users.Add(new User()
+                {
+                    HashedId = "unsaved",
+                    Name = "Unsaved User",
+                    Email = "unsaved@test.com",
+                });
+            }
+            
+            // Assert the user isn't saved by the next context.
+            await using (var context = new ConstructContext())
+            {
+                Assert.AreEqual(0, context.Users.Local.Count);
+                await context.SaveChangesAsync();
+                Assert.AreEqual(0, await context.Users.CountAsync());
+            }
+        }
+        
+        /// <summary>
+        /// Tests reading data with a read-only context.
+        /// </summary>
+        [Test]
+        public async Task TestReadOnlyContext()
+        {
+            // Add the data and assert it can be read.
+            await TestContextAsync();
+            await using var context = new ConstructContext(readOnly: true);
+            Assert.AreEqual("test", (await context.GetUserAsync("test")).HashedId);
+            Assert.AreEqual(1, await context.VisitLogs.CountAsync());
+            
+            // Assert changes can't be saved.
+            context.VisitLogs.Add(new VisitLog()
+            {
+                User = await context.Users.FirstAsync(),
+                Source = "Test System",
+                Time = DateTime.Now,
+            });
+            Assert.ThrowsAsync<DbUpdateException>(async () => await context.SaveChangesAsync());
+        }
+        
         /// <summary>
         /// Tests writing and reading data with no source defined.
         /// </summary>
@@ -129,10 +211,35 @@ namespace Construct.Core.Test.Functional.Database.Context
         public async Task TestContextSourceNull()
         {
             ConstructConfiguration.Configuration.Database.Source = null;
+            ConstructContext.ResetContextPools();
             await TestContextAsync();
         }
     }
     
+    public class ConstructContextNormalizeTest
+    {
+        /// <summary>
+        /// Tests the Normalize method.
+        /// </summary>
+        [Test]
+        public void TestNormalize()
+        {
+            Assert.AreEqual("test user", ConstructContext.Normalize("Test USER"));
+            Assert.IsNull(ConstructContext.Normalize(null));
+        }
+        
+        /// <summary>
+        /// Tests the GetContainsPattern method.
+        /// </summary>
+        [Test]
+        public void TestGetContainsPattern()
+        {
+            Assert.AreEqual("%test%", ConstructContext.GetContainsPattern("test"));
+            Assert.AreEqual("%%", ConstructContext.GetContainsPattern(null));
+            Assert.AreEqual("%100\\%\\_a\\\\b%", ConstructContext.GetContainsPattern("100%_a\\b"));
+        }
+    }
+    
     public class ConstructContextInvalidTest : ConstructContextCommonTest
     {
         /// <summary>
@@ -142,6 +249,7 @@ namespace Construct.Core.Test.Functional.Database.Context
         public void TestContextNullProvider()
         {
             ConstructConfiguration.Configuration.Database.Provider = null;
+            ConstructContext.ResetContextPools();
             Assert.AreEqual(typeof(InvalidOperationException), Assert.Throws<AggregateException>(() =>
             {
                 TestContextAsync().Wait();
@@ -155,6 +263,7 @@ namespace Construct.Core.Test.Functional.Database.Context
         public void TestContextInvalidProvider()
         {
             ConstructConfiguration.Configuration.Database.Provider = "Invalid";
+            ConstructContext.ResetContextPools();
             Assert.AreEqual(typeof(InvalidOperationException), Assert.Throws<AggregateException>(() =>
             {
                 TestContextAsync().Wait();
@@ -0,0 +1,240 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.IO.Compression;
+using System.Linq;
+using System.Threading.Tasks;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Configuration;
+using Construct.Core.Database;
+using Construct.Core.Database.Archive;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Microsoft.EntityFrameworkCore;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Functional.Database
+{
+    public class LogArchiveTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Archive under test.
+        /// </summary>
+        private LogArchive _archive;
+
+        /// <summary>
+        /// Reads all the entries of an archive.
+        /// </summary>
+        /// <param name="entries">Entries to read.</param>
+        /// <typeparam name="T">Type of the entries.</typeparam>
+        /// <returns>The entries of the archive.</returns>
+        private static List<T> ReadAll<T>(IAsyncEnumerable<T> entries)
+        {
+            return Task.Run(async () =>
+            {
+                var list = new List<T>();
+                await foreach (var entry in entries)
+                {
+                    list.Add(entry);
+                }
+                return list;
+            }).Result;
+        }
+
+        /// <summary>
+        /// Sets up the test logs and the archive.
+        /// </summary>
+        [SetUp]
+        public void SetUpLogs()
+        {
+            // Set up the archive.
+            ConstructConfiguration.Configuration.Archive.Directory = Path.Combine(Path.GetTempPath(), "test-archive-" + Guid.NewGuid());
+            Directory.CreateDirectory(ConstructConfiguration.Configuration.Archive.Directory);
+            ConstructConfiguration.Configuration.Archive.MaximumAge = 30;
+            ConstructConfiguration.Configuration.Archive.BatchSize = 2;
+            this._archive = LogArchive.GetSingleton();
+
+            // Add the old and new logs.
+            this.AddData((context) =>
+            {
+                var user = new User()
+                {
+                    HashedId = "test_hash",
+                    Name = "Test User",
+                    Email = "test@email",
+                };
+                var material = new PrintMaterial()
+                {
+                    Name = "TestMaterial",
+                };
+                context.Users.Add(user);
+                context.PrintMaterials.Add(material);
+                for (var i = 1; i <= 5; i++)
+                {
+                    var time = DateTime.Now.AddDays(i <= 3 ? -60 : -1);
+                    context.VisitLogs.Add(new VisitLog()
+                    {
+                        User = user,
+                        Source = "Test Source " + i,
+                        Time = time,
+                    });
+                    context.PrintLog.Add(new PrintLog()
+                    {
+                        User = user,
+                        Time = time,
+                        FileName = "TestFile" + i,
+                        Material = material,
+                        WeightGrams = i,
+                        Purpose = "Test Purpose",
+                        Cost = 0.5f * i,
+                        Owed = (i != 2),
+                    });
+                }
+            });
+
+            // Add a pending receipt for an old print.
+            this.AddData((context) =>
+            {
+                context.PendingPrintReceipts.Add(new PendingPrintReceipt()
+                {
+                    PrintLog = context.PrintLog.First(printLog => printLog.FileName == "TestFile3"),
+                    NextAttemptTime = DateTime.Now,
+                });
+            });
+        }
+
+        /// <summary>
+        /// Removes the test archive.
+        /// </summary>
+        [TearDown]
+        public void TearDownArchive()
+        {
+            if (Directory.Exists(this._archive.Directory))
+            {
+                Directory.Delete(this._archive.Directory, true);
+            }
+            ConstructConfiguration.Configuration.Archive.Directory = null;
+            ConstructConfiguration.Configuration.Archive.MaximumAge = 365;
+            ConstructConfiguration.Configuration.Archive.BatchSize = 10000;
+        }
+
+        /// <summary>
+        /// Tests archiving the old logs.
+        /// </summary>
+        [Test]
+        public void TestArchive()
+        {
+            // Archive the logs and check that only the old logs were moved.
+            Assert.AreEqual(4, this._archive.ArchiveAsync().Result);
+            using (var context = new ConstructContext())
+            {
+                Assert.AreEqual(new[] { "Test Source 4", "Test Source 5" }, context.VisitLogs.OrderBy(visitLog => visitLog.Key).Select(visitLog => visitLog.Source).ToArray());
+                Assert.AreEqual(new[] { "TestFile1", "TestFile3", "TestFile4", "TestFile5" }, context.PrintLog.OrderBy(printLog => printLog.Key).Select(printLog => printLog.FileName).ToArray());
+            }
+            var visitLogs = ReadAll(this._archive.ReadVisitLogsAsync());
+            Assert.AreEqual(new[] { "Test Source 1", "Test Source 2", "Test Source 3" }, visitLogs.Select(visitLog => visitLog.Source).ToArray());
+            Assert.IsTrue(visitLogs.All(visitLog => visitLog.UserHashedId == "test_hash"));
+            var printLogs = ReadAll(this._archive.ReadPrintLogsAsync());
+            Assert.AreEqual(new[] { "TestFile2" }, printLogs.Select(printLog => printLog.FileName).ToArray());
+            Assert.AreEqual("TestMaterial", printLogs[0].MaterialName);
+            Assert.AreEqual(2, Directory.GetFiles(this._archive.Directory, "VisitLogs-*").Length);
+
+            // Check that the print totals still include the archived prints.
+            using (var context = new ConstructContext())
+            {
+                var totals = context.UserPrintTotals.First(totals => totals.HashedId == "test_hash");
+                Assert.AreEqual(5, totals.TotalPrints);
+                Assert.AreEqual(15, totals.TotalWeight, 0.001);
+                Assert.AreEqual(4, totals.OwedPrints);
+            }
+            Assert.AreEqual(0, PrintTotalsCheck.RunAsync().Result);
+
+            // Archive again and check that nothing changed.
+            Assert.AreEqual(0, this._archive.ArchiveAsync().Result);
+            Assert.AreEqual(3, ReadAll(this._archive.ReadVisitLogsAsync()).Count);
+        }
+
+        /// <summary>
+        /// Tests clearing a balance after archiving. The owed prints aren't
+        /// archived, so clearing the balance clears all the owed totals.
+        /// </summary>
+        [Test]
+        public void TestClearBalance()
+        {
+            // Archive the logs and clear the balance like /admin/clearbalance.
+            this._archive.ArchiveAsync().Wait();
+            using (var context = new ConstructContext())
+            {
+                var user = context.Users.Include(user => user.PrintLogs).First(user => user.HashedId == "test_hash");
+                foreach (var printLog in user.PrintLogs)
+                {
+                    printLog.Owed = false;
+                }
+                context.SaveChanges();
+            }
+
+            // Check that the owed totals are zero and stay zero after archiving and checking again.
+            this._archive.ArchiveAsync().Wait();
+            Assert.AreEqual(0, PrintTotalsCheck.RunAsync().Result);
+            using (var context = new ConstructContext())
+            {
+                var totals = context.UserPrintTotals.First(totals => totals.HashedId == "test_hash");
+                Assert.AreEqual(5, totals.TotalPrints);
+                Assert.AreEqual(0, totals.OwedPrints);
+                Assert.AreEqual(0, totals.OwedWeight, 0.001);
+                Assert.AreEqual(0, totals.OwedCost, 0.001);
+            }
+            Assert.AreEqual(new[] { "TestFile1", "TestFile2" }, ReadAll(this._archive.ReadPrintLogsAsync()).Select(printLog => printLog.FileName).OrderBy(fileName => fileName).ToArray());
+        }
+
+        /// <summary>
+        /// Tests that archiving and checking the print totals are refused when the directory can't be used.
+        /// </summary>
+        [Test]
+        public void TestInvalidDirectory()
+        {
+            // Test a missing directory.
+            Directory.Delete(this._archive.Directory);
+            Assert.Throws<AggregateException>(() => this._archive.ArchiveAsync().Wait());
+            Assert.Throws<AggregateException>(() => PrintTotalsCheck.RunAsync().Wait());
+            Assert.IsFalse(Directory.Exists(this._archive.Directory));
+            using (var context = new ConstructContext())
+            {
+                Assert.AreEqual(5, context.VisitLogs.Count());
+                Assert.AreEqual(5, context.UserPrintTotals.First(totals => totals.HashedId == "test_hash").TotalPrints);
+            }
+
+            // Test a relative directory.
+            ConstructConfiguration.Configuration.Archive.Directory = "archive";
+            this._archive = LogArchive.GetSingleton();
+            Assert.IsNotNull(this._archive.GetDirectoryError());
+            Assert.Throws<AggregateException>(() => this._archive.ArchiveAsync().Wait());
+            Assert.IsFalse(Directory.Exists("archive"));
+        }
+
+        /// <summary>
+        /// Tests completing and removing archive files that were left by archiving that stopped.
+        /// </summary>
+        [Test]
+        public void TestRecoverTemporaryFiles()
+        {
+            // Archive the logs and change an archive file back to a temporary file.
+            this._archive.ArchiveAsync().Wait();
+            var file = Directory.GetFiles(this._archive.Directory, "VisitLogs-*").OrderBy(file => file).First();
+            File.Move(file, file + ".tmp");
+
+            // Add a temporary file for logs that are still in the database.
+            using (var context = new ConstructContext())
+            {
+                var key = context.VisitLogs.Min(visitLog => visitLog.Key);
+                using var fileStream = File.Create(Path.Combine(this._archive.Directory, $"VisitLogs-{key}-{key}{LogArchive.TemporaryFileExtension}"));
+                using var gzipStream = new GZipStream(fileStream, CompressionLevel.Optimal);
+            }
+
+            // Archive again and check the temporary files were completed or removed.
+            this._archive.ArchiveAsync().Wait();
+            Assert.AreEqual(0, Directory.GetFiles(this._archive.Directory, "*.tmp").Length);
+            Assert.AreEqual(3, ReadAll(this._archive.ReadVisitLogsAsync()).Count);
+        }
+    }
+}
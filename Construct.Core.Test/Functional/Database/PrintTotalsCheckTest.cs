@@ -0,0 +1,126 @@
+using System.Linq;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Database;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Functional.Database
+{
+    public class PrintTotalsCheckTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Sets up the test user and prints.
+        /// </summary>
+        [SetUp]
+        public void SetUpPrints()
+        {
+            this.AddData((context) =>
+            {
+                var user = new User()
+                {
+                    HashedId = "test_hash",
+                    Name = "Test User",
+                    Email = "test@email",
+                };
+                var material = new PrintMaterial()
+                {
+                    Name = "TestMaterial",
+                };
+                context.Users.Add(user);
+                context.PrintMaterials.Add(material);
+                for (var i = 1; i <= 3; i++)
+                {
+                    context.PrintLog.Add(new PrintLog()
+                    {
+                        User = user,
+                        FileName = "TestFile" + i,
+                        Material = material,
+                        WeightGrams = i,
+                        Purpose = "Test Purpose",
+                        Cost = 0.5f * i,
+                        Owed = (i != 2),
+                    });
+                }
+            });
+        }
+
+        /// <summary>
+        /// Returns the stored print totals of the test user.
+        /// </summary>
+        /// <returns>The print totals of the test user.</returns>
+        private static UserPrintTotals GetTotals()
+        {
+            using var context = new ConstructContext();
+            return context.UserPrintTotals.First(totals => totals.HashedId == "test_hash");
+        }
+
+        /// <summary>
+        /// Tests the totals being updated when prints are added.
+        /// </summary>
+        [Test]
+        public void TestAddPrints()
+        {
+            var totals = GetTotals();
+            Assert.AreEqual(3, totals.TotalPrints);
+            Assert.AreEqual(6, totals.TotalWeight, 0.001);
+            Assert.AreEqual(2, totals.OwedPrints);
+            Assert.AreEqual(4, totals.OwedWeight, 0.001);
+            Assert.AreEqual(2, totals.OwedCost, 0.001);
+        }
+
+        /// <summary>
+        /// Tests the totals being updated when prints are changed and removed.
+        /// </summary>
+        [Test]
+        public void TestChangePrints()
+        {
+            this.AddData((context) =>
+            {
+                foreach (var printLog in context.PrintLog.ToList())
+                {
+                    if (printLog.FileName == "TestFile1")
+                    {
+                        context.PrintLog.Remove(printLog);
+                    }
+                    else
+                    {
+                        printLog.Owed = false;
+                    }
+                }
+            });
+            var totals = GetTotals();
+            Assert.AreEqual(2, totals.TotalPrints);
+            Assert.AreEqual(5, totals.TotalWeight, 0.001);
+            Assert.AreEqual(0, totals.OwedPrints);
+            Assert.AreEqual(0, totals.OwedWeight, 0.001);
+            Assert.AreEqual(0, totals.OwedCost, 0.001);
+        }
+
+        /// <summary>
+        /// Tests correcting the totals.
+        /// </summary>
+        [Test]
+        public void TestRun()
+        {
+            // Assert no totals are corrected.
+            Assert.AreEqual(0, PrintTotalsCheck.RunAsync().Result);
+
+            // Change the totals and assert they are corrected.
+            this.AddData((context) =>
+            {
+                context.UserPrintTotals.First().OwedCost = 10;
+            });
+            Assert.AreEqual(1, PrintTotalsCheck.RunAsync().Result);
+            Assert.AreEqual(2, GetTotals().OwedCost, 0.001);
+
+            // Remove the totals and assert they are added.
+            this.AddData((context) =>
+            {
+                context.UserPrintTotals.Remove(context.UserPrintTotals.First());
+            });
+            Assert.AreEqual(1, PrintTotalsCheck.RunAsync().Result);
+            Assert.AreEqual(3, GetTotals().TotalPrints);
+        }
+    }
+}
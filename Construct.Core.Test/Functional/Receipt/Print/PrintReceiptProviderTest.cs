@@ -33,6 +33,8 @@ namespace Construct.Core.Test.Functional.Receipt.Print
         {
             ConstructConfiguration.Configuration.PrintReceipt.Provider = "GoogleAppScripts";
             Assert.That(PrintReceiptProvider.GetProvider() is GoogleAppScriptPrintReceipt);
+            ConstructConfiguration.Configuration.PrintReceipt.Provider = "Local";
+            Assert.That(PrintReceiptProvider.GetProvider() is LocalPrintReceipt);
             ConstructConfiguration.Configuration.PrintReceipt.Provider = "unknown";
             Assert.Throws<InvalidOperationException>(() => PrintReceiptProvider.GetProvider());
         }
@@ -45,7 +47,7 @@ namespace Construct.Core.Test.Functional.Receipt.Print
         {
             ConstructConfiguration.Configuration.PrintReceipt.Provider = "GoogleAppScripts";
             ConstructConfiguration.Configuration.PrintReceipt.GoogleAppScriptId = "valid_id";
-            Assert.IsTrue(PrintReceiptProvider.SendReceipt(this._testLog));
+            Assert.IsTrue(PrintReceiptProvider.SendReceiptAsync(this._testLog).Result);
         }
     }
 }
\ No newline at end of file
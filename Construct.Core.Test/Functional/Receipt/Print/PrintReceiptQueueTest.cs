@@ -0,0 +1,142 @@
+using System;
+using System.Linq;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Receipt.Print;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Functional.Receipt.Print
+{
+    public class PrintReceiptQueueTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Queue under test.
+        /// </summary>
+        private PrintReceiptQueue _queue;
+
+        /// <summary>
+        /// Sets up the queue and the test prints.
+        /// </summary>
+        [SetUp]
+        public void SetUpQueue()
+        {
+            this._queue = new PrintReceiptQueue()
+            {
+                MaxAttempts = 2,
+                RetryDelay = 60,
+                MaxRetryDelay = 90,
+            };
+            this.AddData((context) =>
+            {
+                var user = new User()
+                {
+                    HashedId = "test_hash",
+                    Name = "Test User",
+                    Email = "test@email",
+                };
+                context.Users.Add(user);
+                for (var i = 0; i < 3; i++)
+                {
+                    var printLog = new PrintLog()
+                    {
+                        User = user,
+                        Time = DateTime.Now,
+                        FileName = "test" + i + ".gcode",
+                        WeightGrams = 10,
+                        Purpose = "Test Purpose",
+                        Cost = 0.3f,
+                        Owed = true,
+                    };
+                    context.PrintLog.Add(printLog);
+                    PrintReceiptQueue.Add(context, printLog);
+                }
+            });
+        }
+
+        /// <summary>
+        /// Tests sending the receipts.
+        /// </summary>
+        [Test]
+        public void TestSend()
+        {
+            ConstructConfiguration.Configuration.PrintReceipt.Provider = "Local";
+            var initialSent = LocalPrintReceipt.TotalSent;
+            Assert.AreEqual(3, this._queue.SendPendingReceiptsAsync().Result);
+            Assert.AreEqual(3, this._queue.Sent);
+            Assert.AreEqual(3, LocalPrintReceipt.TotalSent - initialSent);
+            using var context = new ConstructContext();
+            Assert.AreEqual(0, context.PendingPrintReceipts.Count());
+            Assert.AreEqual(0, this._queue.SendPendingReceiptsAsync().Result);
+        }
+
+        /// <summary>
+        /// Tests retrying receipts that fail to send.
+        /// </summary>
+        [Test]
+        public void TestRetry()
+        {
+            // Fail to send the receipts and assert they are retried later.
+            ConstructConfiguration.Configuration.PrintReceipt.Provider = "GoogleAppScripts";
+            ConstructConfiguration.Configuration.PrintReceipt.GoogleAppScriptId = "invalid_id";
+            Assert.AreEqual(3, this._queue.SendPendingReceiptsAsync().Result);
+            Assert.AreEqual(0, this._queue.Sent);
+            Assert.AreEqual(3, this._queue.Failed);
+            Assert.AreEqual(0, this._queue.SendPendingReceiptsAsync().Result);
+            using (var context = new ConstructContext())
+            {
+                foreach (var receipt in context.PendingPrintReceipts.ToList())
+                {
+                    Assert.AreEqual(1, receipt.Attempts);
+                    Assert.IsNotNull(receipt.LastError);
+                    Assert.That(receipt.NextAttemptTime > DateTime.Now.AddSeconds(50));
+                }
+            }
+
+            // Fail the last attempts and assert the receipts are no longer sent.
+            this.AddData((context) =>
+            {
+                foreach (var receipt in context.PendingPrintReceipts.ToList())
+                {
+                    receipt.NextAttemptTime = DateTime.Now.AddSeconds(-1);
+                }
+            });
+            Assert.AreEqual(3, this._queue.SendPendingReceiptsAsync().Result);
+            Assert.AreEqual(3, this._queue.Abandoned);
+            this.AddData((context) =>
+            {
+                foreach (var receipt in context.PendingPrintReceipts.ToList())
+                {
+                    receipt.NextAttemptTime = DateTime.Now.AddSeconds(-1);
+                }
+            });
+            Assert.AreEqual(0, this._queue.SendPendingReceiptsAsync().Result);
+        }
+
+        /// <summary>
+        /// Tests the delays between attempts.
+        /// </summary>
+        [Test]
+        public void TestGetRetryDelay()
+        {
+            Assert.AreEqual(TimeSpan.FromSeconds(60), this._queue.GetRetryDelay(1));
+            Assert.AreEqual(TimeSpan.FromSeconds(90), this._queue.GetRetryDelay(2));
+            Assert.AreEqual(TimeSpan.FromSeconds(90), this._queue.GetRetryDelay(100));
+        }
+
+        /// <summary>
+        /// Tests that receipts are removed with their prints.
+        /// </summary>
+        [Test]
+        public void TestRemovePrint()
+        {
+            this.AddData((context) =>
+            {
+                context.PrintLog.Remove(context.PrintLog.First());
+            });
+            using var context = new ConstructContext();
+            Assert.AreEqual(2, context.PendingPrintReceipts.Count());
+        }
+    }
+}
@@ -0,0 +1,132 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using Construct.Core.Logging;
+using Microsoft.Extensions.Logging;
+using Newtonsoft.Json.Linq;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Logging
+{
+    public class JsonFileOutputTest
+    {
+        /// <summary>
+        /// Directory of the test log files.
+        /// </summary>
+        private string _directory;
+
+        /// <summary>
+        /// File of the test logs.
+        /// </summary>
+        private string _fileLocation;
+
+        /// <summary>
+        /// Reads the entries written to a file.
+        /// </summary>
+        /// <param name="fileLocation">File to read.</param>
+        /// <returns>The entries in the file.</returns>
+        private static List<JObject> ReadEntries(string fileLocation)
+        {
+            return File.ReadAllLines(fileLocation).Select(JObject.Parse).ToList();
+        }
+
+        /// <summary>
+        /// Sets up the test log files.
+        /// </summary>
+        [SetUp]
+        public void SetUp()
+        {
+            this._directory = Path.Combine(Path.GetTempPath(), "test-logs-" + Guid.NewGuid());
+            this._fileLocation = Path.Combine(this._directory, "construct.jsonl");
+        }
+
+        /// <summary>
+        /// Removes the test log files.
+        /// </summary>
+        [TearDown]
+        public void TearDown()
+        {
+            if (!Directory.Exists(this._directory)) return;
+            Directory.Delete(this._directory, true);
+        }
+
+        /// <summary>
+        /// Tests writing entries.
+        /// </summary>
+        [Test]
+        public void TestLogMessage()
+        {
+            using (var output = new JsonFileOutput(this._fileLocation) { Identifier = "Test" })
+            {
+                output.LogMessage("Test message", LogLevel.Information, "TestCategory");
+                output.LogMessage("Filtered message", LogLevel.Debug, "TestCategory");
+                output.LogMessage(new InvalidOperationException("Test exception"), LogLevel.Error, "TestCategory");
+            }
+            var entries = ReadEntries(this._fileLocation);
+            Assert.AreEqual(2, entries.Count);
+            Assert.AreEqual("Information", entries[0]["level"].ToString());
+            Assert.AreEqual("Test", entries[0]["service"].ToString());
+            Assert.AreEqual("TestCategory", entries[0]["category"].ToString());
+            Assert.AreEqual("Test message", entries[0]["message"].ToString());
+            Assert.IsNull(entries[0]["exception"]);
+            Assert.AreEqual("Test exception", entries[1]["message"].ToString());
+            Assert.IsTrue(entries[1]["exception"].ToString().StartsWith("System.InvalidOperationException"));
+        }
+
+        /// <summary>
+        /// Tests the sample rates of categories.
+        /// </summary>
+        [Test]
+        public void TestSampleRates()
+        {
+            using (var output = new JsonFileOutput(this._fileLocation))
+            {
+                output.SampleRates = new Dictionary<string, double>() { { "Sampled", 0.25 }, { "Ignored", 0 } };
+                for (var i = 0; i < 20; i++)
+                {
+                    output.LogMessage("Sampled message", LogLevel.Warning, "Sampled");
+                    output.LogMessage("Ignored message", LogLevel.Information, "Ignored");
+                    output.LogMessage("Other message", LogLevel.Information, "Other");
+                }
+                output.LogMessage("Error message", LogLevel.Error, "Ignored");
+                Assert.AreEqual(35, output.Sampled);
+            }
+            var entries = ReadEntries(this._fileLocation);
+            Assert.AreEqual(5, entries.Count(entry => entry["category"].ToString() == "Sampled"));
+            Assert.AreEqual(20, entries.Count(entry => entry["category"].ToString() == "Other"));
+            Assert.AreEqual(1, entries.Count(entry => entry["category"].ToString() == "Ignored"));
+        }
+
+        /// <summary>
+        /// Tests rotating the file by size.
+        /// </summary>
+        [Test]
+        public void TestRotation()
+        {
+            using (var output = new JsonFileOutput(this._fileLocation) { MaximumFileSize = 1, MaximumFiles = 2 })
+            {
+                for (var i = 0; i < 4; i++)
+                {
+                    output.LogMessage($"Test message {i}", LogLevel.Information, "Test");
+                }
+                Assert.AreEqual(0, output.Dropped);
+            }
+            Assert.AreEqual("Test message 3", ReadEntries(this._fileLocation).Single()["message"].ToString());
+            Assert.AreEqual("Test message 2", ReadEntries(this._fileLocation + ".1").Single()["message"].ToString());
+            Assert.AreEqual("Test message 1", ReadEntries(this._fileLocation + ".2").Single()["message"].ToString());
+            Assert.IsFalse(File.Exists(this._fileLocation + ".3"));
+        }
+
+        /// <summary>
+        /// Tests getting the category of an entry.
+        /// </summary>
+        [Test]
+        public void TestGetCategory()
+        {
+            Assert.AreEqual("ConstructContext", Log.GetCategory("/root/Construct.Core/Database/Context/ConstructContext.cs"));
+            Assert.AreEqual("SwipeQueue", Log.GetCategory("C:\\Construct.Swipe\\Queue\\SwipeQueue.cs"));
+            Assert.AreEqual("", Log.GetCategory(null));
+        }
+    }
+}
@@ -0,0 +1,204 @@
+using System;
+using System.IO;
+using System.Linq;
+using System.Net;
+using System.Threading.Tasks;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Server;
+using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.Routing;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Server
+{
+    public class ServerMetricsTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Sends a request to the metrics handler.
+        /// </summary>
+        /// <param name="path">Path of the request.</param>
+        /// <param name="handleRequest">Handler for the request after the metrics handler.</param>
+        /// <param name="method">HTTP method of the request.</param>
+        /// <param name="remoteAddress">Address the request is from. Defaults to the loopback address.</param>
+        /// <returns>The status code, body, and whether the next handler was called.</returns>
+        private static (int, string, bool) SendRequest(string path, Action<HttpContext> handleRequest = null, string method = "GET", IPAddress remoteAddress = null)
+        {
+            var context = new DefaultHttpContext();
+            context.Request.Method = method;
+            context.Request.Path = path;
+            context.Connection.RemoteIpAddress = remoteAddress ?? IPAddress.Loopback;
+            context.Response.Body = new MemoryStream();
+            var nextCalled = false;
+            ServerMetrics.HandleRequestAsync(context, () =>
+            {
+                nextCalled = true;
+                handleRequest?.Invoke(context);
+                return Task.CompletedTask;
+            }).Wait();
+            context.Response.Body.Position = 0;
+            return (context.Response.StatusCode, new StreamReader(context.Response.Body).ReadToEnd(), nextCalled);
+        }
+
+        /// <summary>
+        /// Sets the route of a request to a controller method.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="controller">Name of the controller without Controller.</param>
+        /// <param name="action">Name of the controller method.</param>
+        private static void SetRoute(HttpContext context, string controller, string action)
+        {
+            var routeData = new RouteData();
+            routeData.Values["controller"] = controller;
+            routeData.Values["action"] = action;
+            context.Features.Set<IRoutingFeature>(new RoutingFeature() { RouteData = routeData });
+        }
+
+        /// <summary>
+        /// Resets the metrics.
+        /// </summary>
+        [SetUp]
+        public void SetUpServerMetrics()
+        {
+            ServerMetrics.Reset();
+            ConstructConfiguration.Configuration.Metrics.Enabled = true;
+            ConstructConfiguration.Configuration.Metrics.SlowRequestThreshold = 0;
+            ConstructConfiguration.Configuration.Metrics.AllowRemoteRequests = false;
+        }
+
+        /// <summary>
+        /// Tests the metrics request.
+        /// </summary>
+        [Test]
+        public void TestMetrics()
+        {
+            var (statusCode, body, nextCalled) = SendRequest("/metrics");
+            Assert.AreEqual(200, statusCode);
+            Assert.IsTrue(body.Contains("# TYPE construct_http_request_duration_seconds histogram"));
+            Assert.IsTrue(body.Contains("construct_user_cache_hits_total 0"));
+            Assert.IsTrue(body.Contains("construct_gc_collections_total{generation=\"0\"}"));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests recording a request handled by a controller.
+        /// </summary>
+        [Test]
+        public void TestControllerRequest()
+        {
+            var (_, _, nextCalled) = SendRequest("/user/get", context => SetRoute(context, "User", "HandleGetRequest"));
+            Assert.IsTrue(nextCalled);
+            var metrics = ServerMetrics.GetMetricsText();
+            Assert.IsTrue(metrics.Contains("construct_http_request_duration_seconds_count{route=\"UserController.HandleGetRequest\",method=\"GET\",code=\"200\"} 1"));
+            Assert.IsTrue(metrics.Contains("construct_http_request_duration_seconds_bucket{route=\"UserController.HandleGetRequest\",method=\"GET\",code=\"200\",le=\"+Inf\"} 1"));
+        }
+
+        /// <summary>
+        /// Tests recording a request that wasn't handled.
+        /// </summary>
+        [Test]
+        public void TestUnmatchedRequest()
+        {
+            SendRequest("/unknown/path", context => context.Response.StatusCode = 404);
+            Assert.IsTrue(ServerMetrics.GetMetricsText().Contains("construct_http_request_duration_seconds_count{route=\"unmatched\",method=\"GET\",code=\"404\"} 1"));
+        }
+
+        /// <summary>
+        /// Tests recording requests with HTTP methods that aren't recorded by name.
+        /// </summary>
+        [Test]
+        public void TestUnknownMethod()
+        {
+            SendRequest("/user/get", context => SetRoute(context, "User", "HandleGetRequest"), "post");
+            SendRequest("/user/get", context => SetRoute(context, "User", "HandleGetRequest"), "UNKNOWN1");
+            SendRequest("/user/get", context => SetRoute(context, "User", "HandleGetRequest"), "UNKNOWN2");
+            var metrics = ServerMetrics.GetMetricsText();
+            Assert.IsTrue(metrics.Contains("construct_http_request_duration_seconds_count{route=\"UserController.HandleGetRequest\",method=\"POST\",code=\"200\"} 1"));
+            Assert.IsTrue(metrics.Contains("construct_http_request_duration_seconds_count{route=\"UserController.HandleGetRequest\",method=\"other\",code=\"200\"} 2"));
+            Assert.IsFalse(metrics.Contains("UNKNOWN"));
+        }
+
+        /// <summary>
+        /// Tests the metrics request from another machine.
+        /// </summary>
+        [Test]
+        public void TestRemoteMetrics()
+        {
+            var (_, body, nextCalled) = SendRequest("/metrics", remoteAddress: IPAddress.Parse("192.0.2.1"));
+            Assert.AreEqual("", body);
+            Assert.IsTrue(nextCalled);
+
+            ConstructConfiguration.Configuration.Metrics.AllowRemoteRequests = true;
+            (_, body, nextCalled) = SendRequest("/metrics", remoteAddress: IPAddress.Parse("192.0.2.1"));
+            Assert.IsTrue(body.Contains("# TYPE construct_http_request_duration_seconds histogram"));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests recording the database commands of a request.
+        /// </summary>
+        [Test]
+        public void TestDatabaseCommands()
+        {
+            RequestTrace trace = null;
+            SendRequest("/user/get", _ =>
+            {
+                using var context = new ConstructContext();
+                Assert.AreEqual(0, context.Users.Count());
+                trace = RequestTrace.Current;
+            });
+            Assert.AreEqual(1, trace.Commands);
+            Assert.IsTrue(ServerMetrics.GetMetricsText().Contains("construct_db_command_duration_seconds_count{type=\""));
+        }
+
+        /// <summary>
+        /// Tests logging slow requests.
+        /// </summary>
+        [Test]
+        public void TestSlowRequest()
+        {
+            ConstructConfiguration.Configuration.Metrics.SlowRequestThreshold = 1;
+            SendRequest("/user/get", _ => Task.Delay(10).Wait());
+            Assert.IsTrue(ServerMetrics.GetMetricsText().Contains("construct_http_slow_requests_total 1"));
+        }
+
+        /// <summary>
+        /// Tests the metrics being disabled.
+        /// </summary>
+        [Test]
+        public void TestDisabled()
+        {
+            ConstructConfiguration.Configuration.Metrics.Enabled = false;
+            var (_, body, nextCalled) = SendRequest("/metrics");
+            Assert.AreEqual("", body);
+            Assert.IsTrue(nextCalled);
+            Assert.IsFalse(ServerMetrics.GetMetricsText().Contains("route=\"static\""));
+        }
+
+        /// <summary>
+        /// Tests adding metrics from the services.
+        /// </summary>
+        [Test]
+        public void TestAddMetric()
+        {
+            ServerMetrics.AddMetric("construct_test_depth", "gauge", "Test metric.", () => 3);
+            Assert.IsTrue(ServerMetrics.GetMetricsText().Contains("# TYPE construct_test_depth gauge\nconstruct_test_depth 3\n"));
+        }
+
+        /// <summary>
+        /// Tests the buckets of a histogram.
+        /// </summary>
+        [Test]
+        public void TestHistogram()
+        {
+            var histogram = new MetricsHistogram(new[] { 0.1, 1 });
+            histogram.Observe(TimeSpan.FromMilliseconds(50));
+            histogram.Observe(TimeSpan.FromMilliseconds(500));
+            histogram.Observe(TimeSpan.FromSeconds(5));
+            var output = new System.Text.StringBuilder();
+            histogram.Write(output, "test", "");
+            Assert.AreEqual("test_bucket{le=\"0.1\"} 1\ntest_bucket{le=\"1\"} 2\ntest_bucket{le=\"+Inf\"} 3\ntest_sum 5.55\ntest_count 3\n", output.ToString());
+        }
+    }
+}
@@ -0,0 +1,102 @@
+using System.IO;
+using System.Threading.Tasks;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Server;
+using Microsoft.AspNetCore.Http;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Server
+{
+    public class ServerStatusTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Sends a request to the status handler.
+        /// </summary>
+        /// <param name="path">Path of the request.</param>
+        /// <returns>The status code, body, and whether the next handler was called.</returns>
+        private static (int, string, bool) SendRequest(string path)
+        {
+            var context = new DefaultHttpContext();
+            context.Request.Path = path;
+            context.Response.Body = new MemoryStream();
+            var nextCalled = false;
+            ServerStatus.HandleRequestAsync(context, () =>
+            {
+                nextCalled = true;
+                return Task.CompletedTask;
+            }).Wait();
+            context.Response.Body.Position = 0;
+            return (context.Response.StatusCode, new StreamReader(context.Response.Body).ReadToEnd(), nextCalled);
+        }
+
+        /// <summary>
+        /// Resets the server status.
+        /// </summary>
+        [SetUp]
+        public void SetUpServerStatus()
+        {
+            ServerStatus.Reset();
+        }
+
+        /// <summary>
+        /// Tests the health request.
+        /// </summary>
+        [Test]
+        public void TestHealth()
+        {
+            var (statusCode, body, nextCalled) = SendRequest("/health");
+            Assert.AreEqual(200, statusCode);
+            Assert.IsTrue(body.Contains("\"status\":\"healthy\""));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests the ready request before the migrations are completed.
+        /// </summary>
+        [Test]
+        public void TestReadyMigrationsNotCompleted()
+        {
+            var (statusCode, body, nextCalled) = SendRequest("/ready");
+            Assert.AreEqual(503, statusCode);
+            Assert.IsTrue(body.Contains("\"status\":\"not-ready\""));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests the ready request after the migrations are completed.
+        /// </summary>
+        [Test]
+        public void TestReady()
+        {
+            ServerStatus.MigrationsCompleted = true;
+            var (statusCode, body, nextCalled) = SendRequest("/ready");
+            Assert.AreEqual(200, statusCode);
+            Assert.IsTrue(body.Contains("\"status\":\"ready\""));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests other requests being passed to the next handler.
+        /// </summary>
+        [Test]
+        public void TestOtherRequest()
+        {
+            var (_, body, nextCalled) = SendRequest("/user/get");
+            Assert.AreEqual("", body);
+            Assert.IsTrue(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests recording the startup phases.
+        /// </summary>
+        [Test]
+        public void TestStartupTimings()
+        {
+            ServerStatus.CompletePhase("phase1");
+            Assert.AreEqual(5, ServerStatus.TimePhase("phase2", () => 5));
+            Assert.AreEqual(2, ServerStatus.StartupTimings.Count);
+            Assert.AreEqual("phase1", ServerStatus.StartupTimings[0].Item1);
+            Assert.AreEqual("phase2", ServerStatus.StartupTimings[1].Item1);
+        }
+    }
+}
@@ -1,4 +1,5 @@
-﻿using Construct.Core.Attribute;
+﻿using System.Linq;
+using Construct.Core.Attribute;
 using Construct.Core.Server;
 using NUnit.Framework;
 
@@ -78,6 +79,19 @@ namespace Construct.Core.Test.Server
             Assert.AreEqual(multiplePaths[4].Item2.Name, "Test4");
         }
         
+        /// <summary>
+        /// Tests the GetConstructAssemblies method.
+        /// </summary>
+        [Test]
+        public void TestGetConstructAssemblies()
+        {
+            var assemblyNames = Startup.GetConstructAssemblies().Select(assembly => assembly.GetName().Name).ToList();
+            Assert.Contains("Construct.Core", assemblyNames);
+            Assert.Contains("Construct.Core.Test", assemblyNames);
+            Assert.IsFalse(assemblyNames.Contains("System.Private.CoreLib"));
+            Assert.IsFalse(assemblyNames.Contains("Microsoft.EntityFrameworkCore"));
+        }
+        
         /// <summary>
         /// Tests the GetRequestHandlerMethods method.
         /// </summary>
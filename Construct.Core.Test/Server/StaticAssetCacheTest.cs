@@ -0,0 +1,222 @@
+using System;
+using System.IO;
+using System.IO.Compression;
+using System.Text;
+using System.Threading.Tasks;
+using Construct.Core.Server;
+using Microsoft.AspNetCore.Http;
+using NUnit.Framework;
+
+namespace Construct.Core.Test.Server
+{
+    public class StaticAssetCacheTest
+    {
+        /// <summary>
+        /// Script used for the test assets.
+        /// </summary>
+        private static readonly string Script = string.Join("\n", new string[200]).Replace("\n", "console.log(\"test\");\n");
+
+        /// <summary>
+        /// Directory of the test assets.
+        /// </summary>
+        private string _directory;
+
+        /// <summary>
+        /// Cache of the test assets.
+        /// </summary>
+        private StaticAssetCache _cache;
+
+        /// <summary>
+        /// Sends a request to the cache.
+        /// </summary>
+        /// <param name="path">Path of the request.</param>
+        /// <param name="setUpRequest">Action for adding to the request.</param>
+        /// <param name="index">Whether to send the request to the index.html handler.</param>
+        /// <returns>The response and body of the request, and whether the next handler was called.</returns>
+        private (HttpResponse, byte[], bool) SendRequest(string path, Action<HttpRequest> setUpRequest = null, bool index = false)
+        {
+            // Create the request.
+            var context = new DefaultHttpContext();
+            context.Request.Method = "GET";
+            var queryIndex = path.IndexOf('?');
+            context.Request.Path = (queryIndex >= 0 ? path.Substring(0, queryIndex) : path);
+            context.Request.QueryString = new QueryString(queryIndex >= 0 ? path.Substring(queryIndex) : "");
+            context.Response.Body = new MemoryStream();
+            setUpRequest?.Invoke(context.Request);
+
+            // Send the request.
+            var nextCalled = false;
+            Func<Task> next = () =>
+            {
+                nextCalled = true;
+                return Task.CompletedTask;
+            };
+            (index ? this._cache.HandleIndexRequestAsync(context, next) : this._cache.HandleFileRequestAsync(context, next)).Wait();
+            return (context.Response, ((MemoryStream) context.Response.Body).ToArray(), nextCalled);
+        }
+
+        /// <summary>
+        /// Sets up the test assets.
+        /// </summary>
+        [SetUp]
+        public void SetUp()
+        {
+            this._directory = Path.Combine(Path.GetTempPath(), "test-web-" + Guid.NewGuid());
+            Directory.CreateDirectory(Path.Combine(this._directory, "admin", "js"));
+            File.WriteAllText(Path.Combine(this._directory, "admin", "js", "app.js"), Script);
+            File.WriteAllText(Path.Combine(this._directory, "admin", "index.html"), "<script src=\"/admin/js/app.js\"></script><script src=\"https://example.com/lib.js\"></script>");
+            File.WriteAllText(Path.Combine(this._directory, "admin", "unknown.unknowntype"), "test");
+            this._cache = new StaticAssetCache(this._directory);
+            this._cache.Load();
+        }
+
+        /// <summary>
+        /// Removes the test assets.
+        /// </summary>
+        [TearDown]
+        public void TearDown()
+        {
+            this._cache.Dispose();
+            Directory.Delete(this._directory, true);
+        }
+
+        /// <summary>
+        /// Tests loading the assets.
+        /// </summary>
+        [Test]
+        public void TestLoad()
+        {
+            Assert.AreEqual(2, this._cache.Count);
+            Assert.IsNotNull(this._cache.Get("/admin/js/app.js"));
+            Assert.IsNotNull(this._cache.GetIndex("/admin"));
+            Assert.IsNotNull(this._cache.GetIndex("/admin/"));
+            Assert.IsNull(this._cache.Get("/admin/unknown.unknowntype"));
+            Assert.IsNull(this._cache.GetIndex("/user"));
+        }
+
+        /// <summary>
+        /// Tests the versions being added to the local URLs of HTML files.
+        /// </summary>
+        [Test]
+        public void TestHtmlVersions()
+        {
+            var version = this._cache.Get("/admin/js/app.js").Version;
+            var html = Encoding.UTF8.GetString(this._cache.GetIndex("/admin").Contents);
+            Assert.AreEqual($"<script src=\"/admin/js/app.js?v={version}\"></script><script src=\"https://example.com/lib.js\"></script>", html);
+        }
+
+        /// <summary>
+        /// Tests sending an asset without compression.
+        /// </summary>
+        [Test]
+        public void TestSendUncompressed()
+        {
+            var (response, body, nextCalled) = this.SendRequest("/admin/js/app.js");
+            Assert.AreEqual(200, response.StatusCode);
+            Assert.AreEqual(Script, Encoding.UTF8.GetString(body));
+            Assert.AreEqual("application/javascript", response.ContentType);
+            Assert.AreEqual(StaticAssetCache.UnversionedCacheControl, response.Headers["Cache-Control"].ToString());
+            Assert.AreEqual($"\"{this._cache.Get("/admin/js/app.js").Version}\"", response.Headers["ETag"].ToString());
+            Assert.IsFalse(response.Headers.ContainsKey("Content-Encoding"));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests sending an asset with gzip compression.
+        /// </summary>
+        [Test]
+        public void TestSendGzip()
+        {
+            var (response, body, _) = this.SendRequest("/admin/js/app.js", request => request.Headers["Accept-Encoding"] = "gzip, deflate");
+            Assert.AreEqual("gzip", response.Headers["Content-Encoding"].ToString());
+            Assert.IsTrue(body.Length < Script.Length);
+            using var gzipStream = new GZipStream(new MemoryStream(body), CompressionMode.Decompress);
+            Assert.AreEqual(Script, new StreamReader(gzipStream).ReadToEnd());
+        }
+
+        /// <summary>
+        /// Tests sending an asset with Brotli compression.
+        /// </summary>
+        [Test]
+        public void TestSendBrotli()
+        {
+            var (response, body, _) = this.SendRequest("/admin/js/app.js", request => request.Headers["Accept-Encoding"] = "gzip, br");
+            Assert.AreEqual("br", response.Headers["Content-Encoding"].ToString());
+            using var brotliStream = new BrotliStream(new MemoryStream(body), CompressionMode.Decompress);
+            Assert.AreEqual(Script, new StreamReader(brotliStream).ReadToEnd());
+        }
+
+        /// <summary>
+        /// Tests sending that an asset wasn't modified.
+        /// </summary>
+        [Test]
+        public void TestSendNotModified()
+        {
+            var (firstResponse, _, _) = this.SendRequest("/admin/js/app.js", request => request.Headers["Accept-Encoding"] = "gzip");
+            var eTag = firstResponse.Headers["ETag"].ToString();
+            var (response, body, _) = this.SendRequest("/admin/js/app.js", request =>
+            {
+                request.Headers["Accept-Encoding"] = "gzip";
+                request.Headers["If-None-Match"] = eTag;
+            });
+            Assert.AreEqual(304, response.StatusCode);
+            Assert.AreEqual(0, body.Length);
+
+            // Check that the ETag of a different encoding doesn't match.
+            (response, _, _) = this.SendRequest("/admin/js/app.js", request => request.Headers["If-None-Match"] = eTag);
+            Assert.AreEqual(200, response.StatusCode);
+        }
+
+        /// <summary>
+        /// Tests sending an asset with a versioned URL.
+        /// </summary>
+        [Test]
+        public void TestSendVersioned()
+        {
+            var version = this._cache.Get("/admin/js/app.js").Version;
+            var (response, _, _) = this.SendRequest("/admin/js/app.js?v=" + version);
+            Assert.AreEqual(StaticAssetCache.VersionedCacheControl, response.Headers["Cache-Control"].ToString());
+            (response, _, _) = this.SendRequest("/admin/js/app.js?v=old");
+            Assert.AreEqual(StaticAssetCache.UnversionedCacheControl, response.Headers["Cache-Control"].ToString());
+        }
+
+        /// <summary>
+        /// Tests sending the index.html of a path.
+        /// </summary>
+        [Test]
+        public void TestSendIndex()
+        {
+            var (response, body, nextCalled) = this.SendRequest("/admin", index: true);
+            Assert.AreEqual(200, response.StatusCode);
+            Assert.AreEqual("text/html", response.ContentType);
+            Assert.IsTrue(Encoding.UTF8.GetString(body).StartsWith("<script"));
+            Assert.IsFalse(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests requests without assets being passed to the next handler.
+        /// </summary>
+        [Test]
+        public void TestOtherRequest()
+        {
+            var (_, _, nextCalled) = this.SendRequest("/admin/js/missing.js");
+            Assert.IsTrue(nextCalled);
+            (_, _, nextCalled) = this.SendRequest("/user", index: true);
+            Assert.IsTrue(nextCalled);
+        }
+
+        /// <summary>
+        /// Tests loading the assets again after they change.
+        /// </summary>
+        [Test]
+        public void TestReload()
+        {
+            var oldVersion = this._cache.Get("/admin/js/app.js").Version;
+            File.WriteAllText(Path.Combine(this._directory, "admin", "js", "app.js"), "console.log(\"changed\");");
+            this._cache.Load();
+            var newVersion = this._cache.Get("/admin/js/app.js").Version;
+            Assert.AreNotEqual(oldVersion, newVersion);
+            Assert.IsTrue(Encoding.UTF8.GetString(this._cache.GetIndex("/admin").Contents).Contains("?v=" + newVersion));
+        }
+    }
+}
@@ -1,5 +1,8 @@
+using System;
 using System.Collections.Generic;
 using System.IO;
+using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Construct.Core.Logging;
 using Microsoft.Extensions.Logging;
@@ -14,6 +17,41 @@ namespace Construct.Core.Configuration
         /// Minimum log level for the console.
         /// </summary>
         public LogLevel ConsoleLevel { get; set; } = LogLevel.Information;
+
+        /// <summary>
+        /// File that entries are written to as JSON lines. Entries aren't written to a file if it is null.
+        /// </summary>
+        public string FileOutput { get; set; } = null;
+
+        /// <summary>
+        /// Minimum log level for the file.
+        /// </summary>
+        public LogLevel FileLevel { get; set; } = LogLevel.Information;
+
+        /// <summary>
+        /// Maximum entries waiting to be written to the file before new entries are dropped.
+        /// </summary>
+        public int FileQueueSize { get; set; } = 10000;
+
+        /// <summary>
+        /// Size, in megabytes, of the file before it is rotated. The file isn't rotated by size if it is 0.
+        /// </summary>
+        public int FileMaximumSize { get; set; } = 10;
+
+        /// <summary>
+        /// Time, in hours, before the file is rotated. The file isn't rotated by time if it is 0.
+        /// </summary>
+        public int FileRotationInterval { get; set; } = 24;
+
+        /// <summary>
+        /// Rotated files to keep.
+        /// </summary>
+        public int FileMaximumFiles { get; set; } = 5;
+
+        /// <summary>
+        /// Fraction of the entries below Error to write for each category (the name of the file that logged them).
+        /// </summary>
+        public Dictionary<string, double> FileSampleRates { get; set; } = new Dictionary<string, double>();
     }
     
     public class Database
@@ -48,6 +86,49 @@ namespace Construct.Core.Configuration
         /// Password to access the data source.
         /// </summary>
         public string Password { get; set; }
+        
+        /// <summary>
+        /// Max contexts kept to be reused by the requests.
+        /// </summary>
+        public int ContextPoolSize { get; set; } = 128;
+        
+        /// <summary>
+        /// Min connections kept open to the host (source). Not used with Sqlite.
+        /// </summary>
+        public int MinimumConnectionPoolSize { get; set; } = 0;
+        
+        /// <summary>
+        /// Max connections open to the host (source) at once. Not used with Sqlite.
+        /// </summary>
+        public int MaximumConnectionPoolSize { get; set; } = 100;
+        
+        /// <summary>
+        /// Time in seconds before unused connections past the min connections are closed. Not used with Sqlite.
+        /// </summary>
+        public int ConnectionIdleLifetime { get; set; } = 300;
+        
+        /// <summary>
+        /// Journal mode of the database (like "wal" or "delete"). Only used with Sqlite.
+        /// The journal mode isn't changed if it is null.
+        /// </summary>
+        public string SqliteJournalMode { get; set; } = "wal";
+        
+        /// <summary>
+        /// Synchronous level of the connections (like "normal" or "full"). Only used with Sqlite.
+        /// The synchronous level isn't changed if it is null.
+        /// </summary>
+        public string SqliteSynchronous { get; set; } = "normal";
+        
+        /// <summary>
+        /// Time in milliseconds the connections wait for the database to be unlocked.
+        /// Rounded up to seconds. Only used with Sqlite.
+        /// </summary>
+        public int SqliteBusyTimeout { get; set; } = 5000;
+        
+        /// <summary>
+        /// Whether the admin searches and downloads use separate read-only connections. Only used with Sqlite.
+        /// </summary>
+        public bool SqliteReadOnlyConnections { get; set; } = true;
     }
     
     public class Email
@@ -55,12 +136,64 @@ namespace Construct.Core.Configuration
         /// <summary>
         /// Emails that are valid for users.
         /// </summary>
-        public List<string> ValidEmails { get; set; }= new List<string>();
+        private List<string> _validEmails = new List<string>();
+
+        /// <summary>
+        /// Changes to make to emails to make them valid.
+        /// </summary>
+        private Dictionary<string, string> _emailCorrections = new Dictionary<string, string>();
+
+        /// <summary>
+        /// Lowercase emails that are valid for users.
+        /// </summary>
+        private HashSet<string> _validEmailLookup;
+
+        /// <summary>
+        /// Lowercase changes to make to emails to make them valid.
+        /// </summary>
+        private Dictionary<string, string> _emailCorrectionLookup;
+
+        /// <summary>
+        /// Emails that are valid for users.
+        /// </summary>
+        public List<string> ValidEmails
+        {
+            get => this._validEmails;
+            set
+            {
+                this._validEmails = value;
+                this._validEmailLookup = null;
+            }
+        }
 
         /// <summary>
         /// Changes to make to emails to make them valid.
         /// </summary>
-        public Dictionary<string, string> EmailCorrections { get; set; } = new Dictionary<string, string>();
+        public Dictionary<string, string> EmailCorrections
+        {
+            get => this._emailCorrections;
+            set
+            {
+                this._emailCorrections = value;
+                this._emailCorrectionLookup = null;
+            }
+        }
+
+        /// <summary>
+        /// Lowercase emails that are valid for users. It is created when first used,
+        /// so ValidEmails must be replaced instead of modified after it is used.
+        /// </summary>
+        [JsonIgnore]
+        public HashSet<string> ValidEmailLookup => this._validEmailLookup ??= this.ValidEmails.Select(email => email.ToLower()).ToHashSet();
+
+        /// <summary>
+        /// Lowercase changes to make to emails to make them valid. It is created when first used,
+        /// so EmailCorrections must be replaced instead of modified after it is used.
+        /// </summary>
+        [JsonIgnore]
+        public Dictionary<string, string> EmailCorrectionLookup => this._emailCorrectionLookup ??= this.EmailCorrections
+            .GroupBy(correction => correction.Key.ToLower())
+            .ToDictionary(corrections => corrections.Key, corrections => corrections.First().Value.ToLower());
     }
 
     public class PrintReceipt
@@ -74,6 +207,31 @@ namespace Construct.Core.Configuration
         /// Script id to use with Google App Scripts.
         /// </summary>
         public string GoogleAppScriptId { get; set; } = "script_id";
+
+        /// <summary>
+        /// Maximum receipts each service sends at once.
+        /// </summary>
+        public int MaximumConcurrentReceipts { get; set; } = 4;
+
+        /// <summary>
+        /// Maximum attempts to send a receipt before it is no longer sent.
+        /// </summary>
+        public int MaximumAttempts { get; set; } = 10;
+
+        /// <summary>
+        /// Delay, in seconds, before the first retry of a receipt. The delay doubles for each attempt.
+        /// </summary>
+        public int RetryDelay { get; set; } = 30;
+
+        /// <summary>
+        /// Maximum delay, in seconds, between the attempts to send a receipt.
+        /// </summary>
+        public int MaximumRetryDelay { get; set; } = 60 * 60;
+
+        /// <summary>
+        /// Delay, in milliseconds, of each receipt sent with the local provider.
+        /// </summary>
+        public int LocalDelay { get; set; } = 0;
     }
 
     public class Admin
@@ -91,7 +249,126 @@ namespace Construct.Core.Configuration
         /// <summary>
         /// Permissions that are shown in the admin user interface.
         /// </summary>
-        public List<string> ConfigurablePermissions { get; set; } = new List<string>() { "LabManager", };
+        private List<string> _configurablePermissions = new List<string>() { "LabManager", };
+
+        /// <summary>
+        /// Lowercase permissions that are shown in the admin user interface.
+        /// </summary>
+        private List<string> _configurablePermissionLookup;
+
+        /// <summary>
+        /// Permissions that are shown in the admin user interface.
+        /// </summary>
+        public List<string> ConfigurablePermissions
+        {
+            get => this._configurablePermissions;
+            set
+            {
+                this._configurablePermissions = value;
+                this._configurablePermissionLookup = null;
+            }
+        }
+
+        /// <summary>
+        /// Lowercase permissions that are shown in the admin user interface without duplicates.
+        /// It is a list so that it can be used in database queries. It is created when first
+        /// used, so ConfigurablePermissions must be replaced instead of modified after it is used.
+        /// </summary>
+        [JsonIgnore]
+        public List<string> ConfigurablePermissionLookup => this._configurablePermissionLookup ??= this.ConfigurablePermissions
+            .Select(permissionName => permissionName.ToLower()).Distinct().ToList();
+
+        /// <summary>
+        /// Interval, in milliseconds, that the live visit feed checks the database for new visits.
+        /// </summary>
+        public int VisitFeedPollInterval { get; set; } = 2000;
+
+        /// <summary>
+        /// Duration, in seconds, that the totals of searches paged with cursors are stored.
+        /// </summary>
+        public int SearchTotalCacheDuration { get; set; } = 30;
+    }
+    
+    public class Cache
+    {
+        /// <summary>
+        /// Maximum users to store in the user cache of each service.
+        /// </summary>
+        public int MaximumUsers { get; set; } = 10000;
+
+        /// <summary>
+        /// Maximum duration, in seconds, that a user is stored before it is loaded again.
+        /// </summary>
+        public int MaximumUserDuration { get; set; } = 5 * 60;
+    }
+    
+    public class Swipe
+    {
+        /// <summary>
+        /// Whether swipes are queued and saved in batches instead of being saved by each request.
+        /// </summary>
+        public bool BatchInserts { get; set; } = false;
+
+        /// <summary>
+        /// Maximum time, in milliseconds, that a swipe is queued before it is saved.
+        /// </summary>
+        public int BatchInterval { get; set; } = 250;
+
+        /// <summary>
+        /// Maximum swipes to save in a batch.
+        /// </summary>
+        public int MaximumBatchSize { get; set; } = 500;
+
+        /// <summary>
+        /// File that swipes are written to if they can't be saved to the database.
+        /// </summary>
+        public string SpoolFile { get; set; } = "swipe-spool.jsonl";
+    }
+    
+    public class Metrics
+    {
+        /// <summary>
+        /// Whether request, database, and runtime metrics are recorded and served at /metrics.
+        /// </summary>
+        public bool Enabled { get; set; } = true;
+
+        /// <summary>
+        /// Duration, in milliseconds, after which requests are logged as slow. Slow requests aren't logged if it is 0.
+        /// </summary>
+        public int SlowRequestThreshold { get; set; } = 0;
+
+        /// <summary>
+        /// Whether /metrics is served to requests that aren't from the local machine.
+        /// </summary>
+        public bool AllowRemoteRequests { get; set; } = false;
+    }
+    
+    public class Archive
+    {
+        /// <summary>
+        /// Whether the admin service moves old visit and print logs from the database to the archive.
+        /// </summary>
+        public bool Enabled { get; set; } = false;
+
+        /// <summary>
+        /// Absolute directory that the archived logs are written to. It must already exist.
+        /// </summary>
+        public string Directory { get; set; } = null;
+
+        /// <summary>
+        /// Age, in days, after which visit and print logs are archived.
+        /// </summary>
+        public int MaximumAge { get; set; } = 365;
+
+        /// <summary>
+        /// Interval, in hours, that the old logs are archived.
+        /// </summary>
+        public int Interval { get; set; } = 24;
+
+        /// <summary>
+        /// Maximum logs to write to each archive file.
+        /// </summary>
+        public int BatchSize { get; set; } = 10000;
     }
     
     public class ConstructConfiguration
@@ -102,14 +379,35 @@ namespace Construct.Core.Configuration
         public const string FileLocation = "configuration.json";
 
         /// <summary>
-        /// Static configuration used for the application.
+        /// Delay after the configuration file changes before it is loaded again.
         /// </summary>
-        public static ConstructConfiguration Configuration = new ConstructConfiguration();
+        public static TimeSpan ReloadDelay { get; set; } = TimeSpan.FromMilliseconds(500);
 
         /// <summary>
-        /// Database configuration of the application.
+        /// Static configuration used for the application. It is replaced instead of
+        /// modified when the configuration file changes.
         /// </summary>
-        public Database Database { get; } = new Database();
+        public static volatile ConstructConfiguration Configuration = new ConstructConfiguration();
+
+        /// <summary>
+        /// Event for the static configuration being replaced after the configuration file changes.
+        /// </summary>
+        public static event Action<ConstructConfiguration> Reloaded;
+
+        /// <summary>
+        /// Watcher for changes to the configuration file.
+        /// </summary>
+        private static FileSystemWatcher _watcher;
+
+        /// <summary>
+        /// Timer for loading the configuration after the file changes.
+        /// </summary>
+        private static Timer _reloadTimer;
+
+        /// <summary>
+        /// Database configuration of the application. It is kept when the configuration is reloaded.
+        /// </summary>
+        public Database Database { get; private set; } = new Database();
 
         /// <summary>
         /// Logging configuration of the application.
@@ -131,10 +429,30 @@ namespace Construct.Core.Configuration
         /// </summary>
         public Admin Admin { get; } = new Admin();
 
+        /// <summary>
+        /// Cache configuration of the application.
+        /// </summary>
+        public Cache Cache { get; } = new Cache();
+
+        /// <summary>
+        /// Swipe configuration of the application.
+        /// </summary>
+        public Swipe Swipe { get; } = new Swipe();
+
+        /// <summary>
+        /// Metrics configuration of the application.
+        /// </summary>
+        public Metrics Metrics { get; } = new Metrics();
+
+        /// <summary>
+        /// Archive configuration of the application.
+        /// </summary>
+        public Archive Archive { get; } = new Archive();
+
         /// <summary>
         /// Ports used by the services.
         /// </summary>
-        public Dictionary<string, int> Ports { get; } = new Dictionary<string, int>()
+        public Dictionary<string, int> Ports { get; private set; } = new Dictionary<string, int>()
         {
             { "Combined", 8000 },
             { "User", 8001 },
@@ -190,5 +508,82 @@ namespace Construct.Core.Configuration
         {
             Configuration = await LoadAsync(fileLocation);
         }
+
+        /// <summary>
+        /// Loads the static configuration again. The current configuration is kept if the
+        /// file is missing or invalid so that partially written files are ignored.
+        /// </summary>
+        /// <param name="fileLocation">Location of the configuration.</param>
+        /// <returns>Whether the configuration was replaced.</returns>
+        public static async Task<bool> ReloadDefaultAsync(string fileLocation = FileLocation)
+        {
+            // Load the new configuration.
+            if (!File.Exists(fileLocation)) return false;
+            ConstructConfiguration newConfiguration;
+            try
+            {
+                newConfiguration = JsonConvert.DeserializeObject<ConstructConfiguration>(await File.ReadAllTextAsync(fileLocation));
+                if (newConfiguration == null) return false;
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"Failed to reload configuration file {fileLocation}: {e.Message}");
+                return false;
+            }
+            
+            // Warn about the changes that only apply after restarting.
+            var oldConfiguration = Configuration;
+            if (JsonConvert.SerializeObject(oldConfiguration.Database) != JsonConvert.SerializeObject(newConfiguration.Database)
+                || JsonConvert.SerializeObject(oldConfiguration.Ports) != JsonConvert.SerializeObject(newConfiguration.Ports))
+            {
+                Log.Warn("The Database and Ports configuration changed and will only be used after restarting.");
+            }
+            if (oldConfiguration.Swipe.BatchInserts != newConfiguration.Swipe.BatchInserts || oldConfiguration.Swipe.SpoolFile != newConfiguration.Swipe.SpoolFile)
+            {
+                Log.Warn("The Swipe BatchInserts and SpoolFile configuration changed and will only be used after restarting.");
+            }
+            
+            // Keep the Database and Ports configuration the services started with.
+            // The database may not be migrated for a changed Database configuration.
+            newConfiguration.Database = oldConfiguration.Database;
+            newConfiguration.Ports = oldConfiguration.Ports;
+            
+            // Replace the configuration.
+            Configuration = newConfiguration;
+            Log.Info($"Reloaded configuration file {fileLocation}.");
+            Reloaded?.Invoke(newConfiguration);
+            return true;
+        }
+
+        /// <summary>
+        /// Starts loading the static configuration again when the configuration file changes.
+        /// </summary>
+        /// <param name="fileLocation">Location of the configuration.</param>
+        public static void StartWatching(string fileLocation = FileLocation)
+        {
+            if (_watcher != null) return;
+            var fullFileLocation = Path.GetFullPath(fileLocation);
+            _reloadTimer = new Timer(_ => ReloadDefaultAsync(fullFileLocation).Wait());
+            _watcher = new FileSystemWatcher(Path.GetDirectoryName(fullFileLocation)!, Path.GetFileName(fullFileLocation))
+            {
+                NotifyFilter = NotifyFilters.FileName | NotifyFilters.LastWrite | NotifyFilters.Size,
+            };
+            FileSystemEventHandler scheduleReload = (_, _) => _reloadTimer.Change(ReloadDelay, Timeout.InfiniteTimeSpan);
+            _watcher.Changed += scheduleReload;
+            _watcher.Created += scheduleReload;
+            _watcher.Renamed += (_, _) => _reloadTimer.Change(ReloadDelay, Timeout.InfiniteTimeSpan);
+            _watcher.EnableRaisingEvents = true;
+        }
+
+        /// <summary>
+        /// Stops loading the static configuration when the configuration file changes.
+        /// </summary>
+        public static void StopWatching()
+        {
+            _watcher?.Dispose();
+            _reloadTimer?.Dispose();
+            _watcher = null;
+            _reloadTimer = null;
+        }
     }
 }
\ No newline at end of file
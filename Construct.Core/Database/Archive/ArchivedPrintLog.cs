@@ -0,0 +1,57 @@
+using System;
+
+namespace Construct.Core.Database.Archive
+{
+    public class ArchivedPrintLog
+    {
+        /// <summary>
+        /// Key of the print log when it was in the database.
+        /// </summary>
+        public long Key { get; set; }
+
+        /// <summary>
+        /// Hashed id of the user of the print, if the print has a user.
+        /// </summary>
+        public string UserHashedId { get; set; }
+
+        /// <summary>
+        /// Time of the print.
+        /// </summary>
+        public DateTime Time { get; set; }
+
+        /// <summary>
+        /// Name of the file that was printed.
+        /// </summary>
+        public string FileName { get; set; }
+
+        /// <summary>
+        /// Name of the material of the print.
+        /// </summary>
+        public string MaterialName { get; set; }
+
+        /// <summary>
+        /// Weight of the print in grams.
+        /// </summary>
+        public float WeightGrams { get; set; }
+
+        /// <summary>
+        /// Purpose of the print.
+        /// </summary>
+        public string Purpose { get; set; }
+
+        /// <summary>
+        /// Who the print is billed to.
+        /// </summary>
+        public string BillTo { get; set; }
+
+        /// <summary>
+        /// Cost of the print.
+        /// </summary>
+        public float Cost { get; set; }
+
+        /// <summary>
+        /// Whether the cost of the print is owed.
+        /// </summary>
+        public bool Owed { get; set; }
+    }
+}
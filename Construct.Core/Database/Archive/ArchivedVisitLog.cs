@@ -0,0 +1,27 @@
+using System;
+
+namespace Construct.Core.Database.Archive
+{
+    public class ArchivedVisitLog
+    {
+        /// <summary>
+        /// Key of the visit log when it was in the database.
+        /// </summary>
+        public long Key { get; set; }
+
+        /// <summary>
+        /// Hashed id of the user of the visit.
+        /// </summary>
+        public string UserHashedId { get; set; }
+
+        /// <summary>
+        /// Source of the visit.
+        /// </summary>
+        public string Source { get; set; }
+
+        /// <summary>
+        /// Time of the visit.
+        /// </summary>
+        public DateTime Time { get; set; }
+    }
+}
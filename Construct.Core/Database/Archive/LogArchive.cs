@@ -0,0 +1,429 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.IO.Compression;
+using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Logging;
+using Microsoft.EntityFrameworkCore;
+using Newtonsoft.Json;
+
+namespace Construct.Core.Database.Archive
+{
+    public class LogArchive
+    {
+        /// <summary>
+        /// Command line argument for archiving the old logs once.
+        /// </summary>
+        public const string Argument = "--archive";
+
+        /// <summary>
+        /// Name of the archive files of the visit logs.
+        /// </summary>
+        public const string VisitLogsName = "VisitLogs";
+
+        /// <summary>
+        /// Name of the archive files of the print logs.
+        /// </summary>
+        public const string PrintLogName = "PrintLog";
+
+        /// <summary>
+        /// Extension of the archive files.
+        /// </summary>
+        public const string FileExtension = ".jsonl.gz";
+
+        /// <summary>
+        /// Extension of the archive files that are being written.
+        /// </summary>
+        public const string TemporaryFileExtension = ".jsonl.gz.tmp";
+
+        /// <summary>
+        /// Maximum keys to remove with each DELETE command.
+        /// </summary>
+        public const int DeleteBatchSize = 500;
+
+        /// <summary>
+        /// Absolute directory of the archive files. The archive isn't used if it is null.
+        /// </summary>
+        public string Directory { get; set; }
+
+        /// <summary>
+        /// Returns if a directory is set for the archive.
+        /// </summary>
+        public bool IsConfigured => !string.IsNullOrEmpty(this.Directory);
+
+        /// <summary>
+        /// Age, in days, of the logs to archive.
+        /// </summary>
+        public int MaximumAge { get; set; } = 365;
+
+        /// <summary>
+        /// Maximum logs to write to each archive file.
+        /// </summary>
+        public int BatchSize { get; set; } = 10000;
+
+        /// <summary>
+        /// Total visit logs archived.
+        /// </summary>
+        public long ArchivedVisitLogs => Interlocked.Read(ref this._archivedVisitLogs);
+
+        /// <summary>
+        /// Total print logs archived.
+        /// </summary>
+        public long ArchivedPrintLogs => Interlocked.Read(ref this._archivedPrintLogs);
+
+        /// <summary>
+        /// Static archive instance to use.
+        /// </summary>
+        private static LogArchive _staticArchive;
+
+        /// <summary>
+        /// Lock for archiving so that archiving is only done once at a time.
+        /// </summary>
+        private readonly SemaphoreSlim _archiveLock = new SemaphoreSlim(1, 1);
+
+        /// <summary>
+        /// Total visit logs archived.
+        /// </summary>
+        private long _archivedVisitLogs;
+
+        /// <summary>
+        /// Total print logs archived.
+        /// </summary>
+        private long _archivedPrintLogs;
+
+        /// <summary>
+        /// Returns a static instance of the archive. The settings of the
+        /// archive are updated from the current configuration.
+        /// </summary>
+        /// <returns>The static instance of the archive.</returns>
+        public static LogArchive GetSingleton()
+        {
+            var configuration = ConstructConfiguration.Configuration.Archive;
+            var archive = (_staticArchive ??= new LogArchive());
+            archive.Directory = configuration.Directory;
+            archive.MaximumAge = Math.Max(0, configuration.MaximumAge);
+            archive.BatchSize = Math.Max(1, configuration.BatchSize);
+            return archive;
+        }
+
+        /// <summary>
+        /// Returns why the directory of the archive can't be used, or null if it can be used.
+        /// The directory must be absolute since the services run from directories that are
+        /// replaced when they are deployed, and it must already exist so that a missing mount
+        /// isn't mistaken for an empty archive.
+        /// </summary>
+        /// <returns>The error with the directory, or null if there is none.</returns>
+        public string GetDirectoryError()
+        {
+            if (!this.IsConfigured)
+            {
+                return "The archive directory (Archive.Directory) is not set.";
+            }
+            if (!Path.IsPathRooted(this.Directory))
+            {
+                return $"The archive directory {this.Directory} is not an absolute path.";
+            }
+            if (!System.IO.Directory.Exists(this.Directory))
+            {
+                return $"The archive directory {this.Directory} does not exist.";
+            }
+            return null;
+        }
+
+        /// <summary>
+        /// Returns the archive files of a table ordered by the first key in them.
+        /// </summary>
+        /// <param name="name">Name of the archive files of the table.</param>
+        /// <param name="extension">Extension of the archive files.</param>
+        /// <returns>The archive files of the table.</returns>
+        private List<string> GetFiles(string name, string extension = FileExtension)
+        {
+            if (!this.IsConfigured || !System.IO.Directory.Exists(this.Directory)) return new List<string>();
+            return System.IO.Directory.GetFiles(this.Directory, $"{name}-*{extension}")
+                .Where(file => file.EndsWith(extension))
+                .OrderBy(file =>
+                {
+                    var keys = Path.GetFileName(file).Substring(name.Length + 1).Split('-');
+                    return long.TryParse(keys[0], out var firstKey) ? firstKey : long.MaxValue;
+                }).ToList();
+        }
+
+        /// <summary>
+        /// Reads the entries of an archive file.
+        /// </summary>
+        /// <param name="file">Archive file to read.</param>
+        /// <param name="cancellationToken">Token for cancelling reading the file.</param>
+        /// <typeparam name="T">Type of the entries.</typeparam>
+        /// <returns>The entries of the archive file.</returns>
+        private static async IAsyncEnumerable<T> ReadFileAsync<T>(string file, [EnumeratorCancellation] CancellationToken cancellationToken = default)
+        {
+            await using var fileStream = new FileStream(file, FileMode.Open, FileAccess.Read, FileShare.Read | FileShare.Delete);
+            await using var gzipStream = new GZipStream(fileStream, CompressionMode.Decompress);
+            using var reader = new StreamReader(gzipStream, Encoding.UTF8);
+            string line;
+            while ((line = await reader.ReadLineAsync()) != null)
+            {
+                cancellationToken.ThrowIfCancellationRequested();
+                if (line.Length == 0) continue;
+                yield return JsonConvert.DeserializeObject<T>(line);
+            }
+        }
+
+        /// <summary>
+        /// Reads the entries of the archive files of a table.
+        /// </summary>
+        /// <param name="name">Name of the archive files of the table.</param>
+        /// <param name="cancellationToken">Token for cancelling reading the files.</param>
+        /// <typeparam name="T">Type of the entries.</typeparam>
+        /// <returns>The entries of the archive files.</returns>
+        private async IAsyncEnumerable<T> ReadFilesAsync<T>(string name, [EnumeratorCancellation] CancellationToken cancellationToken = default)
+        {
+            foreach (var file in this.GetFiles(name))
+            {
+                await foreach (var entry in ReadFileAsync<T>(file, cancellationToken))
+                {
+                    yield return entry;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Reads the archived visit logs ordered by their keys within each archive file.
+        /// </summary>
+        /// <param name="cancellationToken">Token for cancelling reading the visit logs.</param>
+        /// <returns>The archived visit logs.</returns>
+        public IAsyncEnumerable<ArchivedVisitLog> ReadVisitLogsAsync(CancellationToken cancellationToken = default)
+        {
+            return this.ReadFilesAsync<ArchivedVisitLog>(VisitLogsName, cancellationToken);
+        }
+
+        /// <summary>
+        /// Reads the archived print logs ordered by their keys within each archive file.
+        /// </summary>
+        /// <param name="cancellationToken">Token for cancelling reading the print logs.</param>
+        /// <returns>The archived print logs.</returns>
+        public IAsyncEnumerable<ArchivedPrintLog> ReadPrintLogsAsync(CancellationToken cancellationToken = default)
+        {
+            return this.ReadFilesAsync<ArchivedPrintLog>(PrintLogName, cancellationToken);
+        }
+
+        /// <summary>
+        /// Writes entries to a new temporary archive file.
+        /// </summary>
+        /// <param name="name">Name of the archive files of the table.</param>
+        /// <param name="entries">Entries to write.</param>
+        /// <param name="firstKey">First key of the entries.</param>
+        /// <param name="lastKey">Last key of the entries.</param>
+        /// <typeparam name="T">Type of the entries.</typeparam>
+        /// <returns>The temporary archive file.</returns>
+        private async Task<string> WriteTemporaryFileAsync<T>(string name, IEnumerable<T> entries, long firstKey, long lastKey)
+        {
+            var file = Path.Combine(this.Directory, $"{name}-{firstKey}-{lastKey}{TemporaryFileExtension}");
+            await using (var fileStream = new FileStream(file, FileMode.Create, FileAccess.Write, FileShare.None))
+            {
+                await using (var gzipStream = new GZipStream(fileStream, CompressionLevel.Optimal, true))
+                {
+                    await using var writer = new StreamWriter(gzipStream, new UTF8Encoding(false));
+                    foreach (var entry in entries)
+                    {
+                        await writer.WriteLineAsync(JsonConvert.SerializeObject(entry));
+                    }
+                }
+                fileStream.Flush(true);
+            }
+            return file;
+        }
+
+        /// <summary>
+        /// Removes the rows of a table with the given keys. Only the keys that were
+        /// written to the archive are removed so that rows changed after they were
+        /// read are never removed without being archived.
+        /// </summary>
+        /// <param name="context">Context to remove the rows with.</param>
+        /// <param name="table">Name of the table.</param>
+        /// <param name="keys">Keys of the rows to remove.</param>
+        private static async Task DeleteKeysAsync(ConstructContext context, string table, List<long> keys)
+        {
+            for (var i = 0; i < keys.Count; i += DeleteBatchSize)
+            {
+                var batchKeys = keys.Skip(i).Take(DeleteBatchSize).Cast<object>().ToList();
+                var parameters = string.Join(", ", Enumerable.Range(0, batchKeys.Count).Select(index => $"{{{index}}}"));
+                await context.Database.ExecuteSqlRawAsync($"DELETE FROM \"{table}\" WHERE \"Key\" IN ({parameters})", batchKeys);
+            }
+        }
+
+        /// <summary>
+        /// Completes or removes the temporary archive files left by archiving that stopped
+        /// before finishing. A temporary file is completed if its logs were removed from the
+        /// database, and is removed otherwise so that the logs are archived again.
+        /// </summary>
+        /// <param name="name">Name of the archive files of the table.</param>
+        /// <param name="keyExistsAsync">Returns if a key still exists in the database.</param>
+        private async Task RecoverTemporaryFilesAsync(string name, Func<long, Task<bool>> keyExistsAsync)
+        {
+            foreach (var file in this.GetFiles(name, TemporaryFileExtension))
+            {
+                var firstKey = long.Parse(Path.GetFileName(file).Substring(name.Length + 1).Split('-')[0]);
+                if (await keyExistsAsync(firstKey))
+                {
+                    Log.Warn($"Removing incomplete archive file {file}.");
+                    File.Delete(file);
+                }
+                else
+                {
+                    Log.Warn($"Completing archive file {file}.");
+                    File.Move(file, file.Substring(0, file.Length - TemporaryFileExtension.Length) + FileExtension, true);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Moves the visit logs older than a time from the database to the archive.
+        /// </summary>
+        /// <param name="cutoff">Time before which visit logs are archived.</param>
+        /// <param name="cancellationToken">Token for stopping archiving between batches.</param>
+        /// <returns>The total visit logs archived.</returns>
+        public async Task<int> ArchiveVisitLogsAsync(DateTime cutoff, CancellationToken cancellationToken = default)
+        {
+            // Complete the archive files that weren't completed.
+            await using (var context = new ConstructContext())
+            {
+                await this.RecoverTemporaryFilesAsync(VisitLogsName, key => context.VisitLogs.AnyAsync(visitLog => visitLog.Key == key));
+            }
+
+            // Archive the visit logs in batches.
+            var totalArchived = 0;
+            while (!cancellationToken.IsCancellationRequested)
+            {
+                // Read the next batch.
+                // The batch is read and removed in one transaction so that the removed rows are the ones written.
+                await using var context = new ConstructContext();
+                await using var transaction = await context.Database.BeginTransactionAsync();
+                var visitLogs = await context.VisitLogs.AsNoTracking()
+                    .Where(visitLog => visitLog.Time < cutoff)
+                    .OrderBy(visitLog => visitLog.Key)
+                    .Take(this.BatchSize)
+                    .Select(visitLog => new ArchivedVisitLog()
+                    {
+                        Key = visitLog.Key,
+                        UserHashedId = EF.Property<string>(visitLog, "UserHashedId"),
+                        Source = visitLog.Source,
+                        Time = visitLog.Time,
+                    }).ToListAsync();
+                if (visitLogs.Count == 0) break;
+
+                // Write the archive file, remove the visit logs, and complete the archive file.
+                var firstKey = visitLogs[0].Key;
+                var lastKey = visitLogs[^1].Key;
+                var file = await this.WriteTemporaryFileAsync(VisitLogsName, visitLogs, firstKey, lastKey);
+                await DeleteKeysAsync(context, "VisitLogs", visitLogs.Select(visitLog => visitLog.Key).ToList());
+                await transaction.CommitAsync();
+                File.Move(file, file.Substring(0, file.Length - TemporaryFileExtension.Length) + FileExtension);
+                Interlocked.Add(ref this._archivedVisitLogs, visitLogs.Count);
+                totalArchived += visitLogs.Count;
+                if (visitLogs.Count < this.BatchSize) break;
+            }
+            return totalArchived;
+        }
+
+        /// <summary>
+        /// Moves the print logs older than a time from the database to the archive.
+        /// Print logs that are still owed or have receipts waiting to be sent are not
+        /// archived so that clearing a balance still changes all the owed prints. The print
+        /// totals of the users are not changed, so they still include the archived
+        /// print logs.
+        /// </summary>
+        /// <param name="cutoff">Time before which print logs are archived.</param>
+        /// <param name="cancellationToken">Token for stopping archiving between batches.</param>
+        /// <returns>The total print logs archived.</returns>
+        public async Task<int> ArchivePrintLogsAsync(DateTime cutoff, CancellationToken cancellationToken = default)
+        {
+            // Complete the archive files that weren't completed.
+            await using (var context = new ConstructContext())
+            {
+                await this.RecoverTemporaryFilesAsync(PrintLogName, key => context.PrintLog.AnyAsync(printLog => printLog.Key == key));
+            }
+
+            // Archive the print logs in batches.
+            var totalArchived = 0;
+            while (!cancellationToken.IsCancellationRequested)
+            {
+                // Read the next batch.
+                // The batch is read and removed in one transaction so that the removed rows are the ones written.
+                await using var context = new ConstructContext();
+                await using var transaction = await context.Database.BeginTransactionAsync();
+                var printLogs = await context.PrintLog.AsNoTracking()
+                    .Where(printLog => printLog.Time < cutoff)
+                    .Where(printLog => !printLog.Owed)
+                    .Where(printLog => !context.PendingPrintReceipts.Any(receipt => receipt.PrintLogKey == printLog.Key))
+                    .OrderBy(printLog => printLog.Key)
+                    .Take(this.BatchSize)
+                    .Select(printLog => new ArchivedPrintLog()
+                    {
+                        Key = printLog.Key,
+                        UserHashedId = EF.Property<string>(printLog, "UserHashedId"),
+                        Time = printLog.Time,
+                        FileName = printLog.FileName,
+                        MaterialName = EF.Property<string>(printLog, "MaterialName"),
+                        WeightGrams = printLog.WeightGrams,
+                        Purpose = printLog.Purpose,
+                        BillTo = printLog.BillTo,
+                        Cost = printLog.Cost,
+                        Owed = printLog.Owed,
+                    }).ToListAsync();
+                if (printLogs.Count == 0) break;
+
+                // Write the archive file, remove the print logs, and complete the archive file.
+                // The print logs are removed without the context tracking them so that the print totals aren't changed.
+                var firstKey = printLogs[0].Key;
+                var lastKey = printLogs[^1].Key;
+                var file = await this.WriteTemporaryFileAsync(PrintLogName, printLogs, firstKey, lastKey);
+                await DeleteKeysAsync(context, "PrintLog", printLogs.Select(printLog => printLog.Key).ToList());
+                await transaction.CommitAsync();
+                File.Move(file, file.Substring(0, file.Length - TemporaryFileExtension.Length) + FileExtension);
+                Interlocked.Add(ref this._archivedPrintLogs, printLogs.Count);
+                totalArchived += printLogs.Count;
+                if (printLogs.Count < this.BatchSize) break;
+            }
+            return totalArchived;
+        }
+
+        /// <summary>
+        /// Moves the visit and print logs older than the maximum age from the database to the archive.
+        /// Nothing is archived if the directory of the archive can't be used.
+        /// </summary>
+        /// <param name="cancellationToken">Token for stopping archiving between batches.</param>
+        /// <returns>The total logs archived.</returns>
+        public async Task<int> ArchiveAsync(CancellationToken cancellationToken = default)
+        {
+            // Refuse to archive if the directory can't be used.
+            var directoryError = this.GetDirectoryError();
+            if (directoryError != null)
+            {
+                Log.Error($"Not archiving logs: {directoryError}");
+                throw new InvalidOperationException(directoryError);
+            }
+            
+            await this._archiveLock.WaitAsync(cancellationToken);
+            try
+            {
+                var cutoff = DateTime.Now.AddDays(-this.MaximumAge);
+                Log.Info($"Archiving visit and print logs before {cutoff} to {this.Directory}.");
+                var archivedVisitLogs = await this.ArchiveVisitLogsAsync(cutoff, cancellationToken);
+                var archivedPrintLogs = await this.ArchivePrintLogsAsync(cutoff, cancellationToken);
+                Log.Info($"Archived {archivedVisitLogs} visit logs and {archivedPrintLogs} print logs.");
+                return archivedVisitLogs + archivedPrintLogs;
+            }
+            finally
+            {
+                this._archiveLock.Release();
+            }
+        }
+    }
+}
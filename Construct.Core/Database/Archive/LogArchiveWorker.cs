@@ -0,0 +1,49 @@
+using System;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Logging;
+using Construct.Core.Server;
+using Microsoft.Extensions.Hosting;
+
+namespace Construct.Core.Database.Archive
+{
+    public class LogArchiveWorker : BackgroundService
+    {
+        /// <summary>
+        /// Archives the old logs at the configured interval until the service stops.
+        /// </summary>
+        /// <param name="stoppingToken">Token for when the service stops.</param>
+        protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+        {
+            ServerMetrics.AddMetric("construct_archive_visit_logs_total", "counter", "Visit logs moved to the archive.", () => LogArchive.GetSingleton().ArchivedVisitLogs);
+            ServerMetrics.AddMetric("construct_archive_print_logs_total", "counter", "Print logs moved to the archive.", () => LogArchive.GetSingleton().ArchivedPrintLogs);
+            while (!stoppingToken.IsCancellationRequested)
+            {
+                // Archive the old logs if archiving is enabled.
+                var configuration = ConstructConfiguration.Configuration.Archive;
+                if (configuration.Enabled)
+                {
+                    try
+                    {
+                        await LogArchive.GetSingleton().ArchiveAsync(stoppingToken);
+                    }
+                    catch (Exception e) when (!stoppingToken.IsCancellationRequested)
+                    {
+                        Log.Warn($"Failed to archive logs: {e.Message}");
+                    }
+                }
+                
+                // Wait for the next interval.
+                try
+                {
+                    await Task.Delay(TimeSpan.FromHours(Math.Max(1, configuration.Interval)), stoppingToken);
+                }
+                catch (OperationCanceledException)
+                {
+                    break;
+                }
+            }
+        }
+    }
+}
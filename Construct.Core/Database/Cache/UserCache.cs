@@ -0,0 +1,366 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+
+namespace Construct.Core.Database.Cache
+{
+    public class CachedPermission
+    {
+        /// <summary>
+        /// Name of the permission.
+        /// </summary>
+        public string Name { get; set; }
+
+        /// <summary>
+        /// Start time of the permission.
+        /// </summary>
+        public DateTime? StartTime { get; set; }
+
+        /// <summary>
+        /// End time of the permission.
+        /// </summary>
+        public DateTime? EndTime { get; set; }
+
+        /// <summary>
+        /// Returns if the permission is active.
+        /// </summary>
+        /// <returns>Whether the permission is active.</returns>
+        public bool IsActive()
+        {
+            // Return if the permission hasn't started or the permission has expired.
+            if ((this.StartTime.HasValue && this.StartTime > DateTime.Now) || (this.EndTime.HasValue && this.EndTime < DateTime.Now))
+            {
+                return false;
+            }
+            
+            // Return true (permission active).
+            return true;
+        }
+    }
+
+    public class CachedUser
+    {
+        /// <summary>
+        /// Hashed id of the user as stored in the database.
+        /// </summary>
+        public string HashedId { get; set; }
+
+        /// <summary>
+        /// Name of the user.
+        /// </summary>
+        public string Name { get; set; }
+
+        /// <summary>
+        /// Email of the user.
+        /// </summary>
+        public string Email { get; set; }
+
+        /// <summary>
+        /// Permissions of the user, including inactive permissions. Changes made by other
+        /// services are only seen after the user expires, so these must not be used to authorize
+        /// requests. Authorization must load the permissions from the database.
+        /// </summary>
+        public List<CachedPermission> Permissions { get; set; } = new List<CachedPermission>();
+
+        /// <summary>
+        /// Time the user was stored in the cache.
+        /// </summary>
+        public DateTime CacheTime { get; set; }
+
+        /// <summary>
+        /// Returns the names of the active permissions of the user.
+        /// </summary>
+        /// <returns>The names of the active permissions.</returns>
+        public List<string> GetActivePermissions()
+        {
+            return this.Permissions.Where(permission => permission.IsActive()).Select(permission => permission.Name).ToList();
+        }
+
+        /// <summary>
+        /// Returns a user attached to a context that can be referenced by new entries
+        /// (like visit and print logs) without loading the user from the database.
+        /// The returned user does not have the permissions or logs.
+        /// </summary>
+        /// <param name="context">Context to attach the user to.</param>
+        /// <returns>The user attached to the context.</returns>
+        public User GetAttachedUser(ConstructContext context)
+        {
+            // Return the user if it is already tracked.
+            var trackedUser = context.Users.Local.FirstOrDefault(user => user.HashedId == this.HashedId);
+            if (trackedUser != null)
+            {
+                return trackedUser;
+            }
+
+            // Attach and return the user.
+            var user = new User()
+            {
+                HashedId = this.HashedId,
+                Name = this.Name,
+                Email = this.Email,
+            };
+            context.Users.Attach(user);
+            return user;
+        }
+    }
+
+    public class UserCache
+    {
+        /// <summary>
+        /// Maximum users to store.
+        /// </summary>
+        public int MaxUsers { get; set; } = 10000;
+
+        /// <summary>
+        /// Max duration in seconds to store a user before loading it again.
+        /// Users changed by other services are only updated after this time.
+        /// </summary>
+        public long MaxUserDuration { get; set; } = 5 * 60;
+
+        /// <summary>
+        /// Total lookups that found a stored user.
+        /// </summary>
+        public long Hits => Interlocked.Read(ref this._hits);
+
+        /// <summary>
+        /// Total lookups that did not find a stored user.
+        /// </summary>
+        public long Misses => Interlocked.Read(ref this._misses);
+
+        /// <summary>
+        /// Total users removed to stay within the maximum users.
+        /// </summary>
+        public long Evictions => Interlocked.Read(ref this._evictions);
+
+        /// <summary>
+        /// Total users stored.
+        /// </summary>
+        public int Count => this._users.Count;
+
+        /// <summary>
+        /// Static cache instance to use.
+        /// </summary>
+        private static UserCache _staticCache;
+
+        /// <summary>
+        /// Stored users by their normalized hashed id.
+        /// </summary>
+        private readonly ConcurrentDictionary<string, CachedUser> _users = new ConcurrentDictionary<string, CachedUser>();
+
+        /// <summary>
+        /// Number of times users were removed. Users loaded while a user
+        /// was removed aren't stored since they may have been loaded before the change.
+        /// </summary>
+        private long _generation;
+
+        /// <summary>
+        /// Total lookups that found a stored user.
+        /// </summary>
+        private long _hits;
+
+        /// <summary>
+        /// Total lookups that did not find a stored user.
+        /// </summary>
+        private long _misses;
+
+        /// <summary>
+        /// Total users removed to stay within the maximum users.
+        /// </summary>
+        private long _evictions;
+
+        /// <summary>
+        /// Returns a static instance of the cache. The settings of the
+        /// cache are updated when the configuration is reloaded.
+        /// </summary>
+        /// <returns>The static instance of the cache.</returns>
+        public static UserCache GetSingleton()
+        {
+            if (_staticCache != null) return _staticCache;
+            var cache = new UserCache();
+            cache.ApplyConfiguration(ConstructConfiguration.Configuration);
+            if (Interlocked.CompareExchange(ref _staticCache, cache, null) == null)
+            {
+                ConstructConfiguration.Reloaded += cache.ApplyConfiguration;
+            }
+            return _staticCache;
+        }
+
+        /// <summary>
+        /// Updates the settings of the cache from a configuration.
+        /// </summary>
+        /// <param name="configuration">Configuration to use.</param>
+        public void ApplyConfiguration(ConstructConfiguration configuration)
+        {
+            this.MaxUsers = Math.Max(0, configuration.Cache.MaximumUsers);
+            this.MaxUserDuration = Math.Max(0, configuration.Cache.MaximumUserDuration);
+        }
+
+        /// <summary>
+        /// Returns the normalized form of a hashed id.
+        /// </summary>
+        /// <param name="hashedId">Hashed id to normalize.</param>
+        /// <returns>The normalized hashed id.</returns>
+        public static string NormalizeHashedId(string hashedId)
+        {
+            return ConstructContext.Normalize(hashedId);
+        }
+
+        /// <summary>
+        /// Returns a stored user. Returns null if the user isn't stored or expired.
+        /// </summary>
+        /// <param name="hashedId">Hashed id of the user (not case sensitive).</param>
+        /// <returns>The stored user, if any.</returns>
+        public CachedUser Get(string hashedId)
+        {
+            // Return null if the user isn't stored.
+            var normalizedHashedId = NormalizeHashedId(hashedId);
+            if (normalizedHashedId == null || !this._users.TryGetValue(normalizedHashedId, out var user))
+            {
+                Interlocked.Increment(ref this._misses);
+                return null;
+            }
+
+            // Remove the user and return null if the user expired.
+            if (user.CacheTime.AddSeconds(this.MaxUserDuration) < DateTime.Now)
+            {
+                this._users.TryRemove(new KeyValuePair<string, CachedUser>(normalizedHashedId, user));
+                Interlocked.Increment(ref this._misses);
+                return null;
+            }
+
+            // Return the user.
+            Interlocked.Increment(ref this._hits);
+            return user;
+        }
+
+        /// <summary>
+        /// Stores a user. The permissions of the user must be loaded.
+        /// </summary>
+        /// <param name="user">User to store.</param>
+        /// <returns>The stored user.</returns>
+        public CachedUser Add(User user)
+        {
+            return this.Add(user, Interlocked.Read(ref this._generation));
+        }
+
+        /// <summary>
+        /// Stores a user if no users were removed since it was loaded.
+        /// The permissions of the user must be loaded.
+        /// </summary>
+        /// <param name="user">User to store.</param>
+        /// <param name="generation">Generation of the cache before the user was loaded.</param>
+        /// <returns>The stored user.</returns>
+        private CachedUser Add(User user, long generation)
+        {
+            // Create the stored user.
+            var cachedUser = new CachedUser()
+            {
+                HashedId = user.HashedId,
+                Name = user.Name,
+                Email = user.Email,
+                Permissions = (user.Permissions ?? new List<Permission>()).Select(permission => new CachedPermission()
+                {
+                    Name = permission.Name,
+                    StartTime = permission.StartTime,
+                    EndTime = permission.EndTime,
+                }).ToList(),
+                CacheTime = DateTime.Now,
+            };
+            if (this.MaxUsers == 0 || Interlocked.Read(ref this._generation) != generation) return cachedUser;
+
+            // Remove users if the cache is full and store the user.
+            if (this._users.Count >= this.MaxUsers)
+            {
+                this.RemoveOldest();
+            }
+            var normalizedHashedId = NormalizeHashedId(user.HashedId);
+            this._users[normalizedHashedId] = cachedUser;
+            
+            // Remove the user if a user was removed while it was stored, since the removal may have happened first.
+            if (Interlocked.Read(ref this._generation) != generation)
+            {
+                this._users.TryRemove(new KeyValuePair<string, CachedUser>(normalizedHashedId, cachedUser));
+            }
+            return cachedUser;
+        }
+
+        /// <summary>
+        /// Returns a user from the cache, or loads and stores the user if it isn't stored.
+        /// Users that don't exist are not stored so that new users can be found right away.
+        /// </summary>
+        /// <param name="context">Context to load the user with.</param>
+        /// <param name="hashedId">Hashed id of the user (not case sensitive).</param>
+        /// <returns>The user, if it exists.</returns>
+        public async Task<CachedUser> GetOrLoadAsync(ConstructContext context, string hashedId)
+        {
+            // Return the stored user if it exists.
+            var cachedUser = this.Get(hashedId);
+            if (cachedUser != null)
+            {
+                return cachedUser;
+            }
+
+            // Load the user and store it if it exists and wasn't removed while loading.
+            var generation = Interlocked.Read(ref this._generation);
+            var user = await context.GetUserAsync(hashedId);
+            return user == null ? null : this.Add(user, generation);
+        }
+
+        /// <summary>
+        /// Removes a stored user. Must be called when a user is changed. Users that
+        /// are being loaded when this is called are not stored.
+        /// Only the cache of the current service is changed.
+        /// </summary>
+        /// <param name="hashedId">Hashed id of the user (not case sensitive).</param>
+        public void Invalidate(string hashedId)
+        {
+            var normalizedHashedId = NormalizeHashedId(hashedId);
+            if (normalizedHashedId == null) return;
+            Interlocked.Increment(ref this._generation);
+            this._users.TryRemove(normalizedHashedId, out _);
+        }
+
+        /// <summary>
+        /// Removes all the stored users.
+        /// </summary>
+        public void Clear()
+        {
+            Interlocked.Increment(ref this._generation);
+            this._users.Clear();
+        }
+
+        /// <summary>
+        /// Removes the expired users and the oldest users to make room for new users.
+        /// </summary>
+        private void RemoveOldest()
+        {
+            // Remove the expired users.
+            var expireTime = DateTime.Now.AddSeconds(-this.MaxUserDuration);
+            foreach (var (hashedId, user) in this._users)
+            {
+                if (user.CacheTime >= expireTime) continue;
+                if (this._users.TryRemove(new KeyValuePair<string, CachedUser>(hashedId, user)))
+                {
+                    Interlocked.Increment(ref this._evictions);
+                }
+            }
+            if (this._users.Count < this.MaxUsers) return;
+
+            // Remove the oldest tenth of the users.
+            var usersToRemove = Math.Max(1, this.MaxUsers / 10);
+            foreach (var (hashedId, user) in this._users.OrderBy(pair => pair.Value.CacheTime).Take(usersToRemove).ToList())
+            {
+                if (this._users.TryRemove(new KeyValuePair<string, CachedUser>(hashedId, user)))
+                {
+                    Interlocked.Increment(ref this._evictions);
+                }
+            }
+        }
+    }
+}
@@ -1,8 +1,12 @@
 using System;
 using System.Collections.Generic;
+using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Construct.Core.Database.Model;
+using Construct.Core.Logging;
 using Microsoft.EntityFrameworkCore;
+using Microsoft.EntityFrameworkCore.ChangeTracking;
 using Newtonsoft.Json;
 using Nexus.Logging.Entry;
 
@@ -40,12 +44,329 @@ namespace Construct.Core.Database.Context
         /// </summary>
         public DbSet<PrintMaterial> PrintMaterials { get; set; }
         
+        /// <summary>
+        /// Print totals of the users in the database.
+        /// </summary>
+        public DbSet<UserPrintTotals> UserPrintTotals { get; set; }
+        
+        /// <summary>
+        /// Print receipts in the database that haven't been sent.
+        /// </summary>
+        public DbSet<PendingPrintReceipt> PendingPrintReceipts { get; set; }
+
+        /// <summary>
+        /// Event for when visit logs are saved by any context in the process.
+        /// Handlers are called on the thread that saved the changes and must not block.
+        /// </summary>
+        public static event Action VisitLogsAdded;
+        
+        /// <summary>
+        /// SQL for adding to the print totals of a user, creating the totals if they don't exist.
+        /// The identifiers are quoted so that it works with SQLite and PostgreSQL.
+        /// </summary>
+        private const string AddPrintTotalsSql = "INSERT INTO \"UserPrintTotals\" (\"HashedId\", \"TotalPrints\", \"TotalWeight\", \"OwedPrints\", \"OwedWeight\", \"OwedCost\") " +
+                                                 "VALUES ({0}, {1}, {2}, {3}, {4}, {5}) ON CONFLICT (\"HashedId\") DO UPDATE SET " +
+                                                 "\"TotalPrints\" = \"UserPrintTotals\".\"TotalPrints\" + excluded.\"TotalPrints\", " +
+                                                 "\"TotalWeight\" = \"UserPrintTotals\".\"TotalWeight\" + excluded.\"TotalWeight\", " +
+                                                 "\"OwedPrints\" = \"UserPrintTotals\".\"OwedPrints\" + excluded.\"OwedPrints\", " +
+                                                 "\"OwedWeight\" = \"UserPrintTotals\".\"OwedWeight\" + excluded.\"OwedWeight\", " +
+                                                 "\"OwedCost\" = \"UserPrintTotals\".\"OwedCost\" + excluded.\"OwedCost\"";
+        
+        /// <summary>
+        /// Rows updated in each transaction when filling the lookup columns of existing rows.
+        /// </summary>
+        private const int FillNormalizedColumnsBatchSize = 1000;
+        
+        /// <summary>
+        /// Creates the context.
+        /// </summary>
+        /// <param name="options">Options of the context.</param>
+        protected BaseContext(DbContextOptions options) : base(options)
+        {
+            
+        }
+        
+        /// <summary>
+        /// Configures the models of the context.
+        /// </summary>
+        /// <param name="modelBuilder">Builder for the models.</param>
+        protected override void OnModelCreating(ModelBuilder modelBuilder)
+        {
+            base.OnModelCreating(modelBuilder);
+            
+            // Add the indexes for the lookup columns.
+            modelBuilder.Entity<User>().HasIndex(user => user.NormalizedHashedId);
+            modelBuilder.Entity<User>().HasIndex(user => user.NormalizedEmail);
+            modelBuilder.Entity<User>().HasIndex(user => user.NormalizedName);
+            modelBuilder.Entity<PrintLog>().HasIndex(printLog => printLog.NormalizedFileName);
+            modelBuilder.Entity<PrintLog>().HasIndex(printLog => printLog.NormalizedBillTo);
+            modelBuilder.Entity<PrintLog>().HasIndex(printLog => printLog.Time);
+            modelBuilder.Entity<VisitLog>().HasIndex(visitLog => visitLog.Time);
+            
+            // Add the relationship for the print totals.
+            modelBuilder.Entity<UserPrintTotals>().HasOne(totals => totals.User)
+                .WithOne(user => user.PrintTotals)
+                .HasForeignKey<UserPrintTotals>(totals => totals.HashedId);
+            
+            // Add the indexes for the pending print receipts.
+            modelBuilder.Entity<PendingPrintReceipt>().HasIndex(receipt => receipt.PrintLogKey).IsUnique();
+            modelBuilder.Entity<PendingPrintReceipt>().HasIndex(receipt => receipt.NextAttemptTime);
+        }
+
+        /// <summary>
+        /// Sets the lower case lookup columns of the added and changed entries.
+        /// </summary>
+        private void SetNormalizedColumns()
+        {
+            foreach (var entry in this.ChangeTracker.Entries())
+            {
+                if (entry.State != EntityState.Added && entry.State != EntityState.Modified) continue;
+                if (entry.Entity is User user)
+                {
+                    user.NormalizedHashedId = ConstructContext.Normalize(user.HashedId);
+                    user.NormalizedName = ConstructContext.Normalize(user.Name);
+                    user.NormalizedEmail = ConstructContext.Normalize(user.Email);
+                }
+                else if (entry.Entity is PrintLog printLog)
+                {
+                    printLog.NormalizedFileName = ConstructContext.Normalize(printLog.FileName);
+                    printLog.NormalizedBillTo = ConstructContext.Normalize(printLog.BillTo);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Adds the values of a print log to the changes of the print totals.
+        /// </summary>
+        /// <param name="printTotalChanges">Changes of the print totals by the hashed id of the user.</param>
+        /// <param name="values">Values of the print log.</param>
+        /// <param name="multiplier">1 to add the print log, or -1 to remove it.</param>
+        private static void AddPrintTotalChange(Dictionary<string, UserPrintTotals> printTotalChanges, PropertyValues values, int multiplier)
+        {
+            // Return if the print has no user.
+            var hashedId = values.GetValue<string>("UserHashedId");
+            if (hashedId == null) return;
+            
+            // Add the print log.
+            if (!printTotalChanges.TryGetValue(hashedId, out var printTotalChange))
+            {
+                printTotalChange = new UserPrintTotals()
+                {
+                    HashedId = hashedId,
+                };
+                printTotalChanges[hashedId] = printTotalChange;
+            }
+            var weight = values.GetValue<float>(nameof(PrintLog.WeightGrams));
+            printTotalChange.TotalPrints += multiplier;
+            printTotalChange.TotalWeight += multiplier * weight;
+            if (!values.GetValue<bool>(nameof(PrintLog.Owed))) return;
+            printTotalChange.OwedPrints += multiplier;
+            printTotalChange.OwedWeight += multiplier * weight;
+            printTotalChange.OwedCost += multiplier * values.GetValue<float>(nameof(PrintLog.Cost));
+        }
+        
+        /// <summary>
+        /// Returns the changes to the print totals of the users from the
+        /// added, changed, and removed print logs.
+        /// </summary>
+        /// <returns>The changes of the print totals.</returns>
+        private List<UserPrintTotals> GetPrintTotalChanges()
+        {
+            var printTotalChanges = new Dictionary<string, UserPrintTotals>();
+            foreach (var entry in this.ChangeTracker.Entries<PrintLog>())
+            {
+                if (entry.State == EntityState.Added || entry.State == EntityState.Modified)
+                {
+                    AddPrintTotalChange(printTotalChanges, entry.CurrentValues, 1);
+                }
+                if (entry.State == EntityState.Deleted || entry.State == EntityState.Modified)
+                {
+                    AddPrintTotalChange(printTotalChanges, entry.OriginalValues, -1);
+                }
+            }
+            return printTotalChanges.Values.Where(change => change.TotalPrints != 0 || change.TotalWeight != 0 || change.OwedPrints != 0 || change.OwedWeight != 0 || change.OwedCost != 0).ToList();
+        }
+        
+        /// <summary>
+        /// Returns the parameters for adding a change of the print totals.
+        /// </summary>
+        /// <param name="printTotalChange">Change of the print totals.</param>
+        /// <returns>The parameters for AddPrintTotalsSql.</returns>
+        private static object[] GetPrintTotalParameters(UserPrintTotals printTotalChange)
+        {
+            return new object[]
+            {
+                printTotalChange.HashedId,
+                printTotalChange.TotalPrints,
+                printTotalChange.TotalWeight,
+                printTotalChange.OwedPrints,
+                printTotalChange.OwedWeight,
+                printTotalChange.OwedCost,
+            };
+        }
+        
+        /// <summary>
+        /// Returns if there are visit logs that will be added when the changes are saved.
+        /// </summary>
+        /// <returns>Whether visit logs are being added.</returns>
+        private bool HasAddedVisitLogs()
+        {
+            return this.ChangeTracker.Entries<VisitLog>().Any(entry => entry.State == EntityState.Added);
+        }
+
+        /// <summary>
+        /// Invokes the events for the saved changes.
+        /// </summary>
+        /// <param name="visitLogsAdded">Whether visit logs were added.</param>
+        private static void OnSaved(bool visitLogsAdded)
+        {
+            if (!visitLogsAdded) return;
+            VisitLogsAdded?.Invoke();
+        }
+
+        /// <summary>
+        /// Saves the changes to the database.
+        /// The print totals of the users are updated in the same transaction.
+        /// </summary>
+        /// <param name="acceptAllChangesOnSuccess">Whether to accept the changes after saving.</param>
+        /// <returns>The number of entries written.</returns>
+        public override int SaveChanges(bool acceptAllChangesOnSuccess)
+        {
+            // Save the changes if no print totals are changed.
+            this.SetNormalizedColumns();
+            var visitLogsAdded = this.HasAddedVisitLogs();
+            var printTotalChanges = this.GetPrintTotalChanges();
+            if (printTotalChanges.Count == 0)
+            {
+                var changes = base.SaveChanges(acceptAllChangesOnSuccess);
+                OnSaved(visitLogsAdded);
+                return changes;
+            }
+            
+            // Save the changes and the print totals.
+            int result;
+            using (var transaction = (this.Database.CurrentTransaction == null ? this.Database.BeginTransaction() : null))
+            {
+                result = base.SaveChanges(acceptAllChangesOnSuccess);
+                foreach (var printTotalChange in printTotalChanges)
+                {
+                    this.Database.ExecuteSqlRaw(AddPrintTotalsSql, GetPrintTotalParameters(printTotalChange));
+                }
+                transaction?.Commit();
+            }
+            OnSaved(visitLogsAdded);
+            return result;
+        }
+
+        /// <summary>
+        /// Saves the changes to the database.
+        /// The print totals of the users are updated in the same transaction.
+        /// </summary>
+        /// <param name="acceptAllChangesOnSuccess">Whether to accept the changes after saving.</param>
+        /// <param name="cancellationToken">Token for cancelling saving.</param>
+        /// <returns>The number of entries written.</returns>
+        public override async Task<int> SaveChangesAsync(bool acceptAllChangesOnSuccess, CancellationToken cancellationToken = default)
+        {
+            // Save the changes if no print totals are changed.
+            this.SetNormalizedColumns();
+            var visitLogsAdded = this.HasAddedVisitLogs();
+            var printTotalChanges = this.GetPrintTotalChanges();
+            if (printTotalChanges.Count == 0)
+            {
+                var changes = await base.SaveChangesAsync(acceptAllChangesOnSuccess, cancellationToken).ConfigureAwait(false);
+                OnSaved(visitLogsAdded);
+                return changes;
+            }
+            
+            // Save the changes and the print totals.
+            int result;
+            await using (var transaction = (this.Database.CurrentTransaction == null ? await this.Database.BeginTransactionAsync(cancellationToken).ConfigureAwait(false) : null))
+            {
+                result = await base.SaveChangesAsync(acceptAllChangesOnSuccess, cancellationToken).ConfigureAwait(false);
+                foreach (var printTotalChange in printTotalChanges)
+                {
+                    await this.Database.ExecuteSqlRawAsync(AddPrintTotalsSql, GetPrintTotalParameters(printTotalChange), cancellationToken).ConfigureAwait(false);
+                }
+                if (transaction != null)
+                {
+                    await transaction.CommitAsync(cancellationToken).ConfigureAwait(false);
+                }
+            }
+            OnSaved(visitLogsAdded);
+            return result;
+        }
+        
+        /// <summary>
+        /// Fills the lookup columns of the users and print logs that don't have them. They are filled with
+        /// ConstructContext.Normalize instead of SQL lower(), which only changes ASCII letters with SQLite.
+        /// Only the rows without the columns are read, so filling that stopped partway continues the next time.
+        /// The print logs are updated with raw SQL so that the print totals aren't changed.
+        /// </summary>
+        private async Task FillNormalizedColumnsAsync()
+        {
+            // Fill the columns of the users.
+            var filledUsers = 0;
+            string lastHashedId = null;
+            while (true)
+            {
+                var users = await this.Users.AsNoTracking()
+                    .Where(user => user.NormalizedHashedId == null)
+                    .Where(user => lastHashedId == null || string.Compare(user.HashedId, lastHashedId) > 0)
+                    .OrderBy(user => user.HashedId)
+                    .Take(FillNormalizedColumnsBatchSize)
+                    .Select(user => new {user.HashedId, user.Name, user.Email})
+                    .ToListAsync().ConfigureAwait(false);
+                if (users.Count == 0) break;
+                await using (var transaction = await this.Database.BeginTransactionAsync().ConfigureAwait(false))
+                {
+                    foreach (var user in users)
+                    {
+                        await this.Database.ExecuteSqlInterpolatedAsync($"UPDATE \"Users\" SET \"NormalizedHashedId\" = {ConstructContext.Normalize(user.HashedId)}, \"NormalizedName\" = {ConstructContext.Normalize(user.Name)}, \"NormalizedEmail\" = {ConstructContext.Normalize(user.Email)} WHERE \"HashedId\" = {user.HashedId}").ConfigureAwait(false);
+                    }
+                    await transaction.CommitAsync().ConfigureAwait(false);
+                }
+                lastHashedId = users[^1].HashedId;
+                filledUsers += users.Count;
+            }
+            
+            // Fill the columns of the print logs.
+            var filledPrintLogs = 0;
+            var lastKey = 0L;
+            while (true)
+            {
+                var printLogs = await this.PrintLog.AsNoTracking()
+                    .Where(printLog => printLog.NormalizedFileName == null)
+                    .Where(printLog => printLog.Key > lastKey)
+                    .OrderBy(printLog => printLog.Key)
+                    .Take(FillNormalizedColumnsBatchSize)
+                    .Select(printLog => new {printLog.Key, printLog.FileName, printLog.BillTo})
+                    .ToListAsync().ConfigureAwait(false);
+                if (printLogs.Count == 0) break;
+                await using (var transaction = await this.Database.BeginTransactionAsync().ConfigureAwait(false))
+                {
+                    foreach (var printLog in printLogs)
+                    {
+                        await this.Database.ExecuteSqlInterpolatedAsync($"UPDATE \"PrintLog\" SET \"NormalizedFileName\" = {ConstructContext.Normalize(printLog.FileName)}, \"NormalizedBillTo\" = {ConstructContext.Normalize(printLog.BillTo)} WHERE \"Key\" = {printLog.Key}").ConfigureAwait(false);
+                    }
+                    await transaction.CommitAsync().ConfigureAwait(false);
+                }
+                lastKey = printLogs[^1].Key;
+                filledPrintLogs += printLogs.Count;
+            }
+            if (filledUsers > 0 || filledPrintLogs > 0)
+            {
+                Log.Info($"Filled the lookup columns of {filledUsers} users and {filledPrintLogs} print logs.");
+            }
+        }
+        
         /// <summary>
         /// Ensures that the database is migrated to the latest version.
+        /// The lookup columns of the rows without them are filled every time.
         /// </summary>
         public async Task EnsureUpToDateAsync()
         {
             await Database.MigrateAsync().ConfigureAwait(false);
+            await this.FillNormalizedColumnsAsync().ConfigureAwait(false);
         }
         
         /// <summary>
@@ -0,0 +1,122 @@
+using System.Data.Common;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Server;
+using Microsoft.EntityFrameworkCore.Diagnostics;
+
+namespace Construct.Core.Database.Context
+{
+    public class CommandMetricsInterceptor : DbCommandInterceptor
+    {
+        /// <summary>
+        /// Static interceptor instance to use. The interceptor has no state.
+        /// </summary>
+        private static CommandMetricsInterceptor _staticInterceptor;
+
+        /// <summary>
+        /// Returns a static instance of the interceptor.
+        /// </summary>
+        /// <returns>The static instance of the interceptor.</returns>
+        public static CommandMetricsInterceptor GetSingleton()
+        {
+            return _staticInterceptor ??= new CommandMetricsInterceptor();
+        }
+
+        /// <summary>
+        /// Records a reader command.
+        /// </summary>
+        /// <param name="command">Command that was run.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="result">Result of the command.</param>
+        public override DbDataReader ReaderExecuted(DbCommand command, CommandExecutedEventData eventData, DbDataReader result)
+        {
+            ServerMetrics.RecordCommand("reader", eventData.Duration);
+            return result;
+        }
+
+        /// <summary>
+        /// Records a reader command.
+        /// </summary>
+        /// <param name="command">Command that was run.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="result">Result of the command.</param>
+        /// <param name="cancellationToken">Token for cancelling the command.</param>
+        public override ValueTask<DbDataReader> ReaderExecutedAsync(DbCommand command, CommandExecutedEventData eventData, DbDataReader result, CancellationToken cancellationToken = default)
+        {
+            ServerMetrics.RecordCommand("reader", eventData.Duration);
+            return new ValueTask<DbDataReader>(result);
+        }
+
+        /// <summary>
+        /// Records a non-query command.
+        /// </summary>
+        /// <param name="command">Command that was run.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="result">Result of the command.</param>
+        public override int NonQueryExecuted(DbCommand command, CommandExecutedEventData eventData, int result)
+        {
+            ServerMetrics.RecordCommand("nonquery", eventData.Duration);
+            return result;
+        }
+
+        /// <summary>
+        /// Records a non-query command.
+        /// </summary>
+        /// <param name="command">Command that was run.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="result">Result of the command.</param>
+        /// <param name="cancellationToken">Token for cancelling the command.</param>
+        public override ValueTask<int> NonQueryExecutedAsync(DbCommand command, CommandExecutedEventData eventData, int result, CancellationToken cancellationToken = default)
+        {
+            ServerMetrics.RecordCommand("nonquery", eventData.Duration);
+            return new ValueTask<int>(result);
+        }
+
+        /// <summary>
+        /// Records a scalar command.
+        /// </summary>
+        /// <param name="command">Command that was run.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="result">Result of the command.</param>
+        public override object ScalarExecuted(DbCommand command, CommandExecutedEventData eventData, object result)
+        {
+            ServerMetrics.RecordCommand("scalar", eventData.Duration);
+            return result;
+        }
+
+        /// <summary>
+        /// Records a scalar command.
+        /// </summary>
+        /// <param name="command">Command that was run.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="result">Result of the command.</param>
+        /// <param name="cancellationToken">Token for cancelling the command.</param>
+        public override ValueTask<object> ScalarExecutedAsync(DbCommand command, CommandExecutedEventData eventData, object result, CancellationToken cancellationToken = default)
+        {
+            ServerMetrics.RecordCommand("scalar", eventData.Duration);
+            return new ValueTask<object>(result);
+        }
+
+        /// <summary>
+        /// Records a command that failed.
+        /// </summary>
+        /// <param name="command">Command that failed.</param>
+        /// <param name="eventData">Data of the event.</param>
+        public override void CommandFailed(DbCommand command, CommandErrorEventData eventData)
+        {
+            ServerMetrics.RecordCommand(eventData.ExecuteMethod.ToString().Replace("Execute", "").ToLower(), eventData.Duration, true);
+        }
+
+        /// <summary>
+        /// Records a command that failed.
+        /// </summary>
+        /// <param name="command">Command that failed.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="cancellationToken">Token for cancelling the command.</param>
+        public override Task CommandFailedAsync(DbCommand command, CommandErrorEventData eventData, CancellationToken cancellationToken = default)
+        {
+            ServerMetrics.RecordCommand(eventData.ExecuteMethod.ToString().Replace("Execute", "").ToLower(), eventData.Duration, true);
+            return Task.CompletedTask;
+        }
+    }
+}
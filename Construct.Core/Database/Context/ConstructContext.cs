@@ -1,12 +1,34 @@
 using System;
+using System.Data.Common;
+using System.Linq;
 using System.Threading.Tasks;
 using Construct.Core.Configuration;
 using Construct.Core.Database.Model;
 using Construct.Core.Logging;
 using Microsoft.EntityFrameworkCore;
+using Microsoft.EntityFrameworkCore.Infrastructure;
+using Microsoft.Extensions.DependencyInjection;
 
 namespace Construct.Core.Database.Context
 {
+    public class ContextPool : IDisposable
+    {
+        /// <summary>
+        /// Service provider that contains the pool.
+        /// </summary>
+        public ServiceProvider ServiceProvider { get; set; }
+        
+        /// <summary>
+        /// Creates a context from the pool.
+        /// </summary>
+        public Func<BaseContext> CreateContext { get; set; }
+        
+        /// <summary>
+        /// Disposes of the pool and the contexts in it.
+        /// </summary>
+        public void Dispose() => this.ServiceProvider?.Dispose();
+    }
+    
     public class ConstructContext : IAsyncDisposable, IDisposable
     {
         /// <summary>
@@ -39,33 +61,235 @@ namespace Construct.Core.Database.Context
         /// </summary>
         public DbSet<PrintMaterial> PrintMaterials => this._wrappedContext.PrintMaterials;
         
+        /// <summary>
+        /// Print totals of the users in the database.
+        /// Updated when print logs are saved.
+        /// </summary>
+        public DbSet<UserPrintTotals> UserPrintTotals => this._wrappedContext.UserPrintTotals;
+        
+        /// <summary>
+        /// Print receipts in the database that haven't been sent.
+        /// </summary>
+        public DbSet<PendingPrintReceipt> PendingPrintReceipts => this._wrappedContext.PendingPrintReceipts;
+        
+        /// <summary>
+        /// Database of the context. Used for raw SQL, transactions, and checking the migrations.
+        /// </summary>
+        public DatabaseFacade Database => this._wrappedContext.Database;
+        
+        /// <summary>
+        /// Escape character used by the LIKE patterns.
+        /// </summary>
+        public const string LikeEscapeCharacter = "\\";
+        
         /// <summary>
         /// Wrapped context used depending on the configuration.
         /// </summary>
         private readonly BaseContext _wrappedContext;
+        
+        /// <summary>
+        /// Lock for creating and removing the pools.
+        /// </summary>
+        private static readonly object ContextPoolLock = new object();
+        
+        /// <summary>
+        /// Pool the contexts are created from.
+        /// </summary>
+        private static volatile ContextPool _contextPool;
+        
+        /// <summary>
+        /// Pool the read-only contexts are created from. Same as the pool of
+        /// the contexts if read-only contexts don't have separate connections.
+        /// </summary>
+        private static volatile ContextPool _readOnlyContextPool;
+        
+        /// <summary>
+        /// Compiled query for a user and their permissions by the normalized hashed id.
+        /// </summary>
+        private static readonly Func<BaseContext, string, Task<User>> GetUserQuery = EF.CompileAsyncQuery((BaseContext context, string normalizedHashedId) =>
+            context.Users.AsNoTracking().Include(user => user.Permissions).FirstOrDefault(user => user.NormalizedHashedId == normalizedHashedId));
+        
+        /// <summary>
+        /// Compiled query for a user by the normalized email.
+        /// </summary>
+        private static readonly Func<BaseContext, string, Task<User>> GetUserByEmailQuery = EF.CompileAsyncQuery((BaseContext context, string normalizedEmail) =>
+            context.Users.FirstOrDefault(user => user.NormalizedEmail == normalizedEmail));
+        
+        /// <summary>
+        /// Compiled query for the last print of a user.
+        /// </summary>
+        private static readonly Func<BaseContext, string, Task<PrintLog>> GetLastPrintQuery = EF.CompileAsyncQuery((BaseContext context, string hashedId) =>
+            context.PrintLog.AsNoTracking().Where(printLog => printLog.User.HashedId == hashedId).OrderByDescending(printLog => printLog.Time).FirstOrDefault());
+        
+        /// <summary>
+        /// Compiled query for the print totals of a user.
+        /// </summary>
+        private static readonly Func<BaseContext, string, Task<UserPrintTotals>> GetPrintTotalsQuery = EF.CompileAsyncQuery((BaseContext context, string hashedId) =>
+            context.UserPrintTotals.AsNoTracking().FirstOrDefault(totals => totals.HashedId == hashedId));
 
         /// <summary>
-        /// Creates the Construct Context.
+        /// Returns the lower case form of a string used by the lookup columns
+        /// (like User.NormalizedHashedId).
         /// </summary>
-        public ConstructContext()
+        /// <param name="value">String to normalize.</param>
+        /// <returns>The normalized string.</returns>
+        public static string Normalize(string value)
         {
-            // Get the provider.
-            var provider = ConstructConfiguration.Configuration.Database.Provider?.ToLower();
-            Log.Trace($"Getting context with provider {provider}");
+            return value?.ToLowerInvariant();
+        }
+
+        /// <summary>
+        /// Returns a LIKE pattern for finding a string anywhere in a column.
+        /// Used instead of string.Contains so that trigram indexes can be used.
+        /// </summary>
+        /// <param name="search">String to search for.</param>
+        /// <returns>The LIKE pattern, escaped with LikeEscapeCharacter.</returns>
+        public static string GetContainsPattern(string search)
+        {
+            return "%" + (search ?? "").Replace("\\", "\\\\").Replace("%", "\\%").Replace("_", "\\_") + "%";
+        }
+        
+        /// <summary>
+        /// Creates a pool of contexts for the current database configuration.
+        /// </summary>
+        /// <param name="provider">Provider of the database.</param>
+        /// <param name="readOnly">Whether the contexts use read-only connections.</param>
+        /// <returns>The pool of the contexts.</returns>
+        private static ContextPool CreateContextPool(string provider, bool readOnly)
+        {
+            // Get the connection string for the provider.
+            var connectionString = provider switch
+            {
+                "sqlite" => SqliteContext.GetConnectionString(readOnly),
+                "postgres" or "postgresql" => PostgresContext.GetConnectionString(),
+                _ => null,
+            };
+            if (connectionString == null)
+            {
+                Log.Error($"Unsupported database provider: {provider}");
+                throw new InvalidOperationException($"Unsupported database provider: {provider}");
+            }
             
-            // Set the context.
+            // Create the pool.
+            var poolSize = Math.Max(1, ConstructConfiguration.Configuration.Database.ContextPoolSize);
+            Log.Debug($"Creating {(readOnly ? "read-only " : "")}context pool with provider {provider} and size {poolSize}");
+            var services = new ServiceCollection();
             if (provider == "sqlite")
             {
-                this._wrappedContext = new SqliteContext();
-            } else if (provider == "postgres" || provider == "postgresql")
-            {
-                this._wrappedContext = new PostgresContext();
+                services.AddPooledDbContextFactory<SqliteContext>(options => SqliteContext.Configure(options, connectionString, readOnly), poolSize);
             }
             else
             {
-                Log.Error($"Unsupported database provider: {provider}");
-                throw new InvalidOperationException($"Unsupported database provider: {provider}");
+                services.AddPooledDbContextFactory<PostgresContext>(options => PostgresContext.Configure(options, connectionString), poolSize);
             }
+            var serviceProvider = services.BuildServiceProvider();
+            return new ContextPool()
+            {
+                ServiceProvider = serviceProvider,
+                CreateContext = provider == "sqlite"
+                    ? serviceProvider.GetRequiredService<IDbContextFactory<SqliteContext>>().CreateDbContext
+                    : serviceProvider.GetRequiredService<IDbContextFactory<PostgresContext>>().CreateDbContext,
+            };
+        }
+        
+        /// <summary>
+        /// Returns the pool to create the contexts from. The pools are created the first
+        /// time from the database configuration and kept until ResetContextPools is called.
+        /// Reloading the configuration keeps the Database section, so they don't need to change.
+        /// </summary>
+        /// <param name="readOnly">Whether the contexts should only read.</param>
+        /// <returns>The pool of the contexts.</returns>
+        private static ContextPool GetContextPool(bool readOnly)
+        {
+            // Return the pool if it was created.
+            var contextPool = (readOnly ? _readOnlyContextPool : _contextPool);
+            if (contextPool != null) return contextPool;
+            
+            // Create the pools.
+            // Read-only connections are only separate for Sqlite, where reads can hold up writes.
+            lock (ContextPoolLock)
+            {
+                if (_contextPool == null)
+                {
+                    var provider = ConstructConfiguration.Configuration.Database.Provider?.ToLower();
+                    var newContextPool = CreateContextPool(provider, false);
+                    _readOnlyContextPool = (provider == "sqlite" && ConstructConfiguration.Configuration.Database.SqliteReadOnlyConnections
+                        ? CreateContextPool(provider, true) : newContextPool);
+                    _contextPool = newContextPool;
+                }
+                return (readOnly ? _readOnlyContextPool : _contextPool);
+            }
+        }
+        
+        /// <summary>
+        /// Disposes of the pools so that they are created again with the current database
+        /// configuration. Used when the Database configuration is changed in the process,
+        /// like in tests. Contexts that are still open are disposed without being reused.
+        /// </summary>
+        public static void ResetContextPools()
+        {
+            lock (ContextPoolLock)
+            {
+                var contextPool = _contextPool;
+                var readOnlyContextPool = _readOnlyContextPool;
+                _contextPool = null;
+                _readOnlyContextPool = null;
+                contextPool?.Dispose();
+                if (readOnlyContextPool != contextPool)
+                {
+                    readOnlyContextPool?.Dispose();
+                }
+            }
+        }
+        
+        /// <summary>
+        /// Creates the Construct Context.
+        /// </summary>
+        /// <param name="readOnly">Whether the context only reads. With Sqlite, read-only contexts use
+        /// separate connections that can't save changes so that long reads don't hold up writes.</param>
+        public ConstructContext(bool readOnly = false)
+        {
+            this._wrappedContext = GetContextPool(readOnly).CreateContext();
+        }
+        
+        /// <summary>
+        /// Returns a user and their permissions without tracking changes.
+        /// </summary>
+        /// <param name="hashedId">Hashed id of the user (not case sensitive).</param>
+        /// <returns>The user, if it exists.</returns>
+        public Task<User> GetUserAsync(string hashedId)
+        {
+            return GetUserQuery(this._wrappedContext, Normalize(hashedId));
+        }
+        
+        /// <summary>
+        /// Returns a user for an email. Changes to the user are tracked.
+        /// </summary>
+        /// <param name="email">Email of the user (not case sensitive).</param>
+        /// <returns>The user, if it exists.</returns>
+        public Task<User> GetUserByEmailAsync(string email)
+        {
+            return GetUserByEmailQuery(this._wrappedContext, Normalize(email));
+        }
+        
+        /// <summary>
+        /// Returns the last print of a user without tracking changes.
+        /// </summary>
+        /// <param name="hashedId">Hashed id of the user as stored in the database.</param>
+        /// <returns>The last print, if the user has any.</returns>
+        public Task<PrintLog> GetLastPrintAsync(string hashedId)
+        {
+            return GetLastPrintQuery(this._wrappedContext, hashedId);
+        }
+        
+        /// <summary>
+        /// Returns the print totals of a user without tracking changes.
+        /// </summary>
+        /// <param name="hashedId">Hashed id of the user as stored in the database.</param>
+        /// <returns>The print totals, if the user has any.</returns>
+        public Task<UserPrintTotals> GetPrintTotalsAsync(string hashedId)
+        {
+            return GetPrintTotalsQuery(this._wrappedContext, hashedId);
         }
         
         /// <summary>
@@ -76,6 +300,26 @@ namespace Construct.Core.Database.Context
             await this._wrappedContext.EnsureUpToDateAsync().ConfigureAwait(false);
         }
         
+        /// <summary>
+        /// Returns if the database can be connected to.
+        /// </summary>
+        public async Task<bool> CanConnectAsync()
+        {
+            return await this._wrappedContext.Database.CanConnectAsync().ConfigureAwait(false);
+        }
+        
+        /// <summary>
+        /// Opens and returns the connection of the context. The connection is
+        /// closed when the context is disposed. Used for bulk loading data
+        /// without tracking the entities.
+        /// </summary>
+        /// <returns>The open connection to the database.</returns>
+        public async Task<DbConnection> OpenConnectionAsync()
+        {
+            await this._wrappedContext.Database.OpenConnectionAsync().ConfigureAwait(false);
+            return this._wrappedContext.Database.GetDbConnection();
+        }
+        
         /// <summary>
         /// Saves the changes to the database.
         /// </summary>
@@ -86,7 +330,6 @@ namespace Construct.Core.Database.Context
         /// </summary>
         public Task SaveChangesAsync() => this._wrappedContext.SaveChangesAsync();
         
-        
         /// <summary>
         /// Disposes of the context.
         /// </summary>
@@ -0,0 +1,38 @@
+using System.Diagnostics.CodeAnalysis;
+using Microsoft.EntityFrameworkCore;
+using Microsoft.EntityFrameworkCore.Design;
+
+namespace Construct.Core.Database.Context
+{
+    [ExcludeFromCodeCoverage]
+    public class SqliteDesignTimeContextFactory : IDesignTimeDbContextFactory<SqliteContext>
+    {
+        /// <summary>
+        /// Creates the context for the Entity Framework tools (like creating migrates).
+        /// </summary>
+        /// <param name="args">Arguments from the tools.</param>
+        /// <returns>The context to use.</returns>
+        public SqliteContext CreateDbContext(string[] args)
+        {
+            var optionsBuilder = new DbContextOptionsBuilder<SqliteContext>();
+            SqliteContext.Configure(optionsBuilder, SqliteContext.GetConnectionString());
+            return new SqliteContext(optionsBuilder.Options);
+        }
+    }
+
+    [ExcludeFromCodeCoverage]
+    public class PostgresDesignTimeContextFactory : IDesignTimeDbContextFactory<PostgresContext>
+    {
+        /// <summary>
+        /// Creates the context for the Entity Framework tools (like creating migrates).
+        /// </summary>
+        /// <param name="args">Arguments from the tools.</param>
+        /// <returns>The context to use.</returns>
+        public PostgresContext CreateDbContext(string[] args)
+        {
+            var optionsBuilder = new DbContextOptionsBuilder<PostgresContext>();
+            PostgresContext.Configure(optionsBuilder, PostgresContext.GetConnectionString());
+            return new PostgresContext(optionsBuilder.Options);
+        }
+    }
+}
@@ -1,4 +1,6 @@
+using System;
 using Construct.Core.Configuration;
+using Construct.Core.Database.Model;
 using Microsoft.EntityFrameworkCore;
 
 namespace Construct.Core.Database.Context
@@ -6,25 +8,69 @@ namespace Construct.Core.Database.Context
     public class PostgresContext : BaseContext
     {
         /// <summary>
-        /// Configures the context.
+        /// Creates the context.
         /// </summary>
-        /// <param name="optionsBuilder">Builder for the context options.</param>
-        protected override void OnConfiguring(DbContextOptionsBuilder optionsBuilder)
+        /// <param name="options">Options of the context.</param>
+        public PostgresContext(DbContextOptions<PostgresContext> options) : base(options)
+        {
+            
+        }
+        
+        /// <summary>
+        /// Returns the connection string for the configuration.
+        /// </summary>
+        /// <returns>The connection string to use.</returns>
+        public static string GetConnectionString()
         {
             // Get the source.
             // The default source is set up for the CreateMigrate.py script.
+            var configuration = ConstructConfiguration.Configuration.Database;
             var dataSource = "Host=localhost:39468";
-            if (ConstructConfiguration.Configuration.Database.Source != null)
+            if (configuration.Source != null)
             {
-                dataSource = $"Host={ConstructConfiguration.Configuration.Database.Source};" +
-                             (ConstructConfiguration.Configuration.Database.SourcePort.HasValue ? $"Port={ConstructConfiguration.Configuration.Database.SourcePort};" : "")+
-                             $"Database={ConstructConfiguration.Configuration.Database.SourceDatabase};" +
-                             $"Username={ConstructConfiguration.Configuration.Database.Username};" +
-                             $"Password={ConstructConfiguration.Configuration.Database.Password}";
+                dataSource = $"Host={configuration.Source};" +
+                             (configuration.SourcePort.HasValue ? $"Port={configuration.SourcePort};" : "")+
+                             $"Database={configuration.SourceDatabase};" +
+                             $"Username={configuration.Username};" +
+                             $"Password={configuration.Password}";
             }
             
-            // Set up the source.
-            optionsBuilder.UseNpgsql(dataSource);
+            // Add the connection pool settings.
+            var minimumPoolSize = Math.Max(0, configuration.MinimumConnectionPoolSize);
+            var maximumPoolSize = Math.Max(Math.Max(1, minimumPoolSize), configuration.MaximumConnectionPoolSize);
+            return dataSource + $";Minimum Pool Size={minimumPoolSize};" +
+                   $"Maximum Pool Size={maximumPoolSize};" +
+                   $"Connection Idle Lifetime={Math.Max(1, configuration.ConnectionIdleLifetime)}";
+        }
+        
+        /// <summary>
+        /// Configures the options for the context.
+        /// </summary>
+        /// <param name="optionsBuilder">Builder for the context options.</param>
+        /// <param name="connectionString">Connection string to use.</param>
+        public static void Configure(DbContextOptionsBuilder optionsBuilder, string connectionString)
+        {
+            optionsBuilder.UseNpgsql(connectionString).AddInterceptors(CommandMetricsInterceptor.GetSingleton());
+        }
+
+        /// <summary>
+        /// Configures the models of the context.
+        /// </summary>
+        /// <param name="modelBuilder">Builder for the models.</param>
+        protected override void OnModelCreating(ModelBuilder modelBuilder)
+        {
+            base.OnModelCreating(modelBuilder);
+            
+            // Add the trigram indexes for searching with LIKE.
+            modelBuilder.HasPostgresExtension("pg_trgm");
+            modelBuilder.Entity<User>().HasIndex(user => user.NormalizedName, "IX_Users_NormalizedName_Trigram")
+                .HasMethod("gin").HasOperators("gin_trgm_ops");
+            modelBuilder.Entity<User>().HasIndex(user => user.NormalizedEmail, "IX_Users_NormalizedEmail_Trigram")
+                .HasMethod("gin").HasOperators("gin_trgm_ops");
+            modelBuilder.Entity<PrintLog>().HasIndex(printLog => printLog.NormalizedFileName, "IX_PrintLog_NormalizedFileName_Trigram")
+                .HasMethod("gin").HasOperators("gin_trgm_ops");
+            modelBuilder.Entity<PrintLog>().HasIndex(printLog => printLog.NormalizedBillTo, "IX_PrintLog_NormalizedBillTo_Trigram")
+                .HasMethod("gin").HasOperators("gin_trgm_ops");
         }
     }
 }
\ No newline at end of file
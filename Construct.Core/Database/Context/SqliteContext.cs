@@ -1,3 +1,4 @@
+using System;
 using Construct.Core.Configuration;
 using Construct.Core.Logging;
 using Microsoft.EntityFrameworkCore;
@@ -12,10 +13,20 @@ namespace Construct.Core.Database.Context
         private static bool _warningOutput = false;
         
         /// <summary>
-        /// Configures the context.
+        /// Creates the context.
         /// </summary>
-        /// <param name="optionsBuilder">Builder for the context options.</param>
-        protected override void OnConfiguring(DbContextOptionsBuilder optionsBuilder)
+        /// <param name="options">Options of the context.</param>
+        public SqliteContext(DbContextOptions<SqliteContext> options) : base(options)
+        {
+            
+        }
+        
+        /// <summary>
+        /// Returns the connection string for the configuration.
+        /// </summary>
+        /// <param name="readOnly">Whether the connections are read-only.</param>
+        /// <returns>The connection string to use.</returns>
+        public static string GetConnectionString(bool readOnly = false)
         {
             // Get the source.
             var source = "database.sqlite";
@@ -29,8 +40,21 @@ namespace Construct.Core.Database.Context
                 Log.Warn($"Database source not set for Sqlite. Defaulting to {source}");
             }
             
-            // Set up the source.
-            optionsBuilder.UseSqlite($"Data Source=\"{source}\"");
+            // Return the connection string.
+            // The busy timeout is set with the default timeout, which is in seconds.
+            var timeout = (Math.Max(0, ConstructConfiguration.Configuration.Database.SqliteBusyTimeout) + 999) / 1000;
+            return $"Data Source=\"{source}\";Default Timeout={timeout}" + (readOnly ? ";Mode=ReadOnly" : "");
+        }
+        
+        /// <summary>
+        /// Configures the options for the context.
+        /// </summary>
+        /// <param name="optionsBuilder">Builder for the context options.</param>
+        /// <param name="connectionString">Connection string to use.</param>
+        /// <param name="readOnly">Whether the connections are read-only.</param>
+        public static void Configure(DbContextOptionsBuilder optionsBuilder, string connectionString, bool readOnly = false)
+        {
+            optionsBuilder.UseSqlite(connectionString).AddInterceptors(new SqlitePragmaInterceptor(readOnly), CommandMetricsInterceptor.GetSingleton());
         }
     }
-}
\ No newline at end of file
+}
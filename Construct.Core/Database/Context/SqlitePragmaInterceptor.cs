@@ -0,0 +1,110 @@
+using System.Collections.Generic;
+using System.Data.Common;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Logging;
+using Microsoft.EntityFrameworkCore.Diagnostics;
+
+namespace Construct.Core.Database.Context
+{
+    public class SqlitePragmaInterceptor : DbConnectionInterceptor
+    {
+        /// <summary>
+        /// Journal modes that can be configured.
+        /// </summary>
+        private static readonly HashSet<string> JournalModes = new HashSet<string>() { "delete", "truncate", "persist", "memory", "wal", "off" };
+        
+        /// <summary>
+        /// Synchronous levels that can be configured.
+        /// </summary>
+        private static readonly HashSet<string> SynchronousLevels = new HashSet<string>() { "off", "normal", "full", "extra" };
+        
+        /// <summary>
+        /// SQL run once when the first connection is opened.
+        /// </summary>
+        private readonly string _databaseSql;
+        
+        /// <summary>
+        /// SQL run every time a connection is opened. Null if nothing needs to be run.
+        /// Microsoft.Data.Sqlite doesn't pool connections, so every query opens a connection
+        /// and only settings that must be set for each connection are included.
+        /// </summary>
+        private readonly string _connectionSql;
+        
+        /// <summary>
+        /// Whether the database SQL has been run. 1 if it has been run.
+        /// </summary>
+        private int _databaseSqlRun;
+        
+        /// <summary>
+        /// Creates the interceptor for the configuration.
+        /// </summary>
+        /// <param name="readOnly">Whether the connections are read-only.</param>
+        public SqlitePragmaInterceptor(bool readOnly)
+        {
+            // Add the synchronous level. The busy timeout is set in the connection string.
+            var configuration = ConstructConfiguration.Configuration.Database;
+            var synchronous = configuration.SqliteSynchronous?.ToLower();
+            if (synchronous != null && SynchronousLevels.Contains(synchronous))
+            {
+                this._connectionSql = $"PRAGMA synchronous={synchronous};";
+            }
+            else if (synchronous != null)
+            {
+                Log.Warn($"Unsupported Sqlite synchronous level: {synchronous}");
+            }
+            
+            // Add the journal mode. Read-only connections can't change it.
+            var journalMode = configuration.SqliteJournalMode?.ToLower();
+            if (!readOnly && journalMode != null && JournalModes.Contains(journalMode))
+            {
+                this._databaseSql = $"PRAGMA journal_mode={journalMode};";
+            }
+            else if (!readOnly && journalMode != null)
+            {
+                Log.Warn($"Unsupported Sqlite journal mode: {journalMode}");
+            }
+            this._databaseSqlRun = (this._databaseSql == null ? 1 : 0);
+        }
+        
+        /// <summary>
+        /// Returns the SQL to run for a connection that was opened.
+        /// </summary>
+        /// <returns>The SQL to run, or null if there is nothing to run.</returns>
+        private string GetSql()
+        {
+            if (Interlocked.Exchange(ref this._databaseSqlRun, 1) == 1) return this._connectionSql;
+            return this._connectionSql + this._databaseSql;
+        }
+        
+        /// <summary>
+        /// Runs the pragmas after a connection is opened.
+        /// </summary>
+        /// <param name="connection">Connection that was opened.</param>
+        /// <param name="eventData">Data of the event.</param>
+        public override void ConnectionOpened(DbConnection connection, ConnectionEndEventData eventData)
+        {
+            var sql = this.GetSql();
+            if (sql == null) return;
+            using var command = connection.CreateCommand();
+            command.CommandText = sql;
+            command.ExecuteNonQuery();
+        }
+
+        /// <summary>
+        /// Runs the pragmas after a connection is opened.
+        /// </summary>
+        /// <param name="connection">Connection that was opened.</param>
+        /// <param name="eventData">Data of the event.</param>
+        /// <param name="cancellationToken">Token for cancelling the pragmas.</param>
+        public override async Task ConnectionOpenedAsync(DbConnection connection, ConnectionEndEventData eventData, CancellationToken cancellationToken = default)
+        {
+            var sql = this.GetSql();
+            if (sql == null) return;
+            await using var command = connection.CreateCommand();
+            command.CommandText = sql;
+            await command.ExecuteNonQueryAsync(cancellationToken).ConfigureAwait(false);
+        }
+    }
+}
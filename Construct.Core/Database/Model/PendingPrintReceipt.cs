@@ -0,0 +1,44 @@
+﻿using System;
+using System.ComponentModel.DataAnnotations;
+
+namespace Construct.Core.Database.Model
+{
+    public class PendingPrintReceipt
+    {
+        /// <summary>
+        /// Primary key used by Entity Framework. Not intended to be used for anything else.
+        /// </summary>
+        [Key]
+        public long Key { get; set; }
+        
+        /// <summary>
+        /// Key of the print log to send the receipt for. Each print log can only have 1 pending receipt.
+        /// </summary>
+        [Required]
+        public long PrintLogKey { get; set; }
+        
+        /// <summary>
+        /// Print log to send the receipt for.
+        /// </summary>
+        public PrintLog PrintLog { get; set; }
+        
+        /// <summary>
+        /// Attempts made to send the receipt.
+        /// </summary>
+        [Required]
+        public int Attempts { get; set; }
+        
+        /// <summary>
+        /// Time to next attempt to send the receipt. Changed when a service claims the
+        /// receipt so that services don't send the same receipt at the same time.
+        /// </summary>
+        [Required]
+        [ConcurrencyCheck]
+        public DateTime NextAttemptTime { get; set; }
+        
+        /// <summary>
+        /// Error of the last failed attempt.
+        /// </summary>
+        public string LastError { get; set; }
+    }
+}
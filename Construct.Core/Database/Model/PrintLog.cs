@@ -28,6 +28,12 @@ namespace Construct.Core.Database.Model
         [Required]
         public string FileName { get; set; }
         
+        /// <summary>
+        /// Lower case name of the file used for searching.
+        /// Set by the context when the print is saved.
+        /// </summary>
+        public string NormalizedFileName { get; set; }
+        
         /// <summary>
         /// Material that was printed with.
         /// </summary>
@@ -51,6 +57,12 @@ namespace Construct.Core.Database.Model
         /// </summary>
         public string BillTo { get; set; }
         
+        /// <summary>
+        /// Lower case id to bill to used for searching.
+        /// Set by the context when the print is saved.
+        /// </summary>
+        public string NormalizedBillTo { get; set; }
+        
         /// <summary>
         /// Cost of the print. Separate variable in price of the material changes.
         /// </summary>
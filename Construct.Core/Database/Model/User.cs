@@ -1,4 +1,4 @@
-using System;
+﻿using System;
 using System.Collections.Generic;
 using System.ComponentModel.DataAnnotations;
 
@@ -13,18 +13,36 @@ namespace Construct.Core.Database.Model
         [Required]
         public string HashedId { get; set; }
         
+        /// <summary>
+        /// Lower case hashed id of the user used for lookups.
+        /// Set by the context when the user is saved.
+        /// </summary>
+        public string NormalizedHashedId { get; set; }
+        
         /// <summary>
         /// Name of the user.
         /// </summary>
         [Required]
         public string Name { get; set; }
         
+        /// <summary>
+        /// Lower case name of the user used for searching.
+        /// Set by the context when the user is saved.
+        /// </summary>
+        public string NormalizedName { get; set; }
+        
         /// <summary>
         /// Email of the user.
         /// </summary>
         [Required]
         public string Email { get; set; }
         
+        /// <summary>
+        /// Lower case email of the user used for lookups and searching.
+        /// Set by the context when the user is saved.
+        /// </summary>
+        public string NormalizedEmail { get; set; }
+        
         /// <summary>
         /// Permissions of the user.
         /// </summary>
@@ -40,6 +58,12 @@ namespace Construct.Core.Database.Model
         /// </summary>
         public List<PrintLog> PrintLogs { get; set; }
         
+        /// <summary>
+        /// Totals of the print logs for the user.
+        /// Null if the user has never had a print.
+        /// </summary>
+        public UserPrintTotals PrintTotals { get; set; }
+        
         /// <summary>
         /// Visit logs for the user.
         /// </summary>
@@ -0,0 +1,49 @@
+﻿using System.ComponentModel.DataAnnotations;
+
+namespace Construct.Core.Database.Model
+{
+    public class UserPrintTotals
+    {
+        /// <summary>
+        /// Hashed id of the user the totals are for.
+        /// </summary>
+        [Key]
+        [Required]
+        public string HashedId { get; set; }
+        
+        /// <summary>
+        /// User the totals are for.
+        /// </summary>
+        public User User { get; set; }
+        
+        /// <summary>
+        /// Total prints of the user.
+        /// </summary>
+        [Required]
+        public int TotalPrints { get; set; }
+        
+        /// <summary>
+        /// Total weight of the prints of the user.
+        /// </summary>
+        [Required]
+        public double TotalWeight { get; set; }
+        
+        /// <summary>
+        /// Total prints of the user that are owed.
+        /// </summary>
+        [Required]
+        public int OwedPrints { get; set; }
+        
+        /// <summary>
+        /// Total weight of the prints of the user that are owed.
+        /// </summary>
+        [Required]
+        public double OwedWeight { get; set; }
+        
+        /// <summary>
+        /// Total cost of the prints of the user that are owed.
+        /// </summary>
+        [Required]
+        public double OwedCost { get; set; }
+    }
+}
@@ -0,0 +1,137 @@
+using System;
+using System.Linq;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Archive;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+using Microsoft.EntityFrameworkCore;
+
+namespace Construct.Core.Database
+{
+    public class PrintTotalsCheck
+    {
+        /// <summary>
+        /// Command line argument for running the check.
+        /// </summary>
+        public const string Argument = "--check-print-totals";
+
+        /// <summary>
+        /// Maximum difference of the weights and costs before the totals are incorrect.
+        /// </summary>
+        public const double Tolerance = 0.001;
+
+        /// <summary>
+        /// Returns if the print totals match the expected totals.
+        /// </summary>
+        /// <param name="totals">Stored print totals.</param>
+        /// <param name="expectedTotals">Print totals from the print logs.</param>
+        /// <returns>Whether the print totals match.</returns>
+        private static bool TotalsMatch(UserPrintTotals totals, UserPrintTotals expectedTotals)
+        {
+            return totals.TotalPrints == expectedTotals.TotalPrints
+                   && totals.OwedPrints == expectedTotals.OwedPrints
+                   && Math.Abs(totals.TotalWeight - expectedTotals.TotalWeight) < Tolerance
+                   && Math.Abs(totals.OwedWeight - expectedTotals.OwedWeight) < Tolerance
+                   && Math.Abs(totals.OwedCost - expectedTotals.OwedCost) < Tolerance;
+        }
+
+        /// <summary>
+        /// Checks the print totals of the users against the print logs, including
+        /// the archived print logs, and rebuilds the totals that are incorrect or missing.
+        /// The totals aren't checked if the archive is used but can't be read, since the
+        /// archived print logs would be removed from the totals.
+        /// </summary>
+        /// <returns>The total users with incorrect print totals.</returns>
+        public static async Task<int> RunAsync()
+        {
+            // Refuse to check the totals if the archive can't be read.
+            var archive = LogArchive.GetSingleton();
+            if (archive.IsConfigured || ConstructConfiguration.Configuration.Archive.Enabled)
+            {
+                var directoryError = archive.GetDirectoryError();
+                if (directoryError != null)
+                {
+                    Log.Error($"Not checking print totals: {directoryError}");
+                    throw new InvalidOperationException(directoryError);
+                }
+            }
+            
+            // Get the expected totals from the print logs.
+            Log.Info("Checking print totals.");
+            await using var context = new ConstructContext();
+            var expectedTotals = (await context.PrintLog.AsNoTracking()
+                .Where(printLog => EF.Property<string>(printLog, "UserHashedId") != null)
+                .GroupBy(printLog => EF.Property<string>(printLog, "UserHashedId"))
+                .Select(printLogs => new
+                {
+                    HashedId = printLogs.Key,
+                    TotalPrints = printLogs.Count(),
+                    TotalWeight = printLogs.Sum(printLog => (double) printLog.WeightGrams),
+                    OwedPrints = printLogs.Sum(printLog => printLog.Owed ? 1 : 0),
+                    OwedWeight = printLogs.Sum(printLog => printLog.Owed ? (double) printLog.WeightGrams : 0),
+                    OwedCost = printLogs.Sum(printLog => printLog.Owed ? (double) printLog.Cost : 0),
+                }).ToListAsync()).ToDictionary(totals => totals.HashedId, totals => new UserPrintTotals()
+                {
+                    HashedId = totals.HashedId,
+                    TotalPrints = totals.TotalPrints,
+                    TotalWeight = totals.TotalWeight,
+                    OwedPrints = totals.OwedPrints,
+                    OwedWeight = totals.OwedWeight,
+                    OwedCost = totals.OwedCost,
+                });
+            
+            // Add the archived print logs, which are still included in the totals.
+            await foreach (var printLog in archive.ReadPrintLogsAsync())
+            {
+                if (printLog.UserHashedId == null) continue;
+                if (!expectedTotals.TryGetValue(printLog.UserHashedId, out var userExpectedTotals))
+                {
+                    userExpectedTotals = new UserPrintTotals()
+                    {
+                        HashedId = printLog.UserHashedId,
+                    };
+                    expectedTotals[printLog.UserHashedId] = userExpectedTotals;
+                }
+                userExpectedTotals.TotalPrints += 1;
+                userExpectedTotals.TotalWeight += printLog.WeightGrams;
+                if (!printLog.Owed) continue;
+                userExpectedTotals.OwedPrints += 1;
+                userExpectedTotals.OwedWeight += printLog.WeightGrams;
+                userExpectedTotals.OwedCost += printLog.Cost;
+            }
+
+            // Correct or remove the stored totals.
+            var incorrectUsers = 0;
+            foreach (var totals in await context.UserPrintTotals.ToListAsync())
+            {
+                if (!expectedTotals.Remove(totals.HashedId, out var userExpectedTotals))
+                {
+                    userExpectedTotals = new UserPrintTotals();
+                }
+                if (TotalsMatch(totals, userExpectedTotals)) continue;
+                Log.Warn($"Print totals for {totals.HashedId} are incorrect (prints={totals.TotalPrints}, weight={totals.TotalWeight}, owedPrints={totals.OwedPrints}, owedWeight={totals.OwedWeight}, owedCost={totals.OwedCost}).");
+                totals.TotalPrints = userExpectedTotals.TotalPrints;
+                totals.TotalWeight = userExpectedTotals.TotalWeight;
+                totals.OwedPrints = userExpectedTotals.OwedPrints;
+                totals.OwedWeight = userExpectedTotals.OwedWeight;
+                totals.OwedCost = userExpectedTotals.OwedCost;
+                incorrectUsers += 1;
+            }
+
+            // Add the missing totals.
+            foreach (var totals in expectedTotals.Values)
+            {
+                Log.Warn($"Print totals for {totals.HashedId} are missing.");
+                context.UserPrintTotals.Add(totals);
+                incorrectUsers += 1;
+            }
+
+            // Save the totals.
+            await context.SaveChangesAsync();
+            Log.Info($"Checked print totals. Corrected {incorrectUsers} users.");
+            return incorrectUsers;
+        }
+    }
+}
@@ -0,0 +1,346 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Text;
+using System.Threading;
+using System.Threading.Channels;
+using System.Threading.Tasks;
+using Microsoft.Extensions.Logging;
+using Newtonsoft.Json;
+
+namespace Construct.Core.Logging
+{
+    public class JsonLogEntry
+    {
+        /// <summary>
+        /// Time the entry was logged.
+        /// </summary>
+        public DateTime Time { get; set; }
+
+        /// <summary>
+        /// Log level of the entry.
+        /// </summary>
+        public LogLevel Level { get; set; }
+
+        /// <summary>
+        /// Category of the entry, which is the name of the file that logged it.
+        /// </summary>
+        public string Category { get; set; }
+
+        /// <summary>
+        /// Message of the entry.
+        /// </summary>
+        public string Message { get; set; }
+
+        /// <summary>
+        /// Exception of the entry, if an exception was logged.
+        /// </summary>
+        public Exception Exception { get; set; }
+    }
+
+    public class JsonFileOutput : IDisposable
+    {
+        /// <summary>
+        /// Maximum time to wait for the queued entries to be written when the output is disposed.
+        /// </summary>
+        public static TimeSpan DisposeTimeout { get; set; } = TimeSpan.FromSeconds(5);
+
+        /// <summary>
+        /// File that the entries are written to.
+        /// </summary>
+        public string FileLocation { get; }
+
+        /// <summary>
+        /// Identifier of the service written with each entry.
+        /// </summary>
+        public string Identifier { get; set; }
+
+        /// <summary>
+        /// Minimum log level of the entries to write.
+        /// </summary>
+        public LogLevel MinimumLevel { get; set; } = LogLevel.Information;
+
+        /// <summary>
+        /// Size, in bytes, of the file before it is rotated. The file isn't rotated by size if it is 0.
+        /// </summary>
+        public long MaximumFileSize { get; set; }
+
+        /// <summary>
+        /// Time before the file is rotated. The file isn't rotated by time if it is zero.
+        /// </summary>
+        public TimeSpan RotationInterval { get; set; }
+
+        /// <summary>
+        /// Rotated files to keep.
+        /// </summary>
+        public int MaximumFiles { get; set; } = 5;
+
+        /// <summary>
+        /// Fraction of the entries of a category to write. Entries that are errors
+        /// and categories that aren't included are always written.
+        /// </summary>
+        public Dictionary<string, double> SampleRates { get; set; } = new Dictionary<string, double>();
+
+        /// <summary>
+        /// Total entries written to the file.
+        /// </summary>
+        public long Written => Interlocked.Read(ref this._written);
+
+        /// <summary>
+        /// Total entries dropped because the queue was full or the file couldn't be written.
+        /// </summary>
+        public long Dropped => Interlocked.Read(ref this._dropped);
+
+        /// <summary>
+        /// Total entries skipped by the sample rates.
+        /// </summary>
+        public long Sampled => Interlocked.Read(ref this._sampled);
+
+        /// <summary>
+        /// Entries that are queued to be written.
+        /// </summary>
+        private readonly Channel<JsonLogEntry> _entries;
+
+        /// <summary>
+        /// Task writing the queued entries.
+        /// </summary>
+        private readonly Task _writeTask;
+
+        /// <summary>
+        /// Entries logged for each category with a sample rate.
+        /// </summary>
+        private readonly ConcurrentDictionary<string, long[]> _sampleCounts = new ConcurrentDictionary<string, long[]>();
+
+        /// <summary>
+        /// Buffer for creating the lines of the entries.
+        /// </summary>
+        private readonly StringBuilder _line = new StringBuilder();
+
+        /// <summary>
+        /// Writer of the current file.
+        /// </summary>
+        private StreamWriter _writer;
+
+        /// <summary>
+        /// Size of the current file. Characters written are counted as bytes.
+        /// </summary>
+        private long _fileSize;
+
+        /// <summary>
+        /// Time the current file was opened.
+        /// </summary>
+        private DateTime _fileOpenTime;
+
+        /// <summary>
+        /// Total entries written to the file.
+        /// </summary>
+        private long _written;
+
+        /// <summary>
+        /// Total entries dropped.
+        /// </summary>
+        private long _dropped;
+
+        /// <summary>
+        /// Entries dropped that haven't been reported in the file.
+        /// </summary>
+        private long _unreportedDropped;
+
+        /// <summary>
+        /// Total entries skipped by the sample rates.
+        /// </summary>
+        private long _sampled;
+
+        /// <summary>
+        /// Creates the output and starts writing entries.
+        /// </summary>
+        /// <param name="fileLocation">File to write the entries to.</param>
+        /// <param name="queueSize">Maximum entries that can be queued before new entries are dropped.</param>
+        public JsonFileOutput(string fileLocation, int queueSize = 10000)
+        {
+            this.FileLocation = Path.GetFullPath(fileLocation);
+            this._entries = Channel.CreateBounded<JsonLogEntry>(new BoundedChannelOptions(Math.Max(1, queueSize))
+            {
+                FullMode = BoundedChannelFullMode.Wait,
+                SingleReader = true,
+            });
+            this._writeTask = Task.Run(this.WriteEntriesAsync);
+        }
+
+        /// <summary>
+        /// Returns if an entry of a category should be written based on the sample rates.
+        /// </summary>
+        /// <param name="category">Category of the entry.</param>
+        /// <returns>Whether to write the entry.</returns>
+        private bool IsSampled(string category)
+        {
+            // Return true if the category isn't sampled.
+            if (!this.SampleRates.TryGetValue(category, out var rate) || rate >= 1) return true;
+            if (rate <= 0) return false;
+
+            // Write the entry each time the number of entries times the rate reaches the next whole number.
+            var count = Interlocked.Increment(ref this._sampleCounts.GetOrAdd(category, _ => new long[1])[0]);
+            return (long) (count * rate) > (long) ((count - 1) * rate);
+        }
+
+        /// <summary>
+        /// Queues an entry to be written. The entry is dropped if the queue is full
+        /// so that logging never waits for the file.
+        /// </summary>
+        /// <param name="entry">Entry to write. Can be an object, like an exception.</param>
+        /// <param name="level">Log level of the entry.</param>
+        /// <param name="category">Category of the entry.</param>
+        public void LogMessage(object entry, LogLevel level, string category)
+        {
+            // Return if the entry is filtered.
+            if (level < this.MinimumLevel) return;
+            if (level < LogLevel.Error && !this.IsSampled(category))
+            {
+                Interlocked.Increment(ref this._sampled);
+                return;
+            }
+
+            // Queue the entry.
+            var exception = entry as Exception;
+            var logEntry = new JsonLogEntry()
+            {
+                Time = DateTime.UtcNow,
+                Level = level,
+                Category = category,
+                Message = (exception != null ? exception.Message : entry?.ToString()),
+                Exception = exception,
+            };
+            if (this._entries.Writer.TryWrite(logEntry)) return;
+            Interlocked.Increment(ref this._dropped);
+            Interlocked.Increment(ref this._unreportedDropped);
+        }
+
+        /// <summary>
+        /// Opens the file if it isn't open, and rotates it if it is too large or old.
+        /// </summary>
+        private void PrepareFile()
+        {
+            // Rotate the file.
+            if (this._writer != null && ((this.MaximumFileSize > 0 && this._fileSize >= this.MaximumFileSize) ||
+                                         (this.RotationInterval > TimeSpan.Zero && DateTime.UtcNow - this._fileOpenTime >= this.RotationInterval)))
+            {
+                this.CloseFile();
+                for (var i = this.MaximumFiles - 1; i >= 1; i--)
+                {
+                    if (!File.Exists($"{this.FileLocation}.{i}")) continue;
+                    File.Move($"{this.FileLocation}.{i}", $"{this.FileLocation}.{i + 1}", true);
+                }
+                if (this.MaximumFiles > 0)
+                {
+                    File.Move(this.FileLocation, $"{this.FileLocation}.1", true);
+                }
+                else
+                {
+                    File.Delete(this.FileLocation);
+                }
+            }
+
+            // Open the file.
+            if (this._writer != null) return;
+            Directory.CreateDirectory(Path.GetDirectoryName(this.FileLocation)!);
+            var stream = new FileStream(this.FileLocation, FileMode.Append, FileAccess.Write, FileShare.ReadWrite | FileShare.Delete);
+            this._writer = new StreamWriter(stream, new UTF8Encoding(false));
+            this._fileSize = stream.Length;
+            this._fileOpenTime = DateTime.UtcNow;
+        }
+
+        /// <summary>
+        /// Closes the current file.
+        /// </summary>
+        private void CloseFile()
+        {
+            this._writer?.Dispose();
+            this._writer = null;
+        }
+
+        /// <summary>
+        /// Writes an entry as a line to the file.
+        /// </summary>
+        /// <param name="entry">Entry to write.</param>
+        private void WriteEntry(JsonLogEntry entry)
+        {
+            // Create the line.
+            this._line.Clear();
+            using (var jsonWriter = new JsonTextWriter(new StringWriter(this._line)))
+            {
+                jsonWriter.WriteStartObject();
+                jsonWriter.WritePropertyName("time");
+                jsonWriter.WriteValue(entry.Time.ToString("o"));
+                jsonWriter.WritePropertyName("level");
+                jsonWriter.WriteValue(entry.Level.ToString());
+                jsonWriter.WritePropertyName("service");
+                jsonWriter.WriteValue(this.Identifier);
+                jsonWriter.WritePropertyName("category");
+                jsonWriter.WriteValue(entry.Category);
+                jsonWriter.WritePropertyName("message");
+                jsonWriter.WriteValue(entry.Message);
+                if (entry.Exception != null)
+                {
+                    jsonWriter.WritePropertyName("exception");
+                    jsonWriter.WriteValue(entry.Exception.ToString());
+                }
+                jsonWriter.WriteEndObject();
+            }
+            this._line.Append('\n');
+
+            // Write the line.
+            this.PrepareFile();
+            this._writer.Write(this._line);
+            this._fileSize += this._line.Length;
+            Interlocked.Increment(ref this._written);
+        }
+
+        /// <summary>
+        /// Writes the queued entries until the output is disposed.
+        /// </summary>
+        private async Task WriteEntriesAsync()
+        {
+            while (await this._entries.Reader.WaitToReadAsync())
+            {
+                // Write the queued entries and the entries that were dropped.
+                try
+                {
+                    while (this._entries.Reader.TryRead(out var entry))
+                    {
+                        this.WriteEntry(entry);
+                    }
+                    var dropped = Interlocked.Exchange(ref this._unreportedDropped, 0);
+                    if (dropped > 0)
+                    {
+                        this.WriteEntry(new JsonLogEntry()
+                        {
+                            Time = DateTime.UtcNow,
+                            Level = LogLevel.Warning,
+                            Category = nameof(JsonFileOutput),
+                            Message = $"Dropped {dropped} log entries because the queue was full.",
+                        });
+                    }
+                    this._writer?.Flush();
+                }
+                catch (Exception e)
+                {
+                    // Drop the entry and open the file again with the next entries.
+                    Console.Error.WriteLine($"Failed to write log entries to {this.FileLocation}: {e.Message}");
+                    Interlocked.Increment(ref this._dropped);
+                    this.CloseFile();
+                }
+            }
+            this.CloseFile();
+        }
+
+        /// <summary>
+        /// Stops accepting entries and waits for the queued entries to be written.
+        /// </summary>
+        public void Dispose()
+        {
+            this._entries.Writer.TryComplete();
+            this._writeTask.Wait(DisposeTimeout);
+        }
+    }
+}
@@ -1,8 +1,12 @@
+using System;
 using System.Collections.Generic;
+using System.Runtime.CompilerServices;
 using Microsoft.Extensions.Logging;
+using Newtonsoft.Json;
 using Nexus.Logging;
 using Nexus.Logging.Attribute;
 using Nexus.Logging.Output;
+using LoggingConfiguration = Construct.Core.Configuration.Logging;
 
 namespace Construct.Core.Logging
 {
@@ -18,11 +22,26 @@ namespace Construct.Core.Logging
         /// </summary>
         public static string Identifer { get; private set; }
 
+        /// <summary>
+        /// Output that writes the entries as JSON lines to a file.
+        /// </summary>
+        public static JsonFileOutput FileOutput { get; private set; }
+
         /// <summary>
         /// Minimum log level for the console output.
         /// </summary>
         private static LogLevel _minimumConsoleLogLevel = LogLevel.Information;
 
+        /// <summary>
+        /// Separators of the directories in the paths of the files that log entries.
+        /// </summary>
+        private static readonly char[] PathSeparators = { '/', '\\' };
+
+        /// <summary>
+        /// Configuration used to create the file output.
+        /// </summary>
+        private static string _fileOutputConfiguration;
+
         /// <summary>
         /// Initializes the logger.
         /// </summary>
@@ -65,56 +84,120 @@ namespace Construct.Core.Logging
             }
         }
 
+        /// <summary>
+        /// Sets the file output from the logging configuration. The file output is
+        /// only created again if the configuration changed.
+        /// </summary>
+        /// <param name="configuration">Logging configuration to use.</param>
+        public static void ConfigureFileOutput(LoggingConfiguration configuration)
+        {
+            // Return if the configuration didn't change.
+            configuration ??= new LoggingConfiguration();
+            var fileOutputConfiguration = JsonConvert.SerializeObject(configuration);
+            if (fileOutputConfiguration == _fileOutputConfiguration) return;
+            _fileOutputConfiguration = fileOutputConfiguration;
+            
+            // Replace the file output.
+            JsonFileOutput fileOutput = null;
+            if (!string.IsNullOrEmpty(configuration.FileOutput))
+            {
+                fileOutput = new JsonFileOutput(configuration.FileOutput, configuration.FileQueueSize)
+                {
+                    Identifier = Identifer,
+                    MinimumLevel = configuration.FileLevel,
+                    MaximumFileSize = Math.Max(0, configuration.FileMaximumSize) * 1024L * 1024L,
+                    RotationInterval = TimeSpan.FromHours(Math.Max(0, configuration.FileRotationInterval)),
+                    MaximumFiles = Math.Max(0, configuration.FileMaximumFiles),
+                    SampleRates = new Dictionary<string, double>(configuration.FileSampleRates ?? new Dictionary<string, double>(), StringComparer.OrdinalIgnoreCase),
+                };
+            }
+            var oldFileOutput = FileOutput;
+            FileOutput = fileOutput;
+            oldFileOutput?.Dispose();
+        }
+
+        /// <summary>
+        /// Stops the file output and waits for the queued entries to be written.
+        /// </summary>
+        public static void CloseFileOutput()
+        {
+            var fileOutput = FileOutput;
+            FileOutput = null;
+            _fileOutputConfiguration = null;
+            fileOutput?.Dispose();
+        }
+
+        /// <summary>
+        /// Returns the category of an entry from the file that logged it.
+        /// </summary>
+        /// <param name="callerFilePath">Path of the file that logged the entry.</param>
+        /// <returns>The name of the file without the extension.</returns>
+        public static string GetCategory(string callerFilePath)
+        {
+            if (string.IsNullOrEmpty(callerFilePath)) return "";
+            var nameStart = callerFilePath.LastIndexOfAny(PathSeparators) + 1;
+            var extensionStart = callerFilePath.LastIndexOf('.');
+            return (extensionStart > nameStart ? callerFilePath.Substring(nameStart, extensionStart - nameStart) : callerFilePath.Substring(nameStart));
+        }
+
         /// <summary>
         /// Outputs a message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
         /// <param name="level">Log level to output with.</param>
-        public static void LogMessage(object entry, LogLevel level)
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
+        public static void LogMessage(object entry, LogLevel level, [CallerFilePath] string callerFilePath = "")
         {
             Logger?.Log(entry, level);
+            FileOutput?.LogMessage(entry, level, GetCategory(callerFilePath));
         }
         
         /// <summary>
         /// Outputs a Trace message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
         [LogTraceIgnore]
-        public static void Trace(object entry) => LogMessage(entry, LogLevel.Trace);
+        public static void Trace(object entry, [CallerFilePath] string callerFilePath = "") => LogMessage(entry, LogLevel.Trace, callerFilePath);
 
         /// <summary>
         /// Outputs a Debug message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
         [LogTraceIgnore]
-        public static void Debug(object entry) => LogMessage(entry, LogLevel.Debug);
+        public static void Debug(object entry, [CallerFilePath] string callerFilePath = "") => LogMessage(entry, LogLevel.Debug, callerFilePath);
 
         /// <summary>
         /// Outputs an Info message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
         [LogTraceIgnore]
-        public static void Info(object entry) => LogMessage(entry, LogLevel.Information);
+        public static void Info(object entry, [CallerFilePath] string callerFilePath = "") => LogMessage(entry, LogLevel.Information, callerFilePath);
 
         /// <summary>
         /// Outputs a Warn message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
         [LogTraceIgnore]
-        public static void Warn(object entry) => LogMessage(entry, LogLevel.Warning);
+        public static void Warn(object entry, [CallerFilePath] string callerFilePath = "") => LogMessage(entry, LogLevel.Warning, callerFilePath);
 
         /// <summary>
         /// Outputs a Error message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
         [LogTraceIgnore]
-        public static void Error(object entry) => LogMessage(entry, LogLevel.Error);
+        public static void Error(object entry, [CallerFilePath] string callerFilePath = "") => LogMessage(entry, LogLevel.Error, callerFilePath);
 
         /// <summary>
         /// Outputs a Critical message.
         /// </summary>
         /// <param name="entry">Entry to output.</param>
+        /// <param name="callerFilePath">Path of the file that logged the entry. Set by the compiler.</param>
         [LogTraceIgnore]
-        public static void Critical(object entry) => LogMessage(entry, LogLevel.Critical);
+        public static void Critical(object entry, [CallerFilePath] string callerFilePath = "") => LogMessage(entry, LogLevel.Critical, callerFilePath);
     }
 }
\ No newline at end of file
@@ -0,0 +1,178 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+using System.Diagnostics.CodeAnalysis;
+
+namespace Construct.Core.Migrations.Postgres
+{
+    [ExcludeFromCodeCoverage]
+    public partial class PostgresAddNormalizedColumns : Migration
+    {
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AlterDatabase()
+                .Annotation("Npgsql:PostgresExtension:pg_trgm", ",,");
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedEmail",
+                table: "Users",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedHashedId",
+                table: "Users",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedName",
+                table: "Users",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedBillTo",
+                table: "PrintLog",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedFileName",
+                table: "PrintLog",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedEmail",
+                table: "Users",
+                column: "NormalizedEmail");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedHashedId",
+                table: "Users",
+                column: "NormalizedHashedId");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedName",
+                table: "Users",
+                column: "NormalizedName");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedEmail_Trigram",
+                table: "Users",
+                column: "NormalizedEmail")
+                .Annotation("Npgsql:IndexMethod", "gin")
+                .Annotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedName_Trigram",
+                table: "Users",
+                column: "NormalizedName")
+                .Annotation("Npgsql:IndexMethod", "gin")
+                .Annotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_NormalizedBillTo",
+                table: "PrintLog",
+                column: "NormalizedBillTo");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_NormalizedFileName",
+                table: "PrintLog",
+                column: "NormalizedFileName");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_Time",
+                table: "PrintLog",
+                column: "Time");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_NormalizedBillTo_Trigram",
+                table: "PrintLog",
+                column: "NormalizedBillTo")
+                .Annotation("Npgsql:IndexMethod", "gin")
+                .Annotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_NormalizedFileName_Trigram",
+                table: "PrintLog",
+                column: "NormalizedFileName")
+                .Annotation("Npgsql:IndexMethod", "gin")
+                .Annotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_VisitLogs_Time",
+                table: "VisitLogs",
+                column: "Time");
+        }
+
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedEmail",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedHashedId",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedName",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedEmail_Trigram",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedName_Trigram",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_NormalizedBillTo",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_NormalizedFileName",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_Time",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_NormalizedBillTo_Trigram",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_NormalizedFileName_Trigram",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_VisitLogs_Time",
+                table: "VisitLogs");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedEmail",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedHashedId",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedName",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedBillTo",
+                table: "PrintLog");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedFileName",
+                table: "PrintLog");
+
+            migrationBuilder.AlterDatabase()
+                .OldAnnotation("Npgsql:PostgresExtension:pg_trgm", ",,");
+        }
+    }
+}
@@ -0,0 +1,42 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+using System.Diagnostics.CodeAnalysis;
+
+namespace Construct.Core.Migrations.Postgres
+{
+    [ExcludeFromCodeCoverage]
+    public partial class PostgresAddUserPrintTotals : Migration
+    {
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "UserPrintTotals",
+                columns: table => new
+                {
+                    HashedId = table.Column<string>(type: "text", nullable: false),
+                    TotalPrints = table.Column<int>(type: "integer", nullable: false),
+                    TotalWeight = table.Column<double>(type: "double precision", nullable: false),
+                    OwedPrints = table.Column<int>(type: "integer", nullable: false),
+                    OwedWeight = table.Column<double>(type: "double precision", nullable: false),
+                    OwedCost = table.Column<double>(type: "double precision", nullable: false)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_UserPrintTotals", x => x.HashedId);
+                    table.ForeignKey(
+                        name: "FK_UserPrintTotals_Users_HashedId",
+                        column: x => x.HashedId,
+                        principalTable: "Users",
+                        principalColumn: "HashedId",
+                        onDelete: ReferentialAction.Cascade);
+                });
+
+            migrationBuilder.Sql("INSERT INTO \"UserPrintTotals\" (\"HashedId\", \"TotalPrints\", \"TotalWeight\", \"OwedPrints\", \"OwedWeight\", \"OwedCost\") SELECT \"UserHashedId\", COUNT(*), SUM(CAST(\"WeightGrams\" AS double precision)), SUM(CASE WHEN \"Owed\" THEN 1 ELSE 0 END), SUM(CASE WHEN \"Owed\" THEN CAST(\"WeightGrams\" AS double precision) ELSE 0 END), SUM(CASE WHEN \"Owed\" THEN CAST(\"Cost\" AS double precision) ELSE 0 END) FROM \"PrintLog\" WHERE \"UserHashedId\" IS NOT NULL GROUP BY \"UserHashedId\";");
+        }
+
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "UserPrintTotals");
+        }
+    }
+}
\ No newline at end of file
@@ -0,0 +1,53 @@
+﻿using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+using Npgsql.EntityFrameworkCore.PostgreSQL.Metadata;
+using System.Diagnostics.CodeAnalysis;
+
+namespace Construct.Core.Migrations.Postgres
+{
+    [ExcludeFromCodeCoverage]
+    public partial class PostgresAddPendingPrintReceipts : Migration
+    {
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "PendingPrintReceipts",
+                columns: table => new
+                {
+                    Key = table.Column<long>(type: "bigint", nullable: false)
+                        .Annotation("Npgsql:ValueGenerationStrategy", NpgsqlValueGenerationStrategy.IdentityByDefaultColumn),
+                    PrintLogKey = table.Column<long>(type: "bigint", nullable: false),
+                    Attempts = table.Column<int>(type: "integer", nullable: false),
+                    NextAttemptTime = table.Column<DateTime>(type: "timestamp without time zone", nullable: false),
+                    LastError = table.Column<string>(type: "text", nullable: true)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_PendingPrintReceipts", x => x.Key);
+                    table.ForeignKey(
+                        name: "FK_PendingPrintReceipts_PrintLog_PrintLogKey",
+                        column: x => x.PrintLogKey,
+                        principalTable: "PrintLog",
+                        principalColumn: "Key",
+                        onDelete: ReferentialAction.Cascade);
+                });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PendingPrintReceipts_NextAttemptTime",
+                table: "PendingPrintReceipts",
+                column: "NextAttemptTime");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PendingPrintReceipts_PrintLogKey",
+                table: "PendingPrintReceipts",
+                column: "PrintLogKey",
+                unique: true);
+        }
+
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "PendingPrintReceipts");
+        }
+    }
+}
@@ -17,10 +17,41 @@ namespace Construct.Core.Migrations.Postgres
         {
 #pragma warning disable 612, 618
             modelBuilder
+                .HasPostgresExtension("pg_trgm")
                 .HasAnnotation("Relational:MaxIdentifierLength", 63)
                 .HasAnnotation("ProductVersion", "5.0.10")
                 .HasAnnotation("Npgsql:ValueGenerationStrategy", NpgsqlValueGenerationStrategy.IdentityByDefaultColumn);
 
+            modelBuilder.Entity("Construct.Core.Database.Model.PendingPrintReceipt", b =>
+                {
+                    b.Property<long>("Key")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("bigint")
+                        .HasAnnotation("Npgsql:ValueGenerationStrategy", NpgsqlValueGenerationStrategy.IdentityByDefaultColumn);
+
+                    b.Property<int>("Attempts")
+                        .HasColumnType("integer");
+
+                    b.Property<string>("LastError")
+                        .HasColumnType("text");
+
+                    b.Property<DateTime>("NextAttemptTime")
+                        .IsConcurrencyToken()
+                        .HasColumnType("timestamp without time zone");
+
+                    b.Property<long>("PrintLogKey")
+                        .HasColumnType("bigint");
+
+                    b.HasKey("Key");
+
+                    b.HasIndex("NextAttemptTime");
+
+                    b.HasIndex("PrintLogKey")
+                        .IsUnique();
+
+                    b.ToTable("PendingPrintReceipts");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.Permission", b =>
                 {
                     b.Property<long>("Key")
@@ -69,6 +100,12 @@ namespace Construct.Core.Migrations.Postgres
                     b.Property<string>("MaterialName")
                         .HasColumnType("text");
 
+                    b.Property<string>("NormalizedBillTo")
+                        .HasColumnType("text");
+
+                    b.Property<string>("NormalizedFileName")
+                        .HasColumnType("text");
+
                     b.Property<bool>("Owed")
                         .HasColumnType("boolean");
 
@@ -89,8 +126,22 @@ namespace Construct.Core.Migrations.Postgres
 
                     b.HasIndex("MaterialName");
 
+                    b.HasIndex("NormalizedBillTo");
+
+                    b.HasIndex("NormalizedFileName");
+
+                    b.HasIndex("Time");
+
                     b.HasIndex("UserHashedId");
 
+                    b.HasIndex(new[] { "NormalizedBillTo" }, "IX_PrintLog_NormalizedBillTo_Trigram")
+                        .HasAnnotation("Npgsql:IndexMethod", "gin")
+                        .HasAnnotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
+                    b.HasIndex(new[] { "NormalizedFileName" }, "IX_PrintLog_NormalizedFileName_Trigram")
+                        .HasAnnotation("Npgsql:IndexMethod", "gin")
+                        .HasAnnotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
                     b.ToTable("PrintLog");
                 });
 
@@ -143,14 +194,62 @@ namespace Construct.Core.Migrations.Postgres
                         .IsRequired()
                         .HasColumnType("text");
 
+                    b.Property<string>("NormalizedEmail")
+                        .HasColumnType("text");
+
+                    b.Property<string>("NormalizedHashedId")
+                        .HasColumnType("text");
+
+                    b.Property<string>("NormalizedName")
+                        .HasColumnType("text");
+
                     b.Property<DateTime?>("SignUpTime")
                         .HasColumnType("timestamp without time zone");
 
                     b.HasKey("HashedId");
 
+                    b.HasIndex("NormalizedEmail");
+
+                    b.HasIndex("NormalizedHashedId");
+
+                    b.HasIndex("NormalizedName");
+
+                    b.HasIndex(new[] { "NormalizedEmail" }, "IX_Users_NormalizedEmail_Trigram")
+                        .HasAnnotation("Npgsql:IndexMethod", "gin")
+                        .HasAnnotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
+                    b.HasIndex(new[] { "NormalizedName" }, "IX_Users_NormalizedName_Trigram")
+                        .HasAnnotation("Npgsql:IndexMethod", "gin")
+                        .HasAnnotation("Npgsql:IndexOperators", new[] { "gin_trgm_ops" });
+
                     b.ToTable("Users");
                 });
 
+            modelBuilder.Entity("Construct.Core.Database.Model.UserPrintTotals", b =>
+                {
+                    b.Property<string>("HashedId")
+                        .HasColumnType("text");
+
+                    b.Property<double>("OwedCost")
+                        .HasColumnType("double precision");
+
+                    b.Property<int>("OwedPrints")
+                        .HasColumnType("integer");
+
+                    b.Property<double>("OwedWeight")
+                        .HasColumnType("double precision");
+
+                    b.Property<int>("TotalPrints")
+                        .HasColumnType("integer");
+
+                    b.Property<double>("TotalWeight")
+                        .HasColumnType("double precision");
+
+                    b.HasKey("HashedId");
+
+                    b.ToTable("UserPrintTotals");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.VisitLog", b =>
                 {
                     b.Property<long>("Key")
@@ -171,11 +270,24 @@ namespace Construct.Core.Migrations.Postgres
 
                     b.HasKey("Key");
 
+                    b.HasIndex("Time");
+
                     b.HasIndex("UserHashedId");
 
                     b.ToTable("VisitLogs");
                 });
 
+            modelBuilder.Entity("Construct.Core.Database.Model.PendingPrintReceipt", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.PrintLog", "PrintLog")
+                        .WithMany()
+                        .HasForeignKey("PrintLogKey")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("PrintLog");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.Permission", b =>
                 {
                     b.HasOne("Construct.Core.Database.Model.User", "User")
@@ -211,6 +323,17 @@ namespace Construct.Core.Migrations.Postgres
                     b.Navigation("User");
                 });
 
+            modelBuilder.Entity("Construct.Core.Database.Model.UserPrintTotals", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithOne("PrintTotals")
+                        .HasForeignKey("Construct.Core.Database.Model.UserPrintTotals", "HashedId")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("User");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.VisitLog", b =>
                 {
                     b.HasOne("Construct.Core.Database.Model.User", "User")
@@ -228,6 +351,8 @@ namespace Construct.Core.Migrations.Postgres
 
                     b.Navigation("PrintLogs");
 
+                    b.Navigation("PrintTotals");
+
                     b.Navigation("VisitLogs");
                 });
 #pragma warning restore 612, 618
@@ -0,0 +1,128 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+using System.Diagnostics.CodeAnalysis;
+
+namespace Construct.Core.Migrations
+{
+    [ExcludeFromCodeCoverage]
+    public partial class SqliteAddNormalizedColumns : Migration
+    {
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedEmail",
+                table: "Users",
+                type: "TEXT",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedHashedId",
+                table: "Users",
+                type: "TEXT",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedName",
+                table: "Users",
+                type: "TEXT",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedBillTo",
+                table: "PrintLog",
+                type: "TEXT",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "NormalizedFileName",
+                table: "PrintLog",
+                type: "TEXT",
+                nullable: true);
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedEmail",
+                table: "Users",
+                column: "NormalizedEmail");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedHashedId",
+                table: "Users",
+                column: "NormalizedHashedId");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_NormalizedName",
+                table: "Users",
+                column: "NormalizedName");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_NormalizedBillTo",
+                table: "PrintLog",
+                column: "NormalizedBillTo");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_NormalizedFileName",
+                table: "PrintLog",
+                column: "NormalizedFileName");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PrintLog_Time",
+                table: "PrintLog",
+                column: "Time");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_VisitLogs_Time",
+                table: "VisitLogs",
+                column: "Time");
+        }
+
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedEmail",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedHashedId",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_NormalizedName",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_NormalizedBillTo",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_NormalizedFileName",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_PrintLog_Time",
+                table: "PrintLog");
+
+            migrationBuilder.DropIndex(
+                name: "IX_VisitLogs_Time",
+                table: "VisitLogs");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedEmail",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedHashedId",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedName",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedBillTo",
+                table: "PrintLog");
+
+            migrationBuilder.DropColumn(
+                name: "NormalizedFileName",
+                table: "PrintLog");
+        }
+    }
+}
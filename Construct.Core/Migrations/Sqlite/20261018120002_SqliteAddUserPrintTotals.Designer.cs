@@ -0,0 +1,296 @@
+﻿// <auto-generated />
+using System;
+using Construct.Core.Database.Context;
+using Microsoft.EntityFrameworkCore;
+using Microsoft.EntityFrameworkCore.Infrastructure;
+using Microsoft.EntityFrameworkCore.Migrations;
+using Microsoft.EntityFrameworkCore.Storage.ValueConversion;
+
+namespace Construct.Core.Migrations
+{
+    [DbContext(typeof(SqliteContext))]
+    [Migration("20261018120002_SqliteAddUserPrintTotals")]
+    partial class SqliteAddUserPrintTotals
+    {
+        protected override void BuildTargetModel(ModelBuilder modelBuilder)
+        {
+#pragma warning disable 612, 618
+            modelBuilder
+                .HasAnnotation("ProductVersion", "5.0.9");
+
+            modelBuilder.Entity("Construct.Core.Database.Model.Permission", b =>
+                {
+                    b.Property<long>("Key")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("INTEGER");
+
+                    b.Property<DateTime?>("EndTime")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("Name")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<DateTime?>("StartTime")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("UserHashedId")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.HasKey("Key");
+
+                    b.HasIndex("UserHashedId");
+
+                    b.ToTable("Permissions");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.PrintLog", b =>
+                {
+                    b.Property<long>("Key")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("INTEGER");
+
+                    b.Property<string>("BillTo")
+                        .HasColumnType("TEXT");
+
+                    b.Property<float>("Cost")
+                        .HasColumnType("REAL");
+
+                    b.Property<string>("FileName")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("MaterialName")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedBillTo")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedFileName")
+                        .HasColumnType("TEXT");
+
+                    b.Property<bool>("Owed")
+                        .HasColumnType("INTEGER");
+
+                    b.Property<string>("Purpose")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<DateTime>("Time")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("UserHashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<float>("WeightGrams")
+                        .HasColumnType("REAL");
+
+                    b.HasKey("Key");
+
+                    b.HasIndex("MaterialName");
+
+                    b.HasIndex("NormalizedBillTo");
+
+                    b.HasIndex("NormalizedFileName");
+
+                    b.HasIndex("Time");
+
+                    b.HasIndex("UserHashedId");
+
+                    b.ToTable("PrintLog");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.PrintMaterial", b =>
+                {
+                    b.Property<string>("Name")
+                        .HasColumnType("TEXT");
+
+                    b.Property<float>("CostPerGram")
+                        .HasColumnType("REAL");
+
+                    b.HasKey("Name");
+
+                    b.ToTable("PrintMaterials");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.Student", b =>
+                {
+                    b.Property<long>("Key")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("INTEGER");
+
+                    b.Property<string>("College")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("UserHashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("Year")
+                        .HasColumnType("TEXT");
+
+                    b.HasKey("Key");
+
+                    b.HasIndex("UserHashedId");
+
+                    b.ToTable("Students");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.User", b =>
+                {
+                    b.Property<string>("HashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("Email")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("Name")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedEmail")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedHashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedName")
+                        .HasColumnType("TEXT");
+
+                    b.Property<DateTime?>("SignUpTime")
+                        .HasColumnType("TEXT");
+
+                    b.HasKey("HashedId");
+
+                    b.HasIndex("NormalizedEmail");
+
+                    b.HasIndex("NormalizedHashedId");
+
+                    b.HasIndex("NormalizedName");
+
+                    b.ToTable("Users");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.UserPrintTotals", b =>
+                {
+                    b.Property<string>("HashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<double>("OwedCost")
+                        .HasColumnType("REAL");
+
+                    b.Property<int>("OwedPrints")
+                        .HasColumnType("INTEGER");
+
+                    b.Property<double>("OwedWeight")
+                        .HasColumnType("REAL");
+
+                    b.Property<int>("TotalPrints")
+                        .HasColumnType("INTEGER");
+
+                    b.Property<double>("TotalWeight")
+                        .HasColumnType("REAL");
+
+                    b.HasKey("HashedId");
+
+                    b.ToTable("UserPrintTotals");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.VisitLog", b =>
+                {
+                    b.Property<long>("Key")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("INTEGER");
+
+                    b.Property<string>("Source")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<DateTime>("Time")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("UserHashedId")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.HasKey("Key");
+
+                    b.HasIndex("Time");
+
+                    b.HasIndex("UserHashedId");
+
+                    b.ToTable("VisitLogs");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.Permission", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithMany("Permissions")
+                        .HasForeignKey("UserHashedId")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("User");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.PrintLog", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.PrintMaterial", "Material")
+                        .WithMany()
+                        .HasForeignKey("MaterialName");
+
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithMany("PrintLogs")
+                        .HasForeignKey("UserHashedId");
+
+                    b.Navigation("Material");
+
+                    b.Navigation("User");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.Student", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithMany()
+                        .HasForeignKey("UserHashedId");
+
+                    b.Navigation("User");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.UserPrintTotals", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithOne("PrintTotals")
+                        .HasForeignKey("Construct.Core.Database.Model.UserPrintTotals", "HashedId")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("User");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.VisitLog", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithMany("VisitLogs")
+                        .HasForeignKey("UserHashedId")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("User");
+                });
+
+            modelBuilder.Entity("Construct.Core.Database.Model.User", b =>
+                {
+                    b.Navigation("Permissions");
+
+                    b.Navigation("PrintLogs");
+
+                    b.Navigation("PrintTotals");
+
+                    b.Navigation("VisitLogs");
+                });
+#pragma warning restore 612, 618
+        }
+    }
+}
@@ -0,0 +1,52 @@
+﻿using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+using System.Diagnostics.CodeAnalysis;
+
+namespace Construct.Core.Migrations
+{
+    [ExcludeFromCodeCoverage]
+    public partial class SqliteAddPendingPrintReceipts : Migration
+    {
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "PendingPrintReceipts",
+                columns: table => new
+                {
+                    Key = table.Column<long>(type: "INTEGER", nullable: false)
+                        .Annotation("Sqlite:Autoincrement", true),
+                    PrintLogKey = table.Column<long>(type: "INTEGER", nullable: false),
+                    Attempts = table.Column<int>(type: "INTEGER", nullable: false),
+                    NextAttemptTime = table.Column<DateTime>(type: "TEXT", nullable: false),
+                    LastError = table.Column<string>(type: "TEXT", nullable: true)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_PendingPrintReceipts", x => x.Key);
+                    table.ForeignKey(
+                        name: "FK_PendingPrintReceipts_PrintLog_PrintLogKey",
+                        column: x => x.PrintLogKey,
+                        principalTable: "PrintLog",
+                        principalColumn: "Key",
+                        onDelete: ReferentialAction.Cascade);
+                });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PendingPrintReceipts_NextAttemptTime",
+                table: "PendingPrintReceipts",
+                column: "NextAttemptTime");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_PendingPrintReceipts_PrintLogKey",
+                table: "PendingPrintReceipts",
+                column: "PrintLogKey",
+                unique: true);
+        }
+
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "PendingPrintReceipts");
+        }
+    }
+}
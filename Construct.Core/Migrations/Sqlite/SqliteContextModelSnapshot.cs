@@ -18,6 +18,35 @@ namespace Construct.Core.Migrations
             modelBuilder
                 .HasAnnotation("ProductVersion", "5.0.9");
 
+            modelBuilder.Entity("Construct.Core.Database.Model.PendingPrintReceipt", b =>
+                {
+                    b.Property<long>("Key")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("INTEGER");
+
+                    b.Property<int>("Attempts")
+                        .HasColumnType("INTEGER");
+
+                    b.Property<string>("LastError")
+                        .HasColumnType("TEXT");
+
+                    b.Property<DateTime>("NextAttemptTime")
+                        .IsConcurrencyToken()
+                        .HasColumnType("TEXT");
+
+                    b.Property<long>("PrintLogKey")
+                        .HasColumnType("INTEGER");
+
+                    b.HasKey("Key");
+
+                    b.HasIndex("NextAttemptTime");
+
+                    b.HasIndex("PrintLogKey")
+                        .IsUnique();
+
+                    b.ToTable("PendingPrintReceipts");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.Permission", b =>
                 {
                     b.Property<long>("Key")
@@ -64,6 +93,12 @@ namespace Construct.Core.Migrations
                     b.Property<string>("MaterialName")
                         .HasColumnType("TEXT");
 
+                    b.Property<string>("NormalizedBillTo")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedFileName")
+                        .HasColumnType("TEXT");
+
                     b.Property<bool>("Owed")
                         .HasColumnType("INTEGER");
 
@@ -84,6 +119,12 @@ namespace Construct.Core.Migrations
 
                     b.HasIndex("MaterialName");
 
+                    b.HasIndex("NormalizedBillTo");
+
+                    b.HasIndex("NormalizedFileName");
+
+                    b.HasIndex("Time");
+
                     b.HasIndex("UserHashedId");
 
                     b.ToTable("PrintLog");
@@ -137,14 +178,54 @@ namespace Construct.Core.Migrations
                         .IsRequired()
                         .HasColumnType("TEXT");
 
+                    b.Property<string>("NormalizedEmail")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedHashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("NormalizedName")
+                        .HasColumnType("TEXT");
+
                     b.Property<DateTime?>("SignUpTime")
                         .HasColumnType("TEXT");
 
                     b.HasKey("HashedId");
 
+                    b.HasIndex("NormalizedEmail");
+
+                    b.HasIndex("NormalizedHashedId");
+
+                    b.HasIndex("NormalizedName");
+
                     b.ToTable("Users");
                 });
 
+            modelBuilder.Entity("Construct.Core.Database.Model.UserPrintTotals", b =>
+                {
+                    b.Property<string>("HashedId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<double>("OwedCost")
+                        .HasColumnType("REAL");
+
+                    b.Property<int>("OwedPrints")
+                        .HasColumnType("INTEGER");
+
+                    b.Property<double>("OwedWeight")
+                        .HasColumnType("REAL");
+
+                    b.Property<int>("TotalPrints")
+                        .HasColumnType("INTEGER");
+
+                    b.Property<double>("TotalWeight")
+                        .HasColumnType("REAL");
+
+                    b.HasKey("HashedId");
+
+                    b.ToTable("UserPrintTotals");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.VisitLog", b =>
                 {
                     b.Property<long>("Key")
@@ -164,11 +245,24 @@ namespace Construct.Core.Migrations
 
                     b.HasKey("Key");
 
+                    b.HasIndex("Time");
+
                     b.HasIndex("UserHashedId");
 
                     b.ToTable("VisitLogs");
                 });
 
+            modelBuilder.Entity("Construct.Core.Database.Model.PendingPrintReceipt", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.PrintLog", "PrintLog")
+                        .WithMany()
+                        .HasForeignKey("PrintLogKey")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("PrintLog");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.Permission", b =>
                 {
                     b.HasOne("Construct.Core.Database.Model.User", "User")
@@ -204,6 +298,17 @@ namespace Construct.Core.Migrations
                     b.Navigation("User");
                 });
 
+            modelBuilder.Entity("Construct.Core.Database.Model.UserPrintTotals", b =>
+                {
+                    b.HasOne("Construct.Core.Database.Model.User", "User")
+                        .WithOne("PrintTotals")
+                        .HasForeignKey("Construct.Core.Database.Model.UserPrintTotals", "HashedId")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("User");
+                });
+
             modelBuilder.Entity("Construct.Core.Database.Model.VisitLog", b =>
                 {
                     b.HasOne("Construct.Core.Database.Model.User", "User")
@@ -221,6 +326,8 @@ namespace Construct.Core.Migrations
 
                     b.Navigation("PrintLogs");
 
+                    b.Navigation("PrintTotals");
+
                     b.Navigation("VisitLogs");
                 });
 #pragma warning restore 612, 618
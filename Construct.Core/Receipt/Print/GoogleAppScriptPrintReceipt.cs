@@ -1,10 +1,8 @@
-using System.Linq;
 using System.Net.Http;
+using System.Threading.Tasks;
 using Construct.Core.Configuration;
-using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Construct.Core.Logging;
-using Microsoft.EntityFrameworkCore;
 
 namespace Construct.Core.Receipt.Print
 {
@@ -18,27 +16,25 @@ namespace Construct.Core.Receipt.Print
 
         /// <summary>
         /// Sends a receipt for a print entry.
+        /// The user of the print and their print totals must be loaded.
         /// </summary>
         /// <param name="log">Print log to send.</param>
         /// <returns>Whether the receipt was sent.</returns>
-        public bool Send(PrintLog log)
+        public async Task<bool> SendAsync(PrintLog log)
         {
-            // Get the user prints.
-            using var context = new ConstructContext();
-            var totalPrints = context.PrintLog.Include(printLog => printLog.User)
-                .Count(printLog => printLog.User.HashedId == log.User.HashedId);
-            var totalOwedBalance = context.PrintLog.Include(printLog => printLog.User)
-                .Where(printLog => printLog.User.HashedId == log.User.HashedId && log.Owed == false)
-                .Sum(printLog => printLog.Cost);
+            // Get the user print totals.
+            var printTotals = log.User.PrintTotals;
+            var totalPrints = printTotals?.TotalPrints ?? 0;
+            var totalOwedBalance = (float) (printTotals?.OwedCost ?? 0);
             
             // Send the request.
             Log.Debug($"Sending print receipt for {log.FileName}");
             var scriptId = ConstructConfiguration.Configuration.PrintReceipt.GoogleAppScriptId;
             var url = $"https://script.google.com/macros/s/{scriptId}/exec?request=sendemail&email={log.User.Email}&printCount={totalPrints}&fileName={log.FileName}&printWeight={log.WeightGrams}&printCost={log.Cost}&totalCost={totalOwedBalance}";
-            var emailResult = Client.PostAsync(url, new StringContent("")).Result;
+            using var emailResult = await Client.PostAsync(url, new StringContent(""));
             if ((int) emailResult.StatusCode >= 400)
             {
-                Log.Error($"Failed to send print receipt for {log.FileName}\n{emailResult.Content.ReadAsStringAsync().Result}");
+                Log.Error($"Failed to send print receipt for {log.FileName}\n{await emailResult.Content.ReadAsStringAsync()}");
                 return false;
             }
             else
@@ -1,3 +1,4 @@
+using System.Threading.Tasks;
 using Construct.Core.Database.Model;
 
 namespace Construct.Core.Receipt.Print
@@ -6,9 +7,10 @@ namespace Construct.Core.Receipt.Print
     {
         /// <summary>
         /// Sends a receipt for a print entry.
+        /// The user of the print and their print totals must be loaded.
         /// </summary>
         /// <param name="log">Print log to send.</param>
         /// <returns>Whether the receipt was sent.</returns>
-        public bool Send(PrintLog log);
+        public Task<bool> SendAsync(PrintLog log);
     }
 }
\ No newline at end of file
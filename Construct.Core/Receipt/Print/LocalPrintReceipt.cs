@@ -0,0 +1,39 @@
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+
+namespace Construct.Core.Receipt.Print
+{
+    public class LocalPrintReceipt : IPrintReceipt
+    {
+        /// <summary>
+        /// Total receipts sent by the local provider.
+        /// Intended to only be used by unit tests and load tests.
+        /// </summary>
+        public static long TotalSent => Interlocked.Read(ref _totalSent);
+
+        /// <summary>
+        /// Total receipts sent by the local provider.
+        /// </summary>
+        private static long _totalSent;
+
+        /// <summary>
+        /// Logs a receipt for a print entry without sending it.
+        /// </summary>
+        /// <param name="log">Print log to send.</param>
+        /// <returns>Whether the receipt was sent.</returns>
+        public async Task<bool> SendAsync(PrintLog log)
+        {
+            var delay = ConstructConfiguration.Configuration.PrintReceipt.LocalDelay;
+            if (delay > 0)
+            {
+                await Task.Delay(delay);
+            }
+            Interlocked.Increment(ref _totalSent);
+            Log.Debug($"Sent local print receipt for {log.FileName} to {log.User?.Email}");
+            return true;
+        }
+    }
+}
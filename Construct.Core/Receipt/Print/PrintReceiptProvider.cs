@@ -1,4 +1,5 @@
 using System;
+using System.Threading.Tasks;
 using Construct.Core.Configuration;
 using Construct.Core.Database.Model;
 
@@ -17,6 +18,8 @@ namespace Construct.Core.Receipt.Print
             {
                 case("googleappscripts"):
                     return new GoogleAppScriptPrintReceipt();
+                case("local"):
+                    return new LocalPrintReceipt();
                 default:
                     throw new InvalidOperationException("Invalid print receipt provider: " + provider);
             }
@@ -24,12 +27,13 @@ namespace Construct.Core.Receipt.Print
 
         /// <summary>
         /// Sends a print receipt for the given entry.
+        /// The user of the print and their print totals must be loaded.
         /// </summary>
         /// <param name="printLog">The entry to send the receipt for.</param>
         /// <returns>Whether the receipt was sent.</returns>
-        public static bool SendReceipt(PrintLog printLog)
+        public static Task<bool> SendReceiptAsync(PrintLog printLog)
         {
-            return GetProvider().Send(printLog);
+            return GetProvider().SendAsync(printLog);
         }
     }
 }
\ No newline at end of file
@@ -0,0 +1,327 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+using Microsoft.EntityFrameworkCore;
+
+namespace Construct.Core.Receipt.Print
+{
+    public class PrintReceiptQueue
+    {
+        /// <summary>
+        /// Maximum receipts to load and send at once.
+        /// </summary>
+        public int BatchSize { get; set; } = 50;
+
+        /// <summary>
+        /// Maximum receipts to send at the same time.
+        /// </summary>
+        public int MaxConcurrentReceipts { get; set; } = 4;
+
+        /// <summary>
+        /// Maximum attempts to send a receipt before it is no longer sent.
+        /// </summary>
+        public int MaxAttempts { get; set; } = 10;
+
+        /// <summary>
+        /// Delay in seconds before the first retry of a receipt. The delay doubles for each attempt.
+        /// </summary>
+        public long RetryDelay { get; set; } = 30;
+
+        /// <summary>
+        /// Max delay in seconds between the attempts to send a receipt.
+        /// </summary>
+        public long MaxRetryDelay { get; set; } = 60 * 60;
+
+        /// <summary>
+        /// Duration in seconds that a service claims receipts for while sending them.
+        /// Receipts of services that stop while sending are sent again after this time.
+        /// </summary>
+        public long ClaimDuration { get; set; } = 5 * 60;
+
+        /// <summary>
+        /// Total receipts sent.
+        /// </summary>
+        public long Sent => Interlocked.Read(ref this._sent);
+
+        /// <summary>
+        /// Total attempts to send receipts that failed.
+        /// </summary>
+        public long Failed => Interlocked.Read(ref this._failed);
+
+        /// <summary>
+        /// Total receipts that are no longer sent because they reached the maximum attempts.
+        /// </summary>
+        public long Abandoned => Interlocked.Read(ref this._abandoned);
+
+        /// <summary>
+        /// Static queue instance to use.
+        /// </summary>
+        private static PrintReceiptQueue _staticQueue;
+
+        /// <summary>
+        /// Signal for when receipts are added by the service.
+        /// </summary>
+        private readonly SemaphoreSlim _addedSignal = new SemaphoreSlim(0, 1);
+
+        /// <summary>
+        /// Total receipts sent.
+        /// </summary>
+        private long _sent;
+
+        /// <summary>
+        /// Total attempts to send receipts that failed.
+        /// </summary>
+        private long _failed;
+
+        /// <summary>
+        /// Total receipts that are no longer sent because they reached the maximum attempts.
+        /// </summary>
+        private long _abandoned;
+
+        /// <summary>
+        /// Returns a static instance of the queue. The settings of the
+        /// queue are updated when the configuration is reloaded.
+        /// </summary>
+        /// <returns>The static instance of the queue.</returns>
+        public static PrintReceiptQueue GetSingleton()
+        {
+            if (_staticQueue != null) return _staticQueue;
+            var queue = new PrintReceiptQueue();
+            queue.ApplyConfiguration(ConstructConfiguration.Configuration);
+            if (Interlocked.CompareExchange(ref _staticQueue, queue, null) == null)
+            {
+                ConstructConfiguration.Reloaded += queue.ApplyConfiguration;
+            }
+            return _staticQueue;
+        }
+
+        /// <summary>
+        /// Updates the settings of the queue from a configuration.
+        /// The settings are used starting with the next batch of receipts.
+        /// </summary>
+        /// <param name="configuration">Configuration to use.</param>
+        public void ApplyConfiguration(ConstructConfiguration configuration)
+        {
+            this.MaxConcurrentReceipts = Math.Max(1, configuration.PrintReceipt.MaximumConcurrentReceipts);
+            this.MaxAttempts = Math.Max(1, configuration.PrintReceipt.MaximumAttempts);
+            this.RetryDelay = Math.Max(0, configuration.PrintReceipt.RetryDelay);
+            this.MaxRetryDelay = Math.Max(0, configuration.PrintReceipt.MaximumRetryDelay);
+        }
+
+        /// <summary>
+        /// Adds a receipt to send for a print. The receipt is stored when the context is saved
+        /// so that the print and the receipt are saved together.
+        /// </summary>
+        /// <param name="context">Context the print is added with.</param>
+        /// <param name="printLog">Print to send the receipt for.</param>
+        public static void Add(ConstructContext context, PrintLog printLog)
+        {
+            context.PendingPrintReceipts.Add(new PendingPrintReceipt()
+            {
+                PrintLog = printLog,
+                NextAttemptTime = DateTime.Now,
+            });
+        }
+
+        /// <summary>
+        /// Signals that receipts were saved so that they are sent without waiting.
+        /// </summary>
+        public void Notify()
+        {
+            try
+            {
+                this._addedSignal.Release();
+            }
+            catch (SemaphoreFullException)
+            {
+                // Already signaled.
+            }
+        }
+
+        /// <summary>
+        /// Waits for receipts to be saved by the service or for the timeout.
+        /// </summary>
+        /// <param name="timeout">Maximum time to wait.</param>
+        /// <param name="cancellationToken">Token for stopping waiting.</param>
+        public async Task WaitForReceiptsAsync(TimeSpan timeout, CancellationToken cancellationToken)
+        {
+            await this._addedSignal.WaitAsync(timeout, cancellationToken);
+        }
+
+        /// <summary>
+        /// Returns the delay before the next attempt of a receipt.
+        /// </summary>
+        /// <param name="attempts">Attempts made to send the receipt.</param>
+        /// <returns>The delay before the next attempt.</returns>
+        public TimeSpan GetRetryDelay(int attempts)
+        {
+            var delay = this.RetryDelay * Math.Pow(2, Math.Clamp(attempts - 1, 0, 30));
+            return TimeSpan.FromSeconds(Math.Min(delay, this.MaxRetryDelay));
+        }
+
+        /// <summary>
+        /// Claims receipts by saving their new attempt times. Receipts that were
+        /// changed by another service since they were loaded are not claimed.
+        /// </summary>
+        /// <param name="context">Context the receipts were loaded with.</param>
+        /// <param name="receipts">Receipts to claim.</param>
+        /// <returns>The claimed receipts.</returns>
+        private static async Task<List<PendingPrintReceipt>> ClaimAsync(ConstructContext context, List<PendingPrintReceipt> receipts)
+        {
+            while (true)
+            {
+                try
+                {
+                    await context.SaveChangesAsync();
+                    return receipts;
+                }
+                catch (DbUpdateConcurrencyException e)
+                {
+                    foreach (var entry in e.Entries)
+                    {
+                        entry.State = EntityState.Detached;
+                        receipts.Remove((PendingPrintReceipt) entry.Entity);
+                    }
+                }
+            }
+        }
+
+        /// <summary>
+        /// Removes a sent receipt or schedules the next attempt of a failed receipt. Each receipt
+        /// is saved with its own context right after it is sent so that the sent receipts are
+        /// removed even if the other receipts of the batch can't be saved.
+        /// </summary>
+        /// <param name="receipt">Receipt that was sent.</param>
+        /// <param name="claimTime">Attempt time that the receipt was claimed with.</param>
+        /// <param name="error">Error of sending the receipt, or null if it was sent.</param>
+        private async Task CompleteAsync(PendingPrintReceipt receipt, DateTime claimTime, string error)
+        {
+            // Attach the receipt with the claimed attempt time so that it isn't changed if another service claimed it.
+            await using var context = new ConstructContext();
+            var completedReceipt = new PendingPrintReceipt()
+            {
+                Key = receipt.Key,
+                PrintLogKey = receipt.PrintLogKey,
+                Attempts = receipt.Attempts,
+                NextAttemptTime = claimTime,
+                LastError = receipt.LastError,
+            };
+            context.PendingPrintReceipts.Attach(completedReceipt);
+            
+            // Remove the receipt if it was sent, or schedule the next attempt.
+            if (error == null)
+            {
+                context.PendingPrintReceipts.Remove(completedReceipt);
+                Interlocked.Increment(ref this._sent);
+            }
+            else
+            {
+                completedReceipt.Attempts += 1;
+                completedReceipt.LastError = error;
+                completedReceipt.NextAttemptTime = DateTime.Now.Add(this.GetRetryDelay(completedReceipt.Attempts));
+                Interlocked.Increment(ref this._failed);
+                if (completedReceipt.Attempts >= this.MaxAttempts)
+                {
+                    Interlocked.Increment(ref this._abandoned);
+                    Log.Error($"Failed to send print receipt for {receipt.PrintLog.FileName} after {completedReceipt.Attempts} attempts: {error}");
+                }
+                else
+                {
+                    Log.Warn($"Failed to send print receipt for {receipt.PrintLog.FileName} (attempt {completedReceipt.Attempts}): {error}");
+                }
+            }
+            
+            // Save the receipt. The save isn't cancelled so that sent receipts aren't sent again.
+            try
+            {
+                await context.SaveChangesAsync();
+            }
+            catch (DbUpdateConcurrencyException)
+            {
+                Log.Warn($"Print receipt for {receipt.PrintLog.FileName} was claimed by another service before it was saved.");
+            }
+        }
+
+        /// <summary>
+        /// Sends the receipts that are due and updates or removes them.
+        /// Receipts that aren't sent before cancelling stay claimed until the claim expires.
+        /// </summary>
+        /// <param name="cancellationToken">Token for stopping sending.</param>
+        /// <returns>The total receipts that were loaded.</returns>
+        public async Task<int> SendPendingReceiptsAsync(CancellationToken cancellationToken = default)
+        {
+            // Get the receipts to send.
+            // The claim time is rounded to milliseconds so that it matches the stored time when the receipts are saved.
+            var currentTime = DateTime.Now;
+            var claimTime = currentTime.AddSeconds(this.ClaimDuration);
+            claimTime = claimTime.AddTicks(-(claimTime.Ticks % TimeSpan.TicksPerMillisecond));
+            List<PendingPrintReceipt> receipts;
+            await using (var context = new ConstructContext())
+            {
+                receipts = await context.PendingPrintReceipts.Include(receipt => receipt.PrintLog)
+                    .ThenInclude(printLog => printLog.User).ThenInclude(user => user.PrintTotals)
+                    .Where(receipt => receipt.Attempts < this.MaxAttempts && receipt.NextAttemptTime <= currentTime)
+                    .OrderBy(receipt => receipt.NextAttemptTime).Take(this.BatchSize)
+                    .ToListAsync(cancellationToken);
+                if (receipts.Count == 0) return 0;
+
+                // Claim the receipts so that other services don't send them.
+                foreach (var receipt in receipts)
+                {
+                    receipt.NextAttemptTime = claimTime;
+                }
+                receipts = await ClaimAsync(context, receipts);
+            }
+            var totalReceipts = receipts.Count;
+
+            // Send the receipts and save each receipt after it is sent.
+            var provider = PrintReceiptProvider.GetProvider();
+            using var concurrentReceipts = new SemaphoreSlim(this.MaxConcurrentReceipts);
+            await Task.WhenAll(receipts.Select(async receipt =>
+            {
+                // Send the receipt, or remove it without sending if the print has no user.
+                string error = null;
+                if (receipt.PrintLog.User != null)
+                {
+                    try
+                    {
+                        await concurrentReceipts.WaitAsync(cancellationToken);
+                    }
+                    catch (OperationCanceledException)
+                    {
+                        return;
+                    }
+                    try
+                    {
+                        error = await provider.SendAsync(receipt.PrintLog) ? null : "Receipt provider failed to send the receipt.";
+                    }
+                    catch (Exception e)
+                    {
+                        error = e.Message;
+                    }
+                    finally
+                    {
+                        concurrentReceipts.Release();
+                    }
+                }
+                
+                // Save the receipt.
+                try
+                {
+                    await this.CompleteAsync(receipt, claimTime, error);
+                }
+                catch (Exception e)
+                {
+                    Log.Warn($"Failed to save print receipt for {receipt.PrintLog.FileName}: {e.Message}");
+                }
+            }));
+            return totalReceipts;
+        }
+    }
+}
@@ -0,0 +1,51 @@
+using System;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Logging;
+using Construct.Core.Server;
+using Microsoft.Extensions.Hosting;
+
+namespace Construct.Core.Receipt.Print
+{
+    public class PrintReceiptWorker : BackgroundService
+    {
+        /// <summary>
+        /// Interval to check for receipts saved by other services or that are due to be retried.
+        /// </summary>
+        public static TimeSpan PollInterval { get; set; } = TimeSpan.FromSeconds(30);
+
+        /// <summary>
+        /// Sends the pending print receipts until the service stops.
+        /// </summary>
+        /// <param name="stoppingToken">Token for when the service stops.</param>
+        protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+        {
+            var queue = PrintReceiptQueue.GetSingleton();
+            ServerMetrics.AddMetric("construct_print_receipts_sent_total", "counter", "Print receipts sent.", () => queue.Sent);
+            ServerMetrics.AddMetric("construct_print_receipts_failed_total", "counter", "Attempts to send print receipts that failed.", () => queue.Failed);
+            ServerMetrics.AddMetric("construct_print_receipts_abandoned_total", "counter", "Print receipts that reached the maximum attempts.", () => queue.Abandoned);
+            while (!stoppingToken.IsCancellationRequested)
+            {
+                // Send the pending receipts, and send the next receipts right away if the batch was full.
+                try
+                {
+                    if (await queue.SendPendingReceiptsAsync(stoppingToken) >= queue.BatchSize) continue;
+                }
+                catch (Exception e) when (!stoppingToken.IsCancellationRequested)
+                {
+                    Log.Warn($"Failed to send print receipts: {e.Message}");
+                }
+                
+                // Wait for new receipts or the next check.
+                try
+                {
+                    await queue.WaitForReceiptsAsync(PollInterval, stoppingToken);
+                }
+                catch (OperationCanceledException)
+                {
+                    break;
+                }
+            }
+        }
+    }
+}
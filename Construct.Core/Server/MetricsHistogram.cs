@@ -0,0 +1,94 @@
+using System;
+using System.Globalization;
+using System.Text;
+using System.Threading;
+
+namespace Construct.Core.Server
+{
+    public class MetricsHistogram
+    {
+        /// <summary>
+        /// Upper bounds, in seconds, of the buckets used for durations.
+        /// </summary>
+        public static readonly double[] DurationBuckets = { 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10 };
+
+        /// <summary>
+        /// Total values observed.
+        /// </summary>
+        public long Count => Interlocked.Read(ref this._count);
+
+        /// <summary>
+        /// Sum of the values observed, in seconds.
+        /// </summary>
+        public double Sum => TimeSpan.FromTicks(Interlocked.Read(ref this._sumTicks)).TotalSeconds;
+
+        /// <summary>
+        /// Upper bounds, in seconds, of the buckets.
+        /// </summary>
+        private readonly double[] _buckets;
+
+        /// <summary>
+        /// Values observed in each bucket. The last bucket is for values
+        /// above all of the bounds.
+        /// </summary>
+        private readonly long[] _bucketCounts;
+
+        /// <summary>
+        /// Total values observed.
+        /// </summary>
+        private long _count;
+
+        /// <summary>
+        /// Sum of the values observed, in ticks.
+        /// </summary>
+        private long _sumTicks;
+
+        /// <summary>
+        /// Creates the histogram.
+        /// </summary>
+        /// <param name="buckets">Upper bounds, in seconds, of the buckets in ascending order.</param>
+        public MetricsHistogram(double[] buckets = null)
+        {
+            this._buckets = buckets ?? DurationBuckets;
+            this._bucketCounts = new long[this._buckets.Length + 1];
+        }
+
+        /// <summary>
+        /// Adds a duration to the histogram.
+        /// </summary>
+        /// <param name="duration">Duration to add.</param>
+        public void Observe(TimeSpan duration)
+        {
+            var seconds = duration.TotalSeconds;
+            var bucket = 0;
+            while (bucket < this._buckets.Length && seconds > this._buckets[bucket])
+            {
+                bucket += 1;
+            }
+            Interlocked.Increment(ref this._bucketCounts[bucket]);
+            Interlocked.Increment(ref this._count);
+            Interlocked.Add(ref this._sumTicks, duration.Ticks);
+        }
+
+        /// <summary>
+        /// Writes the histogram in the Prometheus text format.
+        /// </summary>
+        /// <param name="output">Output to write to.</param>
+        /// <param name="name">Name of the metric.</param>
+        /// <param name="labels">Labels of the histogram (like route="Swipe.Post"), or an empty string.</param>
+        public void Write(StringBuilder output, string name, string labels)
+        {
+            var separator = (labels == "" ? "" : ",");
+            var total = 0L;
+            for (var i = 0; i < this._bucketCounts.Length; i++)
+            {
+                total += Interlocked.Read(ref this._bucketCounts[i]);
+                var bound = (i < this._buckets.Length ? this._buckets[i].ToString(CultureInfo.InvariantCulture) : "+Inf");
+                output.Append($"{name}_bucket{{{labels}{separator}le=\"{bound}\"}} {total}\n");
+            }
+            var labelSet = (labels == "" ? "" : "{" + labels + "}");
+            output.Append($"{name}_sum{labelSet} {this.Sum.ToString(CultureInfo.InvariantCulture)}\n");
+            output.Append($"{name}_count{labelSet} {total}\n");
+        }
+    }
+}
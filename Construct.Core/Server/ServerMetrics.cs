@@ -0,0 +1,332 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Globalization;
+using System.Linq;
+using System.Net;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Cache;
+using Construct.Core.Logging;
+using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.Routing;
+
+namespace Construct.Core.Server
+{
+    public class RequestTrace
+    {
+        /// <summary>
+        /// Trace of the request being handled.
+        /// </summary>
+        private static readonly AsyncLocal<RequestTrace> CurrentTrace = new AsyncLocal<RequestTrace>();
+
+        /// <summary>
+        /// Trace of the request being handled, or null if there is none.
+        /// </summary>
+        public static RequestTrace Current => CurrentTrace.Value;
+
+        /// <summary>
+        /// Database commands run by the request.
+        /// </summary>
+        public int Commands => this._commands;
+
+        /// <summary>
+        /// Time spent running database commands for the request.
+        /// </summary>
+        public TimeSpan CommandDuration => TimeSpan.FromTicks(Interlocked.Read(ref this._commandTicks));
+
+        /// <summary>
+        /// Database commands run by the request.
+        /// </summary>
+        private int _commands;
+
+        /// <summary>
+        /// Time spent running database commands for the request, in ticks.
+        /// </summary>
+        private long _commandTicks;
+
+        /// <summary>
+        /// Starts a trace for the current request.
+        /// </summary>
+        /// <returns>The started trace.</returns>
+        public static RequestTrace Start()
+        {
+            var trace = new RequestTrace();
+            CurrentTrace.Value = trace;
+            return trace;
+        }
+
+        /// <summary>
+        /// Adds a database command to the trace.
+        /// </summary>
+        /// <param name="duration">Duration of the command.</param>
+        public void AddCommand(TimeSpan duration)
+        {
+            Interlocked.Increment(ref this._commands);
+            Interlocked.Add(ref this._commandTicks, duration.Ticks);
+        }
+    }
+
+    public class ServerMetrics
+    {
+        /// <summary>
+        /// Path for getting the metrics.
+        /// </summary>
+        public const string MetricsPath = "/metrics";
+
+        /// <summary>
+        /// HTTP methods that are recorded by name. Other methods are recorded as "other"
+        /// so that the number of metrics doesn't grow with the methods sent by clients.
+        /// </summary>
+        private static readonly HashSet<string> RecordedMethods = new HashSet<string>() { "GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH" };
+
+        /// <summary>
+        /// Durations of the requests by route, method, and status code.
+        /// </summary>
+        private static readonly ConcurrentDictionary<(string, string, int), MetricsHistogram> RequestDurations = new ConcurrentDictionary<(string, string, int), MetricsHistogram>();
+
+        /// <summary>
+        /// Durations of the database commands by type of command.
+        /// </summary>
+        private static readonly ConcurrentDictionary<string, MetricsHistogram> CommandDurations = new ConcurrentDictionary<string, MetricsHistogram>();
+
+        /// <summary>
+        /// Metrics added by the services (like queue depths), by name.
+        /// </summary>
+        private static readonly ConcurrentDictionary<string, (string, string, Func<double>)> AddedMetrics = new ConcurrentDictionary<string, (string, string, Func<double>)>();
+
+        /// <summary>
+        /// Total database commands that failed.
+        /// </summary>
+        private static long _commandErrors;
+
+        /// <summary>
+        /// Total requests that took longer than the slow request threshold.
+        /// </summary>
+        private static long _slowRequests;
+
+        /// <summary>
+        /// Requests being handled.
+        /// </summary>
+        private static long _requestsInProgress;
+
+        /// <summary>
+        /// Returns if metrics are recorded.
+        /// </summary>
+        public static bool Enabled => ConstructConfiguration.Configuration.Metrics?.Enabled ?? true;
+
+        /// <summary>
+        /// Removes the recorded metrics.
+        /// </summary>
+        public static void Reset()
+        {
+            RequestDurations.Clear();
+            CommandDurations.Clear();
+            AddedMetrics.Clear();
+            Interlocked.Exchange(ref _commandErrors, 0);
+            Interlocked.Exchange(ref _slowRequests, 0);
+        }
+
+        /// <summary>
+        /// Adds a metric that is read when the metrics are requested.
+        /// </summary>
+        /// <param name="name">Name of the metric (like construct_swipe_queue_depth).</param>
+        /// <param name="type">Prometheus type of the metric ("gauge" or "counter").</param>
+        /// <param name="help">Description of the metric.</param>
+        /// <param name="getValue">Function that returns the value of the metric.</param>
+        public static void AddMetric(string name, string type, string help, Func<double> getValue)
+        {
+            AddedMetrics[name] = (type, help, getValue);
+        }
+
+        /// <summary>
+        /// Records a database command.
+        /// </summary>
+        /// <param name="type">Type of the command ("reader", "nonquery", or "scalar").</param>
+        /// <param name="duration">Duration of the command.</param>
+        /// <param name="failed">Whether the command failed.</param>
+        public static void RecordCommand(string type, TimeSpan duration, bool failed = false)
+        {
+            if (!Enabled) return;
+            CommandDurations.GetOrAdd(type, _ => new MetricsHistogram()).Observe(duration);
+            RequestTrace.Current?.AddCommand(duration);
+            if (failed)
+            {
+                Interlocked.Increment(ref _commandErrors);
+            }
+        }
+
+        /// <summary>
+        /// Returns the name of the route that handled a request. MVC requests
+        /// are named by the controller method so that the number of routes
+        /// doesn't grow with the paths requested.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <returns>The name of the route.</returns>
+        public static string GetRouteName(HttpContext context)
+        {
+            var routeValues = context.GetRouteData()?.Values;
+            if (routeValues != null && routeValues.TryGetValue("controller", out var controller) && routeValues.TryGetValue("action", out var action))
+            {
+                return $"{controller}Controller.{action}";
+            }
+            return (context.Response.StatusCode == StatusCodes.Status404NotFound ? "unmatched" : "static");
+        }
+
+        /// <summary>
+        /// Returns the name of the HTTP method of a request.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <returns>The name of the HTTP method.</returns>
+        public static string GetMethodName(HttpContext context)
+        {
+            var method = context.Request.Method?.ToUpper();
+            return (method != null && RecordedMethods.Contains(method) ? method : "other");
+        }
+
+        /// <summary>
+        /// Returns if the metrics can be sent for a request. Only requests from
+        /// the local machine can get the metrics unless remote requests are allowed.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <returns>Whether the metrics can be sent.</returns>
+        public static bool CanSendMetrics(HttpContext context)
+        {
+            if (ConstructConfiguration.Configuration.Metrics?.AllowRemoteRequests ?? false) return true;
+            var remoteAddress = context.Connection.RemoteIpAddress;
+            return remoteAddress != null && IPAddress.IsLoopback(remoteAddress);
+        }
+
+        /// <summary>
+        /// Handles the metrics request and records the time of the other requests.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="next">Next handler for the request.</param>
+        public static async Task HandleRequestAsync(HttpContext context, Func<Task> next)
+        {
+            // Continue to the next handler if metrics are disabled.
+            if (!Enabled)
+            {
+                await next().ConfigureAwait(false);
+                return;
+            }
+
+            // Handle the metrics request.
+            if (context.Request.Path.Value == MetricsPath && CanSendMetrics(context))
+            {
+                context.Response.StatusCode = StatusCodes.Status200OK;
+                context.Response.ContentType = "text/plain; version=0.0.4";
+                context.Response.Headers["Cache-Control"] = "no-store";
+                await context.Response.WriteAsync(GetMetricsText()).ConfigureAwait(false);
+                return;
+            }
+
+            // Handle the request and record the time.
+            var startTime = Stopwatch.GetTimestamp();
+            var trace = RequestTrace.Start();
+            Interlocked.Increment(ref _requestsInProgress);
+            try
+            {
+                await next().ConfigureAwait(false);
+            }
+            finally
+            {
+                Interlocked.Decrement(ref _requestsInProgress);
+                var duration = TimeSpan.FromSeconds((Stopwatch.GetTimestamp() - startTime) / (double) Stopwatch.Frequency);
+                var route = GetRouteName(context);
+                RequestDurations.GetOrAdd((route, GetMethodName(context), context.Response.StatusCode), _ => new MetricsHistogram()).Observe(duration);
+
+                // Log the request if it was slow.
+                var slowRequestThreshold = ConstructConfiguration.Configuration.Metrics?.SlowRequestThreshold ?? 0;
+                if (slowRequestThreshold > 0 && duration.TotalMilliseconds >= slowRequestThreshold)
+                {
+                    Interlocked.Increment(ref _slowRequests);
+                    Log.Warn($"Slow request {context.Request.Method} {context.Request.Path} handled by {route} in {duration.TotalMilliseconds:0}ms " +
+                             $"(status {context.Response.StatusCode}, {trace.Commands} database commands in {trace.CommandDuration.TotalMilliseconds:0}ms).");
+                }
+            }
+        }
+
+        /// <summary>
+        /// Escapes the value of a label.
+        /// </summary>
+        /// <param name="value">Value to escape.</param>
+        /// <returns>The escaped value.</returns>
+        private static string EscapeLabel(string value)
+        {
+            return value.Replace("\\", "\\\\").Replace("\"", "\\\"").Replace("\n", "\\n");
+        }
+
+        /// <summary>
+        /// Writes a metric with a single value.
+        /// </summary>
+        /// <param name="output">Output to write to.</param>
+        /// <param name="name">Name of the metric.</param>
+        /// <param name="type">Prometheus type of the metric.</param>
+        /// <param name="help">Description of the metric.</param>
+        /// <param name="value">Value of the metric.</param>
+        private static void WriteMetric(StringBuilder output, string name, string type, string help, double value)
+        {
+            output.Append($"# HELP {name} {help}\n# TYPE {name} {type}\n");
+            output.Append($"{name} {value.ToString(CultureInfo.InvariantCulture)}\n");
+        }
+
+        /// <summary>
+        /// Returns the metrics in the Prometheus text format.
+        /// </summary>
+        /// <returns>The metrics in the Prometheus text format.</returns>
+        public static string GetMetricsText()
+        {
+            var output = new StringBuilder();
+
+            // Add the requests.
+            output.Append("# HELP construct_http_request_duration_seconds Duration of the HTTP requests.\n# TYPE construct_http_request_duration_seconds histogram\n");
+            foreach (var ((route, method, statusCode), histogram) in RequestDurations.OrderBy(pair => pair.Key))
+            {
+                histogram.Write(output, "construct_http_request_duration_seconds", $"route=\"{EscapeLabel(route)}\",method=\"{EscapeLabel(method)}\",code=\"{statusCode}\"");
+            }
+            WriteMetric(output, "construct_http_requests_in_progress", "gauge", "HTTP requests being handled.", Interlocked.Read(ref _requestsInProgress));
+            WriteMetric(output, "construct_http_slow_requests_total", "counter", "HTTP requests that took longer than the slow request threshold.", Interlocked.Read(ref _slowRequests));
+
+            // Add the database commands.
+            output.Append("# HELP construct_db_command_duration_seconds Duration of the database commands.\n# TYPE construct_db_command_duration_seconds histogram\n");
+            foreach (var (type, histogram) in CommandDurations.OrderBy(pair => pair.Key))
+            {
+                histogram.Write(output, "construct_db_command_duration_seconds", $"type=\"{EscapeLabel(type)}\"");
+            }
+            WriteMetric(output, "construct_db_command_errors_total", "counter", "Database commands that failed.", Interlocked.Read(ref _commandErrors));
+
+            // Add the user cache.
+            var userCache = UserCache.GetSingleton();
+            WriteMetric(output, "construct_user_cache_hits_total", "counter", "Users found in the user cache.", userCache.Hits);
+            WriteMetric(output, "construct_user_cache_misses_total", "counter", "Users not found in the user cache.", userCache.Misses);
+            WriteMetric(output, "construct_user_cache_evictions_total", "counter", "Users removed from the user cache.", userCache.Evictions);
+            WriteMetric(output, "construct_user_cache_entries", "gauge", "Users stored in the user cache.", userCache.Count);
+
+            // Add the garbage collector and thread pool.
+            output.Append("# HELP construct_gc_collections_total Garbage collections by generation.\n# TYPE construct_gc_collections_total counter\n");
+            for (var generation = 0; generation <= GC.MaxGeneration; generation++)
+            {
+                output.Append($"construct_gc_collections_total{{generation=\"{generation}\"}} {GC.CollectionCount(generation)}\n");
+            }
+            WriteMetric(output, "construct_gc_heap_bytes", "gauge", "Bytes allocated in the managed heap.", GC.GetTotalMemory(false));
+            WriteMetric(output, "construct_gc_allocated_bytes_total", "counter", "Bytes allocated since the process started.", GC.GetTotalAllocatedBytes());
+            WriteMetric(output, "construct_gc_pause_time_percent", "gauge", "Percent of time paused by the last garbage collection.", GC.GetGCMemoryInfo().PauseTimePercentage);
+            WriteMetric(output, "construct_threadpool_threads", "gauge", "Threads in the thread pool.", ThreadPool.ThreadCount);
+            WriteMetric(output, "construct_threadpool_queue_length", "gauge", "Work items waiting for the thread pool.", ThreadPool.PendingWorkItemCount);
+            WriteMetric(output, "construct_threadpool_completed_items_total", "counter", "Work items completed by the thread pool.", ThreadPool.CompletedWorkItemCount);
+            WriteMetric(output, "construct_process_working_set_bytes", "gauge", "Physical memory used by the process.", Environment.WorkingSet);
+            WriteMetric(output, "construct_uptime_seconds", "gauge", "Time since the server started.", (long) (DateTime.Now - ServerStatus.StartTime).TotalSeconds);
+
+            // Add the metrics from the services.
+            foreach (var (name, (type, help, getValue)) in AddedMetrics.OrderBy(pair => pair.Key))
+            {
+                WriteMetric(output, name, type, help, getValue());
+            }
+            return output.ToString();
+        }
+    }
+}
@@ -1,8 +1,13 @@
 using System;
+using System.Linq;
 using Construct.Core.Configuration;
+using Construct.Core.Database;
+using Construct.Core.Database.Archive;
 using Construct.Core.Database.Context;
 using Construct.Core.Logging;
 using Microsoft.AspNetCore.Hosting;
+using Microsoft.EntityFrameworkCore;
+using Microsoft.Extensions.DependencyInjection;
 using Microsoft.Extensions.Hosting;
 using Microsoft.Extensions.Logging;
 
@@ -10,26 +15,61 @@ namespace Construct.Core.Server
 {
     public class ServerProgram
     {
+        /// <summary>
+        /// Argument for starting the server to check that it becomes ready. The database
+        /// migrations aren't applied, the background services aren't started, and the
+        /// configuration isn't watched so that checking a release doesn't change the database.
+        /// </summary>
+        public const string ProbeArgument = "--probe";
+        
         /// <summary>
         /// Runs the server program.
         /// </summary>
         /// <param name="args">Arguments from the command line.</param>
         /// <param name="identifier">Name of the application domain.</param>
-        public static void Run(string[] args, string identifier)
+        /// <param name="hostedServices">Background services to run with the server.</param>
+        public static void Run(string[] args, string identifier, params Type[] hostedServices)
         {
             // Set up the logging.
+            ServerStatus.Reset();
             Log.Initialize(identifier);
+            ServerStatus.CompletePhase("logging");
             
             // Load the configuration.
             ConstructConfiguration.LoadDefaultAsync().Wait();
             Log.SetMinimumLogLevel(ConstructConfiguration.Configuration.Logging?.ConsoleLevel ?? LogLevel.Information);
+            Log.ConfigureFileOutput(ConstructConfiguration.Configuration.Logging);
+            ConstructConfiguration.Reloaded += configuration =>
+            {
+                Log.SetMinimumLogLevel(configuration.Logging?.ConsoleLevel ?? LogLevel.Information);
+                Log.ConfigureFileOutput(configuration.Logging);
+            };
+            AppDomain.CurrentDomain.ProcessExit += (_, _) => Log.CloseFileOutput();
+            ServerMetrics.AddMetric("construct_log_file_written_total", "counter", "Log entries written to the log file.", () => Log.FileOutput?.Written ?? 0);
+            ServerMetrics.AddMetric("construct_log_file_dropped_total", "counter", "Log entries dropped because the log file queue was full.", () => Log.FileOutput?.Dropped ?? 0);
+            ServerMetrics.AddMetric("construct_log_file_sampled_total", "counter", "Log entries skipped by the log file sample rates.", () => Log.FileOutput?.Sampled ?? 0);
+            var probe = args.Contains(ProbeArgument);
+            if (!probe)
+            {
+                ConstructConfiguration.StartWatching();
+            }
+            ServerStatus.CompletePhase("configuration");
             
             // Ensure the database is up to date.
             try
             {
-                Log.Info("Ensuring database is up to date.");
                 using var context = new ConstructContext();
-                context.EnsureUpToDateAsync().Wait();
+                if (probe)
+                {
+                    var pendingMigrations = context.Database.GetPendingMigrations().ToList();
+                    Log.Info($"Not applying {pendingMigrations.Count} pending migration(s) while probing.");
+                }
+                else
+                {
+                    Log.Info("Ensuring database is up to date.");
+                    context.EnsureUpToDateAsync().Wait();
+                }
+                ServerStatus.MigrationsCompleted = true;
             }
             catch (Exception e)
             {
@@ -37,6 +77,21 @@ namespace Construct.Core.Server
                 Log.Critical(e);
                 Environment.Exit(-1);
             }
+            ServerStatus.CompletePhase("migrations");
+            
+            // Check the print totals and exit if requested.
+            if (args.Contains(PrintTotalsCheck.Argument))
+            {
+                PrintTotalsCheck.RunAsync().Wait();
+                Environment.Exit(0);
+            }
+            
+            // Archive the old logs and exit if requested.
+            if (args.Contains(LogArchive.Argument))
+            {
+                LogArchive.GetSingleton().ArchiveAsync().Wait();
+                Environment.Exit(0);
+            }
             
             // Get the port.
             if (!ConstructConfiguration.Configuration.Ports.ContainsKey(identifier))
@@ -46,20 +101,32 @@ namespace Construct.Core.Server
             }
             var port = ConstructConfiguration.Configuration.Ports[identifier];
             
-            // Build the app.
+            // Build the app. The probe argument is removed since the host can't read arguments without values.
             Log.Debug("Preparing server.");
-            var host = Host.CreateDefaultBuilder(args)
+            var host = Host.CreateDefaultBuilder(args.Where(arg => arg != ProbeArgument).ToArray())
                 .ConfigureLogging(logging => logging.ClearProviders().AddProvider(Log.Logger))
+                .ConfigureServices(services =>
+                {
+                    if (probe) return;
+                    foreach (var hostedService in hostedServices)
+                    {
+                        services.AddSingleton(typeof(IHostedService), hostedService);
+                    }
+                })
                 .ConfigureWebHostDefaults(webBuilder =>
                 {
                     webBuilder.UseStartup<Startup>()
                         .UseUrls($"http://*:{port}");
                 })
                 .Build();
+            ServerStatus.CompletePhase("host");
             
             // Start the server.
             Log.Info($"Starting server on port {port}.");
-            host.Run();
+            host.Start();
+            ServerStatus.CompletePhase("listen");
+            ServerStatus.LogStartupTimings();
+            host.WaitForShutdown();
         }
 
         /// <summary>
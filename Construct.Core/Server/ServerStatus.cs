@@ -0,0 +1,191 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Threading.Tasks;
+using Construct.Core.Database.Cache;
+using Construct.Core.Database.Context;
+using Construct.Core.Logging;
+using Microsoft.AspNetCore.Http;
+using Newtonsoft.Json;
+
+namespace Construct.Core.Server
+{
+    public class ServerStatus
+    {
+        /// <summary>
+        /// Path for checking if the server is running.
+        /// </summary>
+        public const string HealthPath = "/health";
+
+        /// <summary>
+        /// Path for checking if the server can handle requests.
+        /// </summary>
+        public const string ReadyPath = "/ready";
+
+        /// <summary>
+        /// Whether the database migrations were completed.
+        /// </summary>
+        public static bool MigrationsCompleted { get; set; }
+
+        /// <summary>
+        /// Time the server started.
+        /// </summary>
+        public static DateTime StartTime { get; private set; } = DateTime.Now;
+
+        /// <summary>
+        /// Time taken for each phase of starting the server, in order.
+        /// </summary>
+        public static List<(string, TimeSpan)> StartupTimings { get; } = new List<(string, TimeSpan)>();
+
+        /// <summary>
+        /// Stopwatch for the current phase of starting the server.
+        /// </summary>
+        private static readonly Stopwatch PhaseStopwatch = new Stopwatch();
+
+        /// <summary>
+        /// Resets the startup information.
+        /// </summary>
+        public static void Reset()
+        {
+            MigrationsCompleted = false;
+            StartTime = DateTime.Now;
+            lock (StartupTimings)
+            {
+                StartupTimings.Clear();
+            }
+            PhaseStopwatch.Restart();
+        }
+
+        /// <summary>
+        /// Completes a phase of starting the server. The time taken is
+        /// since the previous phase was completed.
+        /// </summary>
+        /// <param name="phase">Name of the phase.</param>
+        public static void CompletePhase(string phase)
+        {
+            var duration = PhaseStopwatch.Elapsed;
+            lock (StartupTimings)
+            {
+                StartupTimings.Add((phase, duration));
+            }
+            Log.Debug($"Completed startup phase {phase} in {duration.TotalMilliseconds:0}ms.");
+            PhaseStopwatch.Restart();
+        }
+
+        /// <summary>
+        /// Times a phase of starting the server that may happen separately
+        /// from the other phases (like scanning for request handlers).
+        /// </summary>
+        /// <param name="phase">Name of the phase.</param>
+        /// <param name="action">Action to time.</param>
+        public static T TimePhase<T>(string phase, Func<T> action)
+        {
+            var stopwatch = Stopwatch.StartNew();
+            var result = action();
+            lock (StartupTimings)
+            {
+                StartupTimings.Add((phase, stopwatch.Elapsed));
+            }
+            Log.Debug($"Completed startup phase {phase} in {stopwatch.Elapsed.TotalMilliseconds:0}ms.");
+            return result;
+        }
+
+        /// <summary>
+        /// Logs the time taken for each phase of starting the server.
+        /// </summary>
+        public static void LogStartupTimings()
+        {
+            lock (StartupTimings)
+            {
+                var phases = string.Join(", ", StartupTimings.Select(timing => $"{timing.Item1}={timing.Item2.TotalMilliseconds:0}ms"));
+                Log.Info($"Startup completed in {(DateTime.Now - StartTime).TotalMilliseconds:0}ms ({phases}).");
+            }
+        }
+
+        /// <summary>
+        /// Returns if the server can handle requests. The database migrations
+        /// must be completed and the database must be reachable.
+        /// </summary>
+        public static async Task<bool> IsReadyAsync()
+        {
+            // Return false if the migrations are not done.
+            if (!MigrationsCompleted) return false;
+
+            // Return if the database can be connected to.
+            try
+            {
+                await using var context = new ConstructContext();
+                return await context.CanConnectAsync().ConfigureAwait(false);
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"Failed to check database for readiness: {e.Message}");
+                return false;
+            }
+        }
+
+        /// <summary>
+        /// Handles the health and ready requests before they reach MVC.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="next">Next handler for the request.</param>
+        public static async Task HandleRequestAsync(HttpContext context, Func<Task> next)
+        {
+            // Handle the health request.
+            var path = context.Request.Path.Value;
+            if (path == HealthPath)
+            {
+                var userCache = UserCache.GetSingleton();
+                await WriteStatusAsync(context, StatusCodes.Status200OK, "healthy", new
+                {
+                    hits = userCache.Hits,
+                    misses = userCache.Misses,
+                    evictions = userCache.Evictions,
+                    count = userCache.Count,
+                }).ConfigureAwait(false);
+                return;
+            }
+
+            // Handle the ready request.
+            if (path == ReadyPath)
+            {
+                if (await IsReadyAsync().ConfigureAwait(false))
+                {
+                    await WriteStatusAsync(context, StatusCodes.Status200OK, "ready").ConfigureAwait(false);
+                }
+                else
+                {
+                    await WriteStatusAsync(context, StatusCodes.Status503ServiceUnavailable, "not-ready").ConfigureAwait(false);
+                }
+                return;
+            }
+
+            // Continue to the next handler.
+            await next().ConfigureAwait(false);
+        }
+
+        /// <summary>
+        /// Writes a status response.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="statusCode">Status code of the response.</param>
+        /// <param name="status">Status to send.</param>
+        /// <param name="userCache">Statistics of the user cache to send, if any.</param>
+        private static async Task WriteStatusAsync(HttpContext context, int statusCode, string status, object userCache = null)
+        {
+            context.Response.StatusCode = statusCode;
+            context.Response.ContentType = "application/json";
+            context.Response.Headers["Cache-Control"] = "no-store";
+            await context.Response.WriteAsync(JsonConvert.SerializeObject(new
+            {
+                status,
+                uptime = (long) (DateTime.Now - StartTime).TotalSeconds,
+                userCache,
+            }, new JsonSerializerSettings()
+            {
+                NullValueHandling = NullValueHandling.Ignore,
+            })).ConfigureAwait(false);
+        }
+    }
+}
@@ -8,7 +8,6 @@ using Construct.Core.Logging;
 using Microsoft.AspNetCore.Builder;
 using Microsoft.AspNetCore.Hosting;
 using Microsoft.Extensions.DependencyInjection;
-using Microsoft.Extensions.FileProviders;
 using Microsoft.Extensions.Hosting;
 
 namespace Construct.Core.Server
@@ -19,6 +18,11 @@ namespace Construct.Core.Server
         /// LifeTime of the application.
         /// </summary>
         public static IHostApplicationLifetime LifeTime { get; private set; }
+
+        /// <summary>
+        /// Prefix of the names of the assemblies that can contain controllers.
+        /// </summary>
+        public const string ConstructAssemblyPrefix = "Construct.";
         
         /// <summary>
         /// Returns the request handler methods in given type.
@@ -48,14 +52,44 @@ namespace Construct.Core.Server
         }
     
         /// <summary>
-        /// Returns the request handler methods in the current assembly.
+        /// Returns the loaded assemblies that can contain controllers.
+        /// Only the Construct assemblies are returned so that the framework
+        /// and library assemblies (like EF Core and Npgsql) are not scanned.
+        /// </summary>
+        public static List<Assembly> GetConstructAssemblies()
+        {
+            return AppDomain.CurrentDomain.GetAssemblies()
+                .Where(assembly => !assembly.IsDynamic && (assembly.GetName().Name ?? "").StartsWith(ConstructAssemblyPrefix, StringComparison.Ordinal))
+                .OrderBy(assembly => assembly.GetName().Name, StringComparer.Ordinal)
+                .ToList();
+        }
+        
+        /// <summary>
+        /// Returns the types of an assembly that can be loaded.
+        /// </summary>
+        /// <param name="assembly">Assembly to get the types of.</param>
+        private static IEnumerable<Type> GetLoadableTypes(Assembly assembly)
+        {
+            try
+            {
+                return assembly.GetTypes();
+            }
+            catch (ReflectionTypeLoadException e)
+            {
+                Log.Warn($"Failed to load some types in {assembly.GetName().Name}.");
+                return e.Types.Where(type => type != null);
+            }
+        }
+    
+        /// <summary>
+        /// Returns the request handler methods in the Construct assemblies.
         /// The returned list of pairs is the path and method for the handler.
         /// </summary>
         public static List<(string, MethodInfo)> GetRequestHandlerMethods()
         {
-            // Iterate over the types and add the request handlers.
+            // Iterate over the classes and add the request handlers.
             var handlers = new List<(string, MethodInfo)>();
-            foreach (var type in AppDomain.CurrentDomain.GetAssemblies().SelectMany(assembly => assembly.GetTypes()))
+            foreach (var type in GetConstructAssemblies().SelectMany(GetLoadableTypes).Where(type => type.IsClass && !type.IsAbstract))
             {
                 handlers.AddRange(GetRequestHandlerMethods(type));
             }
@@ -76,7 +110,7 @@ namespace Construct.Core.Server
             {
                 options.EnableEndpointRouting = false;
             });
-            foreach (var assembly in AppDomain.CurrentDomain.GetAssemblies())
+            foreach (var assembly in GetConstructAssemblies())
             {
                 mvc.AddApplicationPart(assembly);
             }
@@ -100,22 +134,36 @@ namespace Construct.Core.Server
             }
             app.UseDeveloperExceptionPage();
 
+            // Set up the health and ready requests.
+            // Done before the other handlers so that checking the status does not go through MVC.
+            app.Use(ServerStatus.HandleRequestAsync);
+
+            // Set up the metrics request and recording the time of the requests.
+            // Done after the status requests so that health checks aren't recorded.
+            app.Use(ServerMetrics.HandleRequestAsync);
+
             // Set up the static files.
+            // The files are loaded into memory and compressed once, and loaded again when they change.
             var staticFiles = Path.GetFullPath("web");
+            StaticAssetCache staticAssets = null;
             if (Directory.Exists(staticFiles))
             {
                 Log.Debug($"Setting up static files at {staticFiles}.");
-                app.UseStaticFiles(new StaticFileOptions
+                staticAssets = new StaticAssetCache(staticFiles);
+                ServerStatus.TimePhase("static", () =>
                 {
-                    FileProvider = new PhysicalFileProvider(staticFiles),
-                    RequestPath = "",
+                    staticAssets.Load();
+                    return staticAssets.Count;
                 });
+                staticAssets.StartWatching();
+                lifeTime.ApplicationStopping.Register(staticAssets.Dispose);
+                app.Use(staticAssets.HandleFileRequestAsync);
             }
 
             // Add the MVC controllers.
             app.UseMvc(routes =>
             {
-                var handlers = GetRequestHandlerMethods();
+                var handlers = ServerStatus.TimePhase("handlers", () => GetRequestHandlerMethods());
                 Log.Debug($"Registering {handlers.Count} API request handlers.");
                 foreach (var (path, handlerMethod) in handlers)
                 {
@@ -139,25 +187,9 @@ namespace Construct.Core.Server
 
             // Set up returning index.html for paths.
             // Done after the MVC setup so that controllers can handle requests first.
-            if (Directory.Exists(staticFiles))
+            if (staticAssets != null)
             {
-                app.Use(async (context, next) =>
-                {
-                    // Get the index.html for the path.
-                    var path = context.Request.Path.ToString().Substring(1);
-                    var indexHtml = Path.Combine(staticFiles, path, "index.html");
-                    
-                    // Send the file if it is found.
-                    if (File.Exists(indexHtml))
-                    {
-                        context.Response.Headers.Add("Content-Type", "text/html");
-                        await context.Response.Body.WriteAsync(await File.ReadAllBytesAsync(indexHtml));
-                        return;
-                    }
-                    
-                    // Continue to the next route.
-                    await next.Invoke();
-                });
+                app.Use(staticAssets.HandleIndexRequestAsync);
             }
         }
     }
@@ -0,0 +1,366 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.IO.Compression;
+using System.Linq;
+using System.Security.Cryptography;
+using System.Text;
+using System.Text.RegularExpressions;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Logging;
+using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.StaticFiles;
+using Microsoft.Net.Http.Headers;
+
+namespace Construct.Core.Server
+{
+    public class StaticAsset
+    {
+        /// <summary>
+        /// Content type of the asset.
+        /// </summary>
+        public string ContentType { get; set; }
+
+        /// <summary>
+        /// Uncompressed contents of the asset.
+        /// </summary>
+        public byte[] Contents { get; set; }
+
+        /// <summary>
+        /// Gzip compressed contents of the asset, or null if compressing doesn't make it smaller.
+        /// </summary>
+        public byte[] GzipContents { get; set; }
+
+        /// <summary>
+        /// Brotli compressed contents of the asset, or null if compressing doesn't make it smaller.
+        /// </summary>
+        public byte[] BrotliContents { get; set; }
+
+        /// <summary>
+        /// Version of the asset created from the contents. Used for the ETag
+        /// and the v query parameter of versioned URLs.
+        /// </summary>
+        public string Version { get; set; }
+
+        /// <summary>
+        /// Time the file of the asset was last changed.
+        /// </summary>
+        public DateTimeOffset LastModified { get; set; }
+    }
+
+    public class StaticAssetCache : IDisposable
+    {
+        /// <summary>
+        /// Cache-Control header for versioned URLs, which change when the asset changes.
+        /// </summary>
+        public const string VersionedCacheControl = "public, max-age=31536000, immutable";
+
+        /// <summary>
+        /// Cache-Control header for the other URLs, which are checked with the ETag before being used.
+        /// </summary>
+        public const string UnversionedCacheControl = "no-cache";
+
+        /// <summary>
+        /// Time to wait after a file changes before loading the assets again,
+        /// so that copying several files only loads the assets once.
+        /// </summary>
+        public static TimeSpan ReloadDelay { get; set; } = TimeSpan.FromMilliseconds(500);
+
+        /// <summary>
+        /// Pattern for the local URLs in the src and href attributes of HTML files.
+        /// </summary>
+        private static readonly Regex LocalUrlPattern = new Regex("(src|href)=\"(/[^/\"?#][^\"?#]*)\"", RegexOptions.Compiled);
+
+        /// <summary>
+        /// Content types of the file extensions.
+        /// </summary>
+        private static readonly FileExtensionContentTypeProvider ContentTypes = new FileExtensionContentTypeProvider();
+
+        /// <summary>
+        /// Directory the assets are loaded from.
+        /// </summary>
+        public string Directory { get; }
+
+        /// <summary>
+        /// Total assets that are loaded.
+        /// </summary>
+        public int Count => this._assets.Count;
+
+        /// <summary>
+        /// Loaded assets by request path (like /admin/js/app.js).
+        /// </summary>
+        private Dictionary<string, StaticAsset> _assets = new Dictionary<string, StaticAsset>(StringComparer.OrdinalIgnoreCase);
+
+        /// <summary>
+        /// Watcher for changes to the files.
+        /// </summary>
+        private FileSystemWatcher _watcher;
+
+        /// <summary>
+        /// Timer for loading the assets after a file changes.
+        /// </summary>
+        private Timer _reloadTimer;
+
+        /// <summary>
+        /// Creates the cache.
+        /// </summary>
+        /// <param name="directory">Directory to load the assets from.</param>
+        public StaticAssetCache(string directory)
+        {
+            this.Directory = Path.GetFullPath(directory);
+        }
+
+        /// <summary>
+        /// Returns the compressed contents, or null if they aren't smaller.
+        /// </summary>
+        /// <param name="contents">Contents to compress.</param>
+        /// <param name="createStream">Creates the compression stream for the output.</param>
+        /// <returns>The compressed contents, or null if they aren't smaller.</returns>
+        private static byte[] Compress(byte[] contents, Func<Stream, Stream> createStream)
+        {
+            using var output = new MemoryStream();
+            using (var compressionStream = createStream(output))
+            {
+                compressionStream.Write(contents, 0, contents.Length);
+            }
+            var compressedContents = output.ToArray();
+            return (compressedContents.Length < contents.Length * 0.9 ? compressedContents : null);
+        }
+
+        /// <summary>
+        /// Returns the version of the contents of an asset.
+        /// </summary>
+        /// <param name="contents">Contents of the asset.</param>
+        /// <returns>The version of the contents.</returns>
+        private static string GetVersion(byte[] contents)
+        {
+            using var sha256 = SHA256.Create();
+            return Convert.ToHexString(sha256.ComputeHash(contents)).Substring(0, 16).ToLower();
+        }
+
+        /// <summary>
+        /// Adds the versions of the local assets to the URLs in an HTML file
+        /// so that browsers can store the assets until the HTML file changes.
+        /// </summary>
+        /// <param name="contents">Contents of the HTML file.</param>
+        /// <param name="versions">Versions of the assets by request path.</param>
+        /// <returns>The contents with the versioned URLs.</returns>
+        private static byte[] AddVersions(byte[] contents, IReadOnlyDictionary<string, string> versions)
+        {
+            var html = LocalUrlPattern.Replace(Encoding.UTF8.GetString(contents), match =>
+            {
+                if (!versions.TryGetValue(match.Groups[2].Value, out var version)) return match.Value;
+                return $"{match.Groups[1].Value}=\"{match.Groups[2].Value}?v={version}\"";
+            });
+            return Encoding.UTF8.GetBytes(html);
+        }
+
+        /// <summary>
+        /// Creates an asset.
+        /// </summary>
+        /// <param name="contents">Contents of the asset.</param>
+        /// <param name="contentType">Content type of the asset.</param>
+        /// <param name="lastModified">Time the file of the asset was last changed.</param>
+        /// <returns>The created asset.</returns>
+        private static StaticAsset CreateAsset(byte[] contents, string contentType, DateTimeOffset lastModified)
+        {
+            return new StaticAsset()
+            {
+                ContentType = contentType,
+                Contents = contents,
+                GzipContents = Compress(contents, output => new GZipStream(output, CompressionLevel.Optimal)),
+                BrotliContents = Compress(contents, output => new BrotliStream(output, CompressionLevel.Optimal)),
+                Version = GetVersion(contents),
+                LastModified = lastModified,
+            };
+        }
+
+        /// <summary>
+        /// Loads the assets from the directory. The loaded assets replace
+        /// the previous assets once they are all loaded.
+        /// </summary>
+        public void Load()
+        {
+            // Read the files with known content types.
+            var files = new Dictionary<string, (byte[], string, DateTimeOffset)>(StringComparer.OrdinalIgnoreCase);
+            foreach (var file in System.IO.Directory.EnumerateFiles(this.Directory, "*", SearchOption.AllDirectories))
+            {
+                if (!ContentTypes.TryGetContentType(file, out var contentType)) continue;
+                var path = "/" + Path.GetRelativePath(this.Directory, file).Replace(Path.DirectorySeparatorChar, '/');
+                files[path] = (File.ReadAllBytes(file), contentType, File.GetLastWriteTimeUtc(file));
+            }
+
+            // Create the assets other than HTML files, and then the HTML files with the versions of the other assets.
+            var assets = new Dictionary<string, StaticAsset>(StringComparer.OrdinalIgnoreCase);
+            foreach (var (path, (contents, contentType, lastModified)) in files.Where(pair => pair.Value.Item2 != "text/html"))
+            {
+                assets[path] = CreateAsset(contents, contentType, lastModified);
+            }
+            var versions = assets.ToDictionary(pair => pair.Key, pair => pair.Value.Version, StringComparer.OrdinalIgnoreCase);
+            foreach (var (path, (contents, contentType, lastModified)) in files.Where(pair => pair.Value.Item2 == "text/html"))
+            {
+                assets[path] = CreateAsset(AddVersions(contents, versions), contentType, lastModified);
+            }
+
+            // Replace the assets.
+            this._assets = assets;
+            Log.Debug($"Loaded {assets.Count} static assets ({assets.Values.Sum(asset => (long) asset.Contents.Length)} bytes) from {this.Directory}.");
+        }
+
+        /// <summary>
+        /// Starts loading the assets again when the files change.
+        /// </summary>
+        public void StartWatching()
+        {
+            if (this._watcher != null) return;
+            this._reloadTimer = new Timer(_ =>
+            {
+                try
+                {
+                    this.Load();
+                }
+                catch (Exception e)
+                {
+                    Log.Warn($"Failed to load the static assets from {this.Directory}: {e.Message}");
+                }
+            });
+            this._watcher = new FileSystemWatcher(this.Directory)
+            {
+                IncludeSubdirectories = true,
+                NotifyFilter = NotifyFilters.FileName | NotifyFilters.DirectoryName | NotifyFilters.LastWrite | NotifyFilters.Size,
+            };
+            FileSystemEventHandler scheduleReload = (_, _) => this._reloadTimer.Change(ReloadDelay, Timeout.InfiniteTimeSpan);
+            this._watcher.Changed += scheduleReload;
+            this._watcher.Created += scheduleReload;
+            this._watcher.Deleted += scheduleReload;
+            this._watcher.Renamed += (_, _) => this._reloadTimer.Change(ReloadDelay, Timeout.InfiniteTimeSpan);
+            this._watcher.EnableRaisingEvents = true;
+        }
+
+        /// <summary>
+        /// Returns the asset for a request path, or null if there is none.
+        /// </summary>
+        /// <param name="path">Path of the request.</param>
+        /// <returns>The asset for the path.</returns>
+        public StaticAsset Get(string path)
+        {
+            return this._assets.TryGetValue(path, out var asset) ? asset : null;
+        }
+
+        /// <summary>
+        /// Returns the index.html asset of a request path (like /admin), or null if there is none.
+        /// </summary>
+        /// <param name="path">Path of the request.</param>
+        /// <returns>The index.html asset for the path.</returns>
+        public StaticAsset GetIndex(string path)
+        {
+            return this.Get(path.TrimEnd('/') + "/index.html");
+        }
+
+        /// <summary>
+        /// Returns if a request accepts an encoding.
+        /// </summary>
+        /// <param name="request">Request to check.</param>
+        /// <param name="encoding">Encoding to check for (like "br").</param>
+        /// <returns>Whether the encoding is accepted.</returns>
+        private static bool AcceptsEncoding(HttpRequest request, string encoding)
+        {
+            return request.GetTypedHeaders().AcceptEncoding.Any(value =>
+                string.Equals(value.Value.Value, encoding, StringComparison.OrdinalIgnoreCase) && (value.Quality ?? 1) > 0);
+        }
+
+        /// <summary>
+        /// Sends an asset.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="asset">Asset to send.</param>
+        /// <param name="versioned">Whether the URL contains the version of the asset.</param>
+        public static async Task SendAssetAsync(HttpContext context, StaticAsset asset, bool versioned)
+        {
+            // Select the encoding.
+            var request = context.Request;
+            var (contents, encoding) = (asset.Contents, (string) null);
+            if (asset.BrotliContents != null && AcceptsEncoding(request, "br"))
+            {
+                (contents, encoding) = (asset.BrotliContents, "br");
+            }
+            else if (asset.GzipContents != null && AcceptsEncoding(request, "gzip"))
+            {
+                (contents, encoding) = (asset.GzipContents, "gzip");
+            }
+
+            // Add the headers.
+            // Each encoding has its own ETag since they aren't the same bytes.
+            var response = context.Response;
+            var eTag = new EntityTagHeaderValue($"\"{asset.Version}{(encoding == null ? "" : "-" + encoding)}\"");
+            var headers = response.GetTypedHeaders();
+            headers.ETag = eTag;
+            headers.LastModified = asset.LastModified;
+            response.Headers[HeaderNames.CacheControl] = (versioned ? VersionedCacheControl : UnversionedCacheControl);
+            response.Headers[HeaderNames.Vary] = HeaderNames.AcceptEncoding;
+
+            // Send that the asset wasn't modified if the ETag matches.
+            var ifNoneMatch = request.GetTypedHeaders().IfNoneMatch;
+            if (ifNoneMatch.Any(value => value.Equals(EntityTagHeaderValue.Any) || value.Compare(eTag, false)))
+            {
+                response.StatusCode = StatusCodes.Status304NotModified;
+                return;
+            }
+
+            // Send the asset.
+            response.StatusCode = StatusCodes.Status200OK;
+            response.ContentType = asset.ContentType;
+            response.ContentLength = contents.Length;
+            if (encoding != null)
+            {
+                response.Headers[HeaderNames.ContentEncoding] = encoding;
+            }
+            if (HttpMethods.IsHead(request.Method)) return;
+            await response.Body.WriteAsync(contents).ConfigureAwait(false);
+        }
+
+        /// <summary>
+        /// Handles requests for the assets.
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="next">Next handler for the request.</param>
+        public async Task HandleFileRequestAsync(HttpContext context, Func<Task> next)
+        {
+            var request = context.Request;
+            var asset = ((HttpMethods.IsGet(request.Method) || HttpMethods.IsHead(request.Method)) ? this.Get(request.Path.Value ?? "") : null);
+            if (asset == null)
+            {
+                await next().ConfigureAwait(false);
+                return;
+            }
+            await SendAssetAsync(context, asset, request.Query["v"] == asset.Version).ConfigureAwait(false);
+        }
+
+        /// <summary>
+        /// Handles requests for the index.html of paths (like /admin).
+        /// </summary>
+        /// <param name="context">Context of the request.</param>
+        /// <param name="next">Next handler for the request.</param>
+        public async Task HandleIndexRequestAsync(HttpContext context, Func<Task> next)
+        {
+            var request = context.Request;
+            var asset = ((HttpMethods.IsGet(request.Method) || HttpMethods.IsHead(request.Method)) ? this.GetIndex(request.Path.Value ?? "") : null);
+            if (asset == null)
+            {
+                await next().ConfigureAwait(false);
+                return;
+            }
+            await SendAssetAsync(context, asset, false).ConfigureAwait(false);
+        }
+
+        /// <summary>
+        /// Stops watching the files.
+        /// </summary>
+        public void Dispose()
+        {
+            this._watcher?.Dispose();
+            this._reloadTimer?.Dispose();
+        }
+    }
+}
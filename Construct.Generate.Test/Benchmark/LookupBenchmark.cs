@@ -0,0 +1,181 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+using Construct.Generate.Test.Random;
+using Microsoft.EntityFrameworkCore;
+
+namespace Construct.Generate.Test.Benchmark
+{
+    public class LookupBenchmark
+    {
+        /// <summary>
+        /// Users to create for the benchmark.
+        /// </summary>
+        public int TotalUsers { get; set; } = 100000;
+
+        /// <summary>
+        /// Visit logs to create for the benchmark.
+        /// </summary>
+        public int TotalVisits { get; set; } = 1000000;
+
+        /// <summary>
+        /// Lookups to time for each query.
+        /// </summary>
+        public int TotalLookups { get; set; } = 500;
+
+        /// <summary>
+        /// Searches to time for each query. Searches are slower than lookups.
+        /// </summary>
+        public int TotalSearches { get; set; } = 20;
+
+        /// <summary>
+        /// Entries to save at once when creating the data.
+        /// </summary>
+        public int BatchSize { get; set; } = 10000;
+
+        /// <summary>
+        /// Random number generator used for the data and lookups.
+        /// </summary>
+        private readonly System.Random _random = new System.Random(1);
+
+        /// <summary>
+        /// Creates the users and visit logs. The database must be empty.
+        /// </summary>
+        /// <returns>The hashed ids and emails of the created users.</returns>
+        private List<(string, string)> CreateData()
+        {
+            // Create the users.
+            var users = new List<(string, string)>();
+            Log.Info($"Creating {this.TotalUsers} users.");
+            for (var i = 0; i < this.TotalUsers; i += this.BatchSize)
+            {
+                using var context = new ConstructContext();
+                for (var j = i; j < Math.Min(this.TotalUsers, i + this.BatchSize); j++)
+                {
+                    var user = new User()
+                    {
+                        HashedId = Guid.NewGuid().ToString("N").ToUpper(),
+                        Name = Program.RandomStrings.NextAscii() + " " + Program.RandomStrings.NextAscii(),
+                        Email = "User" + j + "@benchmark.test",
+                    };
+                    context.Users.Add(user);
+                    users.Add((user.HashedId, user.Email));
+                }
+                context.SaveChanges();
+            }
+
+            // Create the visit logs.
+            Log.Info($"Creating {this.TotalVisits} visit logs.");
+            var dateRandomizer = new RandomDateTime();
+            for (var i = 0; i < this.TotalVisits; i += this.BatchSize)
+            {
+                using var context = new ConstructContext();
+                var attachedUsers = new Dictionary<string, User>();
+                for (var j = i; j < Math.Min(this.TotalVisits, i + this.BatchSize); j++)
+                {
+                    // Attach the user without loading it.
+                    var hashedId = users[this._random.Next(users.Count)].Item1;
+                    if (!attachedUsers.TryGetValue(hashedId, out var user))
+                    {
+                        user = new User()
+                        {
+                            HashedId = hashedId,
+                        };
+                        context.Users.Attach(user);
+                        attachedUsers[hashedId] = user;
+                    }
+                    
+                    // Add the visit.
+                    context.VisitLogs.Add(new VisitLog()
+                    {
+                        User = user,
+                        Time = dateRandomizer.Next(),
+                        Source = "Benchmark",
+                    });
+                }
+                context.SaveChanges();
+            }
+            return users;
+        }
+
+        /// <summary>
+        /// Times a query and logs the mean, median, and 95th percentile times.
+        /// </summary>
+        /// <param name="name">Name of the query.</param>
+        /// <param name="iterations">Times to run the query.</param>
+        /// <param name="query">Query to run with the iteration.</param>
+        private void Time(string name, int iterations, Action<ConstructContext, int> query)
+        {
+            // Run the query once to prepare it.
+            using var context = new ConstructContext();
+            query(context, 0);
+
+            // Time the queries.
+            var times = new List<double>();
+            for (var i = 0; i < iterations; i++)
+            {
+                var stopwatch = Stopwatch.StartNew();
+                query(context, i);
+                times.Add(stopwatch.Elapsed.TotalMilliseconds);
+            }
+
+            // Log the times.
+            times.Sort();
+            Log.Info($"{name}: mean={times.Average():0.000}ms p50={times[times.Count / 2]:0.000}ms p95={times[(int) (times.Count * 0.95)]:0.000}ms ({iterations} runs)");
+        }
+
+        /// <summary>
+        /// Runs the benchmark. The database must be empty.
+        /// </summary>
+        public void Run()
+        {
+            // Create the data.
+            var users = this.CreateData();
+            var lookupUsers = Enumerable.Range(0, this.TotalLookups).Select(_ => users[this._random.Next(users.Count)]).ToList();
+            Log.Info($"Timing lookups with {this.TotalUsers} users and {this.TotalVisits} visit logs.");
+
+            // Time the hashed id lookups.
+            this.Time("Hashed id lookup (ToLower)", this.TotalLookups, (context, i) =>
+            {
+                var hashedId = lookupUsers[i].Item1;
+                context.Users.AsNoTracking().FirstOrDefault(user => user.HashedId.ToLower() == hashedId.ToLower());
+            });
+            this.Time("Hashed id lookup (normalized)", this.TotalLookups, (context, i) =>
+            {
+                var normalizedHashedId = ConstructContext.Normalize(lookupUsers[i].Item1);
+                context.Users.AsNoTracking().FirstOrDefault(user => user.NormalizedHashedId == normalizedHashedId);
+            });
+
+            // Time the email lookups.
+            this.Time("Email lookup (ToLower)", this.TotalLookups, (context, i) =>
+            {
+                var email = lookupUsers[i].Item2;
+                context.Users.AsNoTracking().FirstOrDefault(user => user.Email.ToLower() == email.ToLower());
+            });
+            this.Time("Email lookup (normalized)", this.TotalLookups, (context, i) =>
+            {
+                var normalizedEmail = ConstructContext.Normalize(lookupUsers[i].Item2);
+                context.Users.AsNoTracking().FirstOrDefault(user => user.NormalizedEmail == normalizedEmail);
+            });
+
+            // Time the visit searches.
+            this.Time("Visit search (ToLower Contains)", this.TotalSearches, (context, i) =>
+            {
+                var search = lookupUsers[i].Item2.ToLower();
+                context.VisitLogs.AsNoTracking().Where(visitLog => visitLog.User.Name.ToLower().Contains(search) || visitLog.User.Email.ToLower().Contains(search))
+                    .OrderByDescending(visitLog => visitLog.Time).Take(25).ToList();
+            });
+            this.Time("Visit search (normalized LIKE)", this.TotalSearches, (context, i) =>
+            {
+                var searchPattern = ConstructContext.GetContainsPattern(ConstructContext.Normalize(lookupUsers[i].Item2));
+                context.VisitLogs.AsNoTracking().Where(visitLog => EF.Functions.Like(visitLog.User.NormalizedName, searchPattern, ConstructContext.LikeEscapeCharacter)
+                                                                   || EF.Functions.Like(visitLog.User.NormalizedEmail, searchPattern, ConstructContext.LikeEscapeCharacter))
+                    .OrderByDescending(visitLog => visitLog.Time).Take(25).ToList();
+            });
+        }
+    }
+}
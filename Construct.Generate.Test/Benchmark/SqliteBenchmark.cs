@@ -0,0 +1,217 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+using Construct.Generate.Test.Random;
+using Microsoft.EntityFrameworkCore;
+
+namespace Construct.Generate.Test.Benchmark
+{
+    public class SqliteBenchmark
+    {
+        /// <summary>
+        /// Users to create for the benchmark.
+        /// </summary>
+        public int TotalUsers { get; set; } = 10000;
+
+        /// <summary>
+        /// Visit logs to create for the benchmark.
+        /// </summary>
+        public int TotalVisits { get; set; } = 200000;
+
+        /// <summary>
+        /// Entries to save at once when creating the data.
+        /// </summary>
+        public int BatchSize { get; set; } = 10000;
+
+        /// <summary>
+        /// Tasks saving swipes at the same time.
+        /// </summary>
+        public int Writers { get; set; } = 8;
+
+        /// <summary>
+        /// Tasks running admin searches at the same time.
+        /// </summary>
+        public int Readers { get; set; } = 2;
+
+        /// <summary>
+        /// Duration of each run.
+        /// </summary>
+        public TimeSpan Duration { get; set; } = TimeSpan.FromSeconds(15);
+
+        /// <summary>
+        /// Creates the users and visit logs. The database must be empty.
+        /// </summary>
+        /// <returns>The hashed ids of the created users.</returns>
+        private List<string> CreateData()
+        {
+            // Create the users.
+            var hashedIds = new List<string>();
+            Log.Info($"Creating {this.TotalUsers} users.");
+            for (var i = 0; i < this.TotalUsers; i += this.BatchSize)
+            {
+                using var context = new ConstructContext();
+                for (var j = i; j < Math.Min(this.TotalUsers, i + this.BatchSize); j++)
+                {
+                    var user = new User()
+                    {
+                        HashedId = Guid.NewGuid().ToString("N").ToUpper(),
+                        Name = Program.RandomStrings.NextAscii() + " " + Program.RandomStrings.NextAscii(),
+                        Email = "User" + j + "@benchmark.test",
+                    };
+                    context.Users.Add(user);
+                    hashedIds.Add(user.HashedId);
+                }
+                context.SaveChanges();
+            }
+
+            // Create the visit logs.
+            Log.Info($"Creating {this.TotalVisits} visit logs.");
+            var random = new System.Random(1);
+            var dateRandomizer = new RandomDateTime();
+            for (var i = 0; i < this.TotalVisits; i += this.BatchSize)
+            {
+                using var context = new ConstructContext();
+                var attachedUsers = new Dictionary<string, User>();
+                for (var j = i; j < Math.Min(this.TotalVisits, i + this.BatchSize); j++)
+                {
+                    // Attach the user without loading it.
+                    var hashedId = hashedIds[random.Next(hashedIds.Count)];
+                    if (!attachedUsers.TryGetValue(hashedId, out var user))
+                    {
+                        user = new User()
+                        {
+                            HashedId = hashedId,
+                        };
+                        context.Users.Attach(user);
+                        attachedUsers[hashedId] = user;
+                    }
+                    
+                    // Add the visit.
+                    context.VisitLogs.Add(new VisitLog()
+                    {
+                        User = user,
+                        Time = dateRandomizer.Next(),
+                        Source = "Benchmark",
+                    });
+                }
+                context.SaveChanges();
+            }
+            return hashedIds;
+        }
+
+        /// <summary>
+        /// Saves swipes and runs admin searches at the same time and logs the
+        /// throughput and the median and 95th percentile times of the swipes.
+        /// </summary>
+        /// <param name="name">Name of the run.</param>
+        /// <param name="hashedIds">Hashed ids of the users to swipe.</param>
+        private void Time(string name, List<string> hashedIds)
+        {
+            var swipeTimes = new List<double>();
+            var totalSearches = 0;
+            var failedSwipes = 0;
+            using var stopTokenSource = new CancellationTokenSource(this.Duration);
+            var stopToken = stopTokenSource.Token;
+            var stopwatch = Stopwatch.StartNew();
+
+            // Save swipes until the run stops.
+            var tasks = Enumerable.Range(0, this.Writers).Select(writer => Task.Run(async () =>
+            {
+                var random = new System.Random(writer);
+                while (!stopToken.IsCancellationRequested)
+                {
+                    var swipeStopwatch = Stopwatch.StartNew();
+                    try
+                    {
+                        await using var context = new ConstructContext();
+                        var user = new User()
+                        {
+                            HashedId = hashedIds[random.Next(hashedIds.Count)],
+                        };
+                        context.Users.Attach(user);
+                        context.VisitLogs.Add(new VisitLog()
+                        {
+                            User = user,
+                            Time = DateTime.Now,
+                            Source = "Benchmark",
+                        });
+                        await context.SaveChangesAsync();
+                    }
+                    catch (Exception)
+                    {
+                        Interlocked.Increment(ref failedSwipes);
+                        continue;
+                    }
+                    lock (swipeTimes)
+                    {
+                        swipeTimes.Add(swipeStopwatch.Elapsed.TotalMilliseconds);
+                    }
+                }
+            })).ToList();
+
+            // Run admin visit searches until the run stops.
+            tasks.AddRange(Enumerable.Range(0, this.Readers).Select(reader => Task.Run(async () =>
+            {
+                var random = new System.Random(1000 + reader);
+                while (!stopToken.IsCancellationRequested)
+                {
+                    await using var context = new ConstructContext(readOnly: true);
+                    var searchPattern = ConstructContext.GetContainsPattern(random.Next(100).ToString());
+                    var query = context.VisitLogs.AsNoTracking().Where(visitLog => EF.Functions.Like(visitLog.User.NormalizedEmail, searchPattern, ConstructContext.LikeEscapeCharacter));
+                    await query.CountAsync();
+                    await query.OrderByDescending(visitLog => visitLog.Time).Take(25).ToListAsync();
+                    Interlocked.Increment(ref totalSearches);
+                }
+            })));
+            Task.WaitAll(tasks.ToArray());
+            var totalTime = stopwatch.Elapsed.TotalSeconds;
+
+            // Log the results.
+            swipeTimes.Sort();
+            var p50 = (swipeTimes.Count == 0 ? 0 : swipeTimes[swipeTimes.Count / 2]);
+            var p95 = (swipeTimes.Count == 0 ? 0 : swipeTimes[(int) (swipeTimes.Count * 0.95)]);
+            Log.Info($"{name}: {swipeTimes.Count / totalTime:0.0} swipes/s ({failedSwipes} failed) p50={p50:0.000}ms p95={p95:0.000}ms, {totalSearches / totalTime:0.00} searches/s ({this.Writers} writers, {this.Readers} readers)");
+        }
+
+        /// <summary>
+        /// Runs the benchmark. The database must be empty and use Sqlite.
+        /// </summary>
+        public void Run()
+        {
+            // Return if the database isn't Sqlite.
+            var configuration = ConstructConfiguration.Configuration.Database;
+            if (configuration.Provider?.ToLower() != "sqlite")
+            {
+                Log.Error("The Sqlite benchmark requires the sqlite database provider.");
+                return;
+            }
+            
+            // Create the data.
+            var hashedIds = this.CreateData();
+            
+            // Time the SQLite defaults with the reads on the write connections.
+            var journalMode = configuration.SqliteJournalMode;
+            var synchronous = configuration.SqliteSynchronous;
+            var readOnlyConnections = configuration.SqliteReadOnlyConnections;
+            configuration.SqliteJournalMode = "delete";
+            configuration.SqliteSynchronous = "full";
+            configuration.SqliteReadOnlyConnections = false;
+            ConstructContext.ResetContextPools();
+            this.Time("SQLite defaults", hashedIds);
+            
+            // Time the configured profile.
+            configuration.SqliteJournalMode = journalMode;
+            configuration.SqliteSynchronous = synchronous;
+            configuration.SqliteReadOnlyConnections = readOnlyConnections;
+            ConstructContext.ResetContextPools();
+            this.Time($"Configured (journal_mode={journalMode}, synchronous={synchronous}, read-only connections={readOnlyConnections})", hashedIds);
+        }
+    }
+}
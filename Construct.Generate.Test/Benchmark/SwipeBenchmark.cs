@@ -0,0 +1,162 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+using Construct.Swipe.Queue;
+
+namespace Construct.Generate.Test.Benchmark
+{
+    public class SwipeBenchmark
+    {
+        /// <summary>
+        /// Users to create for the benchmark.
+        /// </summary>
+        public int TotalUsers { get; set; } = 1000;
+
+        /// <summary>
+        /// Swipes to send for each run.
+        /// </summary>
+        public int TotalSwipes { get; set; } = 3000;
+
+        /// <summary>
+        /// Swipes to send per second.
+        /// </summary>
+        public int SwipesPerSecond { get; set; } = 300;
+
+        /// <summary>
+        /// Random number generator used for the swipes.
+        /// </summary>
+        private readonly System.Random _random = new System.Random(1);
+
+        /// <summary>
+        /// Creates the users. The database must be empty.
+        /// </summary>
+        /// <returns>The hashed ids of the created users.</returns>
+        private List<string> CreateUsers()
+        {
+            Log.Info($"Creating {this.TotalUsers} users.");
+            using var context = new ConstructContext();
+            var hashedIds = new List<string>();
+            for (var i = 0; i < this.TotalUsers; i++)
+            {
+                var user = new User()
+                {
+                    HashedId = Guid.NewGuid().ToString("N").ToUpper(),
+                    Name = Program.RandomStrings.NextAscii() + " " + Program.RandomStrings.NextAscii(),
+                    Email = "User" + i + "@benchmark.test",
+                };
+                context.Users.Add(user);
+                hashedIds.Add(user.HashedId);
+            }
+            context.SaveChanges();
+            return hashedIds;
+        }
+
+        /// <summary>
+        /// Sends swipes at the configured rate and logs the throughput and
+        /// the median and 95th percentile times to handle a swipe.
+        /// </summary>
+        /// <param name="name">Name of the run.</param>
+        /// <param name="hashedIds">Hashed ids of the users to swipe.</param>
+        /// <param name="swipe">Handles a swipe for a hashed id.</param>
+        /// <param name="waitForSaved">Waits until the swipes are saved.</param>
+        private void Time(string name, List<string> hashedIds, Func<string, Task> swipe, Func<Task> waitForSaved)
+        {
+            // Send the swipes at the rate without waiting for the previous swipes.
+            var times = new double[this.TotalSwipes];
+            var swipeTasks = new List<Task>();
+            var stopwatch = Stopwatch.StartNew();
+            for (var i = 0; i < this.TotalSwipes; i++)
+            {
+                // Wait until the swipe is due.
+                var dueTime = i * 1000.0 / this.SwipesPerSecond;
+                var remainingTime = dueTime - stopwatch.Elapsed.TotalMilliseconds;
+                if (remainingTime > 0)
+                {
+                    Thread.Sleep(TimeSpan.FromMilliseconds(remainingTime));
+                }
+
+                // Send the swipe.
+                var swipeIndex = i;
+                var hashedId = hashedIds[this._random.Next(hashedIds.Count)];
+                swipeTasks.Add(Task.Run(async () =>
+                {
+                    var swipeStopwatch = Stopwatch.StartNew();
+                    await swipe(hashedId);
+                    times[swipeIndex] = swipeStopwatch.Elapsed.TotalMilliseconds;
+                }));
+            }
+            Task.WaitAll(swipeTasks.ToArray());
+            waitForSaved().Wait();
+            var totalTime = stopwatch.Elapsed.TotalSeconds;
+
+            // Log the times.
+            var sortedTimes = times.OrderBy(time => time).ToList();
+            Log.Info($"{name}: {this.TotalSwipes / totalTime:0.0} swipes/s p50={sortedTimes[sortedTimes.Count / 2]:0.000}ms p95={sortedTimes[(int) (sortedTimes.Count * 0.95)]:0.000}ms ({this.TotalSwipes} swipes at {this.SwipesPerSecond}/s)");
+        }
+
+        /// <summary>
+        /// Runs the benchmark. The database must be empty.
+        /// </summary>
+        public void Run()
+        {
+            // Create the users.
+            var hashedIds = this.CreateUsers();
+
+            // Time saving each swipe in its own context.
+            this.Time("Direct inserts", hashedIds, async (hashedId) =>
+            {
+                await using var context = new ConstructContext();
+                var user = new User()
+                {
+                    HashedId = hashedId,
+                };
+                context.Users.Attach(user);
+                context.VisitLogs.Add(new VisitLog()
+                {
+                    User = user,
+                    Time = DateTime.Now,
+                    Source = "Benchmark",
+                });
+                await context.SaveChangesAsync();
+            }, () => Task.CompletedTask);
+
+            // Time queueing the swipes and saving them in batches.
+            var queue = SwipeQueue.GetSingleton();
+            queue.Enabled = true;
+            queue.Start();
+            var flushTask = Task.Run(async () =>
+            {
+                while (true)
+                {
+                    var batch = await queue.ReadBatchAsync(CancellationToken.None);
+                    if (batch.Count == 0) break;
+                    await queue.FlushAsync(batch);
+                }
+            });
+            this.Time($"Batched inserts (interval={queue.BatchInterval}ms, max={queue.MaxBatchSize})", hashedIds, (hashedId) =>
+            {
+                if (!queue.TryAdd(new QueuedSwipe()
+                {
+                    HashedId = hashedId,
+                    Time = DateTime.Now,
+                    Source = "Benchmark",
+                }))
+                {
+                    throw new InvalidOperationException("Swipe queue is full.");
+                }
+                return Task.CompletedTask;
+            }, async () =>
+            {
+                queue.Stop();
+                await flushTask;
+            });
+            Log.Info($"Batched inserts saved {queue.Saved} swipes in {queue.Batches} batches ({queue.Spooled} spooled).");
+        }
+    }
+}
@@ -0,0 +1,390 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Security.Cryptography;
+using System.Text;
+using System.Threading.Tasks;
+using Construct.Core.Database.Context;
+using Construct.Core.Logging;
+using Construct.Generate.Test.Random;
+using Npgsql;
+
+namespace Construct.Generate.Test.Bulk
+{
+    public class BulkGenerator
+    {
+        /// <summary>
+        /// First names to create the users from.
+        /// </summary>
+        private static readonly string[] FirstNames =
+        {
+            "Alex", "Avery", "Blake", "Cameron", "Casey", "Charlie", "Dakota", "Drew", "Emerson", "Finley",
+            "Harper", "Hayden", "Jamie", "Jordan", "Kai", "Logan", "Morgan", "Parker", "Quinn", "Reese",
+            "Riley", "Rowan", "Sage", "Skyler", "Taylor",
+        };
+
+        /// <summary>
+        /// Last names to create the users from.
+        /// </summary>
+        private static readonly string[] LastNames =
+        {
+            "Adams", "Brown", "Chen", "Davis", "Evans", "Garcia", "Hall", "Johnson", "Kim", "Lee",
+            "Lopez", "Miller", "Nguyen", "Patel", "Robinson", "Smith", "Taylor", "Thomas", "Walker", "White",
+            "Williams", "Wilson", "Wright", "Young", "Zhang",
+        };
+
+        /// <summary>
+        /// Colleges of the students.
+        /// </summary>
+        private static readonly string[] Colleges =
+        {
+            "CAD", "CET", "CHST", "CLA", "COS", "GCCIS", "GIS", "KGCOE", "NTID", "SCB",
+        };
+
+        /// <summary>
+        /// Years of the students.
+        /// </summary>
+        private static readonly string[] StudentYears =
+        {
+            "First Year", "Second Year", "Third Year", "Fourth Year", "Fifth Year", "Graduate",
+        };
+
+        /// <summary>
+        /// Sources of the visits with their relative frequency.
+        /// </summary>
+        private static readonly (string Source, double Weight)[] Sources =
+        {
+            ("MainLab", 0.8),
+            ("Woodshop", 0.12),
+            ("Electronics", 0.08),
+        };
+
+        /// <summary>
+        /// Print materials with their cost per gram and relative frequency.
+        /// </summary>
+        private static readonly (string Name, float CostPerGram, double Weight)[] Materials =
+        {
+            ("PLA", 0.03f, 0.7),
+            ("PETG", 0.04f, 0.12),
+            ("ABS", 0.04f, 0.06),
+            ("Resin", 0.12f, 0.05),
+            ("TPU", 0.08f, 0.04),
+            ("Nylon", 0.1f, 0.03),
+        };
+
+        /// <summary>
+        /// Purposes of the prints.
+        /// </summary>
+        private static readonly string[] Purposes =
+        {
+            "Class Project", "Club", "Personal", "Research", "Senior Design",
+        };
+
+        /// <summary>
+        /// Parts used to create the file names of the prints.
+        /// </summary>
+        private static readonly string[] FileNameParts =
+        {
+            "bracket", "case", "enclosure", "gear", "hinge", "knob", "mount", "prototype", "spacer", "stand",
+        };
+
+        /// <summary>
+        /// Users to create.
+        /// </summary>
+        public int TotalUsers { get; set; } = 100000;
+
+        /// <summary>
+        /// Visit logs to create.
+        /// </summary>
+        public int TotalVisits { get; set; } = 2000000;
+
+        /// <summary>
+        /// Print logs to create.
+        /// </summary>
+        public int TotalPrints { get; set; } = 300000;
+
+        /// <summary>
+        /// Seed of the randomizer. The same seed, totals, years, and end
+        /// time create the same data.
+        /// </summary>
+        public int Seed { get; set; } = 1;
+
+        /// <summary>
+        /// Years of activity to create before the end time.
+        /// </summary>
+        public int Years { get; set; } = 4;
+
+        /// <summary>
+        /// Last time of the created activity.
+        /// </summary>
+        public DateTime EndTime { get; set; } = DateTime.Today;
+
+        /// <summary>
+        /// Ratio of the users that have prints.
+        /// </summary>
+        public double PrinterRatio { get; set; } = 0.35;
+
+        /// <summary>
+        /// Ratio of the users that are students.
+        /// </summary>
+        public double StudentRatio { get; set; } = 0.6;
+
+        /// <summary>
+        /// Ratio of the users that are lab managers.
+        /// </summary>
+        public double LabManagerRatio { get; set; } = 0.005;
+
+        /// <summary>
+        /// Shape of the distribution of visits between users. Lower values
+        /// make a few users have more of the visits.
+        /// </summary>
+        public double VisitShape { get; set; } = 2.5;
+
+        /// <summary>
+        /// Shape of the distribution of prints between the users that print.
+        /// Close to 1, where ~20% of the printers have ~80% of the prints.
+        /// </summary>
+        public double PrintShape { get; set; } = 1.16;
+
+        /// <summary>
+        /// Days before the end time that prints are usually still owed.
+        /// </summary>
+        public int OwedDays { get; set; } = 90;
+
+        /// <summary>
+        /// Randomizer for the data.
+        /// </summary>
+        private System.Random _random;
+
+        /// <summary>
+        /// Randomizer for the times of the activity.
+        /// </summary>
+        private RandomActivityTime _activityTime;
+
+        /// <summary>
+        /// Returns a random entry from a list.
+        /// </summary>
+        /// <param name="values">Values to pick from.</param>
+        /// <returns>The random entry.</returns>
+        private T NextEntry<T>(IReadOnlyList<T> values)
+        {
+            return values[this._random.Next(values.Count)];
+        }
+
+        /// <summary>
+        /// Returns a random index of a list of cumulative weights.
+        /// </summary>
+        /// <param name="cumulativeWeights">Cumulative weights of the entries.</param>
+        /// <returns>The random index.</returns>
+        private int NextWeightedIndex(double[] cumulativeWeights)
+        {
+            var index = Array.BinarySearch(cumulativeWeights, this._random.NextDouble() * cumulativeWeights[^1]);
+            return Math.Min(index < 0 ? ~index : index, cumulativeWeights.Length - 1);
+        }
+
+        /// <summary>
+        /// Returns the cumulative weights of entries with a Pareto distribution.
+        /// </summary>
+        /// <param name="total">Total entries.</param>
+        /// <param name="shape">Shape of the distribution.</param>
+        /// <returns>The cumulative weights.</returns>
+        private double[] CreateParetoWeights(int total, double shape)
+        {
+            var weights = new double[total];
+            var sum = 0.0;
+            for (var i = 0; i < total; i++)
+            {
+                sum += Math.Pow(1 - this._random.NextDouble(), -1 / shape);
+                weights[i] = sum;
+            }
+            return weights;
+        }
+
+        /// <summary>
+        /// Returns a random value of a log-normal distribution.
+        /// </summary>
+        /// <param name="median">Median of the values.</param>
+        /// <param name="sigma">Standard deviation of the logarithm of the values.</param>
+        /// <returns>The random value.</returns>
+        private double NextLogNormal(double median, double sigma)
+        {
+            var normal = Math.Sqrt(-2 * Math.Log(1 - this._random.NextDouble())) * Math.Cos(2 * Math.PI * this._random.NextDouble());
+            return median * Math.Exp(sigma * normal);
+        }
+
+        /// <summary>
+        /// Creates the hashed id of a user.
+        /// </summary>
+        /// <param name="index">Index of the user.</param>
+        /// <returns>The hashed id of the user.</returns>
+        private string CreateHashedId(int index)
+        {
+            return Convert.ToHexString(SHA256.HashData(Encoding.UTF8.GetBytes($"bulk-{this.Seed}-{index}")));
+        }
+
+        /// <summary>
+        /// Creates the rows of the users.
+        /// </summary>
+        /// <param name="hashedIds">Hashed ids of the users.</param>
+        /// <returns>The rows of the users.</returns>
+        private IEnumerable<object[]> CreateUsers(IReadOnlyList<string> hashedIds)
+        {
+            for (var i = 0; i < hashedIds.Count; i++)
+            {
+                var firstName = this.NextEntry(FirstNames);
+                var lastName = this.NextEntry(LastNames);
+                var name = firstName + " " + lastName;
+                var email = $"{firstName}.{lastName}{i}@example.edu";
+                DateTime? signUpTime = (this._random.NextDouble() < 0.9 ? this._activityTime.Next() : null);
+                yield return new object[] { hashedIds[i], ConstructContext.Normalize(hashedIds[i]), name, ConstructContext.Normalize(name), email, ConstructContext.Normalize(email), signUpTime };
+            }
+        }
+
+        /// <summary>
+        /// Creates the rows of the students.
+        /// </summary>
+        /// <param name="hashedIds">Hashed ids of the users.</param>
+        /// <returns>The rows of the students.</returns>
+        private IEnumerable<object[]> CreateStudents(IEnumerable<string> hashedIds)
+        {
+            foreach (var hashedId in hashedIds)
+            {
+                if (this._random.NextDouble() >= this.StudentRatio) continue;
+                yield return new object[] { this.NextEntry(Colleges), this.NextEntry(StudentYears), hashedId };
+            }
+        }
+
+        /// <summary>
+        /// Creates the rows of the permissions.
+        /// </summary>
+        /// <param name="hashedIds">Hashed ids of the users.</param>
+        /// <returns>The rows of the permissions.</returns>
+        private IEnumerable<object[]> CreatePermissions(IEnumerable<string> hashedIds)
+        {
+            foreach (var hashedId in hashedIds)
+            {
+                if (this._random.NextDouble() >= this.LabManagerRatio) continue;
+                yield return new object[] { "LabManager", null, null, hashedId };
+            }
+        }
+
+        /// <summary>
+        /// Creates the rows of the visit logs.
+        /// </summary>
+        /// <param name="hashedIds">Hashed ids of the users.</param>
+        /// <returns>The rows of the visit logs.</returns>
+        private IEnumerable<object[]> CreateVisits(IReadOnlyList<string> hashedIds)
+        {
+            var userWeights = this.CreateParetoWeights(hashedIds.Count, this.VisitShape);
+            var sourceWeights = CreateCumulativeWeights(Sources.Select(source => source.Weight));
+            for (var i = 0; i < this.TotalVisits; i++)
+            {
+                var hashedId = hashedIds[this.NextWeightedIndex(userWeights)];
+                var source = Sources[this.NextWeightedIndex(sourceWeights)].Source;
+                yield return new object[] { this._activityTime.Next(), source, hashedId };
+            }
+        }
+
+        /// <summary>
+        /// Creates the rows of the print logs.
+        /// </summary>
+        /// <param name="hashedIds">Hashed ids of the users.</param>
+        /// <returns>The rows of the print logs.</returns>
+        private IEnumerable<object[]> CreatePrints(IReadOnlyList<string> hashedIds)
+        {
+            // Select the users that print.
+            var printers = hashedIds.Where(_ => this._random.NextDouble() < this.PrinterRatio).ToList();
+            if (printers.Count == 0) yield break;
+            var printerWeights = this.CreateParetoWeights(printers.Count, this.PrintShape);
+            var materialWeights = CreateCumulativeWeights(Materials.Select(material => material.Weight));
+
+            // Create the prints.
+            var owedTime = this.EndTime.AddDays(-this.OwedDays);
+            for (var i = 0; i < this.TotalPrints; i++)
+            {
+                var hashedId = printers[this.NextWeightedIndex(printerWeights)];
+                var time = this._activityTime.Next();
+                var fileName = $"{this.NextEntry(FileNameParts)}_v{this._random.Next(1, 10)}.gcode";
+                var material = Materials[this.NextWeightedIndex(materialWeights)];
+                var weightGrams = (float) Math.Round(Math.Clamp(this.NextLogNormal(25, 0.9), 0.5, 2000), 1);
+                var cost = (float) Math.Round(weightGrams * material.CostPerGram, 2);
+                var owed = this._random.NextDouble() < (time >= owedTime ? 0.6 : 0.02);
+                var billTo = (this._random.NextDouble() < 0.1 ? this.NextEntry(Purposes) : null);
+                yield return new object[] { time, fileName, ConstructContext.Normalize(fileName), material.Name, weightGrams, this.NextEntry(Purposes), billTo, ConstructContext.Normalize(billTo), cost, owed, hashedId };
+            }
+        }
+
+        /// <summary>
+        /// Returns the cumulative weights of a list of weights.
+        /// </summary>
+        /// <param name="weights">Weights of the entries.</param>
+        /// <returns>The cumulative weights.</returns>
+        private static double[] CreateCumulativeWeights(IEnumerable<double> weights)
+        {
+            var sum = 0.0;
+            return weights.Select(weight => sum += weight).ToArray();
+        }
+
+        /// <summary>
+        /// Writes the rows of a table and logs the rate they were written at.
+        /// </summary>
+        /// <param name="writer">Writer to write the rows with.</param>
+        /// <param name="table">Table to write to.</param>
+        /// <param name="columns">Columns of the rows.</param>
+        /// <param name="rows">Rows to write.</param>
+        private static async Task WriteTableAsync(BulkWriter writer, string table, string[] columns, IEnumerable<object[]> rows)
+        {
+            Log.Info($"Writing {table}.");
+            var stopwatch = Stopwatch.StartNew();
+            var totalRows = await writer.WriteAsync(table, columns, rows);
+            stopwatch.Stop();
+            Log.Info($"Wrote {totalRows} rows to {table} in {stopwatch.Elapsed.TotalSeconds:0.0} seconds ({totalRows / Math.Max(stopwatch.Elapsed.TotalSeconds, 0.001):0} rows/s).");
+        }
+
+        /// <summary>
+        /// Creates the data. The database must be empty.
+        /// </summary>
+        public async Task RunAsync()
+        {
+            // Create the randomizers.
+            this._random = new System.Random(this.Seed);
+            this._activityTime = new RandomActivityTime(this._random, this.EndTime.AddYears(-this.Years), this.EndTime);
+            Log.Info($"Creating {this.TotalUsers} users, {this.TotalVisits} visits, and {this.TotalPrints} prints over {this.Years} years with seed {this.Seed}.");
+
+            // Open the connection and create the writer for the database provider.
+            await using var context = new ConstructContext();
+            var connection = await context.OpenConnectionAsync();
+            BulkWriter writer = (connection is NpgsqlConnection npgsqlConnection ? new PostgresBulkWriter(npgsqlConnection) : new SqliteBulkWriter(connection));
+
+            // Write the tables.
+            var stopwatch = Stopwatch.StartNew();
+            var hashedIds = Enumerable.Range(0, this.TotalUsers).Select(this.CreateHashedId).ToList();
+            await WriteTableAsync(writer, "PrintMaterials", new[] { "Name", "CostPerGram" }, Materials.Select(material => new object[] { material.Name, material.CostPerGram }));
+            await WriteTableAsync(writer, "Users", new[] { "HashedId", "NormalizedHashedId", "Name", "NormalizedName", "Email", "NormalizedEmail", "SignUpTime" }, this.CreateUsers(hashedIds));
+            await WriteTableAsync(writer, "Students", new[] { "College", "Year", "UserHashedId" }, this.CreateStudents(hashedIds));
+            await WriteTableAsync(writer, "Permissions", new[] { "Name", "StartTime", "EndTime", "UserHashedId" }, this.CreatePermissions(hashedIds));
+            await WriteTableAsync(writer, "VisitLogs", new[] { "Time", "Source", "UserHashedId" }, this.CreateVisits(hashedIds));
+            await WriteTableAsync(writer, "PrintLog", new[] { "Time", "FileName", "NormalizedFileName", "MaterialName", "WeightGrams", "Purpose", "BillTo", "NormalizedBillTo", "Cost", "Owed", "UserHashedId" }, this.CreatePrints(hashedIds));
+
+            // Create the print totals, since they are normally updated by the context.
+            Log.Info("Creating the print totals.");
+            await writer.ExecuteAsync("INSERT INTO \"UserPrintTotals\" (\"HashedId\", \"TotalPrints\", \"TotalWeight\", \"OwedPrints\", \"OwedWeight\", \"OwedCost\") " +
+                                      "SELECT \"UserHashedId\", COUNT(*), SUM(\"WeightGrams\"), SUM(CASE WHEN \"Owed\" THEN 1 ELSE 0 END), SUM(CASE WHEN \"Owed\" THEN \"WeightGrams\" ELSE 0 END), SUM(CASE WHEN \"Owed\" THEN \"Cost\" ELSE 0 END) " +
+                                      "FROM \"PrintLog\" WHERE \"UserHashedId\" IS NOT NULL GROUP BY \"UserHashedId\"");
+
+            // Update the statistics used by the query planner.
+            Log.Info("Analyzing the database.");
+            await writer.ExecuteAsync("ANALYZE");
+            Log.Info($"Data generated in {stopwatch.Elapsed.TotalSeconds:0.0} seconds.");
+        }
+
+        /// <summary>
+        /// Creates the data. The database must be empty.
+        /// </summary>
+        public void Run()
+        {
+            this.RunAsync().Wait();
+        }
+    }
+}
@@ -0,0 +1,55 @@
+using System;
+using System.Collections.Generic;
+using System.Data.Common;
+using System.Threading.Tasks;
+
+namespace Construct.Generate.Test.Bulk
+{
+    public abstract class BulkWriter
+    {
+        /// <summary>
+        /// Open connection to the database.
+        /// </summary>
+        protected readonly DbConnection Connection;
+
+        /// <summary>
+        /// Creates the writer.
+        /// </summary>
+        /// <param name="connection">Open connection to the database.</param>
+        protected BulkWriter(DbConnection connection)
+        {
+            this.Connection = connection;
+        }
+
+        /// <summary>
+        /// Returns a quoted name of a table or column.
+        /// </summary>
+        /// <param name="name">Name to quote.</param>
+        /// <returns>The quoted name.</returns>
+        protected static string Quote(string name)
+        {
+            return "\"" + name + "\"";
+        }
+
+        /// <summary>
+        /// Writes rows to a table.
+        /// </summary>
+        /// <param name="table">Table to write to.</param>
+        /// <param name="columns">Columns of the rows.</param>
+        /// <param name="rows">Rows to write. Values must be in the order of the columns.</param>
+        /// <returns>The total rows written.</returns>
+        public abstract Task<long> WriteAsync(string table, string[] columns, IEnumerable<object[]> rows);
+
+        /// <summary>
+        /// Runs a SQL statement.
+        /// </summary>
+        /// <param name="sql">Statement to run.</param>
+        public async Task ExecuteAsync(string sql)
+        {
+            await using var command = this.Connection.CreateCommand();
+            command.CommandText = sql;
+            command.CommandTimeout = 0;
+            await command.ExecuteNonQueryAsync();
+        }
+    }
+}
@@ -0,0 +1,77 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading.Tasks;
+using Npgsql;
+using NpgsqlTypes;
+
+namespace Construct.Generate.Test.Bulk
+{
+    public class PostgresBulkWriter : BulkWriter
+    {
+        /// <summary>
+        /// Creates the writer.
+        /// </summary>
+        /// <param name="connection">Open connection to the database.</param>
+        public PostgresBulkWriter(NpgsqlConnection connection) : base(connection)
+        {
+
+        }
+
+        /// <summary>
+        /// Writes a value of a row.
+        /// </summary>
+        /// <param name="importer">Importer to write to.</param>
+        /// <param name="value">Value to write.</param>
+        private static async Task WriteValueAsync(NpgsqlBinaryImporter importer, object value)
+        {
+            switch (value)
+            {
+                case null:
+                    await importer.WriteNullAsync();
+                    break;
+                case string stringValue:
+                    await importer.WriteAsync(stringValue, NpgsqlDbType.Text);
+                    break;
+                case DateTime dateTimeValue:
+                    await importer.WriteAsync(dateTimeValue, NpgsqlDbType.Timestamp);
+                    break;
+                case bool boolValue:
+                    await importer.WriteAsync(boolValue, NpgsqlDbType.Boolean);
+                    break;
+                case int intValue:
+                    await importer.WriteAsync(intValue, NpgsqlDbType.Integer);
+                    break;
+                case float floatValue:
+                    await importer.WriteAsync(floatValue, NpgsqlDbType.Real);
+                    break;
+                case double doubleValue:
+                    await importer.WriteAsync(doubleValue, NpgsqlDbType.Double);
+                    break;
+                default:
+                    throw new ArgumentException($"Unsupported value type {value.GetType().Name}.");
+            }
+        }
+
+        /// <summary>
+        /// Writes rows to a table with a binary COPY.
+        /// </summary>
+        /// <param name="table">Table to write to.</param>
+        /// <param name="columns">Columns of the rows.</param>
+        /// <param name="rows">Rows to write. Values must be in the order of the columns.</param>
+        /// <returns>The total rows written.</returns>
+        public override async Task<long> WriteAsync(string table, string[] columns, IEnumerable<object[]> rows)
+        {
+            await using var importer = ((NpgsqlConnection) this.Connection).BeginBinaryImport($"COPY {Quote(table)} ({string.Join(", ", columns.Select(Quote))}) FROM STDIN (FORMAT BINARY)");
+            foreach (var row in rows)
+            {
+                await importer.StartRowAsync();
+                foreach (var value in row)
+                {
+                    await WriteValueAsync(importer, value);
+                }
+            }
+            return (long) await importer.CompleteAsync();
+        }
+    }
+}
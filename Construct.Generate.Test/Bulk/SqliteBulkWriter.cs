@@ -0,0 +1,133 @@
+using System;
+using System.Collections.Generic;
+using System.Data.Common;
+using System.Linq;
+using System.Threading.Tasks;
+
+namespace Construct.Generate.Test.Bulk
+{
+    public class SqliteBulkWriter : BulkWriter
+    {
+        /// <summary>
+        /// Rows inserted by each statement.
+        /// </summary>
+        public int RowsPerStatement { get; set; } = 100;
+
+        /// <summary>
+        /// Rows inserted by each transaction.
+        /// </summary>
+        public int RowsPerTransaction { get; set; } = 50000;
+
+        /// <summary>
+        /// Creates the writer.
+        /// </summary>
+        /// <param name="connection">Open connection to the database.</param>
+        public SqliteBulkWriter(DbConnection connection) : base(connection)
+        {
+
+        }
+
+        /// <summary>
+        /// Creates a prepared statement that inserts multiple rows.
+        /// </summary>
+        /// <param name="table">Table to insert into.</param>
+        /// <param name="columns">Columns of the rows.</param>
+        /// <param name="rows">Rows inserted by the statement.</param>
+        /// <param name="transaction">Transaction of the statement.</param>
+        /// <returns>The prepared statement.</returns>
+        private DbCommand CreateInsertCommand(string table, string[] columns, int rows, DbTransaction transaction)
+        {
+            // Create the statement.
+            var command = this.Connection.CreateCommand();
+            command.Transaction = transaction;
+            var values = new List<string>();
+            for (var i = 0; i < rows; i++)
+            {
+                values.Add("(" + string.Join(", ", columns.Select((_, j) => "@p" + (i * columns.Length + j))) + ")");
+            }
+            command.CommandText = $"INSERT INTO {Quote(table)} ({string.Join(", ", columns.Select(Quote))}) VALUES {string.Join(", ", values)}";
+
+            // Add the parameters and prepare the statement.
+            for (var i = 0; i < rows * columns.Length; i++)
+            {
+                var parameter = command.CreateParameter();
+                parameter.ParameterName = "@p" + i;
+                command.Parameters.Add(parameter);
+            }
+            command.Prepare();
+            return command;
+        }
+
+        /// <summary>
+        /// Inserts rows with a statement.
+        /// </summary>
+        /// <param name="command">Statement to insert the rows with.</param>
+        /// <param name="rows">Rows to insert.</param>
+        private static async Task InsertAsync(DbCommand command, List<object[]> rows)
+        {
+            var parameter = 0;
+            foreach (var row in rows)
+            {
+                foreach (var value in row)
+                {
+                    command.Parameters[parameter].Value = value ?? DBNull.Value;
+                    parameter += 1;
+                }
+            }
+            await command.ExecuteNonQueryAsync();
+        }
+
+        /// <summary>
+        /// Writes rows to a table. The rows are inserted with multi-row statements
+        /// that are prepared once, and the transaction is committed periodically so
+        /// that the write-ahead log doesn't grow with the whole table.
+        /// </summary>
+        /// <param name="table">Table to write to.</param>
+        /// <param name="columns">Columns of the rows.</param>
+        /// <param name="rows">Rows to write. Values must be in the order of the columns.</param>
+        /// <returns>The total rows written.</returns>
+        public override async Task<long> WriteAsync(string table, string[] columns, IEnumerable<object[]> rows)
+        {
+            // SQLite versions before 3.32 only allow 999 parameters per statement.
+            var rowsPerStatement = Math.Max(1, Math.Min(this.RowsPerStatement, 999 / columns.Length));
+            var totalRows = 0L;
+            var transaction = await this.Connection.BeginTransactionAsync();
+            var command = this.CreateInsertCommand(table, columns, rowsPerStatement, transaction);
+            try
+            {
+                var batch = new List<object[]>(rowsPerStatement);
+                foreach (var row in rows)
+                {
+                    // Insert the batch when it is full.
+                    batch.Add(row);
+                    if (batch.Count < rowsPerStatement) continue;
+                    await InsertAsync(command, batch);
+                    totalRows += batch.Count;
+                    batch.Clear();
+
+                    // Commit the transaction periodically.
+                    if (totalRows % this.RowsPerTransaction >= rowsPerStatement) continue;
+                    await transaction.CommitAsync();
+                    await transaction.DisposeAsync();
+                    transaction = await this.Connection.BeginTransactionAsync();
+                    command.Transaction = transaction;
+                }
+
+                // Insert the remaining rows.
+                if (batch.Count > 0)
+                {
+                    await using var remainingCommand = this.CreateInsertCommand(table, columns, batch.Count, transaction);
+                    await InsertAsync(remainingCommand, batch);
+                    totalRows += batch.Count;
+                }
+                await transaction.CommitAsync();
+            }
+            finally
+            {
+                await command.DisposeAsync();
+                await transaction.DisposeAsync();
+            }
+            return totalRows;
+        }
+    }
+}
@@ -1,10 +1,13 @@
 ﻿using System;
 using System.Collections.Generic;
+using System.Globalization;
 using System.Linq;
 using Construct.Core.Configuration;
 using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Construct.Core.Logging;
+using Construct.Generate.Test.Benchmark;
+using Construct.Generate.Test.Bulk;
 using Construct.Generate.Test.Random;
 using Microsoft.Extensions.Logging;
 
@@ -32,6 +35,18 @@ namespace Construct.Generate.Test
         /// </summary>
         public static readonly IntRange RandomPrints = new IntRange(0, 100);
         
+        /// <summary>
+        /// Returns the value of an argument in the form --name=value.
+        /// </summary>
+        /// <param name="args">Arguments from the command line.</param>
+        /// <param name="name">Name of the argument.</param>
+        /// <returns>The value of the argument, or null if it wasn't given.</returns>
+        private static string GetArgument(IEnumerable<string> args, string name)
+        {
+            var prefix = "--" + name + "=";
+            return args.LastOrDefault(arg => arg.StartsWith(prefix))?.Substring(prefix.Length);
+        }
+        
         /// <summary>
         /// Runs the program.
         /// </summary>
@@ -52,6 +67,45 @@ namespace Construct.Generate.Test
                 return;
             }
             
+            // Run the lookup benchmark instead of generating data if it was requested.
+            if (args.Contains("--benchmark-lookups"))
+            {
+                new LookupBenchmark().Run();
+                return;
+            }
+            
+            // Run the swipe benchmark instead of generating data if it was requested.
+            if (args.Contains("--benchmark-swipes"))
+            {
+                new SwipeBenchmark().Run();
+                return;
+            }
+            
+            // Run the Sqlite benchmark instead of generating data if it was requested.
+            if (args.Contains("--benchmark-sqlite"))
+            {
+                new SqliteBenchmark().Run();
+                return;
+            }
+            
+            // Bulk load a large data set instead of generating data if it was requested.
+            if (args.Contains("--bulk"))
+            {
+                var generator = new BulkGenerator();
+                generator.TotalUsers = int.Parse(GetArgument(args, "users") ?? generator.TotalUsers.ToString());
+                generator.TotalVisits = int.Parse(GetArgument(args, "visits") ?? generator.TotalVisits.ToString());
+                generator.TotalPrints = int.Parse(GetArgument(args, "prints") ?? generator.TotalPrints.ToString());
+                generator.Seed = int.Parse(GetArgument(args, "seed") ?? generator.Seed.ToString());
+                generator.Years = int.Parse(GetArgument(args, "years") ?? generator.Years.ToString());
+                var endTime = GetArgument(args, "end");
+                if (endTime != null)
+                {
+                    generator.EndTime = DateTime.ParseExact(endTime, "yyyy-MM-dd", CultureInfo.InvariantCulture);
+                }
+                generator.Run();
+                return;
+            }
+            
             // Create the random materials.
             var random = new System.Random();
             var materials = new List<PrintMaterial>();
@@ -0,0 +1,124 @@
+using System;
+
+namespace Construct.Generate.Test.Random
+{
+    public class RandomActivityTime
+    {
+        /// <summary>
+        /// Relative activity for each hour of the day. The lab is closed overnight
+        /// and busiest in the afternoon.
+        /// </summary>
+        private static readonly double[] HourWeights =
+        {
+            0, 0, 0, 0, 0, 0, 0, 0.05,
+            0.3, 0.6, 0.8, 0.9, 1.0, 1.0, 1.0, 0.95,
+            0.9, 0.8, 0.6, 0.5, 0.4, 0.3, 0.1, 0,
+        };
+
+        /// <summary>
+        /// Relative activity of weekends compared to weekdays.
+        /// </summary>
+        private const double WeekendWeight = 0.35;
+
+        /// <summary>
+        /// First time that can be returned.
+        /// </summary>
+        public DateTime StartTime { get; }
+
+        /// <summary>
+        /// Last time that can be returned.
+        /// </summary>
+        public DateTime EndTime { get; }
+
+        /// <summary>
+        /// Randomizer for the times.
+        /// </summary>
+        private readonly System.Random _random;
+
+        /// <summary>
+        /// Creates the randomizer.
+        /// </summary>
+        /// <param name="random">Seeded randomizer to use.</param>
+        /// <param name="startTime">First time that can be returned.</param>
+        /// <param name="endTime">Last time that can be returned.</param>
+        public RandomActivityTime(System.Random random, DateTime startTime, DateTime endTime)
+        {
+            this._random = random;
+            this.StartTime = startTime;
+            this.EndTime = endTime;
+        }
+
+        /// <summary>
+        /// Returns the relative activity of a day of the academic year. Semesters
+        /// are busiest in the first two weeks and before finals, summer is quiet,
+        /// and the breaks between semesters are almost empty.
+        /// </summary>
+        /// <param name="day">Day to get the activity of.</param>
+        /// <returns>The relative activity of the day from 0 to 1.5.</returns>
+        public static double GetDayWeight(DateTime day)
+        {
+            // Get the weight of the semester.
+            var fallStart = new DateTime(day.Year, 8, 26);
+            var fallEnd = new DateTime(day.Year, 12, 15);
+            var springStart = new DateTime(day.Year, 1, 15);
+            var springEnd = new DateTime(day.Year, 5, 5);
+            double weight;
+            if (day >= fallStart && day <= fallEnd)
+            {
+                weight = GetSemesterWeight(day, fallStart, fallEnd);
+            }
+            else if (day >= springStart && day <= springEnd)
+            {
+                weight = GetSemesterWeight(day, springStart, springEnd);
+            }
+            else if (day > springEnd && day < fallStart)
+            {
+                weight = 0.15;
+            }
+            else
+            {
+                weight = 0.05;
+            }
+
+            // Reduce the weight on weekends.
+            if (day.DayOfWeek == DayOfWeek.Saturday || day.DayOfWeek == DayOfWeek.Sunday)
+            {
+                weight *= WeekendWeight;
+            }
+            return weight;
+        }
+
+        /// <summary>
+        /// Returns the relative activity of a day in a semester.
+        /// </summary>
+        /// <param name="day">Day to get the activity of.</param>
+        /// <param name="start">Start of the semester.</param>
+        /// <param name="end">End of the semester.</param>
+        /// <returns>The relative activity of the day.</returns>
+        private static double GetSemesterWeight(DateTime day, DateTime start, DateTime end)
+        {
+            if ((day - start).TotalDays < 14) return 1.5;
+            if ((end - day).TotalDays < 21) return 1.4;
+            return 1.0;
+        }
+
+        /// <summary>
+        /// Returns a random time weighted by the activity of the day and hour.
+        /// </summary>
+        /// <returns>A random time between the start and end time.</returns>
+        public DateTime Next()
+        {
+            var totalSeconds = (this.EndTime - this.StartTime).TotalSeconds;
+            while (true)
+            {
+                // Pick a uniform time and keep it with the probability of its activity.
+                var time = this.StartTime.AddSeconds(Math.Floor(this._random.NextDouble() * totalSeconds));
+                var weight = GetDayWeight(time.Date) / 1.5 * HourWeights[time.Hour];
+                if (this._random.NextDouble() < weight)
+                {
+                    return time;
+                }
+            }
+        }
+    }
+}
@@ -1,8 +1,8 @@
 ﻿using System;
-using System.Linq;
 using System.Threading.Tasks;
 using Construct.Core.Attribute;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Construct.Core.Receipt.Print;
@@ -31,8 +31,7 @@ namespace Construct.Print.Controllers
             
             // Get the user.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(user => user.PrintLogs)
-                .FirstOrDefaultAsync(user => user.HashedId.ToLower() == hashedId.ToLower());
+            var user = await UserCache.GetSingleton().GetOrLoadAsync(context, hashedId);
             
             // Return not found if the user doesn't exist.
             if (user == null)
@@ -42,14 +41,14 @@ namespace Construct.Print.Controllers
             }
             
             // Return if the user has no prints.
-            if (user.PrintLogs.Count == 0)
+            var lastPrint = await context.GetLastPrintAsync(user.HashedId);
+            if (lastPrint == null)
             {
                 Response.StatusCode = 404;
                 return new GenericStatusResponse("no-prints");
             }
             
             // Return the response for the last print.
-            var lastPrint = user.PrintLogs.OrderByDescending(p => p.Time).First();
             return new LastPrintResponse()
             {
                 FileName = lastPrint.FileName,
@@ -84,8 +83,7 @@ namespace Construct.Print.Controllers
             
             // Get the user.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(user => user.PrintLogs)
-                .FirstOrDefaultAsync(user => user.HashedId.ToLower() == request.HashedId.ToLower());
+            var user = await UserCache.GetSingleton().GetOrLoadAsync(context, request.HashedId);
             
             // Return not found if the user doesn't exist.
             if (user == null)
@@ -109,7 +107,7 @@ namespace Construct.Print.Controllers
             // Add the print.
             var printLog = new PrintLog()
             {
-                User = user,
+                User = user.GetAttachedUser(context),
                 Time = DateTime.Now,
                 FileName = request.FileName,
                 Material = material,
@@ -119,16 +117,21 @@ namespace Construct.Print.Controllers
                 Cost = material.CostPerGram * request.Weight,
                 Owed = request.Owed ?? true,
             };
-            user.PrintLogs.Add(printLog);
+            context.PrintLog.Add(printLog);
             
-            // Send the print receipt in the background.
-            if (printLog.Owed && printLog.Cost > 0)
+            // Queue the print receipt to send in the background.
+            var sendReceipt = (printLog.Owed && printLog.Cost > 0);
+            if (sendReceipt)
             {
-                var _ = Task.Run(() => PrintReceiptProvider.SendReceipt(printLog));
+                PrintReceiptQueue.Add(context, printLog);
             }
 
             // Save the changes and return success.
             await context.SaveChangesAsync();
+            if (sendReceipt)
+            {
+                PrintReceiptQueue.GetSingleton().Notify();
+            }
             return new BaseSuccessResponse();
         }
     }
@@ -1,4 +1,5 @@
-﻿using Construct.Core.Server;
+﻿using Construct.Core.Receipt.Print;
+using Construct.Core.Server;
 
 namespace Construct.Print
 {
@@ -8,6 +9,6 @@ namespace Construct.Print
         /// Runs the program.
         /// </summary>
         /// <param name="args">Arguments from the command line.</param>
-        public static void Main(string[] args) => ServerProgram.Run(args, "Print");
+        public static void Main(string[] args) => ServerProgram.Run(args, "Print", typeof(PrintReceiptWorker));
     }
 }
\ No newline at end of file
@@ -0,0 +1,145 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using Construct.Base.Test.Functional.Base;
+using Construct.Core.Database.Context;
+using Construct.Swipe.Queue;
+using NUnit.Framework;
+
+namespace Construct.Swipe.Test.Functional.Queue
+{
+    public class SwipeQueueTest : BaseSqliteTest
+    {
+        /// <summary>
+        /// Queue under test.
+        /// </summary>
+        private SwipeQueue _swipeQueue;
+
+        /// <summary>
+        /// Sets up the queue and the test user.
+        /// </summary>
+        [SetUp]
+        public void SetUpQueue()
+        {
+            this._swipeQueue = new SwipeQueue()
+            {
+                Enabled = true,
+                BatchInterval = 50,
+                MaxBatchSize = 2,
+                MaxQueuedSwipes = 3,
+                SpoolFile = Path.Combine(Path.GetTempPath(), $"swipe-spool-{Guid.NewGuid()}.jsonl"),
+            };
+            this.AddData((context) =>
+            {
+                context.Users.Add(new Core.Database.Model.User()
+                {
+                    HashedId = "test_hash",
+                    Name = "Test Name",
+                    Email = "test@email",
+                    SignUpTime = DateTime.Now,
+                });
+            });
+        }
+
+        /// <summary>
+        /// Removes the spool file.
+        /// </summary>
+        [TearDown]
+        public void TearDownQueue()
+        {
+            File.Delete(this._swipeQueue.SpoolFile);
+            File.Delete(this._swipeQueue.SpoolFile + ".replay");
+        }
+
+        /// <summary>
+        /// Creates a swipe to queue.
+        /// </summary>
+        /// <param name="hashedId">Hashed id of the swipe.</param>
+        /// <param name="source">Source of the swipe.</param>
+        /// <returns>The swipe to queue.</returns>
+        private static QueuedSwipe CreateSwipe(string hashedId, string source)
+        {
+            return new QueuedSwipe()
+            {
+                HashedId = hashedId,
+                Source = source,
+                Time = DateTime.Now,
+            };
+        }
+
+        /// <summary>
+        /// Tests queueing and saving swipes in batches.
+        /// </summary>
+        [Test]
+        public void TestBatches()
+        {
+            // Assert swipes aren't queued until the queue is started.
+            Assert.IsFalse(this._swipeQueue.TryAdd(CreateSwipe("test_hash", "Source0")));
+            this._swipeQueue.Start();
+
+            // Queue the swipes and assert the swipes past the maximum aren't queued.
+            for (var i = 0; i < 3; i++)
+            {
+                Assert.IsTrue(this._swipeQueue.TryAdd(CreateSwipe("test_hash", "Source" + i)));
+            }
+            Assert.IsFalse(this._swipeQueue.TryAdd(CreateSwipe("test_hash", "Source3")));
+            Assert.AreEqual(3, this._swipeQueue.Count);
+
+            // Save the swipes and assert they were saved in batches.
+            var batch = this._swipeQueue.ReadBatchAsync(CancellationToken.None).Result;
+            Assert.AreEqual(2, batch.Count);
+            this._swipeQueue.FlushAsync(batch).Wait();
+            batch = this._swipeQueue.ReadBatchAsync(CancellationToken.None).Result;
+            Assert.AreEqual(1, batch.Count);
+            this._swipeQueue.FlushAsync(batch).Wait();
+            using var context = new ConstructContext();
+            Assert.AreEqual(new List<string>() { "Source0", "Source1", "Source2" }, context.VisitLogs.OrderBy(visitLog => visitLog.Key).Select(visitLog => visitLog.Source).ToList());
+            Assert.AreEqual(3, this._swipeQueue.Queued);
+            Assert.AreEqual(3, this._swipeQueue.Saved);
+            Assert.AreEqual(2, this._swipeQueue.Batches);
+            Assert.AreEqual(0, this._swipeQueue.Count);
+
+            // Stop the queue and assert swipes aren't queued.
+            this._swipeQueue.Stop();
+            Assert.IsFalse(this._swipeQueue.TryAdd(CreateSwipe("test_hash", "Source3")));
+            Assert.AreEqual(0, this._swipeQueue.ReadBatchAsync(CancellationToken.None).Result.Count);
+        }
+
+        /// <summary>
+        /// Tests that swipes that can't be saved are spooled and replayed.
+        /// </summary>
+        [Test]
+        public void TestSpool()
+        {
+            // Save a batch with an unknown user and assert only the failed swipe was spooled.
+            this._swipeQueue.FlushAsync(new List<QueuedSwipe>()
+            {
+                CreateSwipe("test_hash", "Source0"),
+                CreateSwipe("unknown_hash", "Source1"),
+            }).Wait();
+            using var context = new ConstructContext();
+            Assert.AreEqual(1, context.VisitLogs.Count());
+            Assert.AreEqual(1, this._swipeQueue.Spooled);
+            Assert.AreEqual(1, File.ReadAllLines(this._swipeQueue.SpoolFile).Length);
+
+            // Add the user, replay the spool, and assert the swipe was saved.
+            this.AddData((addContext) =>
+            {
+                addContext.Users.Add(new Core.Database.Model.User()
+                {
+                    HashedId = "unknown_hash",
+                    Name = "Unknown Name",
+                    Email = "unknown@email",
+                    SignUpTime = DateTime.Now,
+                });
+            });
+            Assert.AreEqual(1, this._swipeQueue.ReplaySpoolAsync().Result);
+            Assert.AreEqual(2, context.VisitLogs.Count());
+            Assert.IsFalse(File.Exists(this._swipeQueue.SpoolFile));
+            Assert.IsFalse(File.Exists(this._swipeQueue.SpoolFile + ".replay"));
+            Assert.AreEqual(0, this._swipeQueue.ReplaySpoolAsync().Result);
+        }
+    }
+}
@@ -2,11 +2,12 @@ using System;
 using System.Threading.Tasks;
 using Construct.Core.Attribute;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Construct.Swipe.Data.Request;
+using Construct.Swipe.Queue;
 using Microsoft.AspNetCore.Mvc;
-using Microsoft.EntityFrameworkCore;
 
 namespace Construct.Swipe.Controllers
 {
@@ -30,17 +31,29 @@ namespace Construct.Swipe.Controllers
             
             // Return if the user doesn't exist.
             await using var context = new ConstructContext();
-            var swipedUser = await context.Users.FirstOrDefaultAsync(user => user.HashedId.ToLower() == request.HashedId.ToLower());
+            var swipedUser = await UserCache.GetSingleton().GetOrLoadAsync(context, request.HashedId);
             if (swipedUser == null)
             {
                 Response.StatusCode = 404;
                 return new GenericStatusResponse("user-not-found");
             }
             
+            // Queue the swipe to be saved in a batch and return success.
+            var swipeQueued = SwipeQueue.GetSingleton().TryAdd(new QueuedSwipe()
+            {
+                HashedId = swipedUser.HashedId,
+                Source = request.Source,
+                Time = DateTime.Now,
+            });
+            if (swipeQueued)
+            {
+                return new BaseSuccessResponse();
+            }
+            
             // Add the swipe log and return success.
             context.VisitLogs.Add(new VisitLog()
             {
-                User = swipedUser,
+                User = swipedUser.GetAttachedUser(context),
                 Time = DateTime.Now,
                 Source = request.Source,
             });
@@ -1,4 +1,5 @@
 ﻿using Construct.Core.Server;
+using Construct.Swipe.Queue;
 
 namespace Construct.Swipe
 {
@@ -8,6 +9,6 @@ namespace Construct.Swipe
         /// Runs the program.
         /// </summary>
         /// <param name="args">Arguments from the command line.</param>
-        public static void Main(string[] args) => ServerProgram.Run(args, "Swipe");
+        public static void Main(string[] args) => ServerProgram.Run(args, "Swipe", typeof(SwipeQueueWorker));
     }
 }
\ No newline at end of file
@@ -0,0 +1,405 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using System.Threading.Channels;
+using System.Threading.Tasks;
+using Construct.Core.Configuration;
+using Construct.Core.Database.Context;
+using Construct.Core.Database.Model;
+using Construct.Core.Logging;
+using Newtonsoft.Json;
+
+namespace Construct.Swipe.Queue
+{
+    public class QueuedSwipe
+    {
+        /// <summary>
+        /// Hashed id of the user as stored in the database.
+        /// </summary>
+        public string HashedId { get; set; }
+
+        /// <summary>
+        /// Source of the swipe.
+        /// </summary>
+        public string Source { get; set; }
+
+        /// <summary>
+        /// Time of the swipe.
+        /// </summary>
+        public DateTime Time { get; set; }
+    }
+
+    public class SwipeQueue
+    {
+        /// <summary>
+        /// Whether swipes are queued. If false, swipes must be saved by the requests.
+        /// </summary>
+        public bool Enabled { get; set; } = false;
+
+        /// <summary>
+        /// Max time in milliseconds that a swipe is queued before it is saved.
+        /// </summary>
+        public int BatchInterval { get; set; } = 250;
+
+        /// <summary>
+        /// Max swipes to save at once.
+        /// </summary>
+        public int MaxBatchSize { get; set; } = 500;
+
+        /// <summary>
+        /// Max swipes that can be queued. Swipes past this must be saved by the requests.
+        /// </summary>
+        public int MaxQueuedSwipes { get; set; } = 10000;
+
+        /// <summary>
+        /// File that swipes are written to if they can't be saved.
+        /// </summary>
+        public string SpoolFile { get; set; } = "swipe-spool.jsonl";
+
+        /// <summary>
+        /// Total swipes queued.
+        /// </summary>
+        public long Queued => Interlocked.Read(ref this._queued);
+
+        /// <summary>
+        /// Total queued swipes that were saved.
+        /// </summary>
+        public long Saved => Interlocked.Read(ref this._saved);
+
+        /// <summary>
+        /// Total batches that were saved.
+        /// </summary>
+        public long Batches => Interlocked.Read(ref this._batches);
+
+        /// <summary>
+        /// Total swipes written to the spool file.
+        /// </summary>
+        public long Spooled => Interlocked.Read(ref this._spooled);
+
+        /// <summary>
+        /// Swipes in the queue.
+        /// </summary>
+        public int Count => this._count;
+
+        /// <summary>
+        /// Static queue instance to use.
+        /// </summary>
+        private static SwipeQueue _staticQueue;
+
+        /// <summary>
+        /// Swipes that are queued to be saved.
+        /// </summary>
+        private readonly Channel<QueuedSwipe> _swipes = Channel.CreateUnbounded<QueuedSwipe>(new UnboundedChannelOptions()
+        {
+            SingleReader = true,
+        });
+
+        /// <summary>
+        /// Lock for writing to the spool file.
+        /// </summary>
+        private readonly SemaphoreSlim _spoolLock = new SemaphoreSlim(1, 1);
+
+        /// <summary>
+        /// Whether the queue was started.
+        /// </summary>
+        private bool _started;
+
+        /// <summary>
+        /// Swipes in the queue.
+        /// </summary>
+        private int _count;
+
+        /// <summary>
+        /// Total swipes queued.
+        /// </summary>
+        private long _queued;
+
+        /// <summary>
+        /// Total queued swipes that were saved.
+        /// </summary>
+        private long _saved;
+
+        /// <summary>
+        /// Total batches that were saved.
+        /// </summary>
+        private long _batches;
+
+        /// <summary>
+        /// Total swipes written to the spool file.
+        /// </summary>
+        private long _spooled;
+
+        /// <summary>
+        /// Returns a static instance of the queue. Whether the queue is enabled and the
+        /// spool file only apply after restarting. The other settings of the queue are
+        /// updated when the configuration is reloaded.
+        /// </summary>
+        /// <returns>The static instance of the queue.</returns>
+        public static SwipeQueue GetSingleton()
+        {
+            if (_staticQueue != null) return _staticQueue;
+            var configuration = ConstructConfiguration.Configuration;
+            var queue = new SwipeQueue()
+            {
+                Enabled = configuration.Swipe.BatchInserts,
+                SpoolFile = configuration.Swipe.SpoolFile ?? "swipe-spool.jsonl",
+            };
+            queue.ApplyConfiguration(configuration);
+            if (Interlocked.CompareExchange(ref _staticQueue, queue, null) == null)
+            {
+                ConstructConfiguration.Reloaded += queue.ApplyConfiguration;
+            }
+            return _staticQueue;
+        }
+
+        /// <summary>
+        /// Updates the batch settings of the queue from a configuration.
+        /// </summary>
+        /// <param name="configuration">Configuration to use.</param>
+        public void ApplyConfiguration(ConstructConfiguration configuration)
+        {
+            this.BatchInterval = Math.Max(0, configuration.Swipe.BatchInterval);
+            this.MaxBatchSize = Math.Max(1, configuration.Swipe.MaximumBatchSize);
+        }
+
+        /// <summary>
+        /// Starts accepting swipes. Swipes are only accepted while a worker is saving them.
+        /// </summary>
+        public void Start()
+        {
+            this._started = true;
+        }
+
+        /// <summary>
+        /// Stops accepting swipes. The queued swipes can still be read.
+        /// </summary>
+        public void Stop()
+        {
+            this._swipes.Writer.TryComplete();
+        }
+
+        /// <summary>
+        /// Queues a swipe to be saved.
+        /// </summary>
+        /// <param name="swipe">Swipe to queue.</param>
+        /// <returns>Whether the swipe was queued. If false, the swipe must be saved by the caller.</returns>
+        public bool TryAdd(QueuedSwipe swipe)
+        {
+            // Return false if the queue isn't running or is full.
+            if (!this.Enabled || !this._started) return false;
+            if (Interlocked.Increment(ref this._count) > this.MaxQueuedSwipes)
+            {
+                Interlocked.Decrement(ref this._count);
+                return false;
+            }
+
+            // Queue the swipe.
+            if (!this._swipes.Writer.TryWrite(swipe))
+            {
+                Interlocked.Decrement(ref this._count);
+                return false;
+            }
+            Interlocked.Increment(ref this._queued);
+            return true;
+        }
+
+        /// <summary>
+        /// Reads a swipe from the queue.
+        /// </summary>
+        /// <param name="swipe">Swipe that was read.</param>
+        /// <returns>Whether a swipe was read.</returns>
+        private bool TryRead(out QueuedSwipe swipe)
+        {
+            if (!this._swipes.Reader.TryRead(out swipe)) return false;
+            Interlocked.Decrement(ref this._count);
+            return true;
+        }
+
+        /// <summary>
+        /// Waits for swipes and reads them until the batch is full or the batch interval
+        /// has passed since the first swipe. The swipes read so far are returned if the
+        /// token is cancelled.
+        /// </summary>
+        /// <param name="cancellationToken">Token for stopping waiting.</param>
+        /// <returns>The swipes to save.</returns>
+        public async Task<List<QueuedSwipe>> ReadBatchAsync(CancellationToken cancellationToken)
+        {
+            var batch = new List<QueuedSwipe>();
+            try
+            {
+                // Wait for the first swipe.
+                if (!await this._swipes.Reader.WaitToReadAsync(cancellationToken)) return batch;
+
+                // Read the swipes until the batch is full or the interval has passed.
+                var stopwatch = Stopwatch.StartNew();
+                while (batch.Count < this.MaxBatchSize)
+                {
+                    // Add the next swipe if there is one.
+                    if (this.TryRead(out var swipe))
+                    {
+                        batch.Add(swipe);
+                        continue;
+                    }
+
+                    // Wait for more swipes for the rest of the interval.
+                    var remainingTime = this.BatchInterval - stopwatch.ElapsedMilliseconds;
+                    if (remainingTime <= 0) break;
+                    using var intervalToken = CancellationTokenSource.CreateLinkedTokenSource(cancellationToken);
+                    intervalToken.CancelAfter(TimeSpan.FromMilliseconds(remainingTime));
+                    try
+                    {
+                        if (!await this._swipes.Reader.WaitToReadAsync(intervalToken.Token)) break;
+                    }
+                    catch (OperationCanceledException) when (!cancellationToken.IsCancellationRequested)
+                    {
+                        break;
+                    }
+                }
+            }
+            catch (OperationCanceledException)
+            {
+                // Return the swipes that were read.
+            }
+            return batch;
+        }
+
+        /// <summary>
+        /// Reads all the queued swipes without waiting.
+        /// </summary>
+        /// <returns>The queued swipes.</returns>
+        public List<QueuedSwipe> ReadAll()
+        {
+            var swipes = new List<QueuedSwipe>();
+            while (this.TryRead(out var swipe))
+            {
+                swipes.Add(swipe);
+            }
+            return swipes;
+        }
+
+        /// <summary>
+        /// Saves swipes in a single transaction.
+        /// </summary>
+        /// <param name="swipes">Swipes to save.</param>
+        private static async Task SaveAsync(IEnumerable<QueuedSwipe> swipes)
+        {
+            // Add the visit logs. The users are attached without loading them.
+            await using var context = new ConstructContext();
+            var users = new Dictionary<string, User>();
+            foreach (var swipe in swipes)
+            {
+                if (!users.TryGetValue(swipe.HashedId, out var user))
+                {
+                    user = new User()
+                    {
+                        HashedId = swipe.HashedId,
+                    };
+                    context.Users.Attach(user);
+                    users[swipe.HashedId] = user;
+                }
+                context.VisitLogs.Add(new VisitLog()
+                {
+                    User = user,
+                    Time = swipe.Time,
+                    Source = swipe.Source,
+                });
+            }
+
+            // Save the visit logs.
+            await context.SaveChangesAsync();
+        }
+
+        /// <summary>
+        /// Saves swipes. If the batch can't be saved, the swipes are saved individually,
+        /// and the swipes that still fail are written to the spool file.
+        /// </summary>
+        /// <param name="swipes">Swipes to save.</param>
+        public async Task FlushAsync(List<QueuedSwipe> swipes)
+        {
+            // Return if there are no swipes.
+            if (swipes.Count == 0) return;
+
+            // Save the batch.
+            try
+            {
+                await SaveAsync(swipes);
+                Interlocked.Add(ref this._saved, swipes.Count);
+                Interlocked.Increment(ref this._batches);
+                return;
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"Failed to save {swipes.Count} swipes at once: {e.Message}");
+            }
+
+            // Save the swipes individually and spool the swipes that fail.
+            var failedSwipes = new List<QueuedSwipe>();
+            foreach (var swipe in swipes)
+            {
+                try
+                {
+                    await SaveAsync(new List<QueuedSwipe>() { swipe });
+                    Interlocked.Increment(ref this._saved);
+                }
+                catch (Exception e)
+                {
+                    Log.Error($"Failed to save swipe for {swipe.HashedId} at {swipe.Time}: {e.Message}");
+                    failedSwipes.Add(swipe);
+                }
+            }
+            await this.SpoolAsync(failedSwipes);
+        }
+
+        /// <summary>
+        /// Writes swipes to the spool file.
+        /// </summary>
+        /// <param name="swipes">Swipes to write.</param>
+        private async Task SpoolAsync(List<QueuedSwipe> swipes)
+        {
+            if (swipes.Count == 0) return;
+            await this._spoolLock.WaitAsync();
+            try
+            {
+                await File.AppendAllLinesAsync(this.SpoolFile, swipes.Select(swipe => JsonConvert.SerializeObject(swipe)));
+                Interlocked.Add(ref this._spooled, swipes.Count);
+                Log.Warn($"Wrote {swipes.Count} swipes to {this.SpoolFile}.");
+            }
+            finally
+            {
+                this._spoolLock.Release();
+            }
+        }
+
+        /// <summary>
+        /// Saves the swipes in the spool file and removes the file.
+        /// Swipes that still can't be saved are written to a new spool file.
+        /// </summary>
+        /// <returns>The total swipes read from the spool file.</returns>
+        public async Task<int> ReplaySpoolAsync()
+        {
+            // Move the spool file so that failed swipes can be written to a new file.
+            // A file left by a previous replay that stopped is replayed first.
+            var replayFile = this.SpoolFile + ".replay";
+            if (!File.Exists(replayFile))
+            {
+                if (!File.Exists(this.SpoolFile)) return 0;
+                File.Move(this.SpoolFile, replayFile);
+            }
+
+            // Save the swipes.
+            var swipes = (await File.ReadAllLinesAsync(replayFile))
+                .Where(line => !string.IsNullOrWhiteSpace(line))
+                .Select(JsonConvert.DeserializeObject<QueuedSwipe>).ToList();
+            Log.Info($"Saving {swipes.Count} swipes from {this.SpoolFile}.");
+            for (var i = 0; i < swipes.Count; i += this.MaxBatchSize)
+            {
+                await this.FlushAsync(swipes.Skip(i).Take(this.MaxBatchSize).ToList());
+            }
+            File.Delete(replayFile);
+            return swipes.Count;
+        }
+    }
+}
@@ -0,0 +1,54 @@
+using System;
+using System.Threading;
+using System.Threading.Tasks;
+using Construct.Core.Logging;
+using Construct.Core.Server;
+using Microsoft.Extensions.Hosting;
+
+namespace Construct.Swipe.Queue
+{
+    public class SwipeQueueWorker : BackgroundService
+    {
+        /// <summary>
+        /// Saves the queued swipes until the service stops.
+        /// </summary>
+        /// <param name="stoppingToken">Token for when the service stops.</param>
+        protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+        {
+            // Return if swipes aren't queued.
+            var queue = SwipeQueue.GetSingleton();
+            if (!queue.Enabled) return;
+
+            // Add the metrics of the queue.
+            ServerMetrics.AddMetric("construct_swipe_queue_depth", "gauge", "Swipes waiting to be saved.", () => queue.Count);
+            ServerMetrics.AddMetric("construct_swipe_queue_saved_total", "counter", "Queued swipes saved to the database.", () => queue.Saved);
+            ServerMetrics.AddMetric("construct_swipe_queue_spooled_total", "counter", "Queued swipes written to the spool file.", () => queue.Spooled);
+
+            // Save the swipes left from a previous run and start accepting swipes.
+            try
+            {
+                await queue.ReplaySpoolAsync();
+            }
+            catch (Exception e)
+            {
+                Log.Error($"Failed to save swipes from {queue.SpoolFile}: {e.Message}");
+            }
+            queue.Start();
+
+            try
+            {
+                // Save the swipes in batches until the service stops.
+                while (!stoppingToken.IsCancellationRequested)
+                {
+                    await queue.FlushAsync(await queue.ReadBatchAsync(stoppingToken));
+                }
+            }
+            finally
+            {
+                // Stop accepting swipes and save the remaining swipes.
+                queue.Stop();
+                await queue.FlushAsync(queue.ReadAll());
+            }
+        }
+    }
+}
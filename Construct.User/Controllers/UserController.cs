@@ -4,6 +4,7 @@ using System.Threading.Tasks;
 using Construct.Core.Attribute;
 using Construct.Core.Configuration;
 using Construct.Core.Data.Response;
+using Construct.Core.Database.Cache;
 using Construct.Core.Database.Context;
 using Construct.Core.Database.Model;
 using Construct.User.Data.Correction;
@@ -17,27 +18,18 @@ namespace Construct.User.Controllers
     public class UserController : Controller
     {
         /// <summary>
-        /// Creates a GetUserResponse for a user. Must have the permissions and print logs.
+        /// Creates a GetUserResponse for a user. Must have the permissions and print totals.
         /// </summary>
         /// <param name="user">User to create the response for.</param>
         /// <returns>Response to return.</returns>
         private static GetUserResponse CreateGetUserResponse(Core.Database.Model.User user)
         {
-            // Determine the balance for the print logs.
-            var owedPrints = user.PrintLogs.Where(print => print.Owed);
-            var owedPrintBalance = 0.0;
-            foreach (var print in owedPrints)
-            {
-                owedPrintBalance += print.Cost;
-            }
-            
-            // Return the response.
             return new GetUserResponse()
             {
                 HashedId = user.HashedId,
                 Name = user.Name,
                 Email = user.Email,
-                OwedPrintBalance = owedPrintBalance,
+                OwedPrintBalance = user.PrintTotals?.OwedCost ?? 0,
                 Permissions = user.Permissions.Where(permission => permission.IsActive()).Select(permission => permission.Name).ToList(),
             };
         }
@@ -59,8 +51,9 @@ namespace Construct.User.Controllers
             
             // Get the user.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(user => user.PrintLogs).Include(user => user.Permissions)
-                .FirstOrDefaultAsync(user => user.HashedId.ToLower() == hashedId.ToLower());
+            var normalizedHashedId = ConstructContext.Normalize(hashedId);
+            var user = await context.Users.Include(user => user.PrintTotals).Include(user => user.Permissions)
+                .FirstOrDefaultAsync(user => user.NormalizedHashedId == normalizedHashedId);
             
             // Return not found if the user doesn't exist.
             if (user == null)
@@ -95,11 +88,7 @@ namespace Construct.User.Controllers
             }
             
             // Correct the email.
-            var emailCorrection = new EmailCorrection()
-            {
-                ValidEmails = ConstructConfiguration.Configuration.Email.ValidEmails,
-                Corrections = ConstructConfiguration.Configuration.Email.EmailCorrections,
-            };
+            var emailCorrection = new EmailCorrection(ConstructConfiguration.Configuration.Email);
             try
             {
                 email = emailCorrection.CorrectEmail(email);
@@ -112,8 +101,8 @@ namespace Construct.User.Controllers
             
             // Find the user.
             await using var context = new ConstructContext();
-            var user = await context.Users.Include(user => user.PrintLogs).Include(user => user.Permissions)
-                .FirstOrDefaultAsync(user => user.Email.ToLower() == email);
+            var user = await context.Users.Include(user => user.PrintTotals).Include(user => user.Permissions)
+                .FirstOrDefaultAsync(user => user.NormalizedEmail == email);
             
             // Return not found if the user doesn't exist.
             if (user == null)
@@ -143,11 +132,7 @@ namespace Construct.User.Controllers
             }
             
             // Correct the email and return if it is invalid.
-            var emailCorrection = new EmailCorrection()
-            {
-                ValidEmails = ConstructConfiguration.Configuration.Email.ValidEmails,
-                Corrections = ConstructConfiguration.Configuration.Email.EmailCorrections,
-            };
+            var emailCorrection = new EmailCorrection(ConstructConfiguration.Configuration.Email);
             try
             {
                 request.Email = emailCorrection.CorrectEmail(request.Email);
@@ -160,7 +145,8 @@ namespace Construct.User.Controllers
             
             // Return if the user already exists.
             await using var context = new ConstructContext();
-            if (await context.Users.FirstOrDefaultAsync(user => user.HashedId.ToLower() == request.HashedId.ToLower() || user.Email.ToLower() == request.Email) != null)
+            var normalizedHashedId = ConstructContext.Normalize(request.HashedId);
+            if (await context.Users.FirstOrDefaultAsync(user => user.NormalizedHashedId == normalizedHashedId || user.NormalizedEmail == request.Email) != null)
             {
                 Response.StatusCode = 409;
                 return new GenericStatusResponse("duplicate-user");
@@ -183,6 +169,7 @@ namespace Construct.User.Controllers
             context.Users.Add(user);
             context.Students.Add(student);
             await context.SaveChangesAsync();
+            UserCache.GetSingleton().Invalidate(user.HashedId);
             return new BaseSuccessResponse();
         }
     }
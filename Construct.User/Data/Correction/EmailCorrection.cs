@@ -1,20 +1,51 @@
 using System;
 using System.Collections.Generic;
 using System.Net.Mail;
+using Construct.Core.Configuration;
 
 namespace Construct.User.Data.Correction
 {
     public class EmailCorrection
     {
+        /// <summary>
+        /// Email configuration containing the valid emails, corrections, and their lookups.
+        /// </summary>
+        private readonly Email _email;
+
         /// <summary>
         /// Emails that are valid.
         /// </summary>
-        public List<string> ValidEmails { get; set; }= new List<string>();
+        public List<string> ValidEmails
+        {
+            get => this._email.ValidEmails;
+            set => this._email.ValidEmails = value;
+        }
 
         /// <summary>
         /// Changes to make to emails to make them valid.
         /// </summary>
-        public Dictionary<string, string> Corrections { get; set; } = new Dictionary<string, string>();
+        public Dictionary<string, string> Corrections
+        {
+            get => this._email.EmailCorrections;
+            set => this._email.EmailCorrections = value;
+        }
+
+        /// <summary>
+        /// Creates the email correction without valid emails or corrections.
+        /// </summary>
+        public EmailCorrection() : this(new Email())
+        {
+            
+        }
+
+        /// <summary>
+        /// Creates the email correction for an email configuration.
+        /// </summary>
+        /// <param name="email">Email configuration to use.</param>
+        public EmailCorrection(Email email)
+        {
+            this._email = email;
+        }
 
         /// <summary>
         /// Corrects an email to a valid email. Throws an FormatException if the email is invalid.
@@ -25,32 +56,22 @@ namespace Construct.User.Data.Correction
         {
             // Correct the emails until no corrects can be made.
             var address = new MailAddress(email.ToLower());
-            while (true)
+            var corrections = this._email.EmailCorrectionLookup;
+            while (corrections.TryGetValue(address.Host, out var newEmail))
             {
-                // Replace the end of the email.
-                var changeMade = false;
-                foreach (var (originalEmail, newEmail) in this.Corrections)
-                {
-                    if (address.Host != originalEmail.ToLower()) continue;
-                    address = new MailAddress(address.User + "@" + newEmail.ToLower());
-                    changeMade = true;
-                    break;
-                }
-                
-                // Break the loop if no change was made.
-                if (!changeMade) break;
+                address = new MailAddress(address.User + "@" + newEmail);
             }
             
             // Return if no valid emails are specified.
-            if (this.ValidEmails.Count == 0)
+            var validEmails = this._email.ValidEmailLookup;
+            if (validEmails.Count == 0)
             {
                 return address.Address;
             }
             
             // Return the email if one is valid.
-            foreach (var validEmail in this.ValidEmails)
+            if (validEmails.Contains(address.Host))
             {
-                if (address.Host != validEmail.ToLower()) continue;
                 return address.Address;
             }
             
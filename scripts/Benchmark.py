@@ -0,0 +1,526 @@
+"""
+Zachary Cook
+
+Benchmarks the latency and throughput of services. The services are
+started against a throwaway SQLite database with generated users, prints,
+and visits, and the results are output as JSON so that they can be
+compared between commits.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import tempfile
+import time
+import aiohttp
+import psutil
+from DeployImplementations import ProjectHash
+from DeployImplementations.BaseDeploy import BaseDeploy
+
+
+"""
+Services that handle each request type. The combined service handles all of them.
+"""
+requestServices = {
+    "swipe": "Construct.Swipe",
+    "print-add": "Construct.Print",
+    "print-last": "Construct.Print",
+    "admin-search": "Construct.Admin",
+    "csv-export": "Construct.Admin",
+}
+
+"""
+Weights of the request types for the named mixes.
+"""
+requestMixes = {
+    "default": {"swipe": 50, "print-last": 20, "print-add": 10, "admin-search": 18, "csv-export": 2},
+    "swipe": {"swipe": 1},
+    "print": {"print-last": 2, "print-add": 1},
+    "admin": {"admin-search": 1},
+    "csv": {"csv-export": 1},
+}
+
+"""
+Hashed id of the user with the LabManager permission used for the admin requests.
+"""
+adminHashedId = "benchmark-admin"
+
+
+"""
+Returns the hashed id of a generated user.
+"""
+def getHashedId(userId):
+    return hashlib.sha256(("benchmark-user-" + str(userId)).encode()).hexdigest()
+
+"""
+Returns a time in the format stored by the SQLite database.
+"""
+def formatTime(dateTime):
+    return dateTime.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+"""
+Returns an unused port.
+"""
+def getUnusedPort():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as portSocket:
+        portSocket.bind(("127.0.0.1", 0))
+        return portSocket.getsockname()[1]
+
+"""
+Parses a request mix, either the name of a mix or a list
+of weights like swipe:5,print-last:1.
+"""
+def parseMix(mixString):
+    if mixString in requestMixes.keys():
+        return requestMixes[mixString]
+    mix = {}
+    for entry in mixString.split(","):
+        requestType, _, weight = entry.partition(":")
+        if requestType not in requestServices.keys():
+            raise ValueError("Unknown request type \"" + requestType + "\". Valid types: " + ",".join(requestServices.keys()))
+        mix[requestType] = float(weight or 1)
+    return mix
+
+"""
+Returns the percentile of a sorted list of latencies (nearest rank).
+"""
+def getPercentile(sortedLatencies, percentile):
+    if len(sortedLatencies) == 0:
+        return None
+    index = max(0, min(len(sortedLatencies) - 1, math.ceil(percentile / 100 * len(sortedLatencies)) - 1))
+    return sortedLatencies[index]
+
+"""
+Returns the summary of a list of latencies in milliseconds.
+"""
+def summarizeLatencies(latencies):
+    sortedLatencies = sorted(latencies)
+    if len(sortedLatencies) == 0:
+        return {}
+    return {
+        "p50": round(getPercentile(sortedLatencies, 50), 3),
+        "p95": round(getPercentile(sortedLatencies, 95), 3),
+        "p99": round(getPercentile(sortedLatencies, 99), 3),
+        "mean": round(sum(sortedLatencies) / len(sortedLatencies), 3),
+        "max": round(sortedLatencies[-1], 3),
+    }
+
+
+class BenchmarkDatabase:
+    """
+    Creates the database generator.
+    """
+    def __init__(self, databaseLocation, users, prints, visits, seed):
+        self.databaseLocation = databaseLocation
+        self.users = users
+        self.prints = prints
+        self.visits = visits
+        self.random = random.Random(seed)
+        self.materials = ["Material " + str(i) for i in range(0, 10)]
+
+    """
+    Adds the generated data to the database. The tables must already
+    exist, which is done by the services when they start. Users are
+    weighted so that a few users have most of the prints and visits.
+    """
+    def populate(self):
+        connection = sqlite3.connect(self.databaseLocation, timeout=30)
+        try:
+            endTime = datetime.datetime.now()
+            startTime = endTime - datetime.timedelta(days=365)
+            randomTime = lambda: startTime + datetime.timedelta(seconds=self.random.uniform(0, 365 * 24 * 60 * 60))
+
+            # Add the materials and users.
+            connection.executemany("INSERT INTO PrintMaterials (Name, CostPerGram) VALUES (?, ?)", [(material, 0.02 + 0.01 * i) for i, material in enumerate(self.materials)])
+            userRows = []
+            for userId in range(0, self.users):
+                hashedId = getHashedId(userId)
+                name = "Benchmark User " + str(userId)
+                email = "user" + str(userId) + "@benchmark.test"
+                userRows.append((hashedId, hashedId.lower(), name, name.lower(), email, email.lower(), formatTime(randomTime())))
+            userRows.append((adminHashedId, adminHashedId, "Benchmark Admin", "benchmark admin", "admin@benchmark.test", "admin@benchmark.test", formatTime(startTime)))
+            connection.executemany("INSERT INTO Users (HashedId, NormalizedHashedId, Name, NormalizedName, Email, NormalizedEmail, SignUpTime) VALUES (?, ?, ?, ?, ?, ?, ?)", userRows)
+            connection.execute("INSERT INTO Permissions (Name, UserHashedId) VALUES (?, ?)", ("LabManager", adminHashedId))
+
+            # Add the prints and visits.
+            hashedIds = [getHashedId(userId) for userId in range(0, self.users)]
+            weights = [self.random.paretovariate(1.5) for _ in hashedIds]
+            printRows = []
+            for hashedId in (self.random.choices(hashedIds, weights, k=self.prints) if self.users > 0 else []):
+                fileName = "print" + str(self.random.randint(0, 1000000)) + ".gcode"
+                billTo = (self.random.choice(["Club", "Senior Design", "Research"]) if self.random.random() < 0.2 else None)
+                weight = round(self.random.lognormvariate(3, 1), 2)
+                printRows.append((hashedId, formatTime(randomTime()), fileName, fileName.lower(), self.random.choice(self.materials), weight, "Benchmark", billTo, (billTo.lower() if billTo is not None else None), round(weight * 0.03, 2), (1 if self.random.random() < 0.3 else 0)))
+            connection.executemany("INSERT INTO PrintLog (UserHashedId, Time, FileName, NormalizedFileName, MaterialName, WeightGrams, Purpose, BillTo, NormalizedBillTo, Cost, Owed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", printRows)
+            visitRows = [(hashedId, formatTime(randomTime()), "Benchmark") for hashedId in (self.random.choices(hashedIds, weights, k=self.visits) if self.users > 0 else [])]
+            connection.executemany("INSERT INTO VisitLogs (UserHashedId, Time, Source) VALUES (?, ?, ?)", visitRows)
+
+            # Add the print totals, which are normally updated by the services.
+            connection.execute("INSERT INTO UserPrintTotals (HashedId, TotalPrints, TotalWeight, OwedPrints, OwedWeight, OwedCost) SELECT UserHashedId, COUNT(*), SUM(WeightGrams), SUM(CASE WHEN Owed THEN 1 ELSE 0 END), SUM(CASE WHEN Owed THEN WeightGrams ELSE 0 END), SUM(CASE WHEN Owed THEN Cost ELSE 0 END) FROM PrintLog WHERE UserHashedId IS NOT NULL GROUP BY UserHashedId")
+            connection.commit()
+        finally:
+            connection.close()
+
+
+class BenchmarkServices:
+    """
+    Creates the services to benchmark.
+    """
+    def __init__(self, deployObject, serviceNames, workingDirectory):
+        self.deployObject = deployObject
+        self.serviceNames = serviceNames
+        self.workingDirectory = workingDirectory
+        self.ports = dict((serviceName, getUnusedPort()) for serviceName in serviceNames)
+        self.processes = {}
+
+    """
+    Returns the directory the services are built to for benchmarking. This is
+    separate from the deployed builds so that benchmarking doesn't replace them.
+    """
+    def getBuildDirectory(self, serviceName):
+        return os.path.realpath(self.deployObject.projectRootDirectory + "/bin/.benchmark/" + serviceName)
+
+    """
+    Builds the services if their sources changed since they were last built.
+    """
+    def build(self):
+        for serviceName in self.serviceNames:
+            buildDirectory = self.getBuildDirectory(serviceName)
+            sourceHash = ProjectHash.getProjectHash(self.deployObject.projectRootDirectory, serviceName)
+            if self.deployObject.getBuildInformation(buildDirectory).get("sources") == sourceHash:
+                print("Using existing benchmark build of " + serviceName + " (unchanged)")
+                continue
+            print("Building " + serviceName)
+            self.deployObject.publish(serviceName, buildDirectory)
+            self.deployObject.setBuildInformation(buildDirectory, {"sources": sourceHash})
+
+    """
+    Writes the configuration used by the services.
+    """
+    def writeConfiguration(self, databaseLocation):
+        configuration = {
+            "Database": {
+                "Provider": "sqlite",
+                "Source": databaseLocation,
+            },
+            "Logging": {
+                "ConsoleLevel": "Warning",
+            },
+            "PrintReceipt": {
+                "Provider": "Local",
+            },
+            "Ports": dict((serviceName.split(".")[-1], port) for serviceName, port in self.ports.items()),
+        }
+        with open(os.path.join(self.workingDirectory, "configuration.json"), "w") as file:
+            json.dump(configuration, file, indent=4)
+
+    """
+    Returns the url of a service.
+    """
+    def getUrl(self, serviceName):
+        return "http://127.0.0.1:" + str(self.ports[serviceName])
+
+    """
+    Starts a service and waits for it to be ready. The services run in the
+    working directory so that they use the benchmark configuration.
+    """
+    def start(self, serviceName, timeout=60):
+        # Start the service.
+        executable = os.path.realpath(self.getBuildDirectory(serviceName) + "/" + serviceName)
+        if os.path.exists(executable + ".exe"):
+            executable += ".exe"
+        logFile = open(os.path.join(self.workingDirectory, serviceName + ".log"), "w")
+        process = subprocess.Popen([executable], cwd=self.workingDirectory, stdout=logFile, stderr=subprocess.STDOUT)
+        self.processes[serviceName] = process
+
+        # Wait for the service to be ready.
+        readyUrl = self.getUrl(serviceName) + "/ready"
+        startTime = time.time()
+        while time.time() - startTime < timeout:
+            if process.poll() is not None:
+                break
+            try:
+                with socket.create_connection(("127.0.0.1", self.ports[serviceName]), timeout=1) as connection:
+                    connection.sendall(("GET /ready HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n").encode())
+                    if connection.recv(12).endswith(b"200"):
+                        return
+            except OSError:
+                pass
+            time.sleep(0.25)
+
+        # Show the log if the service didn't start.
+        with open(os.path.join(self.workingDirectory, serviceName + ".log")) as file:
+            print(file.read()[-4000:])
+        raise AssertionError(serviceName + " did not become ready at " + readyUrl)
+
+    """
+    Returns the memory used by each service.
+    """
+    def getRss(self):
+        rss = {}
+        for serviceName, process in self.processes.items():
+            try:
+                rss[serviceName] = psutil.Process(process.pid).memory_info().rss
+            except psutil.Error:
+                pass
+        return rss
+
+    """
+    Stops the services.
+    """
+    def stop(self):
+        for process in self.processes.values():
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+class BenchmarkClient:
+    """
+    Creates the benchmark client.
+    """
+    def __init__(self, urls, users, mix, seed):
+        self.urls = urls
+        self.users = users
+        self.mix = mix
+        self.random = random.Random(seed)
+        self.session = None
+        self.latencies = dict((requestType, []) for requestType in mix.keys())
+        self.errors = dict((requestType, 0) for requestType in mix.keys())
+
+    """
+    Returns the hashed id of a random generated user.
+    """
+    def getRandomHashedId(self):
+        return getHashedId(self.random.randrange(0, max(1, self.users)))
+
+    """
+    Sends a request of the given type. Returns if the request was successful.
+    """
+    async def sendRequest(self, httpSession, requestType):
+        baseUrl = self.urls[requestType]
+        if requestType == "swipe":
+            response = await httpSession.post(baseUrl + "/swipe/add", json={"hashedId": self.getRandomHashedId(), "source": "Benchmark"})
+        elif requestType == "print-add":
+            response = await httpSession.post(baseUrl + "/print/add", json={
+                "hashedId": self.getRandomHashedId(),
+                "fileName": "benchmark.gcode",
+                "material": "Material " + str(self.random.randrange(0, 10)),
+                "weight": round(self.random.uniform(1, 100), 2),
+                "purpose": "Benchmark",
+                "owed": self.random.random() < 0.3,
+            })
+        elif requestType == "print-last":
+            response = await httpSession.get(baseUrl + "/print/last", params={"hashedId": self.getRandomHashedId()})
+        elif requestType == "admin-search":
+            view, pageSize = self.random.choice([("prints", 20), ("users", 20), ("visits", 50)])
+            parameters = {
+                "session": self.session,
+                "max" + view: pageSize,
+                "offset" + view: pageSize * self.random.randrange(0, 5),
+                "order": ("name" if view == "users" else "time"),
+                "ascending": "false",
+                "search": self.random.choice(["", "", "", "user1", "gcode"]),
+            }
+            response = await httpSession.get(baseUrl + "/admin/" + view, params=parameters)
+        else:
+            response = await httpSession.get(baseUrl + "/admin/csvs", params={"session": self.session})
+
+        # Read the response and return if it was successful.
+        # Prints not existing for users is expected.
+        async with response:
+            await response.read()
+            return response.status < 400 or (requestType == "print-last" and response.status == 404)
+
+    """
+    Sends requests until the end time and records the latencies.
+    """
+    async def runWorker(self, httpSession, endTime, record):
+        requestTypes = list(self.mix.keys())
+        weights = list(self.mix.values())
+        while time.time() < endTime:
+            requestType = self.random.choices(requestTypes, weights)[0]
+            requestStartTime = time.perf_counter()
+            try:
+                successful = await self.sendRequest(httpSession, requestType)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                successful = False
+            if not record:
+                continue
+            self.latencies[requestType].append((time.perf_counter() - requestStartTime) * 1000)
+            if not successful:
+                self.errors[requestType] += 1
+
+    """
+    Runs the benchmark with the given amount of concurrent requests.
+    Returns the time that the requests were recorded for.
+    """
+    async def run(self, concurrency, duration, warmup):
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as httpSession:
+            # Create the admin session if admin requests are sent.
+            adminRequestTypes = [requestType for requestType in self.mix.keys() if requestServices[requestType] == "Construct.Admin"]
+            if len(adminRequestTypes) > 0:
+                async with httpSession.get(self.urls[adminRequestTypes[0]] + "/admin/authenticate", params={"hashedId": adminHashedId}) as response:
+                    self.session = (await response.json())["session"]
+
+            # Warm up the services without recording the requests.
+            if warmup > 0:
+                await asyncio.gather(*[self.runWorker(httpSession, time.time() + warmup, False) for _ in range(0, concurrency)])
+
+            # Send the recorded requests.
+            startTime = time.time()
+            await asyncio.gather(*[self.runWorker(httpSession, startTime + duration, True) for _ in range(0, concurrency)])
+            return time.time() - startTime
+
+
+"""
+Returns the commit of the repository, or None if it can't be read.
+"""
+def getCommit(projectRootDirectory):
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=projectRootDirectory, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+"""
+Prints the differences between the results and previous results.
+"""
+def printComparison(results, previousResults):
+    print("Compared to " + str(previousResults.get("commit")) + ":")
+    previousScenarios = previousResults.get("requests", {})
+    for requestType, scenario in list(results["requests"].items()) + [("total", results["total"])]:
+        previousScenario = (previousResults.get("total") if requestType == "total" else previousScenarios.get(requestType))
+        if previousScenario is None:
+            continue
+        differences = []
+        for name in ["p50", "p95", "p99"]:
+            if name in scenario["latencyMs"].keys() and name in previousScenario.get("latencyMs", {}).keys():
+                differences.append(name + " " + str(previousScenario["latencyMs"][name]) + " -> " + str(scenario["latencyMs"][name]) + " ms")
+        differences.append("rps " + str(previousScenario.get("requestsPerSecond")) + " -> " + str(scenario["requestsPerSecond"]))
+        print("\t" + requestType + ": " + ", ".join(differences))
+
+
+# Run the program.
+if __name__ == '__main__':
+    # Get the services and options.
+    deployObject = BaseDeploy()
+    serviceNames = deployObject.getServicesFromCLI()
+    users = int(deployObject.getOptionFromCLI("users", 1000))
+    prints = int(deployObject.getOptionFromCLI("prints", 20000))
+    visits = int(deployObject.getOptionFromCLI("visits", 50000))
+    duration = float(deployObject.getOptionFromCLI("duration", 30))
+    warmup = float(deployObject.getOptionFromCLI("warmup", 5))
+    concurrency = int(deployObject.getOptionFromCLI("concurrency", 16))
+    seed = int(deployObject.getOptionFromCLI("seed", 0))
+    outputLocation = deployObject.getOptionFromCLI("output")
+    compareLocation = deployObject.getOptionFromCLI("compare")
+
+    # Determine the services that handle the requests.
+    mix = parseMix(deployObject.getOptionFromCLI("mix", "default"))
+    mixServices = {}
+    for requestType in list(mix.keys()):
+        serviceName = ("Construct.Combined" if "Construct.Combined" in serviceNames else requestServices[requestType])
+        if serviceName not in serviceNames:
+            print("Skipping " + requestType + " requests since " + requestServices[requestType] + " is not being benchmarked.")
+            del mix[requestType]
+            continue
+        mixServices[requestType] = serviceName
+    if len(mix) == 0:
+        print("No requests in the mix are handled by the services.")
+        exit(-1)
+
+    # Build the services.
+    with tempfile.TemporaryDirectory() as workingDirectory:
+        try:
+            benchmarkServices = BenchmarkServices(deployObject, serviceNames, workingDirectory)
+            benchmarkServices.build()
+            databaseLocation = os.path.join(workingDirectory, "benchmark.sqlite")
+            benchmarkServices.writeConfiguration(databaseLocation)
+
+            # Start the first service to create the database, then add the data and start the other services.
+            print("Starting " + serviceNames[0])
+            benchmarkServices.start(serviceNames[0])
+            print("Generating " + str(users) + " users, " + str(prints) + " prints, and " + str(visits) + " visits.")
+            BenchmarkDatabase(databaseLocation, users, prints, visits, seed).populate()
+            for serviceName in serviceNames[1:]:
+                print("Starting " + serviceName)
+                benchmarkServices.start(serviceName)
+
+            # Run the requests and measure the memory of the services.
+            print("Sending requests for " + str(duration) + " seconds (" + str(concurrency) + " at once).")
+            client = BenchmarkClient(dict((requestType, benchmarkServices.getUrl(serviceName)) for requestType, serviceName in mixServices.items()), users, mix, seed)
+            peakRss = benchmarkServices.getRss()
+            async def measureRss(task):
+                while not task.done():
+                    for serviceName, rss in benchmarkServices.getRss().items():
+                        peakRss[serviceName] = max(rss, peakRss.get(serviceName, 0))
+                    await asyncio.sleep(0.5)
+            async def runBenchmark():
+                benchmarkTask = asyncio.ensure_future(client.run(concurrency, duration, warmup))
+                await asyncio.gather(benchmarkTask, measureRss(benchmarkTask))
+                return benchmarkTask.result()
+            elapsedTime = asyncio.run(runBenchmark())
+            endRss = benchmarkServices.getRss()
+        finally:
+            if "benchmarkServices" in locals():
+                benchmarkServices.stop()
+
+    # Create the results.
+    allLatencies = [latency for latencies in client.latencies.values() for latency in latencies]
+    results = {
+        "commit": getCommit(deployObject.projectRootDirectory),
+        "time": datetime.datetime.now().isoformat(),
+        "services": serviceNames,
+        "options": {
+            "users": users,
+            "prints": prints,
+            "visits": visits,
+            "durationSeconds": duration,
+            "warmupSeconds": warmup,
+            "concurrency": concurrency,
+            "seed": seed,
+            "mix": mix,
+        },
+        "requests": dict((requestType, {
+            "requests": len(latencies),
+            "errors": client.errors[requestType],
+            "requestsPerSecond": round(len(latencies) / elapsedTime, 3),
+            "latencyMs": summarizeLatencies(latencies),
+        }) for requestType, latencies in client.latencies.items()),
+        "total": {
+            "requests": len(allLatencies),
+            "errors": sum(client.errors.values()),
+            "requestsPerSecond": round(len(allLatencies) / elapsedTime, 3),
+            "latencyMs": summarizeLatencies(allLatencies),
+        },
+        "rss": dict((serviceName, {
+            "peakBytes": peakRss.get(serviceName),
+            "endBytes": endRss.get(serviceName),
+        }) for serviceName in serviceNames),
+    }
+
+    # Output the results.
+    resultsJson = json.dumps(results, indent=4)
+    if outputLocation is not None:
+        with open(outputLocation, "w") as file:
+            file.write(resultsJson)
+        print("Results written to " + outputLocation)
+    else:
+        print(resultsJson)
+    if compareLocation is not None:
+        with open(compareLocation) as file:
+            printComparison(results, json.load(file))
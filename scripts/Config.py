@@ -48,4 +48,4 @@ if __name__ == '__main__':
     else:
         opener = "open" if sys.platform == "darwin" else "xdg-open"
         subprocess.call([opener, configurationLocation])
-    print("NOTE: Changes to the configuration will not take effect without re-deploying.")
\ No newline at end of file
+    print("NOTE: Changes to the configuration will not take effect until Setup.py reload or Setup.py deploy is ran.")
\ No newline at end of file
@@ -6,6 +6,7 @@ Helper script for deploying services.
 
 from DeployImplementations import AutoDeploy
 from DeployImplementations import BaseDeploy
+from DeployImplementations.TestRunner import TestRunner
 
 
 # Run the program.
@@ -22,17 +23,50 @@ if __name__ == '__main__':
                 if project not in projectsToTest:
                     projectsToTest.append(project)
 
-    # Verify the services.
-    for project in projectsToTest:
-        try:
-            print("Verifying " + project)
-            deployObject.verify(project)
-        except AssertionError:
-            print("Verification failed for " + project)
-            print("The output above should should the tests that failed. A deployment may not be safe.")
+    # Get the workers to verify and build with.
+    workers = deployObject.getOptionFromCLI("workers")
+    if workers is not None:
+        if workers is True or not workers.isdigit() or int(workers) < 1:
+            print("Invalid workers specified: " + str(workers))
+            print("\tWorkers must be a positive integer, like --workers=4")
             exit(-1)
+        workers = int(workers)
+
+    # Verify the services.
+    testRunner = TestRunner(deployObject.projectRootDirectory, workers=workers, force=deployObject.getOptionFromCLI("force", False))
+    failedProjects = testRunner.verify(projectsToTest)
+    testRunner.printSummary()
+    if len(failedProjects) > 0:
+        print("Verification failed for " + ", ".join(failedProjects))
+        print("The output above should show the tests that failed. A deployment may not be safe.")
+        exit(-1)
     print("Verified services.")
 
+    # Deploy the services as new releases if blue/green deployments were requested.
+    if deployObject.getOptionFromCLI("blue-green", False):
+        if not hasattr(deployObject, "deployBlueGreen"):
+            print("Blue/green deployments are not supported on this platform.")
+            exit(-1)
+        deployedServices = []
+        for service in servicesToDeploy:
+            print("Deploying " + service + " (blue/green)")
+            if not deployObject.deployBlueGreen(service):
+                # Roll back the services that were already deployed so that all the services run the same release.
+                print("Deploying " + service + " failed.")
+                for deployedService in reversed(deployedServices):
+                    print("Rolling back " + deployedService)
+                    deployObject.rollback(deployedService)
+                exit(-1)
+            deployedServices.append(service)
+        exit(0)
+
+    # Build the services that changed while the existing services are running.
+    try:
+        deployObject.prepareBuilds(servicesToDeploy, workers=workers)
+    except AssertionError:
+        print("Building the services failed. No services were stopped.")
+        exit(-1)
+
     # Deploy the services.
     for service in servicesToDeploy:
         print("Deploying " + service)
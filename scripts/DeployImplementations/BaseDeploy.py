@@ -4,10 +4,13 @@ Zachary Cook
 Base deploy script used for the system.
 """
 
+import json
 import os
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from . import ProjectHash
 
 
 serviceOptions = {
@@ -27,6 +30,14 @@ requiredTests = {
     "Construct.Print": ["Construct.Core.Test","Construct.Print.Test"],
     "Construct.Compatibility": ["Construct.Core.Test","Construct.Compatibility.Test"],
 }
+defaultPorts = {
+    "Combined": 8000,
+    "User": 8001,
+    "Swipe": 8002,
+    "Admin": 8003,
+    "Print": 8004,
+    "Compatibility": 8005,
+}
 
 
 class BaseDeploy:
@@ -35,6 +46,7 @@ class BaseDeploy:
     """
     def __init__(self):
         self.projectRootDirectory = os.path.realpath(__file__ + "/../../../")
+        self.forceBuild = self.getOptionFromCLI("force", False)
 
     """
     Returns the output directory for a service.
@@ -42,6 +54,78 @@ class BaseDeploy:
     def getOutputDirectory(self, serviceName):
         return os.path.realpath(self.projectRootDirectory + "/bin/" + serviceName)
 
+    """
+    Returns the directory containing the versioned releases of a service.
+    """
+    def getReleasesDirectory(self, serviceName):
+        return os.path.realpath(self.projectRootDirectory + "/bin/releases/" + serviceName)
+
+    """
+    Returns the link to the current release of a service.
+    """
+    def getCurrentReleaseLink(self, serviceName):
+        return os.path.join(self.getReleasesDirectory(serviceName), "current")
+
+    """
+    Returns the directory to run a service from. This is the current
+    release if one was deployed, or the output directory otherwise.
+    """
+    def getRunDirectory(self, serviceName):
+        currentReleaseLink = self.getCurrentReleaseLink(serviceName)
+        if os.path.islink(currentReleaseLink) and os.path.exists(currentReleaseLink):
+            return os.path.realpath(currentReleaseLink)
+        return self.getOutputDirectory(serviceName)
+
+    """
+    Returns the port of a service from a configuration file.
+    """
+    def getPort(self, serviceName, configurationPath=None):
+        portName = serviceName.split(".")[-1]
+        if configurationPath is not None and os.path.exists(configurationPath):
+            with open(configurationPath) as file:
+                ports = json.load(file).get("Ports", {})
+            if portName in ports.keys():
+                return ports[portName]
+        return defaultPorts[portName]
+
+    """
+    Returns the directory services are published to before replacing
+    the output directory.
+    """
+    def getStagingDirectory(self, serviceName):
+        return os.path.realpath(self.projectRootDirectory + "/bin/.staging/" + serviceName)
+
+    """
+    Returns the build information stored with the output of a service.
+    Returns an empty dictionary if there is none.
+    """
+    def getBuildInformation(self, outputDirectory):
+        buildInformationLocation = os.path.join(outputDirectory, ".build.json")
+        if not os.path.exists(buildInformationLocation):
+            return {}
+        try:
+            with open(buildInformationLocation) as file:
+                return json.load(file)
+        except ValueError:
+            return {}
+
+    """
+    Stores the build information with the output of a service.
+    """
+    def setBuildInformation(self, outputDirectory, buildInformation):
+        with open(os.path.join(outputDirectory, ".build.json"), "w") as file:
+            json.dump(buildInformation, file, indent=4)
+
+    """
+    Returns if the output of a service was built from the current sources.
+    """
+    def isBuildCurrent(self, serviceName, sourceHash=None):
+        if self.forceBuild:
+            return False
+        if sourceHash is None:
+            sourceHash = ProjectHash.getProjectHash(self.projectRootDirectory, serviceName)
+        return self.getBuildInformation(self.getOutputDirectory(serviceName)).get("sources") == sourceHash
+
     """
     Finds the configuration file and returns the path. Returns
     if none exists.
@@ -64,20 +148,6 @@ class BaseDeploy:
         # Return None (not found).
         return None
 
-    """
-    Verifies a project for deployment, such as running unit tests.
-    An exception will be thrown if the verification fails.
-    """
-    def verify(self, projectName):
-        # Run the tests for the project.
-        projectTestDirectory = os.path.realpath(self.projectRootDirectory + "/" + projectName)
-        testProcess = subprocess.Popen(["dotnet", "test"], cwd=projectTestDirectory)
-
-        # Throw an exception if the tests fail.
-        unitTestsExitCode = testProcess.wait()
-        if unitTestsExitCode != 0:
-            raise AssertionError("Unit tests returned a non-zero exit code: " + str(unitTestsExitCode))
-
     """
     Stops an existing app and deploys the new version.
     """
@@ -91,13 +161,25 @@ class BaseDeploy:
         # Start the service.
         self.start(serviceName)
 
+    """
+    Returns the value of an option from the CLI arguments, like
+    --workers=4. Options without a value return True.
+    """
+    def getOptionFromCLI(self, optionName, default=None):
+        for argument in sys.argv[1:]:
+            if argument == "--" + optionName:
+                return True
+            if argument.startswith("--" + optionName + "="):
+                return argument[len(optionName) + 3:]
+        return default
+
     """
     Returns the services to deploy from the CLI arguments.
     """
     def getServicesFromCLI(self):
         # Get the services to deploy.
-        services = sys.argv[1:]
-        if len(sys.argv) <= 1:
+        services = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+        if len(services) == 0:
             print("No services were specified. One or multiple options must be specified.")
             print("\tValid services: " + ",".join(serviceOptions.keys()))
             services = input("Enter the services to deploy:\n").split(" ")
@@ -136,30 +218,124 @@ class BaseDeploy:
         return servicesToDeploy
 
     """
-    Builds a service.
+    Publishes a service to a directory. Referenced projects are not built
+    if buildReferences is False, which allows services to be published
+    at the same time.
     """
-    def build(self, serviceName):
-        # Build the new service.
-        print("Building " + serviceName)
+    def publish(self, serviceName, outputDirectory, buildReferences=True):
         projectDirectory = os.path.realpath(self.projectRootDirectory + "/" + serviceName)
-        outputDirectory = self.getOutputDirectory(serviceName)
         if os.path.exists(outputDirectory):
             shutil.rmtree(outputDirectory)
-        buildProcess = subprocess.Popen(["dotnet", "publish", "--output", outputDirectory], cwd=projectDirectory)
+        publishArguments = ["dotnet", "publish", "--output", outputDirectory]
+        if not buildReferences:
+            publishArguments.append("-p:BuildProjectReferences=false")
+        buildProcess = subprocess.Popen(publishArguments, cwd=projectDirectory)
         buildExitCode = buildProcess.wait()
         if buildExitCode != 0:
             raise AssertionError("Build returned a non-zero exit code: " + str(buildExitCode))
 
-        # Delete the configuration. May be from a previous build.
-        newConfiguration = os.path.realpath(outputDirectory + "/configuration.json")
-        if os.path.exists(newConfiguration):
-            os.remove(newConfiguration)
+    """
+    Publishes the services that changed since they were last built to the
+    staging directories without stopping them. Shared referenced projects are
+    built once, then the services are published at the same time. The
+    staged services replace the existing outputs when they are built.
+    """
+    def prepareBuilds(self, serviceNames, workers=None):
+        # Determine the services that changed.
+        servicesToBuild = []
+        for serviceName in serviceNames:
+            sourceHash = ProjectHash.getProjectHash(self.projectRootDirectory, serviceName)
+            if self.isBuildCurrent(serviceName, sourceHash):
+                print("Using existing build of " + serviceName + " (unchanged)")
+            else:
+                servicesToBuild.append((serviceName, sourceHash))
+        if len(servicesToBuild) == 0:
+            return
+
+        # Build the referenced projects once.
+        references = []
+        for serviceName, _ in servicesToBuild:
+            for reference in ProjectHash.getReferences(self.projectRootDirectory, serviceName):
+                if reference not in references:
+                    references.append(reference)
+        for reference in references:
+            print("Building " + reference)
+            buildProcess = subprocess.Popen(["dotnet", "build"], cwd=os.path.realpath(self.projectRootDirectory + "/" + reference))
+            buildExitCode = buildProcess.wait()
+            if buildExitCode != 0:
+                raise AssertionError("Build returned a non-zero exit code: " + str(buildExitCode))
+
+        # Publish the services at the same time.
+        def publishStaged(serviceBuild):
+            serviceName, sourceHash = serviceBuild
+            print("Building " + serviceName)
+            stagingDirectory = self.getStagingDirectory(serviceName)
+            self.publish(serviceName, stagingDirectory, buildReferences=False)
+            self.setBuildInformation(stagingDirectory, {"sources": sourceHash})
+        with ThreadPoolExecutor(max_workers=(workers or min(4, os.cpu_count() or 1))) as executor:
+            for _ in executor.map(publishStaged, servicesToBuild):
+                pass
 
-        # Copy the configuration file.
+    """
+    Builds a service. The build is skipped if the service was built from
+    the same sources before, and a staged build is used if one exists.
+    """
+    def build(self, serviceName):
+        # Remove the staged build if the sources changed after it was built.
+        outputDirectory = self.getOutputDirectory(serviceName)
+        stagingDirectory = self.getStagingDirectory(serviceName)
+        sourceHash = ProjectHash.getProjectHash(self.projectRootDirectory, serviceName)
+        if os.path.exists(stagingDirectory) and self.getBuildInformation(stagingDirectory).get("sources") != sourceHash:
+            shutil.rmtree(stagingDirectory)
+
+        if os.path.exists(stagingDirectory):
+            # Replace the output with the staged build.
+            print("Using staged build of " + serviceName)
+            if os.path.exists(outputDirectory):
+                shutil.rmtree(outputDirectory)
+            os.replace(stagingDirectory, outputDirectory)
+        else:
+            # Build the new service if the sources changed.
+            if self.isBuildCurrent(serviceName, sourceHash):
+                print("Using existing build of " + serviceName + " (unchanged)")
+            else:
+                print("Building " + serviceName)
+                self.publish(serviceName, outputDirectory)
+                self.setBuildInformation(outputDirectory, {"sources": sourceHash})
+
+        # Copy the configuration file if it changed.
+        self.copyConfiguration(outputDirectory)
+
+        # Remove the current release so that the new output is run.
+        currentReleaseLink = self.getCurrentReleaseLink(serviceName)
+        if os.path.islink(currentReleaseLink):
+            print("Removing current release link of " + serviceName + ". The existing releases are kept.")
+            os.remove(currentReleaseLink)
+
+    """
+    Copies the configuration file to the output of a service. The file is
+    replaced in one step so running services never read a partial file.
+    Returns if the configuration was copied.
+    """
+    def copyConfiguration(self, outputDirectory):
+        # Return if the configuration is the same as the last copy.
+        newConfiguration = os.path.realpath(outputDirectory + "/configuration.json")
         configurationPath = self.findConfiguration()
+        buildInformation = self.getBuildInformation(outputDirectory)
+        configurationHash = ProjectHash.getFileHash(configurationPath)
+        if os.path.exists(newConfiguration) == (configurationHash is not None) and buildInformation.get("configuration") == configurationHash:
+            return False
+
+        # Copy the configuration file, or delete the configuration from a previous build.
         if configurationPath is not None:
             print("Copying configuration file.")
-            shutil.copy(configurationPath, newConfiguration)
+            shutil.copy(configurationPath, newConfiguration + ".tmp")
+            os.replace(newConfiguration + ".tmp", newConfiguration)
+        elif os.path.exists(newConfiguration):
+            os.remove(newConfiguration)
+        buildInformation["configuration"] = configurationHash
+        self.setBuildInformation(outputDirectory, buildInformation)
+        return True
 
     """
     Stops a service.
@@ -1,14 +1,13 @@
 """
 Zachary Cook
 
-Deploys services as Processes. Only intended for local
-testing as there is no auto-restarts.
+Deploys services as Processes. Each service is run by a supervisor
+process that restarts it if it crashes and writes its output to
+rotating logs in bin/.supervisor/logs.
 """
 
-import os
-import psutil
-import subprocess
 from .BaseDeploy import BaseDeploy
+from .Supervisor import Supervisor
 
 
 class ProcessDeploy(BaseDeploy):
@@ -16,21 +15,14 @@ class ProcessDeploy(BaseDeploy):
     Stops a service.
     """
     def stop(self, serviceName):
-        for process in psutil.process_iter():
-            if process.name().lower() == serviceName.lower() or process.name().lower() == serviceName.lower() + ".exe":
-                print("Stopping " + process.name())
-                process.kill()
-                process.wait()
-                print("Stopped " + process.name())
+        print("Stopping " + serviceName)
+        if Supervisor.stopService(self.projectRootDirectory, serviceName):
+            print("Stopped " + serviceName)
 
     """
     Starts a service.
     """
     def start(self, serviceName):
         print("Starting " + serviceName)
-        outputDirectory = self.getOutputDirectory(serviceName)
-        executable = os.path.realpath(outputDirectory + "/" + serviceName)
-        if os.path.exists(executable + ".exe"):
-            executable += ".exe"
-        subprocess.Popen([executable], cwd=outputDirectory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        print("Started " + serviceName)
\ No newline at end of file
+        Supervisor.startDetached(self.projectRootDirectory, serviceName)
+        print("Started " + serviceName)
@@ -0,0 +1,112 @@
+"""
+Zachary Cook
+
+Helper for hashing the sources of projects and their references.
+Used for skipping work when nothing in a project changed.
+"""
+
+import hashlib
+import os
+import xml.etree.ElementTree
+
+
+ignoredDirectories = ["bin", "obj", "TestResults", ".idea", ".vs"]
+
+
+"""
+Returns the project names directly referenced by a project.
+"""
+def getDirectReferences(projectRootDirectory, projectName):
+    # Return an empty list if the project file doesn't exist.
+    projectFile = os.path.join(projectRootDirectory, projectName, projectName + ".csproj")
+    if not os.path.exists(projectFile):
+        return []
+
+    # Read the project references.
+    references = []
+    for element in xml.etree.ElementTree.parse(projectFile).getroot().iter("ProjectReference"):
+        includePath = element.get("Include")
+        if includePath is None:
+            continue
+        referenceName = os.path.splitext(os.path.basename(includePath.replace("\\", "/")))[0]
+        if referenceName not in references:
+            references.append(referenceName)
+    return references
+
+"""
+Returns the project names referenced by a project, including the
+references of the references.
+"""
+def getReferences(projectRootDirectory, projectName):
+    references = []
+    remainingProjects = [projectName]
+    while len(remainingProjects) > 0:
+        for reference in getDirectReferences(projectRootDirectory, remainingProjects.pop()):
+            if reference not in references and reference != projectName:
+                references.append(reference)
+                remainingProjects.append(reference)
+    return sorted(references)
+
+"""
+Returns the directories outside of the project that are included
+as content (like the web directory).
+"""
+def getContentDirectories(projectRootDirectory, projectName):
+    # Return an empty list if the project file doesn't exist.
+    projectDirectory = os.path.join(projectRootDirectory, projectName)
+    projectFile = os.path.join(projectDirectory, projectName + ".csproj")
+    if not os.path.exists(projectFile):
+        return []
+
+    # Read the content directories outside of the project.
+    contentDirectories = []
+    for element in xml.etree.ElementTree.parse(projectFile).getroot().iter("Content"):
+        includePath = element.get("Include")
+        if includePath is None or not includePath.startswith(".."):
+            continue
+        includeDirectory = includePath.replace("\\", "/").split("*")[0]
+        contentDirectory = os.path.realpath(os.path.join(projectDirectory, includeDirectory))
+        if os.path.isdir(contentDirectory) and contentDirectory not in contentDirectories:
+            contentDirectories.append(contentDirectory)
+    return contentDirectories
+
+"""
+Adds the files of a directory to a hash.
+"""
+def hashDirectory(hash, directory):
+    for parentDirectory, directories, files in os.walk(directory):
+        # Ignore the build directories.
+        directories[:] = sorted(directory for directory in directories if directory not in ignoredDirectories)
+
+        # Add the relative path and contents of the files.
+        for fileName in sorted(files):
+            filePath = os.path.join(parentDirectory, fileName)
+            hash.update(os.path.relpath(filePath, directory).replace("\\", "/").encode("utf8"))
+            with open(filePath, "rb") as file:
+                for block in iter(lambda: file.read(65536), b""):
+                    hash.update(block)
+
+"""
+Returns the hash of the sources of a project, the sources of the
+projects it references, and the content it includes.
+"""
+def getProjectHash(projectRootDirectory, projectName):
+    hash = hashlib.sha256()
+    for name in [projectName] + getReferences(projectRootDirectory, projectName):
+        hash.update(name.encode("utf8"))
+        hashDirectory(hash, os.path.join(projectRootDirectory, name))
+        for contentDirectory in getContentDirectories(projectRootDirectory, name):
+            hashDirectory(hash, contentDirectory)
+    return hash.hexdigest()
+
+"""
+Returns the hash of a single file. Returns None if the file doesn't exist.
+"""
+def getFileHash(filePath):
+    if filePath is None or not os.path.exists(filePath):
+        return None
+    hash = hashlib.sha256()
+    with open(filePath, "rb") as file:
+        for block in iter(lambda: file.read(65536), b""):
+            hash.update(block)
+    return hash.hexdigest()
@@ -0,0 +1,389 @@
+"""
+Zachary Cook
+
+Supervises services as processes. Crashed services are restarted with a
+delay that grows while they keep crashing, their output is written to
+rotating logs, and their state is written to files in bin/.supervisor
+so that they can be stopped and checked without scanning the processes
+of the system.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import psutil
+
+
+"""
+Delay, in seconds, before restarting a service the first time it crashes.
+"""
+initialRestartDelay = 1
+
+"""
+Maximum delay, in seconds, before restarting a service that keeps crashing.
+"""
+maximumRestartDelay = 60
+
+"""
+Time, in seconds, a service must run before a crash is no longer considered part of a crash loop.
+"""
+stableRunTime = 60
+
+"""
+Time, in seconds, a service has to stop before it is killed.
+"""
+stopTimeout = 10
+
+"""
+Interval, in seconds, that the state files are written.
+"""
+statusInterval = 5
+
+
+"""
+Returns the directory of the supervisor files.
+"""
+def getSupervisorDirectory(projectRootDirectory):
+    return os.path.realpath(projectRootDirectory + "/bin/.supervisor")
+
+"""
+Returns the file containing the PID of a service.
+"""
+def getPidFile(projectRootDirectory, serviceName):
+    return os.path.join(getSupervisorDirectory(projectRootDirectory), serviceName + ".pid")
+
+"""
+Returns the file containing the state of a service.
+"""
+def getStatusFile(projectRootDirectory, serviceName):
+    return os.path.join(getSupervisorDirectory(projectRootDirectory), serviceName + ".json")
+
+"""
+Returns the file that requests a service to stop.
+"""
+def getStopFile(projectRootDirectory, serviceName):
+    return os.path.join(getSupervisorDirectory(projectRootDirectory), serviceName + ".stop")
+
+"""
+Returns the log file of a service.
+"""
+def getLogFile(projectRootDirectory, serviceName):
+    return os.path.join(getSupervisorDirectory(projectRootDirectory), "logs", serviceName + ".log")
+
+"""
+Returns if a process is running.
+"""
+def isProcessRunning(pid):
+    try:
+        return pid is not None and psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
+
+"""
+Returns the memory (RSS) of a process in bytes, or None if it can't be read.
+"""
+def getProcessRss(pid):
+    try:
+        return psutil.Process(pid).memory_info().rss
+    except psutil.Error:
+        return None
+
+"""
+Reads the state of a service, or None if it isn't supervised.
+"""
+def readStatus(projectRootDirectory, serviceName):
+    statusFile = getStatusFile(projectRootDirectory, serviceName)
+    if not os.path.exists(statusFile):
+        return None
+    try:
+        with open(statusFile) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+"""
+Returns if a process is a service by its name.
+"""
+def isServiceProcess(process, serviceName):
+    return process.name().lower() in [serviceName.lower(), serviceName.lower() + ".exe"]
+
+"""
+Kills the processes of a service that aren't supervised, like the ones started
+before the services were supervised. Returns if any process was killed.
+"""
+def killUnsupervisedProcesses(serviceName):
+    killed = False
+    for process in psutil.process_iter():
+        try:
+            if isServiceProcess(process, serviceName):
+                print("Stopping unsupervised process " + str(process.pid) + " of " + serviceName)
+                process.kill()
+                process.wait()
+                killed = True
+        except psutil.Error:
+            pass
+    return killed
+
+"""
+Removes a file if it exists.
+"""
+def removeFile(fileName):
+    try:
+        os.remove(fileName)
+    except FileNotFoundError:
+        pass
+
+
+class SupervisedService:
+    """
+    Creates the supervised service.
+    """
+    def __init__(self, supervisor, serviceName):
+        self.supervisor = supervisor
+        self.serviceName = serviceName
+        self.process = None
+        self.outputThread = None
+        self.startTime = None
+        self.restarts = 0
+        self.lastExitCode = None
+        self.restartDelay = initialRestartDelay
+        self.nextStartTime = time.time()
+        self.stopped = False
+
+        # Create the rotating log.
+        logFile = getLogFile(supervisor.projectRootDirectory, serviceName)
+        os.makedirs(os.path.dirname(logFile), exist_ok=True)
+        self.logger = logging.getLogger("supervisor." + serviceName)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(logFile, maxBytes=supervisor.logSize, backupCount=supervisor.logCount, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.handlers = [handler]
+
+    """
+    Writes a message from the supervisor to the log of the service.
+    """
+    def log(self, message):
+        message = "[Supervisor] " + time.strftime("%Y-%m-%d %H:%M:%S") + " " + self.serviceName + " " + message
+        print(message)
+        self.logger.info(message)
+
+    """
+    Writes the output of the process to the log until the process closes it.
+    """
+    def writeOutput(self, process):
+        for line in iter(process.stdout.readline, b""):
+            self.logger.info(line.decode("utf-8", errors="replace").rstrip("\r\n"))
+        process.stdout.close()
+
+    """
+    Starts the process of the service.
+    """
+    def start(self):
+        # Get the executable.
+        outputDirectory = self.supervisor.deployObject.getRunDirectory(self.serviceName)
+        executable = os.path.realpath(outputDirectory + "/" + self.serviceName)
+        if os.path.exists(executable + ".exe"):
+            executable += ".exe"
+
+        # Start the process and write the PID file.
+        self.log("starting" + (" (restart " + str(self.restarts) + ")" if self.restarts > 0 else ""))
+        self.process = subprocess.Popen([executable], cwd=outputDirectory, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        self.startTime = time.time()
+        with open(getPidFile(self.supervisor.projectRootDirectory, self.serviceName), "w") as file:
+            file.write(str(self.process.pid))
+        self.outputThread = threading.Thread(target=self.writeOutput, args=(self.process,), daemon=True)
+        self.outputThread.start()
+        self.writeStatus()
+
+    """
+    Stops the process of the service and removes the files of the service.
+    """
+    def stop(self):
+        # Stop the process, and kill it if it doesn't stop in time.
+        if self.process is not None and self.process.poll() is None:
+            self.log("stopping")
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=stopTimeout)
+            except subprocess.TimeoutExpired:
+                self.log("did not stop after " + str(stopTimeout) + " seconds and was killed")
+                self.process.kill()
+                self.process.wait()
+        if self.outputThread is not None:
+            self.outputThread.join(timeout=stopTimeout)
+
+        # Remove the files.
+        self.stopped = True
+        removeFile(getPidFile(self.supervisor.projectRootDirectory, self.serviceName))
+        removeFile(getStatusFile(self.supervisor.projectRootDirectory, self.serviceName))
+        removeFile(getStopFile(self.supervisor.projectRootDirectory, self.serviceName))
+        self.log("stopped")
+
+    """
+    Checks the process of the service. Crashed processes are restarted
+    after the restart delay, which doubles for each crash until the
+    service runs long enough to be considered stable.
+    """
+    def check(self):
+        # Stop the service if it was requested.
+        if os.path.exists(getStopFile(self.supervisor.projectRootDirectory, self.serviceName)):
+            self.stop()
+            return
+
+        # Schedule a restart if the process exited.
+        if self.process is not None and self.process.poll() is not None:
+            self.lastExitCode = self.process.returncode
+            if time.time() - self.startTime >= stableRunTime:
+                self.restartDelay = initialRestartDelay
+            self.log("exited with code " + str(self.lastExitCode) + ", restarting in " + str(self.restartDelay) + " seconds")
+            self.nextStartTime = time.time() + self.restartDelay
+            self.restartDelay = min(self.restartDelay * 2, maximumRestartDelay)
+            self.restarts += 1
+            self.process = None
+            removeFile(getPidFile(self.supervisor.projectRootDirectory, self.serviceName))
+            self.writeStatus()
+
+        # Start the process if it is time to.
+        if self.process is None and time.time() >= self.nextStartTime:
+            try:
+                self.start()
+            except OSError as error:
+                self.log("failed to start: " + str(error))
+                self.nextStartTime = time.time() + self.restartDelay
+                self.restartDelay = min(self.restartDelay * 2, maximumRestartDelay)
+
+    """
+    Writes the state of the service.
+    """
+    def writeStatus(self):
+        running = self.process is not None and self.process.poll() is None
+        status = {
+            "supervisorPid": os.getpid(),
+            "pid": self.process.pid if running else None,
+            "state": "running" if running else "restarting",
+            "startTime": self.startTime if running else None,
+            "restarts": self.restarts,
+            "lastExitCode": self.lastExitCode,
+            "nextStartTime": None if running else self.nextStartTime,
+            "logFile": getLogFile(self.supervisor.projectRootDirectory, self.serviceName),
+        }
+        statusFile = getStatusFile(self.supervisor.projectRootDirectory, self.serviceName)
+        with open(statusFile + ".tmp", "w") as file:
+            json.dump(status, file)
+        os.replace(statusFile + ".tmp", statusFile)
+
+
+class Supervisor:
+    """
+    Creates the supervisor.
+    """
+    def __init__(self, deployObject, logSize=10 * 1024 * 1024, logCount=5):
+        self.deployObject = deployObject
+        self.projectRootDirectory = deployObject.projectRootDirectory
+        self.logSize = logSize
+        self.logCount = logCount
+        self.services = []
+        self.stopRequested = False
+
+    """
+    Requests the supervisor to stop all the services.
+    """
+    def requestStop(self, signalNumber=None, frame=None):
+        self.stopRequested = True
+
+    """
+    Supervises services until they are all stopped.
+    """
+    def run(self, serviceNames):
+        # Stop the services if the supervisor is stopped.
+        signal.signal(signal.SIGINT, self.requestStop)
+        signal.signal(signal.SIGTERM, self.requestStop)
+
+        # Create the services.
+        os.makedirs(getSupervisorDirectory(self.projectRootDirectory), exist_ok=True)
+        for serviceName in serviceNames:
+            removeFile(getStopFile(self.projectRootDirectory, serviceName))
+            self.services.append(SupervisedService(self, serviceName))
+
+        # Check the services until they are all stopped.
+        lastStatusTime = 0
+        while not self.stopRequested:
+            runningServices = [service for service in self.services if not service.stopped]
+            if len(runningServices) == 0:
+                break
+            for service in runningServices:
+                service.check()
+            if time.time() - lastStatusTime >= statusInterval:
+                lastStatusTime = time.time()
+                for service in runningServices:
+                    if not service.stopped:
+                        service.writeStatus()
+            time.sleep(0.5)
+
+        # Stop the remaining services.
+        for service in self.services:
+            if not service.stopped:
+                service.stop()
+
+    """
+    Starts a supervisor for a service in the background.
+    """
+    @staticmethod
+    def startDetached(projectRootDirectory, serviceName):
+        scriptsDirectory = os.path.realpath(projectRootDirectory + "/scripts")
+        arguments = [sys.executable, os.path.join(scriptsDirectory, "Supervise.py"), serviceName]
+        if os.name == "nt":
+            subprocess.Popen(arguments, cwd=scriptsDirectory, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                             creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP)
+        else:
+            subprocess.Popen(arguments, cwd=scriptsDirectory, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+    """
+    Stops a supervised service. The supervisor is asked to stop the service,
+    and the service is killed by its PID file if the supervisor isn't running.
+    If the service has no state or PID file (like a service started before the
+    services were supervised), the processes with the name of the service are killed.
+    Returns if a service was stopped.
+    """
+    @staticmethod
+    def stopService(projectRootDirectory, serviceName, timeoutSeconds=stopTimeout * 2):
+        # Ask the supervisor to stop the service and wait for it to stop.
+        status = readStatus(projectRootDirectory, serviceName)
+        if status is not None and isProcessRunning(status["supervisorPid"]):
+            with open(getStopFile(projectRootDirectory, serviceName), "w"):
+                pass
+            endTime = time.time() + timeoutSeconds
+            while time.time() < endTime and os.path.exists(getStatusFile(projectRootDirectory, serviceName)):
+                time.sleep(0.25)
+            if not os.path.exists(getStatusFile(projectRootDirectory, serviceName)):
+                return True
+
+        # Kill the processes with the name of the service if it wasn't started by a supervisor.
+        pidFile = getPidFile(projectRootDirectory, serviceName)
+        if status is None and not os.path.exists(pidFile):
+            return killUnsupervisedProcesses(serviceName)
+
+        # Kill the service if the supervisor isn't running or didn't stop it.
+        stopped = False
+        if os.path.exists(pidFile):
+            try:
+                with open(pidFile) as file:
+                    pid = int(file.read().strip())
+                process = psutil.Process(pid)
+                if isServiceProcess(process, serviceName):
+                    process.kill()
+                    process.wait()
+                    stopped = True
+            except (OSError, ValueError, psutil.Error):
+                pass
+        removeFile(pidFile)
+        removeFile(getStatusFile(projectRootDirectory, serviceName))
+        removeFile(getStopFile(projectRootDirectory, serviceName))
+        return stopped or status is not None
@@ -4,13 +4,25 @@ Zachary Cook
 Deploys services using systemd (most Linux distributions).
 """
 
+import json
 import os
+import shutil
+import socket
 import subprocess
 import sys
 import pwd
+import time
+import urllib.error
+import urllib.request
+from . import ProjectHash
 from .BaseDeploy import BaseDeploy
 
 
+releasesToKeep = 3
+readyTimeoutSeconds = 120
+serviceUser = "construct-database"
+
+
 class SystemdDeploy(BaseDeploy):
     """
     Returns the path of the service file for the given service.
@@ -42,17 +54,27 @@ class SystemdDeploy(BaseDeploy):
             print("Stopped " + serviceName)
 
     """
-    Starts a service.
+    Creates the user that runs the services if it doesn't exist.
     """
-    def start(self, serviceName):
-        # Create the user if it doesn't exist
+    def createServiceUser(self):
         try:
-            pwd.getpwnam("construct-database")
+            pwd.getpwnam(serviceUser)
         except KeyError:
-            os.system("useradd -d " + self.projectRootDirectory + " -s /sbin/nologin construct-database")
+            os.system("useradd -d " + self.projectRootDirectory + " -s /sbin/nologin " + serviceUser)
+
+    """
+    Gives the user that runs the services ownership of a directory.
+    """
+    def setServiceOwner(self, directory):
+        self.createServiceUser()
+        os.system("chown -R " + serviceUser + ":" + serviceUser + " \"" + directory + "\"")
 
+    """
+    Starts a service.
+    """
+    def start(self, serviceName):
         # Give the user ownership of the project root directory
-        os.system("chown -R construct-database:construct-database " + self.projectRootDirectory)
+        self.setServiceOwner(self.projectRootDirectory)
 
         # Create the service file if it doesn't exist.
         serviceFileLocation = self.getServiceeFile(serviceName)
@@ -63,8 +85,8 @@ class SystemdDeploy(BaseDeploy):
                 file.write("\n")
                 file.write("[Service]\n")
                 file.write("Type=simple\n")
-                file.write("User=construct-database\n")
-                file.write("Group=construct-database\n")
+                file.write("User=" + serviceUser + "\n")
+                file.write("Group=" + serviceUser + "\n")
                 file.write("WorkingDirectory=" + self.projectRootDirectory + "/scripts\n")
                 file.write("ExecStart=\"" + sys.executable + "\" Run.py " + serviceName + "\n")
                 file.write("\n")
@@ -76,4 +98,207 @@ class SystemdDeploy(BaseDeploy):
         print("Starting " + serviceName)
         self.runSystemctl(["start", serviceName + ".service"])
         self.runSystemctl(["enable", serviceName + ".service"])
-        print("Started " + serviceName)
\ No newline at end of file
+        print("Started " + serviceName)
+
+    """
+    Restarts a service. The service is started if it isn't set up.
+    """
+    def restart(self, serviceName):
+        if not os.path.exists(self.getServiceeFile(serviceName)):
+            self.start(serviceName)
+            return
+        self.setServiceOwner(self.getRunDirectory(serviceName))
+        print("Restarting " + serviceName)
+        self.runSystemctl(["restart", serviceName + ".service"])
+        self.runSystemctl(["enable", serviceName + ".service"])
+        print("Restarted " + serviceName)
+
+    """
+    Waits for a service to report that it is ready on a port. Returns
+    if the service became ready before the timeout.
+    """
+    def waitForReady(self, port, timeoutSeconds=readyTimeoutSeconds, process=None):
+        endTime = time.time() + timeoutSeconds
+        while time.time() < endTime:
+            # Return if the process stopped.
+            if process is not None and process.poll() is not None:
+                return False
+
+            # Return if the service is ready.
+            try:
+                urllib.request.urlopen("http://127.0.0.1:" + str(port) + "/ready", timeout=2).close()
+                return True
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.5)
+        return False
+
+    """
+    Returns the releases of a service, oldest first.
+    """
+    def getReleases(self, serviceName):
+        releasesDirectory = self.getReleasesDirectory(serviceName)
+        if not os.path.exists(releasesDirectory):
+            return []
+        return sorted(name for name in os.listdir(releasesDirectory) if name != "current" and not name.startswith(".") and os.path.isdir(os.path.join(releasesDirectory, name)))
+
+    """
+    Returns the name of the current release of a service. Returns
+    None if there is no current release.
+    """
+    def getCurrentRelease(self, serviceName):
+        currentReleaseLink = self.getCurrentReleaseLink(serviceName)
+        if not os.path.islink(currentReleaseLink):
+            return None
+        return os.path.basename(os.readlink(currentReleaseLink))
+
+    """
+    Atomically changes the current release of a service.
+    """
+    def switchRelease(self, serviceName, releaseName):
+        currentReleaseLink = self.getCurrentReleaseLink(serviceName)
+        temporaryLink = currentReleaseLink + ".new"
+        if os.path.lexists(temporaryLink):
+            os.remove(temporaryLink)
+        os.symlink(os.path.join(self.getReleasesDirectory(serviceName), releaseName), temporaryLink)
+        os.replace(temporaryLink, currentReleaseLink)
+        print("Current release of " + serviceName + " is " + releaseName)
+
+    """
+    Publishes a new release of a service without changing the running
+    service. The current release is copied if the sources didn't change.
+    """
+    def createRelease(self, serviceName):
+        # Determine the release directory.
+        sourceHash = ProjectHash.getProjectHash(self.projectRootDirectory, serviceName)
+        releaseName = time.strftime("%Y%m%d%H%M%S") + "-" + sourceHash[:8]
+        releaseDirectory = os.path.join(self.getReleasesDirectory(serviceName), releaseName)
+
+        # Copy the current release if it has the same sources, or publish a new release.
+        currentRelease = self.getCurrentRelease(serviceName)
+        currentReleaseDirectory = (os.path.join(self.getReleasesDirectory(serviceName), currentRelease) if currentRelease is not None else None)
+        if not self.forceBuild and currentReleaseDirectory is not None and self.getBuildInformation(currentReleaseDirectory).get("sources") == sourceHash:
+            print("Copying current release of " + serviceName + " (unchanged)")
+            shutil.copytree(currentReleaseDirectory, releaseDirectory, symlinks=True)
+        else:
+            print("Building release " + releaseName + " of " + serviceName)
+            self.publish(serviceName, releaseDirectory)
+            self.setBuildInformation(releaseDirectory, {"sources": sourceHash})
+
+        # Copy the configuration, give the user ownership of the release, and return the release.
+        self.copyConfiguration(releaseDirectory)
+        self.setServiceOwner(releaseDirectory)
+        return releaseName
+
+    """
+    Starts a release on an unused port and returns if it became ready.
+    The port of the running service can't be shared, so the configuration
+    of the release is temporarily changed to use the unused port. The
+    release is started as the service user with --probe so that it doesn't
+    apply migrations or start the background services before it is chosen.
+    """
+    def probeRelease(self, serviceName, releaseName):
+        # Get an unused port.
+        probeSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probeSocket.bind(("127.0.0.1", 0))
+        probePort = probeSocket.getsockname()[1]
+        probeSocket.close()
+
+        # Change the port in the configuration.
+        releaseDirectory = os.path.join(self.getReleasesDirectory(serviceName), releaseName)
+        configurationPath = os.path.join(releaseDirectory, "configuration.json")
+        originalConfiguration = None
+        configuration = {}
+        if os.path.exists(configurationPath):
+            with open(configurationPath) as file:
+                originalConfiguration = file.read()
+            configuration = json.loads(originalConfiguration)
+        if "Ports" not in configuration.keys():
+            configuration["Ports"] = {}
+        configuration["Ports"][serviceName.split(".")[-1]] = probePort
+        with open(configurationPath, "w") as file:
+            json.dump(configuration, file, indent=2)
+
+        # Start the release and wait for it to be ready.
+        print("Checking release " + releaseName + " of " + serviceName + " on port " + str(probePort))
+        executable = os.path.realpath(releaseDirectory + "/" + serviceName)
+        logLocation = os.path.join(releaseDirectory, "probe.log")
+        with open(logLocation, "w") as logFile:
+            self.setServiceOwner(configurationPath)
+            self.setServiceOwner(logLocation)
+            process = subprocess.Popen([executable, "--probe"], cwd=releaseDirectory, stdout=logFile, stderr=subprocess.STDOUT, user=serviceUser, group=serviceUser)
+            try:
+                ready = self.waitForReady(probePort, process=process)
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+
+        # Restore the configuration and return if the release was ready.
+        if originalConfiguration is not None:
+            with open(configurationPath, "w") as file:
+                file.write(originalConfiguration)
+        else:
+            os.remove(configurationPath)
+        return ready
+
+    """
+    Removes the oldest releases of a service. The current release and
+    the releases before it are kept for rolling back.
+    """
+    def pruneReleases(self, serviceName):
+        releases = self.getReleases(serviceName)
+        currentRelease = self.getCurrentRelease(serviceName)
+        for releaseName in releases[:max(0, len(releases) - releasesToKeep)]:
+            if releaseName == currentRelease:
+                continue
+            print("Removing old release " + releaseName + " of " + serviceName)
+            shutil.rmtree(os.path.join(self.getReleasesDirectory(serviceName), releaseName))
+
+    """
+    Deploys a new release of a service while the existing release keeps
+    running. The service is only restarted after the new release passes
+    a readiness check, and the previous release is restored if the
+    restarted service doesn't become ready. Returns if the new release
+    was deployed.
+    """
+    def deployBlueGreen(self, serviceName):
+        # Create and check the new release.
+        previousRelease = self.getCurrentRelease(serviceName)
+        releaseName = self.createRelease(serviceName)
+        if not self.probeRelease(serviceName, releaseName):
+            print("Release " + releaseName + " of " + serviceName + " did not become ready. See probe.log in the release. The running service was not changed.")
+            return False
+
+        # Switch to the new release and restart the service.
+        self.switchRelease(serviceName, releaseName)
+        self.restart(serviceName)
+        port = self.getPort(serviceName, os.path.join(self.getReleasesDirectory(serviceName), releaseName, "configuration.json"))
+        if not self.waitForReady(port):
+            print("Release " + releaseName + " of " + serviceName + " did not become ready on port " + str(port) + ".")
+            if previousRelease is not None:
+                print("Rolling back to " + previousRelease)
+                self.switchRelease(serviceName, previousRelease)
+                self.restart(serviceName)
+            return False
+
+        # Remove the old releases.
+        self.pruneReleases(serviceName)
+        return True
+
+    """
+    Changes a service back to the release before the current release.
+    """
+    def rollback(self, serviceName):
+        # Get the previous release.
+        releases = self.getReleases(serviceName)
+        currentRelease = self.getCurrentRelease(serviceName)
+        if currentRelease not in releases or releases.index(currentRelease) == 0:
+            print("No release of " + serviceName + " to roll back to.")
+            return
+
+        # Switch to the previous release and restart the service.
+        self.switchRelease(serviceName, releases[releases.index(currentRelease) - 1])
+        self.restart(serviceName)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Zachary Cook
+
+Runs the test projects for deployments. Independent test projects are
+run at the same time and projects that haven't changed since the last
+passing run are skipped.
+"""
+
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import ProjectHash
+
+
+class TestRunner:
+    """
+    Creates the test runner.
+    """
+    def __init__(self, projectRootDirectory, workers=None, force=False):
+        self.projectRootDirectory = projectRootDirectory
+        self.workers = max(1, workers if workers is not None else min(4, os.cpu_count() or 1))
+        self.force = force
+        self.cacheLocation = os.path.join(projectRootDirectory, "bin", ".verification.json")
+        self.results = []
+
+    """
+    Reads the hashes of the last passing runs.
+    """
+    def readCache(self):
+        if not os.path.exists(self.cacheLocation):
+            return {}
+        try:
+            with open(self.cacheLocation) as file:
+                return json.load(file)
+        except ValueError:
+            return {}
+
+    """
+    Writes the hashes of the last passing runs.
+    """
+    def writeCache(self, cache):
+        os.makedirs(os.path.dirname(self.cacheLocation), exist_ok=True)
+        with open(self.cacheLocation, "w") as file:
+            json.dump(cache, file, indent=4, sort_keys=True)
+
+    """
+    Runs a dotnet command for a project and returns the exit code and output.
+    """
+    def runDotnet(self, projectName, arguments):
+        projectDirectory = os.path.realpath(os.path.join(self.projectRootDirectory, projectName))
+        process = subprocess.run(["dotnet"] + arguments, cwd=projectDirectory, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return process.returncode, process.stdout.decode("utf8", errors="replace")
+
+    """
+    Builds a test project. Builds are done one at a time since the
+    projects share references that can't be written at the same time.
+    """
+    def buildProject(self, projectName):
+        print("Building " + projectName)
+        startTime = time.time()
+        exitCode, output = self.runDotnet(projectName, ["build"])
+        return {
+            "project": projectName,
+            "passed": exitCode == 0,
+            "buildTime": time.time() - startTime,
+            "testTime": 0.0,
+            "output": output,
+        }
+
+    """
+    Tests a project that was already built.
+    """
+    def testProject(self, result):
+        print("Testing " + result["project"])
+        startTime = time.time()
+        exitCode, output = self.runDotnet(result["project"], ["test", "--no-build"])
+        result["passed"] = exitCode == 0
+        result["testTime"] = time.time() - startTime
+        result["output"] += output
+        print(("Passed " if result["passed"] else "Failed ") + result["project"])
+        return result
+
+    """
+    Verifies a list of test projects. Returns the names of the
+    projects that failed.
+    """
+    def verify(self, projectNames):
+        # Determine the projects that changed since the last passing run.
+        cache = self.readCache()
+        projectHashes = {}
+        projectsToRun = []
+        self.results = []
+        for projectName in projectNames:
+            projectHashes[projectName] = ProjectHash.getProjectHash(self.projectRootDirectory, projectName)
+            if not self.force and cache.get(projectName) == projectHashes[projectName]:
+                print("Skipping " + projectName + " (unchanged since the last passing run)")
+                self.results.append({"project": projectName, "passed": True, "cached": True, "buildTime": 0.0, "testTime": 0.0, "output": ""})
+            else:
+                projectsToRun.append(projectName)
+
+        # Build the projects, then run the tests of the built projects at the same time.
+        builtResults = []
+        for projectName in projectsToRun:
+            result = self.buildProject(projectName)
+            if result["passed"]:
+                builtResults.append(result)
+            else:
+                print("Failed to build " + projectName)
+                self.results.append(result)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self.results.extend(executor.map(self.testProject, builtResults))
+
+        # Store the hashes of the passing projects.
+        failedProjects = []
+        for result in self.results:
+            if result.get("cached"):
+                continue
+            if result["passed"]:
+                cache[result["project"]] = projectHashes[result["project"]]
+            else:
+                cache.pop(result["project"], None)
+                failedProjects.append(result["project"])
+        self.writeCache(cache)
+
+        # Output the failed tests and return the failed projects.
+        for result in self.results:
+            if not result["passed"]:
+                print("Output for " + result["project"] + ":")
+                print(result["output"])
+        return failedProjects
+
+    """
+    Prints the time taken for each project.
+    """
+    def printSummary(self):
+        print("Verification summary (" + str(self.workers) + " workers):")
+        for result in sorted(self.results, key=lambda result: result["project"]):
+            if result.get("cached"):
+                status = "cached"
+            elif result["passed"]:
+                status = "passed"
+            else:
+                status = "FAILED"
+            print("\t" + result["project"].ljust(32) + status.ljust(8) + ("build %.1fs" % result["buildTime"]).ljust(14) + ("test %.1fs" % result["testTime"]))
@@ -0,0 +1,27 @@
+"""
+Zachary Cook
+
+Helper script for copying the configuration to deployed services. The
+services load the configuration again when the file changes, so the
+changes apply without restarting them.
+"""
+
+import os
+from DeployImplementations.BaseDeploy import BaseDeploy
+
+
+# Run the program.
+if __name__ == '__main__':
+    deployObject = BaseDeploy()
+    for service in deployObject.getServicesFromCLI():
+        # Skip the service if it isn't deployed.
+        runDirectory = deployObject.getRunDirectory(service)
+        if not os.path.exists(runDirectory):
+            print(service + " is not deployed.")
+            continue
+
+        # Copy the configuration.
+        if deployObject.copyConfiguration(runDirectory):
+            print("Reloading configuration of " + service + ". Changes to Database and Ports still require Setup.py deploy.")
+        else:
+            print("Configuration of " + service + " is unchanged.")
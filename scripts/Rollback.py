@@ -0,0 +1,21 @@
+"""
+Zachary Cook
+
+Helper script for rolling back services deployed with blue/green deployments.
+"""
+
+from DeployImplementations import AutoDeploy
+
+
+# Run the program.
+if __name__ == '__main__':
+    # Get the services to roll back.
+    deployObject = AutoDeploy.getDeploy()
+    servicesToDeploy = deployObject.getServicesFromCLI()
+    if not hasattr(deployObject, "rollback"):
+        print("Rolling back is not supported on this platform.")
+        exit(-1)
+
+    # Roll back the services.
+    for service in servicesToDeploy:
+        deployObject.rollback(service)
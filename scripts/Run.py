@@ -22,12 +22,12 @@ if __name__ == '__main__':
     service = servicesToRun[0]
 
     # Build the service if it wasn't done already.
-    if not os.path.exists(deployObject.getOutputDirectory(service)):
+    if not os.path.exists(deployObject.getRunDirectory(service)):
         deployObject.build(service)
 
     # Start the service.
     print("Starting " + service)
-    outputDirectory = deployObject.getOutputDirectory(service)
+    outputDirectory = deployObject.getRunDirectory(service)
     executable = os.path.realpath(outputDirectory + "/" + service)
     if os.path.exists(executable + ".exe"):
         executable += ".exe"
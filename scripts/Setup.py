@@ -12,6 +12,12 @@ import sys
 
 repositoryUrl = "https://github.com/TheConstructRIT/Makerspace-Database-Server.git"
 commands = [
+    {
+        "command": "benchmark",
+        "script": "Benchmark.py",
+        "arguments": "[service1] [service2] [...]",
+        "description": "Measures the latency and throughput of a list of services with a generated database.",
+    },
     {
         "command": "config",
         "script": "Config.py",
@@ -24,12 +30,36 @@ commands = [
         "arguments": "[service1] [service2] [...]",
         "description": "Stops, rebuilds, and deploys a list of services.",
     },
+    {
+        "command": "reload",
+        "script": "Reload.py",
+        "arguments": "[service1] [service2] [...]",
+        "description": "Copies the configuration to a list of deployed services, which apply it without restarting.",
+    },
+    {
+        "command": "rollback",
+        "script": "Rollback.py",
+        "arguments": "[service1] [service2] [...]",
+        "description": "Restarts a list of services using the release before the current blue/green release.",
+    },
+    {
+        "command": "supervise",
+        "script": "Supervise.py",
+        "arguments": "[service1] [service2] [...]",
+        "description": "Runs a list of services in the foreground and restarts them if they crash.",
+    },
     {
         "command": "start",
         "script": "Start.py",
         "arguments": "[service1] [service2] [...]",
         "description": "Stops and starts a list of services without rebuilding.",
     },
+    {
+        "command": "status",
+        "script": "Status.py",
+        "arguments": "[service1] [service2] [...]",
+        "description": "Displays the uptime, restarts, and memory of services supervised as processes.",
+    },
     {
         "command": "stop",
         "script": "Stop.py",
@@ -20,7 +20,7 @@ if __name__ == '__main__':
         deployObject.stop(service)
 
         # Build the service if it wasn't done already.
-        if not os.path.exists(deployObject.getOutputDirectory(service)):
+        if not os.path.exists(deployObject.getRunDirectory(service)):
             deployObject.build(service)
 
         # Start the service.
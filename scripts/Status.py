@@ -0,0 +1,61 @@
+"""
+Zachary Cook
+
+Helper script for displaying the state of the services supervised
+as processes, including the uptime, restarts, and memory.
+"""
+
+import sys
+import time
+from DeployImplementations import BaseDeploy
+from DeployImplementations import Supervisor
+
+
+"""
+Returns a duration in seconds as a readable string.
+"""
+def formatDuration(seconds):
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return str(seconds // 86400) + "d" + str(seconds % 86400 // 3600) + "h"
+    if seconds >= 3600:
+        return str(seconds // 3600) + "h" + str(seconds % 3600 // 60) + "m"
+    if seconds >= 60:
+        return str(seconds // 60) + "m" + str(seconds % 60) + "s"
+    return str(seconds) + "s"
+
+
+# Run the program.
+if __name__ == '__main__':
+    # Get the services to display. All the services are displayed if none are specified.
+    deployObject = BaseDeploy.BaseDeploy()
+    servicesSpecified = len([argument for argument in sys.argv[1:] if not argument.startswith("--")]) > 0
+    if servicesSpecified:
+        services = deployObject.getServicesFromCLI()
+    else:
+        services = []
+        for serviceNames in BaseDeploy.serviceOptions.values():
+            services.extend(serviceName for serviceName in serviceNames if serviceName not in services)
+
+    # Display the state of the services.
+    print("Service".ljust(26) + "State".ljust(12) + "PID".ljust(9) + "Uptime".ljust(10) + "Restarts".ljust(10) + "Last Exit".ljust(11) + "RSS")
+    for service in services:
+        status = Supervisor.readStatus(deployObject.projectRootDirectory, service)
+        if status is None:
+            if servicesSpecified:
+                print(service.ljust(26) + "stopped")
+            continue
+
+        # Determine the state.
+        state = status["state"]
+        pid = status["pid"]
+        if not Supervisor.isProcessRunning(status["supervisorPid"]):
+            state = "orphaned" if Supervisor.isProcessRunning(pid) else "stale"
+        elif pid is not None and not Supervisor.isProcessRunning(pid):
+            state = "exited"
+
+        # Display the service.
+        uptime = formatDuration(time.time() - status["startTime"]) if status["startTime"] is not None and state == "running" else "-"
+        rss = Supervisor.getProcessRss(pid) if pid is not None else None
+        print(service.ljust(26) + state.ljust(12) + str(pid if pid is not None else "-").ljust(9) + uptime.ljust(10) + str(status["restarts"]).ljust(10) +
+              str(status["lastExitCode"] if status["lastExitCode"] is not None else "-").ljust(11) + (str(round(rss / (1024 * 1024), 1)) + " MB" if rss is not None else "-"))
@@ -0,0 +1,36 @@
+"""
+Zachary Cook
+
+Helper script for supervising services in the foreground. Crashed services
+are restarted until the supervisor is stopped (Ctrl+C) or the services are
+stopped with Stop.py.
+"""
+
+import os
+from DeployImplementations.BaseDeploy import BaseDeploy
+from DeployImplementations import Supervisor
+
+
+# Run the program.
+if __name__ == '__main__':
+    # Get the services to supervise.
+    deployObject = BaseDeploy()
+    servicesToSupervise = []
+    for service in deployObject.getServicesFromCLI():
+        status = Supervisor.readStatus(deployObject.projectRootDirectory, service)
+        if status is not None and Supervisor.isProcessRunning(status["supervisorPid"]):
+            print(service + " is already supervised by process " + str(status["supervisorPid"]) + ".")
+            continue
+        servicesToSupervise.append(service)
+    if len(servicesToSupervise) == 0:
+        exit(0)
+
+    # Build the services if it wasn't done already.
+    for service in servicesToSupervise:
+        if not os.path.exists(deployObject.getRunDirectory(service)):
+            deployObject.build(service)
+
+    # Supervise the services.
+    logSize = int(deployObject.getOptionFromCLI("log-size", 10)) * 1024 * 1024
+    logCount = int(deployObject.getOptionFromCLI("log-count", 5))
+    Supervisor.Supervisor(deployObject, logSize=logSize, logCount=logCount).run(servicesToSupervise)
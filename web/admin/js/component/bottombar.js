@@ -16,12 +16,20 @@ class BottomBar extends React.Component {
 
         // Bind the functions.
         this.startDownload = this.startDownload.bind(this);
+        this.startArchivedDownload = this.startArchivedDownload.bind(this);
+    }
+
+    /*
+     * Starts downloading the CSVs with the archived visits and prints.
+     */
+    startArchivedDownload() {
+        this.startDownload(true);
     }
 
     /*
      * Starts downloading the CSVs.
      */
-    startDownload() {
+    startDownload(archived) {
         // Return if the data is downloading.
         if (this.state.downloadState == "Download Started") {
             return;
@@ -33,6 +41,7 @@ class BottomBar extends React.Component {
         var link = document.createElement("a");
         link.href = "/admin/csvs?" + $.param({
             "session": getCookie("session"),
+            "archived": archived === true,
         });
         link.download = "CSVs.zip";
         link.click();
@@ -45,6 +54,7 @@ class BottomBar extends React.Component {
         // Return the bottom bar.
         return <div class="BottomBarContainer">
             <button onClick={this.startDownload}>{this.state.downloadState}</button>
+            <button onClick={this.startArchivedDownload}>Export Data With Archive</button>
         </div>
     }
 }
\ No newline at end of file
@@ -246,20 +246,17 @@ class Summary extends React.Component {
         this.inspect = this.inspect.bind(this);
         this.setView = this.setView.bind(this);
         this.search = this.search.bind(this);
+        this.startVisitFeed = this.startVisitFeed.bind(this);
+        this.stopVisitFeed = this.stopVisitFeed.bind(this);
+        this.addVisit = this.addVisit.bind(this);
+        this.getPageParameters = this.getPageParameters.bind(this);
+        this.storeNextCursor = this.storeNextCursor.bind(this);
 
         // Load the initial data.
         this.loadData();
         if (this.props.user == null) {
             staticSummary = this;
         }
-
-        // Occasionally update the visits list.
-        let summaryObject = this;
-        setInterval(function() {
-            if (summaryObject.state.view == "Visits") {
-                summaryObject.loadVisits(true);
-            }
-        },5000);
     }
 
     /*
@@ -293,6 +290,133 @@ class Summary extends React.Component {
         // Create the new table.
         this.componentDidMount();
         this.loadData();
+
+        // Listen for new visits while the visits are shown.
+        if (viewName == "Visits" && this.props.user == null) {
+            this.startVisitFeed();
+        } else {
+            this.stopVisitFeed();
+        }
+    }
+
+    /*
+     * Starts listening for new visits from the server.
+     */
+    startVisitFeed() {
+        // Return if the feed is already open.
+        if (this.visitFeed != null) {
+            return;
+        }
+
+        // Open the feed.
+        let summaryObject = this;
+        this.visitFeed = new EventSource("/admin/visits/feed?" + $.param({
+            session: getCookie("session"),
+        }));
+        this.visitFeed.addEventListener("visit", function(event) {
+            summaryObject.addVisit(JSON.parse(event.data));
+        });
+    }
+
+    /*
+     * Stops listening for new visits from the server.
+     */
+    stopVisitFeed() {
+        if (this.visitFeed != null) {
+            this.visitFeed.close();
+            this.visitFeed = null;
+        }
+        if (this.visitReloadTimeout != null) {
+            clearTimeout(this.visitReloadTimeout);
+            this.visitReloadTimeout = null;
+        }
+    }
+
+    /*
+     * Adds a new visit from the server.
+     */
+    addVisit(visit) {
+        // Return if the visits aren't shown.
+        if (this.state.view != "Visits" || this.state.loading || this.state.failed || this.state.unathorized) {
+            return;
+        }
+
+        // Reload the visits later if the visit isn't added to the top of the first page.
+        let ordered = true;
+        if (this.table != null) {
+            let order = this.table.order()[0];
+            ordered = (COLUMNS.Visits[order[0]].data == "time" && order[1] == "desc");
+        }
+        if (this.state.currentPage > 1 || this.state.searchTerm != "" || !ordered) {
+            if (this.visitReloadTimeout == null) {
+                let summaryObject = this;
+                this.visitReloadTimeout = setTimeout(function() {
+                    summaryObject.visitReloadTimeout = null;
+                    if (summaryObject.state.view == "Visits") {
+                        summaryObject.loadVisits(true);
+                    }
+                },5000);
+            }
+            return;
+        }
+
+        // Return if the visit is already shown.
+        for (let entry of this.state.entries) {
+            if (entry.id == visit.id) {
+                return;
+            }
+        }
+
+        // Add the visit.
+        visit.time = visit.timestamp;
+        visit.hashedId = cleanString(visit.hashedId);
+        visit.name = cleanString(visit.name);
+        visit.email = cleanString(visit.email);
+        this.state.entries = [visit].concat(this.state.entries).slice(0, MAX_VISIT_ENTRIES_PER_PAGE);
+        this.state.totalVisits += 1;
+        this.counter.setMaxPage(Math.ceil(this.state.totalVisits / MAX_VISIT_ENTRIES_PER_PAGE));
+        this.updateState();
+    }
+
+    /*
+     * Returns the url parameters for loading the current page. Pages after a
+     * loaded page use the cursor returned with it so that the server doesn't
+     * have to skip the entries before the page. Other pages use the offset.
+     */
+    getPageParameters(name, column, ascending, entriesPerPage) {
+        // Reset the cursors if the search changed.
+        let pagingKey = [this.state.view, this.state.searchTerm, column, ascending, this.props.user].join("\n");
+        if (this.pageCursors == null || this.pageCursors.key != pagingKey) {
+            this.pageCursors = {
+                key: pagingKey,
+                cursors: {1: ""},
+            };
+        }
+
+        // Create the parameters.
+        let page = Math.max(this.state.currentPage, 1);
+        let parameters = {};
+        parameters["max" + name] = entriesPerPage;
+        parameters["offset" + name] = (page - 1) * entriesPerPage;
+        let cursor = this.pageCursors.cursors[page];
+        if (cursor != null) {
+            parameters.usecursor = true;
+            parameters.cursor = cursor;
+        }
+        return {
+            key: pagingKey,
+            page: page,
+            parameters: parameters,
+        };
+    }
+
+    /*
+     * Stores the cursor for the page after a loaded page.
+     */
+    storeNextCursor(pageParameters, nextCursor) {
+        if (this.pageCursors != null && this.pageCursors.key == pageParameters.key && nextCursor != null) {
+            this.pageCursors.cursors[pageParameters.page + 1] = nextCursor;
+        }
     }
 
     /*
@@ -325,14 +449,13 @@ class Summary extends React.Component {
         }
 
         // Form the url parameters.
-        let urlParameters = {
+        let pageParameters = this.getPageParameters("prints", column, ascending, MAX_ENTRIES_PER_PAGE);
+        let urlParameters = Object.assign({
             session: getCookie("session"),
-            maxprints: MAX_ENTRIES_PER_PAGE,
-            offsetprints: Math.max(this.state.currentPage - 1, 0) * MAX_ENTRIES_PER_PAGE,
             order: column,
             ascending: ascending,
             search: this.state.searchTerm,
-        };
+        }, pageParameters.parameters);
         if (this.props.user) {
             urlParameters.hashedId = this.props.user;
         }
@@ -356,6 +479,7 @@ class Summary extends React.Component {
                 }
 
                 // Convert the result.
+                summaryObject.storeNextCursor(pageParameters, result.nextCursor);
                 summaryObject.counter.setMaxPage(Math.ceil(result.totalPrints / MAX_ENTRIES_PER_PAGE));
                 summaryObject.state.entries = [];
                 result.prints.forEach(function(entry) {
@@ -391,7 +515,8 @@ class Summary extends React.Component {
                     return;
                 }
 
-                // Set the loading as failed.
+                // Set the loading as failed. The cursors are reset in case they are no longer valid.
+                summaryObject.pageCursors = null;
                 summaryObject.state.loading = false;
                 summaryObject.state.failed = true;
                 summaryObject.updateState();
@@ -422,15 +547,14 @@ class Summary extends React.Component {
 
         // Start loading the data.
         let summaryObject = this;
+        let pageParameters = this.getPageParameters("users", column, ascending, MAX_ENTRIES_PER_PAGE);
         $.ajax({
-            url: "/admin/users?" + $.param({
+            url: "/admin/users?" + $.param(Object.assign({
                 session: getCookie("session"),
-                maxusers: MAX_ENTRIES_PER_PAGE,
-                offsetusers: Math.max(this.state.currentPage - 1, 0) * MAX_ENTRIES_PER_PAGE,
                 order: column,
                 ascending: ascending,
                 search: summaryObject.state.searchTerm,
-            }),
+            }, pageParameters.parameters)),
             
             success: function(result) {
                 // Return if the current loading request doesn't match.
@@ -447,6 +571,7 @@ class Summary extends React.Component {
                 }
 
                 // Convert the result.
+                summaryObject.storeNextCursor(pageParameters, result.nextCursor);
                 summaryObject.counter.setMaxPage(Math.ceil(result.totalUsers / MAX_ENTRIES_PER_PAGE));
                 summaryObject.state.entries = result.users;
                 result.users.forEach(function(entry) {
@@ -466,7 +591,8 @@ class Summary extends React.Component {
                     return;
                 }
 
-                // Set the loading as failed.
+                // Set the loading as failed. The cursors are reset in case they are no longer valid.
+                summaryObject.pageCursors = null;
                 summaryObject.state.loading = false;
                 summaryObject.state.failed = true;
                 summaryObject.updateState();
@@ -499,15 +625,14 @@ class Summary extends React.Component {
         
         // Start loading the data.
         let summaryObject = this;
+        let pageParameters = this.getPageParameters("visits", column, ascending, MAX_VISIT_ENTRIES_PER_PAGE);
         $.ajax({
-            url: "/admin/visits?" + $.param({
+            url: "/admin/visits?" + $.param(Object.assign({
                 session: getCookie("session"),
-                maxvisits: MAX_VISIT_ENTRIES_PER_PAGE,
-                offsetvisits: Math.max(this.state.currentPage - 1, 0) * MAX_VISIT_ENTRIES_PER_PAGE,
                 order: column,
                 ascending: ascending,
                 search: summaryObject.state.searchTerm,
-            }),
+            }, pageParameters.parameters)),
             
             success: function(result) {
                 // Return if the current loading request doesn't match.
@@ -524,6 +649,8 @@ class Summary extends React.Component {
                 }
 
                 // Convert the result.
+                summaryObject.storeNextCursor(pageParameters, result.nextCursor);
+                summaryObject.state.totalVisits = result.totalVisits;
                 summaryObject.counter.setMaxPage(Math.ceil(result.totalVisits / MAX_VISIT_ENTRIES_PER_PAGE));
                 summaryObject.state.entries = result.visits;
                 result.visits.forEach(function(entry) {
@@ -544,7 +671,8 @@ class Summary extends React.Component {
                     return;
                 }
 
-                // Set the loading as failed.
+                // Set the loading as failed. The cursors are reset in case they are no longer valid.
+                summaryObject.pageCursors = null;
                 summaryObject.state.loading = false;
                 summaryObject.state.failed = true;
                 summaryObject.updateState();